@@ -176,6 +176,79 @@ echo window_height = 1080
 echo page_load_timeout = 30
 echo timeout = 10
 echo additional_options = --disable-gpu,--no-sandbox
+echo # 起動プロファイル: lite（大量処理向け）/ full-render（描画あり）/ debug（画面表示・開発者ツール）、空欄で従来の設定
+echo launch_profile = 
+echo # 操作方式: webdriver（chromedriver経由）/ cdp（DevToolsに直接接続、websocket-clientが必要）
+echo engine = webdriver
+echo # cdp エンジンで使用する Chrome の実行ファイル（空欄の場合は自動検出）
+echo chrome_path = 
+echo # ページソースの取得モード: lazy（初回アクセス時）/ eager（移動時）/ off（取得しない）
+echo page_source_capture = lazy
+echo page_source_history_size = 2
+echo # lazy で、参照しなかったページのソースも移動の直前に取得して last_page_source に残すかどうか
+echo page_source_keep_previous = false
+echo page_source_compression = auto
+echo # フォーム入力方式: script（スクリプトで一括入力）/ keys（キー入力）
+echo form_input_mode = script
+echo # crawl() の同時ブラウザ数とリトライ回数
+echo crawl_concurrency = 4
+echo crawl_retries = 1
+echo # load_in_tabs() の同時タブ数と、タブを作り直すまでの処理ページ数
+echo tab_pool_size = 4
+echo tab_max_uses = 50
+echo # ブラウザを作り直すまでの移動回数とメモリ使用量（MB、0で無効）
+echo recycle_after_navigations = 0
+echo recycle_memory_mb = 0
+echo # quit() を待つ秒数（超えた場合はプロセスを強制終了）
+echo quit_timeout = 10
+echo # セッションごとのプロセス計測結果の出力先（空欄の場合は出力しない）
+echo watchdog_metrics_path = 
+echo # ブラウザデーモンへの接続: auto（動作中なら接続）/ true / false
+echo use_daemon = auto
+echo daemon_state_path = tmp/browser_daemon.json
+echo # 要素の待機時間をセレクタ・ドメインごとに記録し、タイムアウトを実績（p99 × margin）から決める
+echo adaptive_timeout = false
+echo selector_stats_path = data/selector_stats.json
+echo adaptive_timeout_margin = 1.5
+echo adaptive_timeout_min = 1
+echo adaptive_timeout_max = 60
+echo adaptive_timeout_min_samples = 20
+echo # selectors.csv の同じグループ・名前の候補ごとの一致の実績（一致する候補を優先する）
+echo selector_candidates_path = data/selector_candidates.json
+echo # 同じページで見つけた要素を再利用する（ページの移動・ウィンドウの切り替え・要素の追加や削除で無効化）
+echo element_cache = false
+echo element_cache_size = 256
+echo # extract_table() で1回に取得するテーブルの行数
+echo table_chunk_size = 1000
+echo # start_network_capture() で保持する応答の件数と本文の合計サイズ・1件の最大サイズ（バイト）
+echo network_capture_max_entries = 500
+echo network_capture_max_bytes = 52428800
+echo network_capture_max_body_bytes = 10485760
+echo # start_network_capture() で応答の本文を取得するスレッド数
+echo network_capture_body_workers = 2
+echo # navigate_to() ごとの通信を HAR ファイルに記録するかどうかと保存先、集計で表示するリソースの数
+echo har_recording = false
+echo har_dir = logs/har
+echo har_top = 10
+echo har_max_entries = 2000
+echo # ダウンロード先（セッションごとのディレクトリを作成。空欄の場合は expect_download() の初回に downloads に作成）と完了を待つ秒数
+echo download_dir =
+echo download_timeout = 120
+echo # エラー時に直近の画面を GIF で保存する録画（DevTools の screencast）と保存先、1秒あたりのフレーム数と保持する秒数
+echo screencast = false
+echo screencast_dir = logs/screencasts
+echo screencast_fps = 5
+echo screencast_seconds = 10
+echo screencast_max_width = 800
+echo screencast_max_height = 600
+echo screencast_quality = 50
+echo.
+echo # 起動プロファイルの変更・追加の例（base の設定に arguments を追加し、remove_arguments を除外）
+echo # [LAUNCH_PROFILE:scraper]
+echo # base = lite
+echo # arguments = --proxy-server=http://127.0.0.1:8080
+echo # remove_arguments = --blink-settings=imagesEnabled=false
+echo # page_load_strategy = eager
 echo.
 echo [LOGIN]
 echo url = https://example.com/login
@@ -185,6 +258,7 @@ echo redirect_timeout = 30
 echo element_timeout = 10
 echo page_load_wait = 2
 echo screenshot_on_login = true
+echo # input_mode = keys
 echo basic_auth_enabled = false
 echo # 以下の認証情報は secrets.env から取得されます
 echo # LOGIN_USERNAME, LOGIN_PASSWORD, LOGIN_ACCOUNT_KEY
@@ -265,6 +339,9 @@ echo.
 echo # Web Automation
 echo selenium==4.18.1
 echo webdriver-manager==4.0.1
+echo websocket-client==1.7.0
+echo psutil==5.9.8
+echo watchdog==4.0.0
 echo.
 echo # AI/ML Libraries
 echo openai==1.12.0
@@ -324,6 +401,16 @@ if errorlevel 1 echo [ERROR] bigquery.py のコピーに失敗しました。終
 attrib -R "%PROJECT_NAME%\src\utils\bigquery.py"
 echo [LOG] bigquery.py をコピーしました。
 
+copy "%TEMPLATE_DIR%\python\utils\sharding_template.py" "%PROJECT_NAME%\src\utils\sharding.py" > nul
+if errorlevel 1 echo [ERROR] sharding.py のコピーに失敗しました。終了します。 && goto END
+attrib -R "%PROJECT_NAME%\src\utils\sharding.py"
+echo [LOG] sharding.py をコピーしました。
+
+copy "%TEMPLATE_DIR%\python\utils\startup_timer_template.py" "%PROJECT_NAME%\src\utils\startup_timer.py" > nul
+if errorlevel 1 echo [ERROR] startup_timer.py のコピーに失敗しました。終了します。 && goto END
+attrib -R "%PROJECT_NAME%\src\utils\startup_timer.py"
+echo [LOG] startup_timer.py をコピーしました。
+
 :: テンプレート接尾辞のないファイルをそのままコピー
 copy "%TEMPLATE_DIR%\python\utils\git_batch.py" "%PROJECT_NAME%\src\utils\git_batch.py" > nul
 if errorlevel 1 echo [ERROR] git_batch.py のコピーに失敗しました。終了します。 && goto END
@@ -5,13 +5,18 @@
 """
 
 import sys
+# 起動時間の計測はほかのモジュールより先に開始する
+from src.utils.startup_timer import startup_timer
+import argparse
 import logging
 from pathlib import Path
 from src.utils.logging_config import get_logger
 from src.utils.environment import env  # 追加: env をインポート
+from src.utils.sharding import merge_shard_outputs, parse_shard
 
 # ロガーの取得
 logger = get_logger(__name__)
+startup_timer.checkpoint("import")
 
 def setup():
     """
@@ -33,19 +38,57 @@ def setup():
     
     return True
 
-def main():
+def parse_args(argv=None):
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='メイン処理')
+    
+    parser.add_argument('--shard', type=parse_shard, default=parse_shard(None),
+                        help="複数のマシンで分担する場合の担当分（例: 0/4）")
+    parser.add_argument('--merge', metavar='OUTPUT',
+                        help="シャードごとの出力ファイルを結合して終了する（例: data/results.jsonl）")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="インポート・設定の読み込み・ブラウザの起動などの所要時間を終了時に表示する")
+    
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     メイン処理を実行します。
     """
-    if not setup():
+    args = parse_args(argv)
+    
+    # 各シャードの出力を結合する場合はセットアップ不要
+    if args.merge:
+        try:
+            merge_shard_outputs(args.merge)
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"シャードの出力の結合に失敗しました: {str(e)}")
+            return 1
+        return 0
+    
+    with startup_timer.measure("config"):
+        ready = setup()
+    if not ready:
         logger.error("セットアップに失敗しました。")
         return 1
 
+    shard = args.shard
+    if shard.is_sharded:
+        logger.info(f"シャード {shard} を処理します")
+
     logger.info("処理を開始します...")
     
     # ここにメイン処理を記述
+    # 入力はシャードで絞り込み、出力先はシャードごとに分けてください。例:
+    #   for url in shard.filter(urls):
+    #       ...
+    #   output_path = shard.output_path("data/results.jsonl")
     
     logger.info("処理が完了しました。")
+    
+    # Browser を使用した場合は browser.* としてドライバーの解決や最初のページ移動の時間も表示される
+    if args.startup_report:
+        print(startup_timer.report())
     return 0
 
 
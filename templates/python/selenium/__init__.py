@@ -5,6 +5,6 @@
 Seleniumを使用したブラウザ自動化ユーティリティを提供します。
 """
 
-from src.modules.generic.browser import Browser
+from .browser import Browser
 
 __all__ = ['Browser'] 
\ No newline at end of file
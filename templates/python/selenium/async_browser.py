@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+非同期ブラウザモジュール
+
+Browser の操作を asyncio から呼び出すためのラッパーを提供します。
+ドライバーへの呼び出しはセッションごとに専用のスレッドで順番に実行するため、
+イベントループをブロックせずに、1つのイベントループから複数のセッションや
+Slack・HTTP などの他のI/Oを同時に扱えます。
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .browser import Browser
+
+
+class AsyncBrowser:
+    """
+    Browser を asyncio から操作するためのラッパー
+
+    使用例:
+        async with AsyncBrowser(headless=True) as browser:
+            await browser.navigate_to("https://www.example.com")
+            element = await browser.wait_for_element(("login", "username"))
+            result = await browser.analyze_page_content()
+    """
+
+    def __init__(self, browser: Optional[Browser] = None, **browser_kwargs):
+        """
+        Args:
+            browser: ラップするBrowserインスタンス（省略時は browser_kwargs で新規作成）
+            **browser_kwargs: Browser のコンストラクタに渡す引数
+        """
+        self.browser = browser or Browser(**browser_kwargs)
+        self.logger = self.browser.logger
+        # WebDriverはスレッドセーフではないため、セッションごとに1スレッドで順番に実行する
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='async-browser')
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        任意の同期処理をこのセッションのスレッドで実行する
+
+        Browser のメソッドや、同じ Browser を使う LoginPage の処理などに使用します。
+
+        Args:
+            func: 実行する関数
+            *args: 関数の引数
+            **kwargs: 関数のキーワード引数
+
+        Returns:
+            関数の戻り値
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    @property
+    def driver(self):
+        """WebDriverインスタンス（直接操作する場合は run() 経由で呼び出してください）"""
+        return self.browser.driver
+
+    async def setup(self) -> bool:
+        """ブラウザを初期化する"""
+        return await self.run(self.browser.setup)
+
+    async def navigate_to(self, url: str) -> bool:
+        """指定したURLに移動する"""
+        return await self.run(self.browser.navigate_to, url)
+
+    async def analyze_page_content(self, element_filter: Optional[Dict[str, bool]] = None,
+                                   check_visibility: bool = True) -> Dict[str, Any]:
+        """ページの内容を解析する"""
+        return await self.run(self.browser.analyze_page_content, element_filter, check_visibility)
+
+    async def save_screenshot(self, filename: str, append_timestamp: bool = False,
+                              append_url: bool = False, custom_dir: Optional[str] = None):
+        """スクリーンショットを保存する"""
+        return await self.run(self.browser.save_screenshot, filename, append_timestamp, append_url, custom_dir)
+
+    async def find_interactive_elements(self, check_visibility: bool = True, viewport_only: bool = False):
+        """操作可能な要素を取得する"""
+        return await self.run(self.browser.find_interactive_elements, check_visibility, viewport_only)
+
+    async def fill_form(self, fields: Dict[Any, Any], typing: Optional[bool] = None,
+                        timeout: Optional[float] = None) -> Dict[Any, bool]:
+        """フォームに一括で入力する"""
+        return await self.run(self.browser.fill_form, fields, typing, timeout)
+
+    async def execute_script(self, script: str, *args) -> Any:
+        """JavaScriptを実行する"""
+        return await self.run(self.browser.driver.execute_script, script, *args)
+
+    async def get_current_url(self) -> Optional[str]:
+        """現在のURLを取得する"""
+        return await self.run(self.browser.get_current_url)
+
+    async def wait_for_element(self, locator: Any, value: Optional[str] = None, timeout: Optional[float] = None,
+                               visible: bool = False):
+        """
+        要素が見つかるまで待機する
+
+        Browser.wait_for_element をこのセッションのスレッドで実行するため、セレクタの候補の一括検索や
+        adaptive_timeout・要素キャッシュなど同期版と同じ動作になり、待機中もイベントループはブロックされません。
+
+        Args:
+            locator: タプル(group, name)、タプル(By.XX, value)、By定数、またはCSSセレクタ文字列
+                （value を省略した文字列はCSSセレクタとして扱う）
+            value: セレクタの値（locator がBy定数の場合に使用）
+            timeout: タイムアウト時間（秒）。未指定時はBrowserのデフォルトのタイムアウト
+            visible: 要素が表示されるのを待つかどうか
+
+        Returns:
+            WebElement: 見つかった要素。見つからない場合はNone
+        """
+        if isinstance(locator, str) and value is None:
+            # Browser.wait_for_element は文字列を By 定数として扱うため、CSSセレクタとして解決してから渡す
+            locator = self.browser._resolve_locator(locator)
+        return await self.run(self.browser.wait_for_element, locator, value, timeout=timeout, visible=visible)
+
+    async def sleep(self, seconds: float):
+        """イベントループをブロックせずに待機する（time.sleep の代わりに使用）"""
+        await asyncio.sleep(seconds)
+
+    async def quit(self):
+        """ブラウザを終了し、専用スレッドを停止する"""
+        try:
+            await self.run(self.browser.quit)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def close(self):
+        """quit()のエイリアス"""
+        await self.quit()
+
+    async def __aenter__(self):
+        if not await self.setup():
+            self._executor.shutdown(wait=False)
+            raise RuntimeError("ブラウザのセットアップに失敗しました")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.quit()
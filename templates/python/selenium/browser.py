@@ -19,14 +19,13 @@ from datetime import datetime
 from typing import Dict, Any, Optional, Union, List, Tuple, Callable
 import urllib.parse
 import re
+import threading
+import weakref
+import importlib.util
+import tempfile
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
     TimeoutException, 
     NoSuchElementException, 
@@ -34,14 +33,37 @@ from selenium.common.exceptions import (
     StaleElementReferenceException,
     ElementClickInterceptedException
 )
-from webdriver_manager.chrome import ChromeDriverManager
 
-# BeautifulSoupのインポート（可能であれば）
-try:
-    from bs4 import BeautifulSoup
-    BS4_AVAILABLE = True
-except ImportError:
-    BS4_AVAILABLE = False
+from .page_history import PageSourceHistory
+from .crawler import Crawler
+from .harvester import Harvester
+from .network_capture import NetworkCapture
+from .download_manager import DownloadManager
+from .screencast import ScreencastRecorder
+from .har_recorder import HarRecorder, HarReport, har_filename, save_har, summarize_har
+from .cdp import CDPDriver, CDPSession, WEBSOCKET_AVAILABLE
+from .tab_pool import TabPool
+from .watchdog import ProcessWatchdog
+from .launch_profiles import load_profile
+from .element_cache import ElementCache
+from .selector_stats import CandidateHistory, SelectorStats
+from .browser_daemon import DEFAULT_STATE_PATH, close_context, find_daemon, open_context
+from .dom_diff import DEFAULT_IGNORE_TAGS, diff_trees, parse_html
+from .element_snapshot import (
+    BUTTON_SCHEMA,
+    CLICKABLE_SCHEMA,
+    ERROR_SCHEMA,
+    FORM_SCHEMA,
+    INPUT_SCHEMA,
+    INTERACTIVE_INPUT_SCHEMA,
+    LINK_SCHEMA,
+    MEDIA_SCHEMA,
+    TEXT_MATCH_SCHEMA,
+    capture_snapshot
+)
+
+# BeautifulSoupが利用可能かどうか（インポートは使用する時点で行う）
+BS4_AVAILABLE = importlib.util.find_spec("bs4") is not None
 
 # 環境変数操作用のユーティリティをインポート（存在する場合）
 try:
@@ -50,6 +72,92 @@ try:
 except ImportError:
     ENV_UTILS_AVAILABLE = False
 
+# 起動時間の計測ユーティリティをインポート（存在する場合）
+try:
+    from src.utils.startup_timer import startup_timer
+    STARTUP_TIMER_AVAILABLE = True
+except ImportError:
+    STARTUP_TIMER_AVAILABLE = False
+
+
+# ページ内でロケーター（By種別と値）から要素を検索するJavaScript関数
+# 複数の要素を1回のスクリプト実行で扱う処理（フォーム一括入力など）で共有する
+LOCATE_ELEMENT_JS = """
+    function __locateElement(by, value) {
+        switch (by) {
+            case 'id':
+                return document.getElementById(value);
+            case 'css selector':
+                return document.querySelector(value);
+            case 'xpath':
+                return document.evaluate(value, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            case 'name':
+                return document.getElementsByName(value)[0] || null;
+            case 'tag name':
+                return document.getElementsByTagName(value)[0] || null;
+            case 'class name':
+                return document.getElementsByClassName(value)[0] || null;
+            case 'link text':
+            case 'partial link text':
+                var links = document.links;
+                for (var i = 0; i < links.length; i++) {
+                    var text = (links[i].innerText || '').trim();
+                    if (by === 'link text' ? text === value : text.indexOf(value) !== -1) {
+                        return links[i];
+                    }
+                }
+                return null;
+        }
+        return null;
+    }
+"""
+
+
+# By定数の値（(By.XX, value) 形式のロケーターの判定用）
+BY_TYPES = ('id', 'xpath', 'link text', 'partial link text', 'name', 'tag name', 'class name', 'css selector')
+
+# 複数のセレクタ候補を1回のスクリプト実行でまとめて検索するスクリプト
+# 候補ごとの一致と検索時間(ms)を返し、優先順で最初に一致した候補の要素を返す
+LOCATE_CANDIDATES_JS = LOCATE_ELEMENT_JS + """
+    var candidates = arguments[0], visible = arguments[1];
+    var found = null, matched = [], timings = [];
+    for (var i = 0; i < candidates.length; i++) {
+        var started = performance.now(), el = null;
+        try {
+            el = __locateElement(candidates[i][0], candidates[i][1]);
+        } catch (e) {
+            el = null;
+        }
+        if (el && visible) {
+            var style = window.getComputedStyle(el);
+            if (!el.getClientRects().length || style.visibility === 'hidden') el = null;
+        }
+        timings.push(performance.now() - started);
+        matched.push(!!el);
+        if (el && found === null) found = {index: i, element: el};
+    }
+    return {index: found ? found.index : null, element: found ? found.element : null,
+            matched: matched, timings: timings};
+"""
+
+
+def _webdriver_modules():
+    """
+    WebDriverの起動に必要なモジュールをインポートする
+    
+    selenium.webdriver と webdriver_manager は読み込みに時間がかかるため、
+    モジュールのインポート時ではなく setup() の時点で読み込みます。
+    
+    Returns:
+        tuple: (webdriver, Options, Service, ChromeDriverManager)
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+    return webdriver, Options, Service, ChromeDriverManager
+
 
 class Browser:
     """
@@ -63,6 +171,10 @@ class Browser:
     - ページの解析と要素の操作
     """
     
+    # プロセスで最初の setup() と navigate_to() の所要時間を startup_timer に記録したかどうか
+    _startup_setup_recorded = False
+    _startup_navigation_recorded = False
+    
     def __init__(
         self, 
         logger: Optional[logging.Logger] = None,
@@ -103,14 +215,57 @@ class Browser:
         self.timeout = timeout
         
         # settings.ini から headless モードを読み込む（引数で指定されていない場合）
+        self._headless_explicit = headless is not None
         if headless is None:
             headless_str = self._get_config_value("BROWSER", "headless", "false")
             self.headless = headless_str.lower() == "true"
         else:
             self.headless = headless
         
+        # ブラウザの操作方式（webdriver: chromedriver経由 / cdp: DevToolsに直接接続）
+        self.engine = str(self._get_config_value("BROWSER", "engine", "webdriver")).lower()
+        
+        # 起動プロファイル（lite / full-render / debug など。空欄の場合は従来のオプション）
+        self.launch_profile_name = str(self._get_config_value("BROWSER", "launch_profile", "") or "").strip()
+        self.launch_profile = None
+        
+        # ブラウザデーモンへの接続（auto: 動作中なら接続 / true: 常に試みる / false: 使用しない）
+        self.use_daemon = str(self._get_config_value("BROWSER", "use_daemon", "auto")).lower()
+        self.daemon_state_path = self._resolve_path(
+            self._get_config_value("BROWSER", "daemon_state_path", DEFAULT_STATE_PATH)
+        )
+        
         # スクリーンショット設定を読み込む
         self._load_screenshot_settings()
+        
+        # ページソース履歴の設定を読み込む
+        self._load_page_source_settings()
+        
+        # プロセス監視の設定を読み込む
+        self._load_watchdog_settings()
+        
+        # セレクタごとの待機時間の学習設定を読み込む
+        self._load_selector_stats_settings()
+        
+        # 移動ごとの通信の記録（HAR）の設定を読み込む
+        self._load_har_settings()
+        
+        # エラー時に直近の画面を保存する録画の設定を読み込む
+        self._load_screencast_settings()
+        
+        # セレクタの候補ごとの一致の実績
+        candidates_path = self._get_config_value("BROWSER", "selector_candidates_path", "data/selector_candidates.json")
+        self.candidate_history = CandidateHistory(
+            self._resolve_path(candidates_path) if candidates_path else None, logger=self.logger
+        )
+        self._reported_drift = set()
+        
+        # 見つけた要素のキャッシュ（ページの移動・ウィンドウの切り替え・DOMの変更で無効化）
+        self.element_cache = None
+        if str(self._get_config_value("BROWSER", "element_cache", "false")).lower() == "true":
+            self.element_cache = ElementCache(
+                int(self._get_config_value("BROWSER", "element_cache_size", "256")), locate_js=LOCATE_ELEMENT_JS
+            )
             
         # 通知機能
         self.notifier = notifier
@@ -118,8 +273,36 @@ class Browser:
         # ドライバーと状態の初期化
         self.driver = None
         self.selectors = {}
-        self.current_page_source = None
-        self.last_page_source = None
+        
+        # DOM差分用の解析済みツリー（履歴エントリが破棄されると自動的に解放）
+        self._dom_tree_cache = weakref.WeakKeyDictionary()
+        
+        # 直近の crawl() の集計結果
+        self.last_crawl_stats = None
+        
+        # 直近の harvest() の集計結果
+        self.last_harvest_stats = None
+        
+        # DevTools への接続（get_cdp_session() で作成）
+        self._cdp_session = None
+        
+        # タブごとの DevTools のセッション {ターゲットID: [セッションID, 使用している記録の数]}
+        self._tab_sessions = {}
+        self._tab_sessions_owner = None
+        # タブのセッションを使用している記録 {id(記録): 記録}
+        self._tab_recorders = {}
+        
+        # XHR・fetch の応答の記録（start_network_capture() で作成）
+        self.network_capture = None
+        
+        # セッションごとのダウンロード先（download_dir を設定した場合は setup()、それ以外は expect_download() で作成）
+        self.download_manager = None
+        
+        # デーモンに接続した場合に作成したブラウザコンテキストのID
+        self._daemon_context = None
+        
+        # 直近の setup() の段階ごとの所要時間（秒）と起動方式
+        self.setup_timings = {}
         
         # ログ出力
         self.logger.debug(f"Browserクラスを初期化しました (headless: {self.headless})")
@@ -222,6 +405,301 @@ class Browser:
         if not os.path.isabs(self.screenshot_dir):
             self.screenshot_dir = os.path.join(self.project_root, self.screenshot_dir)
             
+    def _load_page_source_settings(self):
+        """ページソース履歴関連の設定を読み込む"""
+        # 取得モード: lazy（初回アクセス時に取得）, eager（移動時に取得）, off（取得しない）
+        capture = str(self._get_config_value("BROWSER", "page_source_capture", "lazy")).lower()
+        if capture not in ('lazy', 'eager', 'off'):
+            self.logger.warning(f"未知のページソース取得モードです: {capture}（lazyを使用します）")
+            capture = 'lazy'
+        self.page_source_capture = capture
+        
+        # 履歴の保持件数と圧縮方式
+        history_size = int(self._get_config_value("BROWSER", "page_source_history_size", "2"))
+        compression = str(self._get_config_value("BROWSER", "page_source_compression", "auto"))
+        self.page_history = PageSourceHistory(
+            max_entries=history_size,
+            compression=compression,
+            logger=self.logger
+        )
+        
+        # lazyモードで、一度もアクセスされなかったページのソースを移動の直前に取得して残すかどうか
+        # （diff_page_sources() を引数なしで呼び出した場合も、以降の移動では残す）
+        self.keep_previous_page_source = str(
+            self._get_config_value("BROWSER", "page_source_keep_previous", "false")).lower() == "true"
+    
+    @property
+    def current_page_source(self):
+        """
+        最後に移動したページのHTMLソース
+        
+        lazyモードでは最初にアクセスした時点でドライバーから取得します。
+        
+        Returns:
+            str or None: HTMLソース。記録されていない場合はNone
+        """
+        snapshot = self.page_history.current
+        return snapshot.get_source() if snapshot else None
+    
+    @current_page_source.setter
+    def current_page_source(self, source):
+        # 最新のエントリのソースを置き換える（新しいエントリを追加すると1つ前のページが押し出されるため）
+        snapshot = self.page_history.current
+        if snapshot is None:
+            url = self.driver.current_url if self.driver else ""
+            self.page_history.record_source(url, source)
+            return
+        snapshot.set_source(source)
+        self._dom_tree_cache.pop(snapshot, None)
+    
+    @property
+    def last_page_source(self):
+        """
+        1つ前に移動したページのHTMLソース
+        
+        lazyモードでは、一度もアクセスされなかったページのソースは取得しないためNoneになります。
+        page_source_keep_previous = true の場合（または diff_page_sources() を引数なしで呼び出した後）は、
+        navigate_to() で移動する直前に取得して圧縮します（page_source_history_size が 1 の場合は常にNone）。
+        
+        Returns:
+            str or None: HTMLソース。記録されていない場合はNone
+        """
+        snapshot = self.page_history.previous
+        return snapshot.get_source() if snapshot else None
+    
+    def _keep_page_source(self):
+        """
+        移動する直前に、まだ取得していない現在のページのソースを取得する
+        
+        lazyモードで keep_previous_page_source が有効な場合のみ取得し、参照されないページのソースは転送しません。
+        """
+        if (self.page_source_capture != 'lazy' or not self.keep_previous_page_source
+                or self.page_history.max_entries < 2):
+            return
+        try:
+            self.page_history.load_current()
+        except Exception as e:
+            self.logger.debug(f"移動前のページソースを取得できませんでした: {str(e)}")
+    
+    def _record_page_source(self):
+        """現在のページを設定されたモードでページソース履歴に記録する"""
+        if self.page_source_capture == 'off':
+            return
+        
+        url = self.driver.current_url
+        if self.page_source_capture == 'eager':
+            self.page_history.record_source(url, self.driver.page_source)
+        else:
+            driver = self.driver
+            self.page_history.record(url, lambda: driver.page_source)
+    
+    def _load_watchdog_settings(self):
+        """プロセス監視とセッションの作り直しの設定を読み込む"""
+        self.watchdog = ProcessWatchdog(
+            max_navigations=int(self._get_config_value("BROWSER", "recycle_after_navigations", "0")),
+            memory_limit_mb=float(self._get_config_value("BROWSER", "recycle_memory_mb", "0")),
+            quit_timeout=float(self._get_config_value("BROWSER", "quit_timeout", "10")),
+            logger=self.logger
+        )
+        self.watchdog_metrics_path = self._get_config_value("BROWSER", "watchdog_metrics_path", "")
+        if self.watchdog_metrics_path:
+            self.watchdog_metrics_path = self._resolve_path(self.watchdog_metrics_path)
+        
+        # セッションを作り直した後に呼び出す関数 on_recycle(browser)（ログインのやり直しなど）
+        self.on_recycle = None
+
+    def _load_selector_stats_settings(self):
+        """セレクタごとの待機時間の学習（adaptive_timeout）の設定を読み込む"""
+        self.selector_stats = None
+        self._selector_stats_domain = None
+        if str(self._get_config_value("BROWSER", "adaptive_timeout", "false")).lower() != "true":
+            return
+        
+        path = self._get_config_value("BROWSER", "selector_stats_path", "data/selector_stats.json")
+        self.selector_stats = SelectorStats(
+            self._resolve_path(path) if path else None,
+            margin=float(self._get_config_value("BROWSER", "adaptive_timeout_margin", "1.5")),
+            min_timeout=float(self._get_config_value("BROWSER", "adaptive_timeout_min", "1")),
+            max_timeout=float(self._get_config_value("BROWSER", "adaptive_timeout_max", "60")),
+            min_samples=int(self._get_config_value("BROWSER", "adaptive_timeout_min_samples", "20")),
+            logger=self.logger
+        )
+
+    def _load_har_settings(self):
+        """移動ごとの通信の記録（HAR）の設定を読み込む"""
+        self.har_recording = str(self._get_config_value("BROWSER", "har_recording", "false")).lower() == "true"
+        self.har_dir = self._resolve_path(self._get_config_value("BROWSER", "har_dir", "logs/har"))
+        self.har_max_entries = int(self._get_config_value("BROWSER", "har_max_entries", "2000"))
+        self.har_report = HarReport(int(self._get_config_value("BROWSER", "har_top", "10")))
+        self.har_recorder = None
+        self.last_har_summary = None
+        self._har_handle = None
+        self._har_summary_path = os.path.join(self.har_dir, f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    
+    def _load_screencast_settings(self):
+        """画面録画（screencast）の設定を読み込む"""
+        self.screencast = str(self._get_config_value("BROWSER", "screencast", "false")).lower() == "true"
+        self.screencast_dir = self._resolve_path(self._get_config_value("BROWSER", "screencast_dir", "logs/screencasts"))
+        self.screencast_recorder = None
+    
+    def _start_screencast(self):
+        """現在のタブの画面の録画を開始する（screencast が有効な場合。タブを切り替えた場合は録画し直す）"""
+        if not self.screencast:
+            return
+        try:
+            if self.screencast_recorder is not None:
+                self._stop_tab_recorder(self.screencast_recorder)
+                self.screencast_recorder = None
+            session = self.get_cdp_session()
+            if session is None:
+                self.logger.warning("DevToolsに接続できないため、画面の録画を無効にします")
+                self.screencast = False
+                return
+            session_id = self._get_tab_session_id(session)
+            try:
+                recorder = ScreencastRecorder(
+                    session,
+                    session_id,
+                    fps=float(self._get_config_value("BROWSER", "screencast_fps", "5")),
+                    seconds=float(self._get_config_value("BROWSER", "screencast_seconds", "10")),
+                    max_width=int(self._get_config_value("BROWSER", "screencast_max_width", "800")),
+                    max_height=int(self._get_config_value("BROWSER", "screencast_max_height", "600")),
+                    quality=int(self._get_config_value("BROWSER", "screencast_quality", "50")),
+                    logger=self.logger
+                )
+                self.screencast_recorder = self._hold_tab_session(recorder.start())
+            except Exception:
+                self._release_tab_session(session_id)
+                raise
+        except Exception as e:
+            self.logger.warning(f"画面の録画を開始できませんでした: {str(e)}")
+    
+    def save_screencast(self, name, seconds=None):
+        """
+        直近の画面の録画を GIF アニメーションとして保存する（screencast が有効な場合）
+        
+        Args:
+            name (str): ファイル名（拡張子なし。日時を付けて screencast_dir に保存）
+            seconds (float, optional): 保存する直近の秒数（省略時は保持しているすべて）
+            
+        Returns:
+            str or None: 保存したパス。録画していない場合やフレームがない場合はNone
+        """
+        if self.screencast_recorder is None:
+            return None
+        try:
+            filename = "".join(c for c in f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}" if c.isalnum() or c in "_-.")
+            return self.screencast_recorder.save(os.path.join(self.screencast_dir, f"{filename}.gif"), seconds)
+        except Exception as e:
+            self.logger.error(f"画面の録画の保存中にエラーが発生しました: {str(e)}")
+            return None
+    
+    def _begin_har_page(self, url):
+        """移動の直前に、現在のタブの通信の記録を開始する（har_recording が有効な場合）"""
+        if not self.har_recording:
+            return
+        try:
+            handle = self.driver.current_window_handle
+            if self.har_recorder is None or not self.har_recorder.active or self._har_handle != handle:
+                if self.har_recorder is not None:
+                    self._stop_tab_recorder(self.har_recorder)
+                session = self.get_cdp_session()
+                if session is None:
+                    self.logger.warning("DevToolsに接続できないため、HARの記録を無効にします")
+                    self.har_recording = False
+                    return
+                self.har_recorder = None
+                session_id = self._get_tab_session_id(session)
+                try:
+                    self.har_recorder = self._hold_tab_session(HarRecorder(
+                        session, session_id, max_entries=self.har_max_entries, logger=self.logger
+                    ).start())
+                except Exception:
+                    self._release_tab_session(session_id)
+                    raise
+                self._har_handle = handle
+            self.har_recorder.begin_page(url)
+        except Exception as e:
+            self.logger.warning(f"HARの記録を開始できませんでした: {str(e)}")
+    
+    def _finish_har_page(self):
+        """
+        ページの通信の記録を終了し、HARファイルの保存と集計を行う
+        
+        Returns:
+            str or None: 保存したHARファイルのパス。記録していない場合はNone
+        """
+        if self.har_recorder is None:
+            return None
+        try:
+            har = self.har_recorder.end_page()
+            if har is None:
+                return None
+            page_url = har['log']['pages'][0]['title']
+            path = os.path.join(self.har_dir, har_filename(page_url))
+            save_har(har, path)
+            
+            summary = summarize_har(har, self.har_report.top)
+            self.har_report.add(summary)
+            self.last_har_summary = summary
+            slowest = summary['slowest'][0] if summary['slowest'] else None
+            self.logger.info(
+                f"ページの通信: {summary['requests']}件, {summary['transfer_bytes'] / 1024:.1f} KB, "
+                f"onLoad: {summary['on_load']:.0f} ms"
+                + (f", 最も遅いリソース: {slowest['url']} ({slowest['time']:.0f} ms)" if slowest else "")
+            )
+            return path
+        except Exception as e:
+            self.logger.warning(f"HARの保存に失敗しました: {str(e)}")
+            return None
+    
+    def get_har_report(self):
+        """
+        この実行で記録したページの通信の集計を取得する
+        
+        Returns:
+            dict: {totals, slowest_pages, slowest_resources, largest_resources}
+        """
+        return self.har_report.report()
+    
+    def get_selector_timeout(self, selector, default):
+        """
+        セレクタの待機タイムアウトを取得する（adaptive_timeout が有効な場合は実績から算出）
+        
+        Args:
+            selector (tuple): (グループ, 名前)
+            default (float): 実績が不足している場合や学習が無効な場合のタイムアウト
+            
+        Returns:
+            float: タイムアウト（秒）
+        """
+        if self.selector_stats is None or selector is None:
+            return default
+        
+        self._selector_stats_domain = self._current_domain()
+        return self.selector_stats.timeout_for(selector, self._selector_stats_domain, default)
+
+    def _current_domain(self):
+        """現在のページのドメインを取得する（取得できない場合はNone）"""
+        try:
+            return urllib.parse.urlparse(self.driver.current_url).hostname
+        except Exception:
+            return None
+
+    def record_selector_wait(self, selector, seconds):
+        """
+        セレクタの待機結果を記録する（adaptive_timeout が無効な場合は何もしない）
+        
+        get_selector_timeout() と組み合わせて使用し、同じページのドメインで記録します。
+        
+        Args:
+            selector (tuple): (グループ, 名前)
+            seconds (float or None): 要素が現れるまでの時間。見つからなかった場合はNone
+        """
+        if self.selector_stats is None or selector is None:
+            return
+        self.selector_stats.record(selector, self._selector_stats_domain, seconds)
+
     def _setup_fallback_selectors(self):
         """フォールバックセレクタを設定する"""
         # セレクタがまだ設定されていない場合に初期化
@@ -268,22 +746,32 @@ class Browser:
                 
                 # 各行を処理
                 for row in reader:
-                        group = row['group']
-                        name = row['name']
+                    group = row['group']
+                    name = row['name']
                     selector_type = row['selector_type']
                     selector_value = row['selector_value']
                     description = row.get('description', '')
-                        
+                    
                     # グループが存在しなければ作成
-                        if group not in self.selectors:
-                            self.selectors[group] = {}
-                        
+                    if group not in self.selectors:
+                        self.selectors[group] = {}
+                    
+                    # 同じグループ・名前の2行目以降は候補として追加
+                    if name in self.selectors[group]:
+                        self.add_selector_candidate(group, name, selector_type, selector_value, description)
+                        continue
+                    
                     # セレクタを追加
-                        self.selectors[group][name] = {
+                    self.selectors[group][name] = {
                         'selector_type': selector_type,
                         'selector_value': selector_value,
-                        'description': description
-                        }
+                        'description': description,
+                        'candidates': [{
+                            'selector_type': selector_type,
+                            'selector_value': selector_value,
+                            'description': description
+                        }]
+                    }
             
             self.logger.info(f"セレクタをロードしました: {len(self.selectors)} グループ")
             
@@ -295,64 +783,269 @@ class Browser:
             self.logger.error(f"セレクタの読み込み中にエラーが発生しました: {str(e)}")
             self._setup_fallback_selectors()
     
+    def add_selector_candidate(self, group, name, selector_type, selector_value, description=''):
+        """
+        セレクタに候補を追加する（既存の候補より優先順位は低い）
+        
+        セレクタが定義されていない場合は、追加した候補をそのセレクタとして登録します。
+        
+        Args:
+            group (str): セレクタグループ
+            name (str): セレクタ名
+            selector_type (str): セレクタ種別（id, css, xpath など）
+            selector_value (str): セレクタの値
+            description (str): 説明
+        """
+        if not self.selectors:
+            self._load_selectors()
+        
+        candidate = {'selector_type': selector_type, 'selector_value': selector_value, 'description': description}
+        selector_info = self.selectors.setdefault(group, {}).get(name)
+        if selector_info is None:
+            self.selectors[group][name] = dict(candidate, candidates=[candidate])
+            return
+        
+        candidates = selector_info.setdefault('candidates', [{
+            'selector_type': selector_info['selector_type'],
+            'selector_value': selector_info['selector_value'],
+            'description': selector_info.get('description', '')
+        }])
+        if not any(self._candidate_key(c) == self._candidate_key(candidate) for c in candidates):
+            candidates.append(candidate)
+    
+    @staticmethod
+    def _candidate_key(candidate):
+        """候補を実績の記録用のキー（種別=値）に変換する"""
+        return f"{candidate['selector_type']}={candidate['selector_value']}"
+    
+    def get_selector_candidates(self, group, name):
+        """
+        セレクタの候補を優先順で取得する
+        
+        Args:
+            group (str): セレクタグループ
+            name (str): セレクタ名
+            
+        Returns:
+            list: 候補の辞書 {selector_type, selector_value, description} のリスト
+                （実績のある候補は一致率の高い順、実績のない候補は selectors.csv の順）
+        """
+        if not self.selectors:
+            self._load_selectors()
+        
+        selector_info = self.selectors.get(group, {}).get(name)
+        if selector_info is None:
+            return []
+        candidates = selector_info.get('candidates') or [selector_info]
+        if len(candidates) < 2:
+            return list(candidates)
+        by_key = {self._candidate_key(c): c for c in candidates}
+        return [by_key[key] for key in self.candidate_history.rank((group, name), list(by_key))]
+    
+    def get_selector_drift(self):
+        """
+        selectors.csv の第1候補が一致せず、別の候補が使われているセレクタを取得する
+        
+        Returns:
+            list: {selector, primary, active, primary_rate, active_rate} のリスト
+        """
+        drifts = []
+        for group, selectors in self.selectors.items():
+            for name, selector_info in selectors.items():
+                keys = [self._candidate_key(c) for c in selector_info.get('candidates', [])]
+                drift = self.candidate_history.drift((group, name), keys)
+                if drift:
+                    drifts.append(drift)
+        return drifts
+    
+    def _wait_for_candidates(self, selector, candidates, timeout, visible):
+        """
+        複数の候補を1回のスクリプト実行でまとめて検索し、最初に一致した候補の要素を返す
+        
+        Args:
+            selector (tuple): (グループ, 名前)
+            candidates (list): 優先順の候補
+            timeout (float): タイムアウト（秒）
+            visible (bool): 要素が表示されていることを確認するかどうか
+            
+        Returns:
+            WebElement: 見つかった要素
+            
+        Raises:
+            TimeoutException: いずれの候補も一致しなかった場合
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        keys = [self._candidate_key(c) for c in candidates]
+        payload = [[self._get_by_type(c['selector_type']), c['selector_value']] for c in candidates]
+        last = {}
+        
+        def locate(driver):
+            result = driver.execute_script(LOCATE_CANDIDATES_JS, payload, visible)
+            last['result'] = result
+            return result if result and result.get('index') is not None else False
+        
+        started = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout).until(locate)
+        except TimeoutException:
+            self.record_selector_wait(selector, None)
+            if last.get('result'):
+                self._record_candidates(selector, keys, last['result'])
+            raise
+        self.record_selector_wait(selector, time.perf_counter() - started)
+        self._record_candidates(selector, keys, result)
+        return result['element']
+    
+    def _record_candidates(self, selector, keys, result):
+        """候補ごとの検索結果を記録し、第1候補が使われなくなった場合は警告する"""
+        self.candidate_history.record(selector, {
+            key: (bool(matched), float(ms))
+            for key, matched, ms in zip(keys, result.get('matched', []), result.get('timings', []))
+        })
+        
+        group, name = selector
+        csv_order = [self._candidate_key(c) for c in self.selectors[group][name].get('candidates', [])]
+        drift = self.candidate_history.drift(selector, csv_order)
+        if drift and selector not in self._reported_drift:
+            self._reported_drift.add(selector)
+            self.logger.warning(
+                f"セレクタ {drift['selector']} の第1候補 {drift['primary']} が一致しにくくなっているため、"
+                f"{drift['active']} を使用します（selectors.csv の更新を検討してください）"
+            )
+    
+    def build_chrome_options(self):
+        """
+        設定ファイルの内容から Chrome のオプションを作成する
+        
+        Returns:
+            Options: Chromeのオプション
+        """
+        from selenium.webdriver.chrome.options import Options
+        
+        chrome_options = Options()
+        
+        # 起動プロファイルの設定（プロファイルの headless は引数で指定されていない場合に優先）
+        profile = self.get_launch_profile()
+        if profile is not None:
+            if profile.headless is not None and not self._headless_explicit:
+                self.headless = profile.headless
+            profile.apply(chrome_options, self.headless)
+            self.logger.info(f"起動プロファイル {profile.name} を使用します")
+        elif self.headless:
+            chrome_options.add_argument("--headless")
+        
+        if self.headless:
+            self.logger.info("ヘッドレスモードを有効化しました")
+        
+        # その他の一般的なオプション
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        
+        # ブラウザのサイズを設定
+        window_width = self._get_config_value("BROWSER", "window_width", "1920")
+        window_height = self._get_config_value("BROWSER", "window_height", "1080")
+        chrome_options.add_argument(f"--window-size={window_width},{window_height}")
+        
+        # 言語設定
+        chrome_options.add_argument("--lang=ja")
+        
+        # 追加のオプション（設定ファイルから読み込み）
+        additional_options = self._get_config_value("BROWSER", "additional_options", "")
+        if additional_options:
+            for option in additional_options.split(","):
+                option = option.strip()
+                if option and option not in chrome_options.arguments:
+                    chrome_options.add_argument(option)
+                    self.logger.debug(f"追加のブラウザオプション: {option}")
+        
+        return chrome_options
+
+    def get_launch_profile(self):
+        """
+        [BROWSER] launch_profile で指定された起動プロファイルを取得する
+        
+        Returns:
+            LaunchProfile or None: プロファイル。指定されていない場合はNone
+            
+        Raises:
+            ValueError: プロファイルが存在しない、または設定内容に問題がある場合
+        """
+        if not self.launch_profile_name:
+            return None
+        if self.launch_profile is None:
+            self.launch_profile = load_profile(self.launch_profile_name, self._get_config_value)
+        return self.launch_profile
+
     def setup(self):
         """
         ブラウザドライバーを初期化する
         
+        ブラウザデーモンが動作している場合は Chrome を起動せずに接続し、
+        新しいブラウザコンテキストで操作します。各段階の所要時間は setup_timings に記録されます。
+        
         Returns:
             bool: 成功した場合はTrue、それ以外はFalse
         """
         try:
+            started = time.perf_counter()
+            self.setup_timings = {}
+            
             # Chromeのオプションを設定
-            chrome_options = Options()
+            chrome_options = self._timed("import", self.build_chrome_options)
             
-            # ヘッドレスモードの設定
-            if self.headless:
-                chrome_options.add_argument("--headless")
-                self.logger.info("ヘッドレスモードを有効化しました")
+            # ブラウザデーモンが動作している場合は接続
+            self.driver = self._attach_daemon(chrome_options) if self.use_daemon != "false" else None
             
-            # その他の一般的なオプション
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
+            # cdp エンジンの場合は Chrome を直接起動して DevTools に接続
+            if self.driver is None and self.engine == "cdp":
+                self.driver = self._timed("launch", self._launch_cdp_driver, chrome_options)
             
-            # ブラウザのサイズを設定
-            window_width = self._get_config_value("BROWSER", "window_width", "1920")
-            window_height = self._get_config_value("BROWSER", "window_height", "1080")
-            chrome_options.add_argument(f"--window-size={window_width},{window_height}")
+            if self.driver is None:
+                webdriver, _, Service, ChromeDriverManager = self._timed("import", _webdriver_modules)
+                
+                # ドライバーマネージャを使用してChromeドライバーをセットアップ
+                service = Service(self._timed("driver_resolution", ChromeDriverManager().install))
+                
+                # WebDriverを初期化
+                self.driver = self._timed("launch", webdriver.Chrome, service=service, options=chrome_options)
             
-            # 言語設定
-            chrome_options.add_argument("--lang=ja")
+            self.setup_timings.setdefault("mode", "launch")
             
-            # 追加のオプション（設定ファイルから読み込み）
-            additional_options = self._get_config_value("BROWSER", "additional_options", "")
-            if additional_options:
-                for option in additional_options.split(","):
-                    option = option.strip()
-                    if option:
-                        chrome_options.add_argument(option)
-                        self.logger.debug(f"追加のブラウザオプション: {option}")
+            # タイムアウトを設定（待機時間を学習する場合は、要素の検索ごとの暗黙の待機を無効にする）
+            self.driver.implicitly_wait(0 if self.selector_stats is not None else self.timeout)
             
-            # ドライバーマネージャを使用してChromeドライバーをセットアップ
-            service = Service(ChromeDriverManager().install())
+            # プロセスの監視を開始
+            self.watchdog.attach(self.driver)
             
-            # WebDriverを初期化
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # ダウンロード先をセッションごとのディレクトリに設定
+            if self._get_config_value("BROWSER", "download_dir", ""):
+                self._setup_downloads()
             
-            # タイムアウトを設定
-            self.driver.implicitly_wait(self.timeout)
+            # エラー時に保存する画面の録画を開始
+            self._start_screencast()
             
-            # セレクタを読み込む
-            self._load_selectors()
+            # セレクタを読み込む（読み込み済みの場合は追加された候補を残す）
+            if not self.selectors:
+                self._load_selectors()
             
             # スクリーンショットディレクトリの作成
             if self.auto_screenshot or self.screenshot_on_error:
                 os.makedirs(self.screenshot_dir, exist_ok=True)
                 self.logger.debug(f"スクリーンショットディレクトリを確認: {self.screenshot_dir}")
             
-            self.logger.info("ブラウザの初期化に成功しました")
+            self.setup_timings["total"] = time.perf_counter() - started
+            if STARTUP_TIMER_AVAILABLE and not Browser._startup_setup_recorded:
+                Browser._startup_setup_recorded = True
+                for phase, seconds in self.setup_timings.items():
+                    if isinstance(seconds, float):
+                        startup_timer.record(f"browser.{phase}", seconds)
+            self.logger.info(
+                f"ブラウザの初期化に成功しました ({self.setup_timings['mode']}: {self.setup_timings['total']:.2f}秒)"
+            )
             return True
             
-            except Exception as e:
+        except Exception as e:
             self.logger.error(f"ブラウザのセットアップ中にエラーが発生しました: {str(e)}")
             self.logger.debug(traceback.format_exc())
             
@@ -361,6 +1054,176 @@ class Browser:
                 
             return False 
 
+    def _timed(self, phase, func, *args, **kwargs):
+        """関数を実行し、所要時間を setup_timings に記録する"""
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.setup_timings[phase] = self.setup_timings.get(phase, 0.0) + time.perf_counter() - started
+
+    def _attach_daemon(self, chrome_options):
+        """
+        動作中のブラウザデーモンに接続し、新しいブラウザコンテキストのタブを操作するドライバーを作成する
+        
+        デーモンが動作していない場合や接続に失敗した場合は None を返し、setup() は Chrome を起動します。
+        
+        Args:
+            chrome_options: Chromeのオプション
+            
+        Returns:
+            WebDriver, CDPDriver or None: 作成したドライバー
+        """
+        state = self._timed("daemon_lookup", find_daemon, self.daemon_state_path)
+        if state is None:
+            if self.use_daemon == "true":
+                self.logger.warning("ブラウザデーモンが動作していないため、Chrome を起動します")
+            return None
+        
+        if self.engine == "cdp" and not WEBSOCKET_AVAILABLE:
+            return None
+        
+        address = state["debugger_address"]
+        session = None
+        context_id = None
+        driver = None
+        try:
+            session, context_id, target_id = self._timed("context", open_context, address, logger=self.logger)
+            
+            if self.engine == "cdp":
+                driver = CDPDriver(session, debugger_address=address, logger=self.logger, target_id=target_id,
+                                   browser_context_id=context_id)
+                driver.page_load_strategy = chrome_options.page_load_strategy
+            else:
+                webdriver, Options, Service, ChromeDriverManager = self._timed("import", _webdriver_modules)
+                driver_path = state.get("driver_path")
+                if not driver_path:
+                    driver_path = self._timed("driver_resolution", ChromeDriverManager().install)
+                
+                # debuggerAddress を指定した場合、chromedriver は既存の Chrome に接続する（起動オプションは無視される）
+                # ページ読み込みの待機方式は chromedriver 側の設定のため、接続時にも指定できる
+                attach_options = Options()
+                attach_options.debugger_address = address
+                attach_options.page_load_strategy = chrome_options.page_load_strategy
+                driver = self._timed("launch", webdriver.Chrome, service=Service(driver_path), options=attach_options)
+                driver.switch_to.window(target_id)
+                self._cdp_session = session
+            
+            self._daemon_context = (session, context_id)
+            self._apply_daemon_options(session, target_id, chrome_options, state)
+            self.setup_timings["mode"] = "daemon"
+            self.logger.info(f"ブラウザデーモンに接続しました: {address}")
+            return driver
+            
+        except Exception as e:
+            self.logger.warning(f"ブラウザデーモンへの接続に失敗したため、Chrome を起動します: {str(e)}")
+            # 作成したブラウザコンテキストとタブがデーモンに残らないようにする
+            if driver is not None and not isinstance(driver, CDPDriver):
+                try:
+                    driver.quit()
+                except Exception as quit_error:
+                    self.logger.debug(f"デーモンに接続したドライバーを終了できませんでした: {str(quit_error)}")
+            if context_id is not None:
+                self._close_daemon_context((session, context_id))
+            elif session is not None:
+                session.close()
+            self._cdp_session = None
+            self._daemon_context = None
+            return None
+
+    def _close_daemon_context(self, daemon_context):
+        """
+        デーモンに作成したブラウザコンテキストを破棄し、接続を閉じる（Chrome は停止しない）
+        
+        Args:
+            daemon_context (tuple): (CDPSession, ブラウザコンテキストID)
+        """
+        session, context_id = daemon_context
+        try:
+            close_context(session, context_id)
+        except Exception as e:
+            self.logger.warning(f"ブラウザコンテキストの破棄に失敗しました: {str(e)}")
+
+    def _apply_daemon_options(self, session, target_id, chrome_options, state):
+        """
+        起動オプションのうち、起動済みの Chrome にも適用できるものを新しいタブに適用する
+        
+        ウィンドウサイズは Browser.setWindowBounds で設定します。それ以外の起動オプション
+        （起動プロファイルの画像の無効化など）はデーモンの起動時の設定が使われるため、
+        デーモンの起動時に指定されていないものを警告します。
+        
+        Args:
+            session (CDPSession): デーモンへの接続
+            target_id (str): 新しいタブのターゲットID
+            chrome_options: Chromeのオプション
+            state (dict): デーモンの状態
+        """
+        daemon_arguments = set(state.get("arguments") or [])
+        ignored = []
+        for arg in chrome_options.arguments:
+            flag, _, value = arg.partition("=")
+            if flag == "--window-size":
+                try:
+                    width, height = (int(v) for v in value.split(","))
+                    window_id = session.send("Browser.getWindowForTarget", {"targetId": target_id})["windowId"]
+                    session.send("Browser.setWindowBounds", {
+                        "windowId": window_id, "bounds": {"width": width, "height": height}
+                    })
+                except Exception as e:
+                    self.logger.debug(f"ウィンドウサイズを設定できませんでした: {str(e)}")
+            elif arg not in daemon_arguments:
+                ignored.append(arg)
+        
+        if ignored:
+            self.logger.warning(
+                f"ブラウザデーモンの起動時に指定されていない起動オプションは適用されません: {' '.join(ignored)}"
+                f"（デーモンを起動し直してください）"
+            )
+
+    def _browser_context_id(self):
+        """ブラウザデーモンに接続している場合は、この実行のブラウザコンテキストのIDを返す"""
+        return self._daemon_context[1] if self._daemon_context is not None else None
+
+    def _window_handles(self):
+        """
+        操作できるウィンドウハンドルを取得する
+        
+        ブラウザデーモンに接続している場合、chromedriver はほかの実行のタブも返すため、
+        この実行のブラウザコンテキストのタブのみを返します。
+        """
+        context_id = self._browser_context_id()
+        if context_id is not None and not isinstance(self.driver, CDPDriver):
+            return [target["targetId"] for target in self._daemon_context[0].page_targets(context_id)]
+        return self.driver.window_handles
+
+    def _launch_cdp_driver(self, chrome_options):
+        """
+        Chrome を起動し、CDPで操作するドライバーを作成する
+        
+        起動できない場合は webdriver エンジンに切り替えます。
+        
+        Args:
+            chrome_options: Chromeのオプション
+            
+        Returns:
+            CDPDriver or None: 作成したドライバー。失敗した場合はNone
+        """
+        if not WEBSOCKET_AVAILABLE:
+            self.logger.warning("websocket-clientがインストールされていないため、webdriver エンジンを使用します")
+            self.engine = "webdriver"
+            return None
+        
+        try:
+            chrome_path = self._get_config_value("BROWSER", "chrome_path", "") or None
+            driver = CDPDriver.launch(chrome_options.arguments, binary=chrome_path, logger=self.logger)
+            driver.page_load_strategy = chrome_options.page_load_strategy
+            self.logger.info("cdp エンジンでブラウザを起動しました")
+            return driver
+        except Exception as e:
+            self.logger.warning(f"cdp エンジンでの起動に失敗したため、webdriver エンジンを使用します: {str(e)}")
+            self.engine = "webdriver"
+            return None
+
     def navigate_to(self, url):
         """
         指定したURLに移動する
@@ -373,19 +1236,36 @@ class Browser:
         """
         if not self.driver:
             self.logger.error("ドライバーが初期化されていません。setup()を先に呼び出してください。")
-                return False
+            return False
+                
+        # 移動前のページのソースを履歴に残す（セッションを作り直す前に取得する）
+        self._keep_page_source()
+        
+        # 移動回数やメモリ使用量が上限を超えたセッションは作り直す
+        reason = self.watchdog.should_recycle()
+        if reason and not self.recycle(reason):
+            return False
                 
         try:
-                self.logger.info(f"URLに移動します: {url}")
-                self.driver.get(url)
+            self.logger.info(f"URLに移動します: {url}")
+            started = time.perf_counter()
+            if self.element_cache is not None:
+                self.element_cache.invalidate()
+            self._begin_har_page(url)
+            self.driver.get(url)
+            self.watchdog.record_navigation()
             
             # ページ読み込みの完了を待機
             if not self.wait_for_page_load():
                 self.logger.warning("ページの読み込みが完了しなかった可能性があります")
+            self._finish_har_page()
+            
+            if STARTUP_TIMER_AVAILABLE and not Browser._startup_navigation_recorded:
+                Browser._startup_navigation_recorded = True
+                startup_timer.record("browser.first_navigation", time.perf_counter() - started)
             
-            # 現在のページソースを保存
-            self.last_page_source = self.current_page_source
-            self.current_page_source = self.driver.page_source
+            # ページソースを履歴に記録（取得タイミングは page_source_capture に従う）
+            self._record_page_source()
             
             # 自動スクリーンショットが有効な場合
             if self.auto_screenshot:
@@ -396,9 +1276,11 @@ class Browser:
             
         except Exception as e:
             self.logger.error(f"URLへの移動中にエラーが発生しました: {str(e)}")
+            self._finish_har_page()
             
             if self.screenshot_on_error:
                 self.save_screenshot(f"error_navigate_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            self.save_screencast("error_navigate")
                 
             if self.notifier:
                 self._notify_error("ページへの移動に失敗しました", exception=e, context={"url": url})
@@ -555,6 +1437,9 @@ class Browser:
             if self.driver and self.screenshot_on_error:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 screenshot_path = self.save_screenshot(f"error_notification_{timestamp}")
+            
+            # 直近の画面の録画を保存（screencast が有効な場合）
+            screencast_path = self.save_screencast("error_notification")
                 
             # 例外の詳細を取得
             exception_details = str(exception) if exception else "不明"
@@ -567,7 +1452,8 @@ class Browser:
                 "traceback": traceback_info,
                 "url": current_url,
                 "timestamp": datetime.now().isoformat(),
-                "screenshot_path": screenshot_path
+                "screenshot_path": screenshot_path,
+                "screencast_path": screencast_path
             }
             
             # コンテキスト情報を追加
@@ -579,36 +1465,580 @@ class Browser:
             self.logger.info("エラー通知を送信しました")
             
         except Exception as e:
-            self.logger.error(f"エラー通知の送信中にエラーが発生しました: {str(e)}")
-    
-    def quit(self, error_message=None, exception=None, context=None):
+            self.logger.error(f"エラー通知の送信中にエラーが発生しました: {str(e)}")
+    
+    def quit(self, error_message=None, exception=None, context=None):
+        """
+        ブラウザを終了する
+        
+        Args:
+            error_message: エラーメッセージ（省略可能）
+            exception: 例外オブジェクト（省略可能）
+            context: コンテキスト情報（省略可能）
+        """
+        try:
+            # エラーメッセージが提供されている場合は通知を送信
+            if error_message and self.notifier:
+                self._notify_error(error_message, exception, context)
+                
+            # 通信の記録を終了する（記録済みの応答は network_capture に残る）
+            # デーモンの接続を閉じる前に終了し、タブのセッションの使用も終了する
+            self._stop_tab_recorder(self.network_capture)
+            if self.har_recorder is not None:
+                self._stop_tab_recorder(self.har_recorder)
+                self.har_recorder = None
+            if self.download_manager is not None:
+                self.download_manager.close()
+                self.download_manager = None
+            if self.screencast_recorder is not None:
+                self._stop_tab_recorder(self.screencast_recorder)
+                self.screencast_recorder = None
+            if self.har_report.totals['pages']:
+                self.har_report.save(self._har_summary_path)
+            
+            # DevTools への接続を閉じる（cdp エンジンの場合はドライバーが、デーモンへの接続は
+            # ブラウザコンテキストの破棄後に閉じる）
+            daemon_context, self._daemon_context = self._daemon_context, None
+            daemon_session = daemon_context[0] if daemon_context is not None else None
+            if (self._cdp_session is not None and not isinstance(self.driver, CDPDriver)
+                    and self._cdp_session is not daemon_session):
+                self._cdp_session.close()
+            self._cdp_session = None
+            self._tab_sessions = {}
+            self._tab_sessions_owner = None
+            self._tab_recorders = {}
+            
+            # 学習したセレクタの待機時間と候補の実績を保存
+            if self.selector_stats is not None:
+                self.selector_stats.save()
+            self.candidate_history.save()
+            
+            # デーモンに接続している場合は、作成したブラウザコンテキストを破棄する（Chrome は停止しない）
+            # cdp エンジンのドライバーは終了時にデーモンへの接続を閉じるため、先に破棄する
+            if daemon_context is not None and isinstance(self.driver, CDPDriver):
+                self._close_daemon_context(daemon_context)
+                daemon_context = None
+            
+            # ドライバーが初期化されている場合は終了
+            if self.driver:
+                self.logger.info("ブラウザを終了します")
+                self._quit_driver(self.driver)
+                self.driver = None
+            
+            if daemon_context is not None:
+                self._close_daemon_context(daemon_context)
+            
+        except Exception as e:
+            self.logger.error(f"ブラウザの終了中にエラーが発生しました: {str(e)}")
+    
+    def _quit_driver(self, driver):
+        """
+        ドライバーを終了し、残ったプロセスを強制終了する
+        
+        driver.quit() が quit_timeout 秒以内に戻らない場合や、ドライバーが異常終了して
+        Chrome のプロセスが残っている場合は、監視していたプロセスをすべて強制終了します。
+        
+        Args:
+            driver: 終了するドライバー
+        """
+        def quit_driver():
+            try:
+                driver.quit()
+            except Exception as e:
+                self.logger.warning(f"ドライバーの終了中にエラーが発生しました: {str(e)}")
+        
+        # 終了直前の使用量を記録
+        self.watchdog.sample()
+        
+        quitter = threading.Thread(target=quit_driver, name="browser-quit", daemon=True)
+        quitter.start()
+        quitter.join(self.watchdog.quit_timeout)
+        
+        if quitter.is_alive():
+            self.logger.warning(f"ドライバーが {self.watchdog.quit_timeout}秒以内に終了しませんでした。プロセスを強制終了します")
+            self.watchdog.terminate(timeout=0)
+        else:
+            self.watchdog.terminate()
+        
+        if self.watchdog_metrics_path:
+            try:
+                self.watchdog.metrics.export(self.watchdog_metrics_path)
+            except Exception as e:
+                self.logger.warning(f"プロセスの計測結果を保存できませんでした: {str(e)}")
+    
+    def recycle(self, reason=None):
+        """
+        ブラウザを終了して起動し直す（長時間の実行によるメモリ使用量の増加を解消）
+        
+        作り直した後、on_recycle が設定されていれば on_recycle(browser) を呼び出します。
+        Cookie やログイン状態は引き継がれないため、必要に応じて on_recycle でログインし直してください。
+        
+        Args:
+            reason (str, optional): 作り直す理由（ログ出力用）
+            
+        Returns:
+            bool: 成功した場合はTrue、それ以外はFalse
+        """
+        self.logger.info(f"ブラウザのセッションを作り直します: {reason or '手動'}")
+        self.watchdog.metrics.recycles += 1
+        self.quit()
+        if self.element_cache is not None:
+            self.element_cache.invalidate()
+        
+        if not self.setup():
+            return False
+        
+        if self.on_recycle is not None:
+            try:
+                self.on_recycle(self)
+            except Exception as e:
+                self.logger.error(f"セッションを作り直した後の処理でエラーが発生しました: {str(e)}")
+                return False
+        return True
+    
+    def with_element(self, locator, action, timeout=None, visible=False, retries=1):
+        """
+        要素を取得して処理を実行する（要素が古くなっていた場合は検索し直して再実行）
+        
+        Args:
+            locator: タプル(group, name) またはタプル(By.XX, value)
+            action (callable): action(element) の形式で呼び出す処理
+            timeout (int, optional): 要素を待機する秒数
+            visible (bool): 要素が表示されるのを待つかどうか
+            retries (int): 要素が古くなっていた場合に検索し直す回数
+            
+        Returns:
+            Any: action の戻り値。要素が見つからない場合はNone
+        """
+        for attempt in range(retries + 1):
+            element = self.wait_for_element(locator, timeout=timeout, visible=visible)
+            if element is None:
+                return None
+            try:
+                return action(element)
+            except StaleElementReferenceException:
+                if attempt >= retries:
+                    raise
+                self.logger.debug(f"要素が古くなっているため検索し直します: {locator}")
+                if self.element_cache is not None:
+                    self.element_cache.discard(self._element_cache_key(locator, None, visible))
+    
+    def get_element_cache_stats(self):
+        """
+        要素キャッシュの利用状況を取得する
+        
+        Returns:
+            dict: {size, hits, misses, stale, invalidations, hit_rate}（キャッシュが無効な場合は空の辞書）
+        """
+        return self.element_cache.stats() if self.element_cache is not None else {}
+    
+    def get_process_metrics(self):
+        """
+        現在のセッションのプロセスの計測結果を取得する
+        
+        Returns:
+            dict: 移動回数・作り直し回数・メモリ使用量のピーク・直近のサンプルなど
+                  （psutil がない場合、メモリなどの値は記録されません）
+        """
+        if self.driver:
+            self.watchdog.sample()
+        return self.watchdog.metrics.to_dict()
+            
+    # close() メソッドは quit() のエイリアス
+    def close(self, error_message=None, exception=None, context=None):
+        """quit()のエイリアス"""
+        self.quit(error_message, exception, context)
+
+    def get_cdp_session(self):
+        """
+        ブラウザの DevTools への接続を取得する
+        
+        cdp エンジンの場合はドライバーの接続を、webdriver エンジンの場合は
+        chromedriver が起動した Chrome に新たに接続して返します。
+        
+        Returns:
+            CDPSession or None: 接続。websocket-client がない場合や接続できない場合はNone
+        """
+        if not self.driver:
+            return None
+        
+        if self._cdp_session is not None and not self._cdp_session.closed:
+            return self._cdp_session
+        
+        try:
+            if isinstance(self.driver, CDPDriver):
+                self._cdp_session = self.driver.session
+            elif WEBSOCKET_AVAILABLE:
+                self._cdp_session = CDPSession.from_driver(self.driver, logger=self.logger)
+            else:
+                self.logger.debug("websocket-clientがインストールされていないため、DevToolsに接続できません")
+                return None
+            
+            # タブの作成イベントを受け取る
+            self._cdp_session.send('Target.setDiscoverTargets', {'discover': True})
+            return self._cdp_session
+        except Exception as e:
+            self.logger.warning(f"DevToolsへの接続に失敗しました: {str(e)}")
+            self._cdp_session = None
+            return None
+
+    def _get_tab_session_id(self, session):
+        """
+        現在のタブに DevTools のコマンドを送るためのセッションIDを取得する
+        
+        webdriver エンジンの場合、タブごとに1つのセッションを作成して通信の記録や録画で共有します。
+        使い終わった場合は _release_tab_session() を呼び出してください。
+        
+        Args:
+            session (CDPSession): get_cdp_session() の戻り値
+            
+        Returns:
+            str: セッションID
+        """
+        if isinstance(self.driver, CDPDriver):
+            return self.driver.session_id
+        
+        if self._tab_sessions_owner is not session:
+            # DevTools に接続し直した場合、以前のセッションは使用できない
+            self._tab_sessions = {}
+            self._tab_sessions_owner = session
+            session.on('Target.detachedFromTarget', self._on_tab_detached)
+        
+        handle = self.driver.current_window_handle
+        entry = self._tab_sessions.get(handle)
+        if entry is None:
+            entry = self._tab_sessions[handle] = [session.attach(handle), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _release_tab_session(self, session_id):
+        """
+        _get_tab_session_id() で取得したセッションの使用を終了し、ほかに使用していなければ切断する
+        
+        Args:
+            session_id (str): セッションID
+        """
+        for handle, entry in list(self._tab_sessions.items()):
+            if entry[0] != session_id:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._tab_sessions[handle]
+                try:
+                    self._tab_sessions_owner.detach(session_id)
+                except Exception as e:
+                    self.logger.debug(f"タブのセッションを切断できませんでした: {str(e)}")
+            return
+
+    def _on_tab_detached(self, params):
+        """タブが閉じられたなどで切断されたセッションを破棄する（配信スレッドで呼び出される）"""
+        for handle, entry in list(self._tab_sessions.items()):
+            if entry[0] == params.get('sessionId'):
+                self._tab_sessions.pop(handle, None)
+
+    def _hold_tab_session(self, recorder):
+        """開始した記録を、タブのセッションを使用している記録として登録する"""
+        self._tab_recorders[id(recorder)] = recorder
+        return recorder
+
+    def _stop_tab_recorder(self, recorder):
+        """
+        タブのセッションを使用する記録（通信の記録・HAR・録画）を終了し、セッションの使用を終了する
+        
+        記録の stop() を直接呼び出していた場合も、セッションの使用を終了します。
+        
+        Args:
+            recorder: NetworkCapture, HarRecorder, ScreencastRecorder または None
+        """
+        if recorder is None:
+            return
+        if recorder.active:
+            recorder.stop()
+        if self._tab_recorders.pop(id(recorder), None) is not None:
+            self._release_tab_session(recorder.session_id)
+
+    def start_network_capture(self, patterns=None, resource_types=None, json_only=False):
+        """
+        現在のタブの XHR・fetch の応答の記録を開始する
+        
+        ページが表示に使っている JSON をそのまま取得できるため、画面から値を読み取る必要がなくなります。
+        記録する件数と合計サイズは [BROWSER] network_capture_max_entries / network_capture_max_bytes までで、
+        超えた場合は古い応答から破棄します。すでに記録中の場合は、終了してから記録し直します。
+        
+        Args:
+            patterns (optional): 記録するURLのパターン（"*/api/*" のようなワイルドカード、部分一致の文字列、
+                re.compile() したパターン、またはそれらのリスト。省略時はすべて）
+            resource_types (list, optional): 記録する通信の種類（省略時は XHR と Fetch）
+            json_only (bool): JSON の応答のみを記録するかどうか
+            
+        Returns:
+            NetworkCapture or None: 記録。DevToolsに接続できない場合はNone
+        """
+        session = self.get_cdp_session()
+        if session is None:
+            self.logger.error("DevToolsに接続できないため、通信を記録できません")
+            return None
+        
+        self.stop_network_capture()
+        session_id = None
+        try:
+            session_id = self._get_tab_session_id(session)
+            capture = NetworkCapture(
+                session,
+                session_id,
+                patterns=patterns,
+                resource_types=resource_types or ('XHR', 'Fetch'),
+                max_entries=int(self._get_config_value("BROWSER", "network_capture_max_entries", "500")),
+                max_bytes=int(self._get_config_value("BROWSER", "network_capture_max_bytes", "52428800")),
+                max_body_bytes=int(self._get_config_value("BROWSER", "network_capture_max_body_bytes", "10485760")),
+                json_only=json_only,
+                body_workers=int(self._get_config_value("BROWSER", "network_capture_body_workers", "2")),
+                logger=self.logger
+            )
+            self.network_capture = self._hold_tab_session(capture.start())
+            self.logger.debug(f"通信の記録を開始しました: {patterns or 'すべて'}")
+            return self.network_capture
+        except Exception as e:
+            if session_id is not None:
+                self._release_tab_session(session_id)
+            self.logger.error(f"通信の記録を開始できませんでした: {str(e)}")
+            return None
+
+    def stop_network_capture(self):
+        """
+        通信の記録を終了する（記録済みの応答は network_capture から取得できる）
+        """
+        self._stop_tab_recorder(self.network_capture)
+
+    def get_captured_json(self, pattern=None):
+        """
+        記録した応答のうち JSON として解析できたものの値を取得する
+        
+        Args:
+            pattern (optional): 絞り込むURLのパターン（省略時はすべて）
+            
+        Returns:
+            list: 解析した値（古い順）。記録していない場合は空のリスト
+        """
+        if self.network_capture is None:
+            return []
+        return self.network_capture.json_bodies(pattern)
+
+    def wait_for_response(self, pattern=None, timeout=None, after=0):
+        """
+        パターンに一致する応答が記録されるまで待機する
+        
+        Args:
+            pattern (optional): URLのパターン（省略時はすべて）
+            timeout (float, optional): 待機する秒数（省略時はデフォルトのタイムアウト）
+            after (int): この番号より後に記録された応答のみを対象にする（network_capture.last_seq）
+            
+        Returns:
+            CapturedResponse or None: 応答。記録していない場合やタイムアウトした場合はNone
+        """
+        if self.network_capture is None:
+            self.logger.error("通信を記録していません。start_network_capture() を呼び出してください")
+            return None
+        response = self.network_capture.wait_for(pattern, timeout or self.timeout, after)
+        if response is None:
+            self.logger.warning(f"応答が記録されませんでした: {pattern or 'すべて'}")
+        return response
+
+    def _setup_downloads(self):
+        """
+        ダウンロード先をセッションごとのディレクトリに設定し、ダウンロードの記録を開始する
+        
+        Returns:
+            DownloadManager or None: 設定済みの場合は既存のもの。設定できない場合はNone
+        """
+        if self.download_manager is not None:
+            return self.download_manager
+        if not self.driver:
+            self.logger.error("WebDriverが初期化されていません")
+            return None
+        
+        base_dir = self._resolve_path(self._get_config_value("BROWSER", "download_dir", "") or "downloads")
+        try:
+            os.makedirs(base_dir, exist_ok=True)
+            directory = tempfile.mkdtemp(prefix=datetime.now().strftime('%Y%m%d_%H%M%S_'), dir=base_dir)
+            manager = DownloadManager(directory, logger=self.logger)
+            session = self.get_cdp_session()
+            if session is not None:
+                manager.attach_session(session, self._browser_context_id())
+            else:
+                manager.attach_driver(self.driver)
+        except Exception as e:
+            self.logger.error(f"ダウンロード先を設定できませんでした: {str(e)}")
+            return None
+        
+        self.download_manager = manager
+        self.logger.info(f"ダウンロード先: {directory}（完了の検出: {manager.mode}）")
+        return manager
+
+    def expect_download(self, filename=None, timeout=None):
         """
-        ブラウザを終了する
+        この後に開始されるダウンロードの待機を開始する（ダウンロードを開始する操作の前に呼び出す）
+        
+        with 文の中でダウンロードを開始し、戻り値の path で完了したファイルのパスを取得します。
+        同時に複数の待機を作成でき、ダウンロードは開始された順に、ファイル名が一致する待機に割り当てられます。
         
         Args:
-            error_message: エラーメッセージ（省略可能）
-            exception: 例外オブジェクト（省略可能）
-            context: コンテキスト情報（省略可能）
+            filename (str, optional): 対象にするファイル名のパターン（"*.csv" など。省略時は最初のダウンロード）
+            timeout (float, optional): 完了を待つ秒数（省略時は [BROWSER] download_timeout）
+            
+        Returns:
+            DownloadWaiter or None: 待機。ダウンロード先を設定できない場合はNone
         """
-        try:
-            # エラーメッセージが提供されている場合は通知を送信
-            if error_message and self.notifier:
-                self._notify_error(error_message, exception, context)
-                
-            # ドライバーが初期化されている場合は終了
-            if self.driver:
-                self.logger.info("ブラウザを終了します")
-                self.driver.quit()
-                self.driver = None
+        manager = self._setup_downloads()
+        if manager is None:
+            return None
+        if timeout is None:
+            timeout = float(self._get_config_value("BROWSER", "download_timeout", "120"))
+        return manager.expect(filename, timeout)
+
+    def get_downloaded_files(self):
+        """
+        このセッションでダウンロードが完了したファイルのパスを取得する
+        
+        Returns:
+            list: ファイルのパス（開始された順）
+        """
+        if self.download_manager is None:
+            return []
+        return [download.path for download in self.download_manager.completed()]
+
+    def open_tab_pool(self, size=None, timeout=None):
+        """
+        同じブラウザ内で複数のタブを使って URL を処理するタブプールを作成する
+        
+        Args:
+            size (int, optional): 同時に開くタブ数（省略時は [BROWSER] tab_pool_size）
+            timeout (float, optional): 1ページの読み込みタイムアウト秒数（省略時は page_load_timeout）
             
-        except Exception as e:
-            self.logger.error(f"ブラウザの終了中にエラーが発生しました: {str(e)}")
+        Returns:
+            TabPool or None: タブプール。DevToolsに接続できない場合はNone
+        """
+        session = self.get_cdp_session()
+        if session is None:
+            self.logger.error("DevToolsに接続できないため、タブプールを作成できません")
+            return None
+        
+        if size is None:
+            size = int(self._get_config_value("BROWSER", "tab_pool_size", "4"))
+        if timeout is None:
+            timeout = float(self._get_config_value("BROWSER", "page_load_timeout", "30"))
+        max_uses = int(self._get_config_value("BROWSER", "tab_max_uses", "50"))
+        
+        return TabPool(session, size=size, timeout=timeout, max_uses=max_uses, logger=self.logger,
+                       browser_context_id=self._browser_context_id())
+
+    def load_in_tabs(self, urls, size=None, extractor=None, timeout=None):
+        """
+        複数のURLを同じブラウザ内のタブで同時に読み込み、完了した順に結果を返す
+        
+        ブラウザを複数起動する crawl() よりメモリ使用量が少なく、軽いページの処理に向いています。
+        
+        Args:
+            urls: 処理するURLのリストまたはイテレーター
+            size (int, optional): 同時に開くタブ数
+            extractor (callable, optional): 読み込み完了後に呼び出す関数 extractor(tab)
+            timeout (float, optional): 1ページの読み込みタイムアウト秒数
             
-    # close() メソッドは quit() のエイリアス
-    def close(self, error_message=None, exception=None, context=None):
-        """quit()のエイリアス"""
-        self.quit(error_message, exception, context)
+        Yields:
+            CrawlResult: 各URLの処理結果
+        """
+        pool = self.open_tab_pool(size, timeout)
+        if pool is None:
+            return
+        with pool:
+            yield from pool.map(urls, extractor)
+
+    def spawn(self):
+        """
+        同じ設定で新しいBrowserインスタンスを作成する（セットアップは行わない）
+
+        Returns:
+            Browser: 新しいインスタンス
+        """
+        return self.__class__(
+            logger=self.logger,
+            selectors_path=self.selectors_path,
+            headless=self.headless if self._headless_explicit else None,
+            timeout=self.timeout,
+            config=self.config,
+            project_root=self.project_root
+        )
 
+    def crawl(self, urls, concurrency=None, extractor=None, timeout=None, retries=None):
+        """
+        複数のURLを並列に処理し、完了した順に結果を返す
+
+        ワーカーごとにこのインスタンスと同じ設定のブラウザを作成します。
+        このインスタンス自身のドライバーは使用しません。
+
+        Args:
+            urls: 処理するURLのリストまたはイテレーター
+            concurrency (int, optional): 同時に使用するブラウザ数（省略時は [BROWSER] crawl_concurrency）
+            extractor (callable, optional): ページ表示後に呼び出す関数 extractor(browser)
+            timeout (float, optional): 1ページの読み込みタイムアウト秒数（省略時は page_load_timeout）
+            retries (int, optional): 失敗時のリトライ回数（省略時は [BROWSER] crawl_retries）
+
+        Yields:
+            CrawlResult: 各URLの処理結果
+        """
+        if concurrency is None:
+            concurrency = int(self._get_config_value("BROWSER", "crawl_concurrency", "4"))
+        if timeout is None:
+            timeout = float(self._get_config_value("BROWSER", "page_load_timeout", "30"))
+        if retries is None:
+            retries = int(self._get_config_value("BROWSER", "crawl_retries", "1"))
+
+        crawler = Crawler(
+            self.spawn,
+            concurrency=concurrency,
+            extractor=extractor,
+            timeout=timeout,
+            retries=retries,
+            logger=self.logger
+        )
+        self.last_crawl_stats = crawler.stats
+        for result in crawler.crawl(urls):
+            self.last_crawl_stats = crawler.stats
+            yield result
+
+    def harvest(self, item_selector, fields=None, key=None, next_locator=None, **options):
+        """
+        無限スクロールやページ送りで追加される一覧の項目を、追加された分だけ取得して返す
+
+        スクロール（next_locator を省略した場合）または「次へ」のクリックを、新しい項目が現れなくなるか
+        上限に達するまで繰り返します。取得済みの項目には data-harvested 属性を付けるため、
+        ラウンドごとの処理量は一覧の長さによらず一定です。
+
+        Args:
+            item_selector (str): 一覧の項目のCSSセレクタ
+            fields (dict, optional): {フィールド名: 指定}（"h3" はテキスト、"a@href" は属性、"@data-id" は項目自体の属性）
+            key (str, optional): 重複の判定に使うフィールド名（仮想スクロールで項目が作り直される場合に指定）
+            next_locator (optional): 「次へ」ボタンのロケーター
+            **options: Harvester の引数（scroll_container, max_items, max_rounds, max_seconds,
+                idle_rounds, round_timeout, batch_size, seen_limit）
+
+        Yields:
+            dict: 項目ごとのフィールドの値
+        """
+        harvester = Harvester(self, item_selector, fields=fields, key=key, next_locator=next_locator,
+                              logger=self.logger, **options)
+        self.last_harvest_stats = harvester.stats
+        yield from harvester
+
+    def _element_cache_key(self, by_or_tuple, value, visible):
+        """
+        要素キャッシュのキーを作成する
+        
+        (group, name) と (By.XX, value) はタプルのまま、By定数の場合は (By定数, 値) をキーにします。
+        """
+        locator = tuple(by_or_tuple) if isinstance(by_or_tuple, tuple) else (by_or_tuple, value)
+        return locator, visible
+    
     def wait_for_element(self, by_or_tuple, value=None, condition=None, timeout=None, visible=False):
         """
         指定された条件で要素を待機する
@@ -629,27 +2059,38 @@ class Browser:
                 return None
             
             wait_timeout = timeout or self.timeout
+            stats_key = None
+            candidates = []
+            
+            if isinstance(by_or_tuple, tuple) and not self.selectors:
+                self._load_selectors()
             
             # by_or_tupleの型に応じて処理を分岐
             if isinstance(by_or_tuple, tuple):
                 if len(by_or_tuple) == 2:
-                    # (group, name)形式の場合
-                    if isinstance(by_or_tuple[0], str) and isinstance(by_or_tuple[1], str):
+                    # (group, name)形式の場合（By定数と値のタプルと区別するため、グループの有無で判定）
+                    if isinstance(by_or_tuple[1], str) and (
+                        by_or_tuple[0] in self.selectors or by_or_tuple[0] not in BY_TYPES
+                    ):
                         group, name = by_or_tuple
-                        if not self.selectors:
-                            self._load_selectors()
-                            
                         if group not in self.selectors or name not in self.selectors[group]:
                             self.logger.error(f"セレクタが見つかりません: {group}.{name}")
                             return None
                         
-                        selector_info = self.selectors[group][name]
-                        by = self._get_by_type(selector_info['selector_type'])
-                        value = selector_info['selector_value']
+                        candidates = self.get_selector_candidates(group, name)
+                        by = self._get_by_type(candidates[0]['selector_type'])
+                        value = candidates[0]['selector_value']
                         
                         # ログ出力で要素の説明を追加
-                        description = selector_info.get('description', '')
+                        description = self.selectors[group][name].get('description', '')
                         self.logger.debug(f"要素を待機します: {group}.{name} ({description})")
+                        
+                        # タイムアウトが指定されていない場合は、実績から算出したタイムアウトを使用
+                        stats_key = (group, name)
+                        if timeout is None:
+                            wait_timeout = self.get_selector_timeout(stats_key, wait_timeout)
+                        else:
+                            self._selector_stats_domain = self._current_domain()
                     # (By.XX, value)形式の場合
                     else:
                         by, value = by_or_tuple
@@ -657,13 +2098,47 @@ class Browser:
                 # By定数の場合
                 by = by_or_tuple
             
+            # 同じページで見つけた要素があれば再利用（待機条件を指定した場合は毎回確認する）
+            # キャッシュにない場合は同じスクリプトで検索し、見つからなかった場合のみ待機する
+            cache_key = None
+            cache_state = None
+            if self.element_cache is not None and condition is None:
+                cache_key = self._element_cache_key(by_or_tuple, value, visible)
+                # 候補が複数ある場合は、キャッシュの確認のみ行い、候補はまとめて検索する
+                locator = (by, value) if len(candidates) <= 1 else None
+                started = time.perf_counter()
+                element, cache_state, cached = self.element_cache.lookup(self.driver, cache_key, locator, visible)
+                if element is not None:
+                    if not cached:
+                        self.record_selector_wait(stats_key, time.perf_counter() - started)
+                        self.element_cache.store(cache_key, element, cache_state)
+                    return element
+            
+            # 候補が複数ある場合は、すべての候補をまとめて検索
+            if len(candidates) > 1 and condition is None:
+                element = self._wait_for_candidates(stats_key, candidates, wait_timeout, visible)
+                if cache_key is not None:
+                    self.element_cache.store(cache_key, element, cache_state)
+                return element
+            
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+            
             # 条件が指定されていない場合は、visibleに応じてデフォルト条件を設定
             if condition is None:
                 condition = EC.visibility_of_element_located if visible else EC.presence_of_element_located
             
-            element = WebDriverWait(self.driver, wait_timeout).until(
-                condition((by, value))
-            )
+            started = time.perf_counter()
+            try:
+                element = WebDriverWait(self.driver, wait_timeout).until(
+                    condition((by, value))
+                )
+            except TimeoutException:
+                self.record_selector_wait(stats_key, None)
+                raise
+            self.record_selector_wait(stats_key, time.perf_counter() - started)
+            if cache_key is not None:
+                self.element_cache.store(cache_key, element, cache_state)
             return element
             
         except TimeoutException:
@@ -672,7 +2147,7 @@ class Browser:
             
             # エラー時のスクリーンショット
             if self.screenshot_on_error:
-                self._take_error_screenshot(f"timeout_{selector_info.replace(':', '_').replace('=', '_')}")
+                self.save_screenshot(f"timeout_{selector_info.replace(':', '_').replace('=', '_')}", append_timestamp=True)
                 
             return None
         except Exception as e:
@@ -681,6 +2156,254 @@ class Browser:
             self._notify_error(error_message, e)
             return None
             
+    def _resolve_locator(self, locator):
+        """
+        ロケーターを (By種別, 値) に変換する
+        
+        Args:
+            locator: タプル(group, name)、タプル(By.XX, value)、またはCSSセレクタ文字列
+            
+        Returns:
+            tuple: (By種別, 値)。解決できない場合は (None, None)
+        """
+        if isinstance(locator, str):
+            return By.CSS_SELECTOR, locator
+        
+        if isinstance(locator, tuple) and len(locator) == 2:
+            first, second = locator
+            # (group, name) 形式の場合はセレクタ定義から解決
+            if not self.selectors:
+                self._load_selectors()
+            if first in self.selectors and second in self.selectors.get(first, {}):
+                selector_info = self.get_selector_candidates(first, second)[0]
+                return self._get_by_type(selector_info['selector_type']), selector_info['selector_value']
+            return first, second
+        
+        self.logger.error(f"ロケーターの形式が不正です: {locator}")
+        return None, None
+    
+    def _resolve_locator_candidates(self, locator):
+        """
+        ロケーターを優先順の (By種別, 値) のリストに変換する（セレクタの候補をすべて含む）
+        
+        Returns:
+            list: (By種別, 値) のリスト。解決できない場合は空のリスト
+        """
+        if isinstance(locator, tuple) and len(locator) == 2 and locator[1] in self.selectors.get(locator[0], {}):
+            return [(self._get_by_type(c['selector_type']), c['selector_value'])
+                    for c in self.get_selector_candidates(*locator)]
+        by, value = self._resolve_locator(locator)
+        return [] if by is None else [(by, value)]
+    
+    def fill_form(self, fields, typing=None, timeout=None, mask_fields=('password',)):
+        """
+        フォームの複数フィールドに値を一括入力する
+        
+        デフォルトでは1回のスクリプト実行ですべての値をネイティブのsetterで設定し、
+        input/change イベントを発火させます。キー入力を検知するサイトでは typing=True を
+        指定すると、従来どおり clear() と send_keys() でフィールドごとに入力します。
+        
+        Args:
+            fields (dict): ロケーターと入力値の辞書
+                ロケーターはタプル(group, name)、タプル(By.XX, value)、CSSセレクタ文字列のいずれか。
+                チェックボックス・ラジオボタンは True/False、selectは値または表示テキストを指定
+            typing (bool, optional): キー入力モードを使用するかどうか
+                （省略時は [BROWSER] form_input_mode の設定に従う）
+            timeout (int, optional): フィールドが現れるまで待機する秒数
+            mask_fields (tuple): ログ出力時に値を伏せるフィールド名の一部
+            
+        Returns:
+            dict: ロケーターごとの入力成否 {locator: bool}
+        """
+        results = {locator: False for locator in fields}
+        if not self.driver:
+            self.logger.error("WebDriverが初期化されていません")
+            return results
+        
+        if typing is None:
+            typing = str(self._get_config_value("BROWSER", "form_input_mode", "script")).lower() == "keys"
+        wait_timeout = timeout or self.timeout
+        
+        def masked(locator, value):
+            label = str(locator)
+            return "****" if any(m in label for m in mask_fields) else value
+        
+        if typing:
+            # キー入力モード: フィールドごとに待機して入力
+            for locator, value in fields.items():
+                element = self.wait_for_element(
+                    locator if isinstance(locator, tuple) else (By.CSS_SELECTOR, locator),
+                    timeout=wait_timeout, visible=True
+                )
+                if not element:
+                    self.logger.error(f"入力フィールドが見つかりません: {locator}")
+                    continue
+                try:
+                    if isinstance(value, bool):
+                        if element.is_selected() != value:
+                            element.click()
+                    else:
+                        element.clear()
+                        element.send_keys(str(value))
+                    results[locator] = True
+                    self.logger.debug(f"フィールドに入力しました: {locator} = {masked(locator, value)}")
+                except Exception as e:
+                    self.logger.error(f"フィールドへの入力中にエラーが発生しました: {locator}: {str(e)}")
+            return results
+        
+        # スクリプトモード: すべてのフィールドを1回のスクリプト実行で設定
+        fill_script = LOCATE_ELEMENT_JS + """
+            var fields = arguments[0], statuses = [];
+            
+            function setValue(el, value) {
+                var tag = el.tagName.toLowerCase();
+                var type = (el.getAttribute('type') || '').toLowerCase();
+                if (el.focus) el.focus();
+                
+                if (type === 'checkbox' || type === 'radio') {
+                    var checked = value === true || value === 'true' || value === 'on' || value === '1';
+                    if (el.checked !== checked) el.click();  // click で input/change が発火する
+                    return el.checked === checked;
+                }
+                
+                if (tag === 'select') {
+                    var matched = false;
+                    for (var i = 0; i < el.options.length; i++) {
+                        var option = el.options[i];
+                        if (option.value === value || option.text.trim() === value) {
+                            el.selectedIndex = i;
+                            matched = true;
+                            break;
+                        }
+                    }
+                    if (!matched) return false;
+                } else if (el.isContentEditable) {
+                    el.textContent = value;
+                } else {
+                    // React等のフレームワークが値の変更を検知できるようネイティブのsetterを使用
+                    var proto = tag === 'textarea' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+                    var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+                    if (descriptor && descriptor.set) {
+                        descriptor.set.call(el, value);
+                    } else {
+                        el.value = value;
+                    }
+                }
+                
+                el.dispatchEvent(new Event('input', {bubbles: true}));
+                el.dispatchEvent(new Event('change', {bubbles: true}));
+                if (el.blur) el.blur();
+                return el.isContentEditable ? el.textContent === value : String(el.value) === String(value);
+            }
+            
+            for (var i = 0; i < fields.length; i++) {
+                // セレクタの候補を優先順に検索
+                var el = null;
+                for (var j = 0; j < fields[i][0].length && !el; j++) {
+                    el = __locateElement(fields[i][0][j][0], fields[i][0][j][1]);
+                }
+                if (!el) { statuses.push('not_found'); continue; }
+                if (el.disabled || el.readOnly) { statuses.push('disabled'); continue; }
+                try {
+                    statuses.push(setValue(el, fields[i][1]) ? 'ok' : 'mismatch');
+                } catch (e) {
+                    statuses.push('error: ' + e.message);
+                }
+            }
+            return statuses;
+        """
+        
+        pending = []
+        for locator, value in fields.items():
+            candidates = self._resolve_locator_candidates(locator)
+            if not candidates:
+                continue
+            pending.append((locator, [list(c) for c in candidates], value if isinstance(value, bool) else str(value)))
+        
+        end_time = time.time() + wait_timeout
+        statuses = {}
+        try:
+            while pending:
+                payload = [[candidates, value] for _, candidates, value in pending]
+                round_statuses = self.driver.execute_script(fill_script, payload)
+                
+                not_found = []
+                for entry, status in zip(pending, round_statuses):
+                    statuses[entry[0]] = status
+                    if status == 'not_found':
+                        not_found.append(entry)
+                    else:
+                        results[entry[0]] = status == 'ok'
+                
+                # 未描画のフィールドのみを対象に、タイムアウトまで再試行
+                pending = not_found
+                if pending and time.time() < end_time:
+                    time.sleep(0.2)
+                else:
+                    break
+        except Exception as e:
+            self.logger.error(f"フォームの一括入力中にエラーが発生しました: {str(e)}")
+            if self.screenshot_on_error:
+                self.save_screenshot(f"error_fill_form_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            self.save_screencast("error_fill_form")
+            return results
+        
+        for locator, value in fields.items():
+            if results[locator]:
+                self.logger.debug(f"フィールドに入力しました: {locator} = {masked(locator, value)}")
+            else:
+                self.logger.warning(f"フィールドへの入力に失敗しました: {locator} ({statuses.get(locator, 'invalid_locator')})")
+        
+        return results
+    
+    def extract_table(self, locator, path, format=None, chunk_size=None, fill_spans=True, header=None, timeout=None):
+        """
+        テーブルのセルの値をCSV・Arrow・Parquet ファイルに書き出す
+        
+        rowspan・colspan を展開し、chunk_size 行ずつ1回のスクリプト実行で取得して順に書き出します。
+        Arrow・Parquet 形式には pyarrow が必要です。
+        
+        Args:
+            locator: table要素のロケーター（タプル(group, name)、タプル(By.XX, value)、またはCSSセレクタ文字列）
+            path (str): 出力先のパス（拡張子 .csv / .arrow / .feather / .parquet で形式を判定）
+            format (str, optional): 出力形式（csv / arrow / parquet）
+            chunk_size (int, optional): 1回に取得する行数（省略時は [BROWSER] table_chunk_size）
+            fill_spans (bool): 結合されたセルの値をすべての列・行に入れるかどうか
+            header (bool, optional): 見出し行があるかどうか（省略時は thead または th のみの先頭行で判定）
+            timeout (int, optional): テーブルが現れるまで待機する秒数
+            
+        Returns:
+            dict: {path, format, rows, columns}。失敗した場合はNone
+        """
+        # table_extractor は pyarrow を読み込むため（読み込みに時間がかかる）、使用時にインポートする
+        from .table_extractor import DEFAULT_CHUNK_SIZE, extract_table
+        
+        by, value = self._resolve_locator(locator)
+        if by is None:
+            return None
+        table = self.wait_for_element((by, value), timeout=timeout)
+        if table is None:
+            self.logger.error(f"テーブルが見つかりません: {locator}")
+            return None
+        
+        if chunk_size is None:
+            chunk_size = int(self._get_config_value("BROWSER", "table_chunk_size", DEFAULT_CHUNK_SIZE))
+        
+        try:
+            started = time.perf_counter()
+            result = extract_table(
+                self.driver, table, self._resolve_path(path), format=format, chunk_size=chunk_size,
+                fill_spans=fill_spans, header=header, logger=self.logger
+            )
+            self.logger.info(
+                f"テーブルを書き出しました: {result['path']} ({result['rows']}行 x {len(result['columns'])}列, "
+                f"{time.perf_counter() - started:.2f}秒)"
+            )
+            return result
+        except Exception as e:
+            self.logger.error(f"テーブルの書き出し中にエラーが発生しました: {locator}: {str(e)}")
+            return None
+    
     def analyze_page_content(self, element_filter=None, check_visibility=True):
         """
         現在のページを解析し、重要な要素やステータスを取得する
@@ -698,6 +2421,8 @@ class Browser:
             
         Returns:
             dict: ページ解析結果を含む辞書
+                各要素は ElementSnapshot として格納され、WebElement は
+                item['element'] を参照した時点で解決されます
         """
         if not self.driver:
             self.logger.error("WebDriverが初期化されていません")
@@ -731,51 +2456,60 @@ class Browser:
             # フォーム要素の解析
             if element_filter.get('forms', True):
                 form_elements = self.driver.find_elements(By.TAG_NAME, "form")
-                for form in form_elements:
+                for index, form in enumerate(form_elements):
                     if not check_visibility or form.is_displayed():
-                        form_info = {
-                            'id': form.get_attribute('id') or '',
-                            'action': form.get_attribute('action') or '',
-                            'method': form.get_attribute('method') or 'GET',
-                            'is_enabled': True,  # フォーム自体には無効状態がない
-                            'element': form  # Selenium WebElement
-                        }
-                        result['forms'].append(form_info)
+                        result['forms'].append(capture_snapshot(
+                            FORM_SCHEMA,
+                            (
+                                form.get_attribute('id') or '',
+                                form.get_attribute('action') or '',
+                                form.get_attribute('method') or 'GET',
+                                True  # フォーム自体には無効状態がない
+                            ),
+                            form, By.TAG_NAME, "form", index, self
+                        ))
             
             # ボタン要素の解析
             if element_filter.get('buttons', True):
                 # ボタン要素を取得（button要素とtype="button"のinput要素）
-                button_elements = self.driver.find_elements(By.TAG_NAME, "button")
-                button_elements.extend(self.driver.find_elements(By.CSS_SELECTOR, "input[type='button'], input[type='submit']"))
+                button_locators = [
+                    (By.TAG_NAME, "button"),
+                    (By.CSS_SELECTOR, "input[type='button'], input[type='submit']")
+                ]
                 
-                for button in button_elements:
-                    if not check_visibility or button.is_displayed():
-                        button_info = {
-                            'id': button.get_attribute('id') or '',
-                            'text': button.text or button.get_attribute('value') or '',
-                            'type': button.get_attribute('type') or '',
-                            'is_enabled': button.is_enabled(),
-                            'is_displayed': button.is_displayed(),
-                            'element': button  # Selenium WebElement
-                        }
-                        result['buttons'].append(button_info)
+                for by, selector in button_locators:
+                    for index, button in enumerate(self.driver.find_elements(by, selector)):
+                        if not check_visibility or button.is_displayed():
+                            result['buttons'].append(capture_snapshot(
+                                BUTTON_SCHEMA,
+                                (
+                                    button.get_attribute('id') or '',
+                                    button.text or button.get_attribute('value') or '',
+                                    button.get_attribute('type') or '',
+                                    button.is_enabled(),
+                                    button.is_displayed()
+                                ),
+                                button, by, selector, index, self
+                            ))
             
             # リンク要素の解析
             if element_filter.get('links', True):
                 link_elements = self.driver.find_elements(By.TAG_NAME, "a")
-                for link in link_elements:
+                for index, link in enumerate(link_elements):
                     if not check_visibility or link.is_displayed():
                         href = link.get_attribute('href') or ''
-                        link_info = {
-                            'text': link.text,
-                            'href': href,
-                            'target': link.get_attribute('target') or '',
-                            'is_external': href.startswith(('http', 'https', '//')) and not href.startswith(self.driver.current_url),
-                            'is_enabled': link.is_enabled(),
-                            'is_displayed': link.is_displayed(),
-                            'element': link  # Selenium WebElement
-                        }
-                        result['links'].append(link_info)
+                        result['links'].append(capture_snapshot(
+                            LINK_SCHEMA,
+                            (
+                                link.text,
+                                href,
+                                link.get_attribute('target') or '',
+                                href.startswith(('http', 'https', '//')) and not href.startswith(result['current_url']),
+                                link.is_enabled(),
+                                link.is_displayed()
+                            ),
+                            link, By.TAG_NAME, "a", index, self
+                        ))
             
             # 入力要素の解析
             if element_filter.get('inputs', True):
@@ -787,22 +2521,24 @@ class Browser:
                 
                 for selector in input_selectors:
                     input_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for input_elem in input_elements:
+                    for index, input_elem in enumerate(input_elements):
                         if not check_visibility or input_elem.is_displayed():
                             input_type = input_elem.get_attribute('type') or input_elem.tag_name
-                            input_info = {
-                                'name': input_elem.get_attribute('name') or '',
-                                'id': input_elem.get_attribute('id') or '',
-                                'type': input_type,
-                                'value': input_elem.get_attribute('value') or '',
-                                'placeholder': input_elem.get_attribute('placeholder') or '',
-                                'is_required': input_elem.get_attribute('required') == 'true',
-                                'is_readonly': input_elem.get_attribute('readonly') == 'true',
-                                'is_enabled': input_elem.is_enabled(),
-                                'is_displayed': input_elem.is_displayed(),
-                                'element': input_elem  # Selenium WebElement
-                            }
-                            result['inputs'].append(input_info)
+                            result['inputs'].append(capture_snapshot(
+                                INPUT_SCHEMA,
+                                (
+                                    input_elem.get_attribute('name') or '',
+                                    input_elem.get_attribute('id') or '',
+                                    input_type,
+                                    input_elem.get_attribute('value') or '',
+                                    input_elem.get_attribute('placeholder') or '',
+                                    input_elem.get_attribute('required') == 'true',
+                                    input_elem.get_attribute('readonly') == 'true',
+                                    input_elem.is_enabled(),
+                                    input_elem.is_displayed()
+                                ),
+                                input_elem, By.CSS_SELECTOR, selector, index, self
+                            ))
             
             # エラーメッセージの解析
             if element_filter.get('errors', True):
@@ -815,15 +2551,14 @@ class Browser:
                 
                 for selector in error_selectors:
                     error_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for error in error_elements:
+                    for index, error in enumerate(error_elements):
                         error_text = error.text.strip()
                         if error_text and (not check_visibility or error.is_displayed()):
-                            error_info = {
-                                'text': error_text,
-                                'is_displayed': error.is_displayed(),
-                                'element': error  # Selenium WebElement
-                            }
-                            result['error_messages'].append(error_info)
+                            result['error_messages'].append(capture_snapshot(
+                                ERROR_SCHEMA,
+                                (error_text, error.is_displayed()),
+                                error, By.CSS_SELECTOR, selector, index, self
+                            ))
             
             return result
             
@@ -893,6 +2628,9 @@ class Browser:
         }
         
         try:
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+            
             # アラートの存在を確認（0.5秒のタイムアウト）
             alert = WebDriverWait(self.driver, 0.5).until(EC.alert_is_present())
             if alert:
@@ -912,7 +2650,7 @@ class Browser:
         except TimeoutException:
             # アラートがない場合は正常
             pass
-            except Exception as e:
+        except Exception as e:
             self.logger.error(f"アラート確認中にエラーが発生しました: {str(e)}")
             
         return alert_info
@@ -929,10 +2667,10 @@ class Browser:
             check_visibility (bool): 表示されている要素のみを対象にするかどうか
             
         Returns:
-            list: 一致する要素のリスト
+            list: 一致する要素の ElementSnapshot のリスト
         """
-            if not self.driver:
-                self.logger.error("WebDriverが初期化されていません")
+        if not self.driver:
+            self.logger.error("WebDriverが初期化されていません")
             return []
             
         # 検索対象の要素タイプ設定
@@ -950,27 +2688,31 @@ class Browser:
             # 対応する大文字・小文字処理
             search_text = text if case_sensitive else text.lower()
             
-            for element in elements:
+            for index, element in enumerate(elements):
                 # 表示要素のみをチェック（オプション）
                 if check_visibility and not element.is_displayed():
                     continue
                     
-                element_text = element.text.strip()
+                raw_text = element.text
+                element_text = raw_text.strip()
                 if not case_sensitive:
                     element_text = element_text.lower()
                 
                 # テキスト一致の判定
                 if (exact_match and element_text == search_text) or \
                    (not exact_match and search_text in element_text):
-                    matching_elements.append({
-                        'element': element,
-                        'text': element.text,
-                        'tag': element.tag_name,
-                        'is_displayed': element.is_displayed(),
-                        'is_enabled': element.is_enabled(),
-                        'location': element.location,
-                        'size': element.size
-                    })
+                    matching_elements.append(capture_snapshot(
+                        TEXT_MATCH_SCHEMA,
+                        (
+                            raw_text,
+                            element.tag_name,
+                            element.is_displayed(),
+                            element.is_enabled(),
+                            element.location,
+                            element.size
+                        ),
+                        element, By.CSS_SELECTOR, css_selector, index, self
+                    ))
             
             return matching_elements
             
@@ -978,18 +2720,23 @@ class Browser:
             self.logger.error(f"テキスト検索中にエラーが発生しました: {str(e)}")
             return []
     
-    def find_interactive_elements(self, check_visibility=True):
+    def find_interactive_elements(self, check_visibility=True, viewport_only=False):
         """
         ページ上のインタラクティブな要素を検索する
         
+        表示判定（矩形・計算済みスタイル・ビューポートとの交差）、位置とサイズ、
+        アクセシブルネームをページ内で一括計算し、1回のスクリプト実行で取得します。
+        
         Args:
             check_visibility (bool): 表示されている要素のみを対象にするかどうか
+            viewport_only (bool): ビューポート内の要素のみを対象にするかどうか
+                （無限スクロールのページなどで処理を高速化できます）
             
         Returns:
-            dict: タイプ別のインタラクティブ要素リスト
+            dict: タイプ別のインタラクティブ要素（ElementSnapshot）のリスト
         """
-            if not self.driver:
-                self.logger.error("WebDriverが初期化されていません")
+        if not self.driver:
+            self.logger.error("WebDriverが初期化されていません")
             return {}
             
         interactive_elements = {
@@ -998,69 +2745,142 @@ class Browser:
             'media': []       # メディア要素
         }
         
+        # 種類ごとのセレクタ（1つのセレクタにまとめることで重複を排除）
+        selectors = {
+            'clickable': "a, button, input[type='button'], input[type='submit'], "
+                         "[onclick], [role='button'], [class*='btn']",
+            'input': "input:not([type='hidden']), textarea, select, [contenteditable='true']",
+            'media': "video, audio, iframe, canvas"
+        }
+        
+        # 各要素を [要素, 位置, テキスト, タグ, type, name, value, src, 有効, 表示, x, y, 幅, 高さ, 名前, ビューポート内] の配列で返す
+        inventory_script = """
+            var selectors = arguments[0], checkVisibility = arguments[1], viewportOnly = arguments[2];
+            var vw = window.innerWidth || document.documentElement.clientWidth;
+            var vh = window.innerHeight || document.documentElement.clientHeight;
+            var sx = window.scrollX || window.pageXOffset, sy = window.scrollY || window.pageYOffset;
+            
+            function isDisplayed(el, rect) {
+                if (rect.width <= 0 || rect.height <= 0) return false;
+                if (el.checkVisibility) {
+                    return el.checkVisibility({opacityProperty: true, visibilityProperty: true});
+                }
+                var style = window.getComputedStyle(el);
+                return style.display !== 'none' && style.visibility !== 'hidden' &&
+                       style.visibility !== 'collapse' && parseFloat(style.opacity) !== 0;
+            }
+            
+            function textOf(node) {
+                return ((node && (node.innerText || node.textContent)) || '').replace(/\\s+/g, ' ').trim();
+            }
+            
+            function accessibleName(el) {
+                var label = el.getAttribute('aria-label');
+                if (label && label.trim()) return label.trim();
+                var labelledBy = el.getAttribute('aria-labelledby');
+                if (labelledBy) {
+                    var parts = labelledBy.split(/\\s+/).map(function(id) {
+                        return textOf(document.getElementById(id));
+                    }).filter(Boolean);
+                    if (parts.length) return parts.join(' ');
+                }
+                if (el.labels && el.labels.length) {
+                    var labelText = textOf(el.labels[0]);
+                    if (labelText) return labelText;
+                }
+                var alt = el.getAttribute('alt') || el.getAttribute('title');
+                if (alt) return alt.trim();
+                var text = textOf(el);
+                if (text) return text.slice(0, 200);
+                return String(el.value || el.getAttribute('placeholder') || '').trim();
+            }
+            
+            var result = {};
+            Object.keys(selectors).forEach(function(kind) {
+                var rows = [];
+                var elements = document.querySelectorAll(selectors[kind]);
+                for (var i = 0; i < elements.length; i++) {
+                    var el = elements[i];
+                    var rect = el.getBoundingClientRect();
+                    var inViewport = rect.bottom > 0 && rect.right > 0 && rect.top < vh && rect.left < vw;
+                    if (viewportOnly && !inViewport) continue;
+                    var displayed = isDisplayed(el, rect);
+                    if (checkVisibility && !displayed) continue;
+                    rows.push([
+                        el, i,
+                        el.innerText || '',
+                        el.tagName.toLowerCase(),
+                        el.getAttribute('type') || '',
+                        el.getAttribute('name') || '',
+                        el.value !== undefined && el.value !== null ? String(el.value) : (el.getAttribute('value') || ''),
+                        el.currentSrc || el.src || el.getAttribute('src') || '',
+                        !el.disabled,
+                        displayed,
+                        Math.round(rect.left + sx), Math.round(rect.top + sy),
+                        Math.round(rect.width), Math.round(rect.height),
+                        accessibleName(el),
+                        inViewport
+                    ]);
+                }
+                result[kind] = rows;
+            });
+            return result;
+        """
+        
         try:
-            # クリック可能な要素のセレクタ
-            clickable_selectors = [
-                "a", "button", "input[type='button']", "input[type='submit']",
-                "[onclick]", "[role='button']", "[class*='btn']"
-            ]
-            
-            # 入力フィールドのセレクタ
-            input_selectors = [
-                "input:not([type='hidden'])", "textarea", "select",
-                "[contenteditable='true']"
-            ]
-            
-            # メディア要素のセレクタ
-            media_selectors = [
-                "video", "audio", "iframe", "canvas"
-            ]
-            
-            # クリック可能な要素を検索
-            for selector in clickable_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if not check_visibility or element.is_displayed():
-                        interactive_elements['clickable'].append({
-                            'element': element,
-                            'text': element.text or element.get_attribute('value') or '',
-                            'tag': element.tag_name,
-                            'is_enabled': element.is_enabled(),
-                            'is_displayed': element.is_displayed(),
-                            'location': element.location,
-                            'size': element.size
-                        })
-            
-            # 入力フィールドを検索
-            for selector in input_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if not check_visibility or element.is_displayed():
-                        interactive_elements['input'].append({
-                            'element': element,
-                            'tag': element.tag_name,
-                            'type': element.get_attribute('type') or element.tag_name,
-                            'name': element.get_attribute('name') or '',
-                            'value': element.get_attribute('value') or '',
-                            'is_enabled': element.is_enabled(),
-                            'is_displayed': element.is_displayed(),
-                            'location': element.location,
-                            'size': element.size
-                        })
-            
-            # メディア要素を検索
-            for selector in media_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if not check_visibility or element.is_displayed():
-                        interactive_elements['media'].append({
-                            'element': element,
-                            'tag': element.tag_name,
-                            'src': element.get_attribute('src') or '',
-                            'is_displayed': element.is_displayed(),
-                            'location': element.location,
-                            'size': element.size
-                        })
+            inventory = self.driver.execute_script(inventory_script, selectors, check_visibility, viewport_only)
+            
+            for (element, index, text, tag, input_type, name, value, src, is_enabled, is_displayed,
+                 x, y, width, height, accessible_name, in_viewport) in inventory.get('clickable', []):
+                interactive_elements['clickable'].append(capture_snapshot(
+                    CLICKABLE_SCHEMA,
+                    (
+                        text or value or '',
+                        tag,
+                        is_enabled,
+                        is_displayed,
+                        {'x': x, 'y': y},
+                        {'width': width, 'height': height},
+                        accessible_name,
+                        in_viewport
+                    ),
+                    element, By.CSS_SELECTOR, selectors['clickable'], index, self
+                ))
+            
+            for (element, index, text, tag, input_type, name, value, src, is_enabled, is_displayed,
+                 x, y, width, height, accessible_name, in_viewport) in inventory.get('input', []):
+                interactive_elements['input'].append(capture_snapshot(
+                    INTERACTIVE_INPUT_SCHEMA,
+                    (
+                        tag,
+                        input_type or tag,
+                        name,
+                        value,
+                        is_enabled,
+                        is_displayed,
+                        {'x': x, 'y': y},
+                        {'width': width, 'height': height},
+                        accessible_name,
+                        in_viewport
+                    ),
+                    element, By.CSS_SELECTOR, selectors['input'], index, self
+                ))
+            
+            for (element, index, text, tag, input_type, name, value, src, is_enabled, is_displayed,
+                 x, y, width, height, accessible_name, in_viewport) in inventory.get('media', []):
+                interactive_elements['media'].append(capture_snapshot(
+                    MEDIA_SCHEMA,
+                    (
+                        tag,
+                        src,
+                        is_displayed,
+                        {'x': x, 'y': y},
+                        {'width': width, 'height': height},
+                        accessible_name,
+                        in_viewport
+                    ),
+                    element, By.CSS_SELECTOR, selectors['media'], index, self
+                ))
             
             return interactive_elements
             
@@ -1085,15 +2905,22 @@ class Browser:
         if timeout is None:
             timeout = int(self._get_config_value("BROWSER", "page_load_timeout", "30"))
             
+        # 起動プロファイルで eager / none を指定した場合は DOM の構築完了（interactive）までを待つ
+        ready_states = ("complete",)
+        if self.launch_profile is not None and self.launch_profile.page_load_strategy != "normal":
+            ready_states = ("interactive", "complete")
+            
         try:
+            from selenium.webdriver.support.ui import WebDriverWait
+            
             # document.readyStateがcompleteになるまで待機
             WebDriverWait(self.driver, timeout).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
+                lambda driver: driver.execute_script("return document.readyState") in ready_states
             )
             
             # JavaScriptによる非同期処理の完了を確認（オプション）
             try:
-            self.driver.execute_script("return (typeof jQuery === 'undefined' || jQuery.active === 0)")
+                self.driver.execute_script("return (typeof jQuery === 'undefined' || jQuery.active === 0)")
             except:
                 pass  # jQueryが未定義の場合は無視
             
@@ -1122,7 +2949,7 @@ class Browser:
         # 現在のウィンドウハンドルが指定されていない場合は取得
         if current_handles is None:
             try:
-                current_handles = self.driver.window_handles
+                current_handles = self._window_handles()
                 self.logger.info(f"現在のウィンドウハンドル: {current_handles}")
             except Exception as e:
                 self.logger.error(f"現在のウィンドウハンドルの取得に失敗しました: {str(e)}")
@@ -1131,29 +2958,10 @@ class Browser:
         retry_count = 0
         while retry_count < retries:
             try:
-                # 新しいウィンドウが開くまで待機
-                start_time = time.time()
-                new_handle = None
-                
-                while time.time() - start_time < timeout:
-                    try:
-                        # 現在のハンドルを再取得（セッションが無効になっていないか確認）
-                        handles = self.driver.window_handles
-                        
-                        # 新しいウィンドウを探す
-                        for handle in handles:
-                            if handle not in current_handles:
-                                new_handle = handle
-                                break
-                        
-                        if new_handle:
-                            break
-                            
-                        time.sleep(0.5)  # 短い間隔で再試行
-                    except Exception as inner_e:
-                        self.logger.warning(f"ウィンドウハンドルの取得中にエラーが発生しました（リトライ中）: {str(inner_e)}")
-                        time.sleep(1)
-                        continue
+                # 新しいウィンドウが開くまで待機（DevToolsのイベントを使用できる場合はイベントで待機）
+                new_handle = self._wait_for_new_target(current_handles, timeout)
+                if new_handle is None and self._cdp_session is None:
+                    new_handle = self._poll_for_new_window(current_handles, timeout)
                 
                 if not new_handle:
                     self.logger.warning(f"新しいウィンドウが見つかりませんでした（{timeout}秒待機後）")
@@ -1165,6 +2973,9 @@ class Browser:
                 
                 # 新しいウィンドウに切り替え
                 self.driver.switch_to.window(new_handle)
+                if self.element_cache is not None:
+                    self.element_cache.invalidate()
+                self._start_screencast()
                 
                 # 切り替え後のURLを表示
                 self.logger.info(f"新しいウィンドウに切り替えました: {self.driver.current_url}")
@@ -1174,7 +2985,7 @@ class Browser:
                 
                 return True
                 
-        except Exception as e:
+            except Exception as e:
                 retry_count += 1
                 self.logger.warning(f"新しいウィンドウへの切り替え中にエラーが発生しました (リトライ {retry_count}/{retries}): {str(e)}")
                 
@@ -1188,6 +2999,66 @@ class Browser:
         
         return False
 
+    def _poll_for_new_window(self, current_handles, timeout):
+        """
+        新しいウィンドウが開くまでウィンドウハンドルを定期的に確認する
+        
+        Args:
+            current_handles (list): 切り替え前のウィンドウハンドルリスト
+            timeout (float): 待機する時間(秒)
+            
+        Returns:
+            str or None: 新しいウィンドウハンドル。見つからない場合はNone
+        """
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            try:
+                # 現在のハンドルを再取得（セッションが無効になっていないか確認）
+                for handle in self._window_handles():
+                    if handle not in current_handles:
+                        return handle
+                time.sleep(0.5)  # 短い間隔で再試行
+            except Exception as inner_e:
+                self.logger.warning(f"ウィンドウハンドルの取得中にエラーが発生しました（リトライ中）: {str(inner_e)}")
+                time.sleep(1)
+        return None
+
+    def _wait_for_new_target(self, current_handles, timeout):
+        """
+        新しいタブが作成されるのを DevTools のイベントで待機する
+        
+        Args:
+            current_handles (list): 切り替え前のウィンドウハンドルリスト
+            timeout (float): 待機する時間(秒)
+            
+        Returns:
+            str or None: 新しいウィンドウハンドル。見つからない場合やイベントを使用できない場合はNone
+        """
+        session = self.get_cdp_session()
+        if session is None:
+            return None
+        
+        known = set(current_handles)
+        # Target.setDiscoverTargets はブラウザ全体のイベントのため、デーモンに接続している場合は
+        # ほかの実行のブラウザコンテキストで開いたタブを除く
+        context_id = self._browser_context_id()
+        
+        def is_new_page(params):
+            info = params['targetInfo']
+            return (info.get('type') == 'page' and info['targetId'] not in known
+                    and (context_id is None or info.get('browserContextId') == context_id))
+        
+        waiter = session.expect_event('Target.targetCreated', is_new_page)
+        
+        # 待機を開始する前に開いていたウィンドウを確認する
+        for handle in self._window_handles():
+            if handle not in known:
+                waiter.cancel()
+                return handle
+        
+        params = waiter.wait(timeout)
+        return params['targetInfo']['targetId'] if params else None
+
     def get_page_source(self):
         """
         現在のページのHTMLソースを取得する
@@ -1281,6 +3152,87 @@ class Browser:
             self.logger.warning(f"ページ変更検出中にエラーが発生しました: {str(e)}")
             return False 
 
+    def snapshot_page_source(self):
+        """
+        現在のDOMをページソース履歴に記録する
+        
+        クリックやAJAXによる更新の前後で呼び出すことで、
+        diff_page_sources() で変化した要素を取得できます。
+        
+        Returns:
+            bool: 記録に成功した場合はTrue
+        """
+        if not self.driver:
+            self.logger.error("WebDriverが初期化されていません")
+            return False
+        
+        try:
+            self.page_history.record_source(self.driver.current_url, self.driver.page_source)
+            return True
+        except Exception as e:
+            self.logger.error(f"ページソースの記録中にエラーが発生しました: {str(e)}")
+            return False
+    
+    def _get_dom_tree(self, snapshot, ignore_tags):
+        """履歴エントリの解析済みツリーを取得する（解析結果はキャッシュする）"""
+        cache_key = tuple(ignore_tags)
+        cached = self._dom_tree_cache.get(snapshot)
+        if cached and cached[0] == cache_key:
+            return cached[1]
+        
+        tree = parse_html(snapshot.get_source() or "", ignore_tags)
+        self._dom_tree_cache[snapshot] = (cache_key, tree)
+        return tree
+
+    def diff_page_sources(self, old_source=None, new_source=None, ignore_tags=DEFAULT_IGNORE_TAGS):
+        """
+        2つのページソースの構造的な差分を取得する
+        
+        省略時は last_page_source と current_page_source を比較します（以降の移動では
+        keep_previous_page_source を有効にし、アクセスされなかったページのソースも残します）。
+        部分木ハッシュが一致する領域は比較を省略します。
+        
+        Args:
+            old_source (str, optional): 変更前のHTMLソース
+            new_source (str, optional): 変更後のHTMLソース
+            ignore_tags (tuple): 比較対象から除外する要素名
+            
+        Returns:
+            DomDiff or None: 差分結果。比較対象がない場合はNone
+        """
+        try:
+            if old_source is not None:
+                old_tree = parse_html(old_source, ignore_tags)
+            else:
+                # 以降の移動では、アクセスされなかったページのソースも移動の直前に取得して比較に使えるようにする
+                self.keep_previous_page_source = True
+                snapshot = self.page_history.previous
+                if snapshot is None or snapshot.get_source() is None:
+                    self.logger.warning("比較対象となる前のページソースがありません")
+                    return None
+                old_tree = self._get_dom_tree(snapshot, ignore_tags)
+            
+            if new_source is not None:
+                new_tree = parse_html(new_source, ignore_tags)
+            else:
+                snapshot = self.page_history.current
+                if snapshot is None or snapshot.get_source() is None:
+                    self.logger.warning("比較対象となる現在のページソースがありません")
+                    return None
+                new_tree = self._get_dom_tree(snapshot, ignore_tags)
+            
+            diff = diff_trees(old_tree, new_tree)
+            summary = diff.summary()
+            self.logger.debug(
+                f"DOM差分: 追加 {summary['added']}, 削除 {summary['removed']}, 変更 {summary['modified']} "
+                f"(比較ノード {summary['compared_nodes']}/{summary['total_nodes']})"
+            )
+            return diff
+            
+        except Exception as e:
+            self.logger.error(f"DOM差分の計算中にエラーが発生しました: {str(e)}")
+            return None
+
     def _analyze_page_details(self, soup):
         """
         ページの詳細情報を分析する
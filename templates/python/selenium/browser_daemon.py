@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ブラウザデーモンモジュール
+
+デバッグポートを有効にした Chrome をバックグラウンドで起動したままにしておき、
+短時間で終わるコマンドの実行ごとに Chrome の起動とドライバーの解決を省略します。
+デーモンが動いている場合、Browser.setup() は Chrome に接続して新しいブラウザコンテキスト
+（Cookie やストレージを共有しない、シークレットウィンドウ相当の環境）を作成します。
+
+使用例:
+    python -m src.modules.selenium.browser_daemon start
+    python -m src.modules.selenium.browser_daemon status
+    python -m src.modules.selenium.browser_daemon benchmark --runs 5
+    python -m src.modules.selenium.browser_daemon stop
+"""
+
+import json
+import logging
+import os
+import shutil
+import signal
+import statistics
+import time
+import urllib.request
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .cdp import CDPSession, launch_chrome
+
+# デーモンの状態ファイルのデフォルトの場所（プロジェクトルートからの相対パス）
+DEFAULT_STATE_PATH = 'tmp/browser_daemon.json'
+
+
+def read_state(state_path: str) -> Optional[Dict[str, Any]]:
+    """
+    デーモンの状態ファイルを読み込む
+
+    Args:
+        state_path: 状態ファイルのパス
+
+    Returns:
+        dict or None: 状態。ファイルがない場合や読み込めない場合はNone
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_alive(state: Optional[Dict[str, Any]], timeout: float = 1.0) -> bool:
+    """
+    状態ファイルに記録された Chrome が応答するかどうかを確認する
+
+    Args:
+        state: read_state() で読み込んだ状態
+        timeout: 応答待ちのタイムアウト（秒）
+
+    Returns:
+        bool: 応答した場合はTrue
+    """
+    if not state or not state.get('debugger_address'):
+        return False
+    try:
+        url = f"http://{state['debugger_address']}/json/version"
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def find_daemon(state_path: str) -> Optional[Dict[str, Any]]:
+    """
+    動作中のデーモンを探す
+
+    Args:
+        state_path: 状態ファイルのパス
+
+    Returns:
+        dict or None: 動作中であれば状態、それ以外はNone
+    """
+    state = read_state(state_path)
+    return state if is_alive(state) else None
+
+
+def open_context(debugger_address: str, timeout: float = 30.0,
+                 logger: Optional[logging.Logger] = None):
+    """
+    デーモンの Chrome に接続し、新しいブラウザコンテキストとタブを作成する
+
+    Args:
+        debugger_address: Chrome のデバッガーアドレス
+        timeout: コマンドの応答待ちのタイムアウト（秒）
+        logger: ロガー（省略可能）
+
+    Returns:
+        tuple: (CDPSession, ブラウザコンテキストID, タブのターゲットID)
+    """
+    session = CDPSession.connect(debugger_address, timeout, logger)
+    context_id = None
+    try:
+        context_id = session.send('Target.createBrowserContext', {'disposeOnDetach': False})['browserContextId']
+        target_id = session.send(
+            'Target.createTarget', {'url': 'about:blank', 'browserContextId': context_id}
+        )['targetId']
+    except Exception:
+        # タブを作成できなかった場合も、作成したブラウザコンテキストをデーモンに残さない
+        if context_id is not None:
+            try:
+                session.send('Target.disposeBrowserContext', {'browserContextId': context_id}, timeout=5)
+            except Exception:
+                pass
+        session.close()
+        raise
+    return session, context_id, target_id
+
+
+def close_context(session: CDPSession, context_id: str):
+    """ブラウザコンテキストを破棄し、そのタブをすべて閉じる（Chrome は停止しない）"""
+    try:
+        session.send('Target.disposeBrowserContext', {'browserContextId': context_id}, timeout=5)
+    finally:
+        session.close()
+
+
+class BrowserDaemon:
+    """
+    バックグラウンドで動作し続ける Chrome の起動・停止・状態確認を行う
+
+    起動時に chromedriver のパスも解決して状態ファイルに記録するため、
+    接続する側は webdriver_manager によるドライバーの確認も省略できます。
+    """
+
+    def __init__(self, state_path: str, arguments: Optional[List[str]] = None, binary: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            state_path: 状態ファイルのパス
+            arguments: Chrome の起動オプション
+            binary: Chrome の実行ファイルのパス（省略時は自動検出）
+            logger: ロガー（省略可能）
+        """
+        self.state_path = state_path
+        self.arguments = list(arguments or [])
+        self.binary = binary
+        self.logger = logger or logging.getLogger(__name__)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        デーモンの状態を取得する
+
+        Returns:
+            dict: 状態ファイルの内容に alive（応答するかどうか）を加えたもの
+        """
+        state = read_state(self.state_path) or {}
+        return dict(state, alive=is_alive(state))
+
+    def start(self, timeout: float = 30.0) -> Dict[str, Any]:
+        """
+        Chrome を起動して状態ファイルに記録する（既に動作中の場合はその状態を返す）
+
+        Args:
+            timeout: 起動待ちのタイムアウト（秒）
+
+        Returns:
+            dict: デーモンの状態
+        """
+        state = find_daemon(self.state_path)
+        if state:
+            self.logger.info(f"ブラウザデーモンは既に動作しています: {state['debugger_address']}")
+            return state
+
+        started = time.perf_counter()
+        process, address, _, user_data_dir = launch_chrome(self.arguments, self.binary, timeout, detach=True)
+        state = {
+            'pid': process.pid,
+            'debugger_address': address,
+            'user_data_dir': user_data_dir,
+            'driver_path': self._resolve_driver_path(),
+            'arguments': self.arguments,
+            'started_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(f"ブラウザデーモンを起動しました: {address} ({time.perf_counter() - started:.2f}秒)")
+        return state
+
+    def _resolve_driver_path(self) -> Optional[str]:
+        """chromedriver のパスを解決する（webdriver_manager がない場合はNone）"""
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        except Exception as e:
+            self.logger.warning(f"chromedriver のパスを解決できませんでした: {str(e)}")
+            return None
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """
+        デーモンの Chrome を停止し、状態ファイルと一時プロファイルを削除する
+
+        Args:
+            timeout: 終了を待つ時間（秒）。超えた場合はプロセスを強制終了する
+
+        Returns:
+            bool: 停止した場合はTrue、動作していなかった場合はFalse
+        """
+        state = read_state(self.state_path)
+        if not state:
+            self.logger.info("ブラウザデーモンは動作していません")
+            return False
+
+        if is_alive(state):
+            try:
+                session = CDPSession.connect(state['debugger_address'], timeout)
+                try:
+                    session.send('Browser.close', timeout=timeout)
+                except Exception:
+                    pass
+                session.close()
+            except Exception as e:
+                self.logger.debug(f"ブラウザデーモンへの接続に失敗しました: {str(e)}")
+
+            deadline = time.monotonic() + timeout
+            while is_alive(state, timeout=0.5) and time.monotonic() < deadline:
+                time.sleep(0.2)
+
+        if is_alive(state, timeout=0.5) and state.get('pid'):
+            self.logger.warning("ブラウザデーモンが終了しないため、プロセスを強制終了します")
+            try:
+                os.kill(state['pid'], signal.SIGTERM)
+            except OSError:
+                pass
+
+        if state.get('user_data_dir'):
+            shutil.rmtree(state['user_data_dir'], ignore_errors=True)
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+        self.logger.info("ブラウザデーモンを停止しました")
+        return True
+
+
+def benchmark_startup(runs: int = 3, **browser_kwargs) -> Dict[str, Dict[str, float]]:
+    """
+    Chrome を起動する場合とデーモンに接続する場合の setup() の所要時間を比較する
+
+    Args:
+        runs: 各方式の実行回数
+        **browser_kwargs: Browser に渡す引数（config など）
+
+    Returns:
+        dict: {方式: {段階: 平均秒数}}（段階は Browser.setup_timings のキー）
+    """
+    from .browser import Browser
+
+    results = {}
+    base_config = browser_kwargs.pop('config', None) or {}
+    for mode, use_daemon in (('launch', 'false'), ('daemon', 'true')):
+        config = {section: dict(values) for section, values in base_config.items()}
+        config.setdefault('BROWSER', {})['use_daemon'] = use_daemon
+        samples = {}
+        for _ in range(runs):
+            browser = Browser(config=config, **browser_kwargs)
+            try:
+                if not browser.setup():
+                    break
+                if browser.setup_timings.get('mode') != mode:
+                    browser.logger.warning(f"{mode} で起動できないため、計測をスキップします")
+                    break
+                for phase, seconds in browser.setup_timings.items():
+                    if isinstance(seconds, float):
+                        samples.setdefault(phase, []).append(seconds)
+            finally:
+                browser.quit()
+        if samples:
+            results[mode] = {phase: statistics.mean(values) for phase, values in samples.items()}
+    return results
+
+
+def format_startup_report(results: Dict[str, Dict[str, float]]) -> str:
+    """benchmark_startup の結果を表形式の文字列にする"""
+    modes = list(results)
+    phases = []
+    for timings in results.values():
+        phases.extend(phase for phase in timings if phase not in phases)
+
+    lines = ["段階".ljust(20) + "".join(f"{mode} (秒)".rjust(14) for mode in modes)]
+    for phase in phases:
+        lines.append(phase.ljust(20) + "".join(
+            (f"{results[mode][phase]:.3f}" if phase in results[mode] else "-").rjust(14) for mode in modes
+        ))
+    if 'launch' in results and 'daemon' in results:
+        saved = results['launch'].get('total', 0) - results['daemon'].get('total', 0)
+        lines.append(f"短縮: {saved:.3f}秒 / 回")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .browser import Browser
+
+    parser = argparse.ArgumentParser(description='バックグラウンドで動作し続ける Chrome の管理')
+    parser.add_argument('command', choices=['start', 'stop', 'status', 'benchmark'], help='実行するコマンド')
+    parser.add_argument('--runs', type=int, default=3, help='benchmark の各方式の実行回数')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    browser = Browser()
+    daemon = BrowserDaemon(
+        browser.daemon_state_path,
+        arguments=browser.build_chrome_options().arguments,
+        binary=browser._get_config_value("BROWSER", "chrome_path", "") or None,
+        logger=browser.logger
+    )
+
+    if args.command == 'start':
+        print(json.dumps(daemon.start(), ensure_ascii=False, indent=2))
+    elif args.command == 'stop':
+        daemon.stop()
+    elif args.command == 'status':
+        print(json.dumps(daemon.status(), ensure_ascii=False, indent=2))
+    else:
+        started_here = find_daemon(daemon.state_path) is None
+        if started_here:
+            daemon.start()
+        try:
+            print(format_startup_report(benchmark_startup(args.runs)))
+        finally:
+            if started_here:
+                daemon.stop()
@@ -0,0 +1,1307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Chrome DevTools Protocol (CDP) モジュール
+
+chromedriver を経由せず、Chrome の DevTools WebSocket に直接接続して操作するための
+セッションと、WebDriver と同じ使い方ができるドライバー（CDPDriver）を提供します。
+Browser の [BROWSER] engine = cdp を設定すると、このドライバーが使用されます。
+
+CDPSession は chromedriver が起動した Chrome にも接続できるため、
+WebDriver を使用している場合でもネットワークやタブのイベントの取得に利用できます。
+"""
+
+import base64
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoAlertPresentException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+# websocket-clientが利用可能かどうか（インポートは接続する時点で行う）
+WEBSOCKET_AVAILABLE = importlib.util.find_spec("websocket") is not None
+
+
+class CDPError(WebDriverException):
+    """CDPのコマンドがエラーを返した場合の例外"""
+
+    def __init__(self, message: str, code: Optional[int] = None, method: Optional[str] = None):
+        super().__init__(f"{method}: {message}" if method else message)
+        self.code = code
+        self.method = method
+
+
+class EventWaiter:
+    """
+    CDPイベントの到着を待機するためのオブジェクト
+
+    操作の前に CDPSession.expect_event() で作成し、操作の後に wait() で待機します。
+    """
+
+    def __init__(self, session: 'CDPSession', method: str, predicate: Optional[Callable[[Dict], bool]],
+                 session_id: Optional[str]):
+        self._session = session
+        self._method = method
+        self._predicate = predicate
+        self._event = threading.Event()
+        self.params = None
+        self._listener = session.on(method, self._handle, session_id)
+
+    def _handle(self, params: Dict[str, Any]):
+        if self._event.is_set():
+            return
+        if self._predicate is None or self._predicate(params):
+            self.params = params
+            self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        イベントを待機する
+
+        Args:
+            timeout: タイムアウト（秒）
+
+        Returns:
+            dict or None: イベントのパラメーター。タイムアウトした場合はNone
+        """
+        try:
+            self._event.wait(timeout)
+            return self.params
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """待機を取りやめる"""
+        self._session.off(self._method, self._listener)
+
+
+class CDPSession:
+    """
+    Chrome DevTools Protocol の WebSocket 接続
+
+    ブラウザ全体のエンドポイントに接続し、Target.attachToTarget（flatten）で得た
+    sessionId を指定して各タブにコマンドを送信します。受信は専用スレッドで行い、
+    イベントのコールバックは別のスレッドで呼び出すため、コールバックの中から
+    send() を呼び出せます。
+    """
+
+    def __init__(self, ws_url: str, timeout: float = 30.0, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            ws_url: DevTools の WebSocket URL（ws://127.0.0.1:9222/devtools/browser/...）
+            timeout: コマンドの応答待ちのタイムアウト（秒）
+            logger: ロガー（省略可能）
+
+        Raises:
+            ImportError: websocket-clientがインストールされていない場合
+        """
+        if not WEBSOCKET_AVAILABLE:
+            raise ImportError("websocket-clientがインストールされていません")
+        import websocket
+
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._ws = websocket.create_connection(ws_url, suppress_origin=True, enable_multithread=True)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._listeners = {}
+        self._listeners_lock = threading.Lock()
+        # (セッションID, ドメイン) ごとの enable() の回数
+        self._enabled = {}
+        self._enabled_lock = threading.Lock()
+        self._events = queue.Queue()
+        self.closed = False
+
+        self._reader = threading.Thread(target=self._read_loop, name='cdp-reader', daemon=True)
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='cdp-dispatcher', daemon=True)
+        self._reader.start()
+        self._dispatcher.start()
+
+    @classmethod
+    def connect(cls, debugger_address: str, timeout: float = 30.0,
+                logger: Optional[logging.Logger] = None) -> 'CDPSession':
+        """
+        デバッガーアドレス（host:port）を指定して接続する
+
+        Args:
+            debugger_address: Chrome のデバッガーアドレス（例: 127.0.0.1:9222）
+            timeout: コマンドの応答待ちのタイムアウト（秒）
+            logger: ロガー（省略可能）
+
+        Returns:
+            CDPSession: 接続したセッション
+        """
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=timeout) as response:
+            version = json.loads(response.read().decode('utf-8'))
+        return cls(version['webSocketDebuggerUrl'], timeout, logger)
+
+    @classmethod
+    def from_driver(cls, driver, timeout: float = 30.0, logger: Optional[logging.Logger] = None) -> 'CDPSession':
+        """
+        WebDriver（chromedriver）が起動した Chrome に接続する
+
+        Args:
+            driver: WebDriverインスタンス
+            timeout: コマンドの応答待ちのタイムアウト（秒）
+            logger: ロガー（省略可能）
+
+        Returns:
+            CDPSession: 接続したセッション
+        """
+        return cls.connect(get_debugger_address(driver), timeout, logger)
+
+    def _read_loop(self):
+        """WebSocketからメッセージを受信する（受信スレッド）"""
+        while not self.closed:
+            try:
+                raw = self._ws.recv()
+            except Exception as e:
+                if not self.closed:
+                    self.logger.debug(f"CDPの接続が切断されました: {str(e)}")
+                break
+            if not raw:
+                continue
+
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+
+            if 'id' in message:
+                with self._pending_lock:
+                    waiter = self._pending.pop(message['id'], None)
+                if waiter is not None:
+                    waiter[1] = message
+                    waiter[0].set()
+            elif 'method' in message:
+                self._events.put((message['method'], message.get('params', {}), message.get('sessionId')))
+
+        self.closed = True
+        # 応答待ちのコマンドをすべて解放する
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter[0].set()
+        self._events.put(None)
+
+    def _dispatch_loop(self):
+        """イベントのコールバックを呼び出す（配信スレッド）"""
+        while True:
+            item = self._events.get()
+            if item is None:
+                break
+            method, params, session_id = item
+            with self._listeners_lock:
+                listeners = list(self._listeners.get(method, ()))
+            for callback, listener_session in listeners:
+                if listener_session is not None and listener_session != session_id:
+                    continue
+                try:
+                    callback(params)
+                except Exception as e:
+                    self.logger.warning(f"CDPイベントの処理中にエラーが発生しました ({method}): {str(e)}")
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        コマンドを送信し、応答を待つ
+
+        Args:
+            method: コマンド名（例: Page.navigate）
+            params: パラメーター
+            session_id: 送信先のタブのセッションID（省略時はブラウザ全体）
+            timeout: 応答待ちのタイムアウト（秒）
+
+        Returns:
+            dict: コマンドの結果
+
+        Raises:
+            CDPError: コマンドがエラーを返した場合
+            TimeoutException: 応答がなかった場合
+        """
+        if self.closed:
+            raise WebDriverException("CDPセッションは切断されています")
+
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+
+        waiter = [threading.Event(), None]
+        with self._pending_lock:
+            if self.closed:
+                raise WebDriverException("CDPセッションは切断されています")
+            self._pending[message_id] = waiter
+
+        try:
+            self._ws.send(json.dumps(message))
+        except Exception as e:
+            with self._pending_lock:
+                self._pending.pop(message_id, None)
+            raise WebDriverException(f"CDPコマンドの送信に失敗しました ({method}): {str(e)}")
+
+        if not waiter[0].wait(timeout or self.timeout):
+            with self._pending_lock:
+                self._pending.pop(message_id, None)
+            raise TimeoutException(f"CDPコマンドの応答がありません: {method}")
+
+        response = waiter[1]
+        if response is None:
+            raise WebDriverException(f"CDPセッションが切断されました: {method}")
+        if 'error' in response:
+            error = response['error']
+            raise CDPError(error.get('message', ''), error.get('code'), method)
+        return response.get('result', {})
+
+    def on(self, method: str, callback: Callable[[Dict[str, Any]], None],
+           session_id: Optional[str] = None) -> Tuple[Callable, Optional[str]]:
+        """
+        イベントのコールバックを登録する
+
+        Args:
+            method: イベント名（例: Page.loadEventFired）
+            callback: パラメーターを受け取る関数
+            session_id: 対象のタブのセッションID（省略時はすべて）
+
+        Returns:
+            tuple: off() に渡す登録情報
+        """
+        listener = (callback, session_id)
+        with self._listeners_lock:
+            self._listeners.setdefault(method, []).append(listener)
+        return listener
+
+    def off(self, method: str, listener: Tuple[Callable, Optional[str]]):
+        """
+        イベントのコールバックを解除する
+
+        Args:
+            method: イベント名
+            listener: on() の戻り値
+        """
+        with self._listeners_lock:
+            listeners = self._listeners.get(method, [])
+            if listener in listeners:
+                listeners.remove(listener)
+
+    def expect_event(self, method: str, predicate: Optional[Callable[[Dict], bool]] = None,
+                     session_id: Optional[str] = None) -> EventWaiter:
+        """
+        イベントの待機を開始する（操作の前に呼び出す）
+
+        Args:
+            method: イベント名
+            predicate: 対象のイベントかどうかを判定する関数（省略可能）
+            session_id: 対象のタブのセッションID（省略時はすべて）
+
+        Returns:
+            EventWaiter: wait() で待機するオブジェクト
+        """
+        return EventWaiter(self, method, predicate, session_id)
+
+    def attach(self, target_id: str) -> str:
+        """
+        タブに接続し、セッションIDを取得する
+
+        Args:
+            target_id: タブのターゲットID
+
+        Returns:
+            str: セッションID
+        """
+        return self.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})['sessionId']
+
+    def detach(self, session_id: str):
+        """
+        タブへの接続を切断する
+
+        Args:
+            session_id: attach() で取得したセッションID
+        """
+        with self._enabled_lock:
+            for key in [key for key in self._enabled if key[0] == session_id]:
+                del self._enabled[key]
+        self.send('Target.detachFromTarget', {'sessionId': session_id})
+
+    def enable(self, domain: str, params: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None):
+        """
+        ドメイン（Network, Page など）を有効にする
+
+        同じタブで複数の機能が同じドメインを使用する場合があるため、呼び出し回数を数え、
+        disable() がすべての enable() を取り消した時点で無効にします。
+
+        Args:
+            domain: ドメイン名
+            params: {domain}.enable のパラメーター
+            session_id: 対象のタブのセッションID
+        """
+        key = (session_id, domain)
+        with self._enabled_lock:
+            self._enabled[key] = self._enabled.get(key, 0) + 1
+        try:
+            self.send(f'{domain}.enable', params, session_id)
+        except Exception:
+            self.disable(domain, session_id, send=False)
+            raise
+
+    def disable(self, domain: str, session_id: Optional[str] = None, send: bool = True):
+        """
+        enable() を1回取り消し、ほかに使用している機能がなければドメインを無効にする
+
+        Args:
+            domain: ドメイン名
+            session_id: 対象のタブのセッションID
+            send: 無効にする場合に {domain}.disable を送信するかどうか
+        """
+        key = (session_id, domain)
+        with self._enabled_lock:
+            count = self._enabled.get(key, 0) - 1
+            if count > 0:
+                self._enabled[key] = count
+                return
+            self._enabled.pop(key, None)
+        if send:
+            self.send(f'{domain}.disable', session_id=session_id)
+
+    def page_targets(self, browser_context_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        開いているタブの一覧を取得する
+
+        Args:
+            browser_context_id: 指定した場合は、このブラウザコンテキストのタブのみを返す
+
+        Returns:
+            list: type が page のターゲット情報
+        """
+        targets = self.send('Target.getTargets').get('targetInfos', [])
+        return [
+            target for target in targets
+            if target.get('type') == 'page'
+            and (browser_context_id is None or target.get('browserContextId') == browser_context_id)
+        ]
+
+    def close(self):
+        """接続を閉じる"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def get_debugger_address(driver) -> str:
+    """
+    WebDriverが起動した Chrome のデバッガーアドレスを取得する
+
+    Args:
+        driver: WebDriverインスタンス（chromedriver または CDPDriver）
+
+    Returns:
+        str: デバッガーアドレス（host:port）
+
+    Raises:
+        WebDriverException: デバッガーアドレスが取得できない場合
+    """
+    address = (driver.capabilities.get('goog:chromeOptions') or {}).get('debuggerAddress')
+    if not address:
+        raise WebDriverException("デバッガーアドレスを取得できません（Chrome 以外のブラウザの可能性があります）")
+    return address
+
+
+# ページ内の要素の登録を整理する件数
+NODE_REGISTRY_LIMIT = 5000
+
+# execute_script の実行環境
+# DOM要素は window.__cdpNodes に登録したIDで受け渡し、WebDriverの要素IDと同様に扱う
+# 登録は WeakRef で保持し（要素の解放を妨げない）、件数が上限を超えるとDOMから外れた要素の登録を削除する
+# （ページを移動すると window ごと破棄される）
+SCRIPT_RUNTIME_JS = """
+(function(__script, __args) {
+    var registry = window.__cdpNodes || (window.__cdpNodes = {seq: 0, size: 0, limit: %(limit)d, nodes: {}});
+
+    function lookup(id) {
+        var entry = registry.nodes[id];
+        return entry && typeof entry.deref === 'function' ? entry.deref() : entry;
+    }
+
+    function remember(node) {
+        if (!node.__cdpId) node.__cdpId = 'n' + (++registry.seq);
+        if (!(node.__cdpId in registry.nodes)) {
+            registry.size++;
+            if (registry.size > registry.limit) prune();
+        }
+        registry.nodes[node.__cdpId] = typeof WeakRef === 'function' ? new WeakRef(node) : node;
+        return node.__cdpId;
+    }
+
+    function prune() {
+        var size = 0;
+        for (var id in registry.nodes) {
+            var node = lookup(id);
+            if (!node || !node.isConnected) delete registry.nodes[id];
+            else size++;
+        }
+        registry.size = size + 1;
+        // DOMに残っている要素が多い場合に、登録のたびに全件を確認しないよう上限を広げる
+        registry.limit = Math.max(registry.limit, registry.size * 2);
+    }
+
+    function revive(value) {
+        if (value && typeof value === 'object') {
+            if (Array.isArray(value)) return value.map(revive);
+            if (value.__cdp_node__ !== undefined) {
+                var node = lookup(value.__cdp_node__);
+                if (!node || !node.isConnected) throw new Error('stale element reference: ' + value.__cdp_node__);
+                return node;
+            }
+            var copy = {};
+            for (var key in value) copy[key] = revive(value[key]);
+            return copy;
+        }
+        return value;
+    }
+
+    function serialize(value, depth) {
+        if (value === undefined || value === null) return null;
+        if (depth > 30) return null;
+        if (value instanceof Node) {
+            return {__cdp_node__: remember(value)};
+        }
+        if (Array.isArray(value) || value instanceof NodeList || value instanceof HTMLCollection) {
+            var items = [];
+            for (var i = 0; i < value.length; i++) items.push(serialize(value[i], depth + 1));
+            return items;
+        }
+        if (typeof value === 'object') {
+            var result = {};
+            for (var key in value) {
+                if (typeof value[key] !== 'function') result[key] = serialize(value[key], depth + 1);
+            }
+            return result;
+        }
+        if (typeof value === 'function') return null;
+        return value;
+    }
+
+    return serialize(__script.apply(null, revive(__args)), 0);
+})
+""" % {'limit': NODE_REGISTRY_LIMIT}
+
+# 要素の検索（By の種類ごと）
+FIND_ELEMENTS_JS = """
+    var root = arguments[0] || document, by = arguments[1], value = arguments[2];
+    switch (by) {
+        case 'id':
+            return root.querySelectorAll('#' + CSS.escape(value));
+        case 'css selector':
+            return root.querySelectorAll(value);
+        case 'xpath':
+            var snapshot = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        case 'name':
+            return root.querySelectorAll('[name="' + CSS.escape(value) + '"]');
+        case 'tag name':
+            return root.getElementsByTagName(value);
+        case 'class name':
+            return root.getElementsByClassName(value);
+        case 'link text':
+        case 'partial link text':
+            var links = root.querySelectorAll('a'), matched = [];
+            for (var j = 0; j < links.length; j++) {
+                var text = (links[j].innerText || '').trim();
+                if (by === 'link text' ? text === value : text.indexOf(value) !== -1) matched.push(links[j]);
+            }
+            return matched;
+    }
+    throw new Error('unsupported locator: ' + by);
+"""
+
+# send_keys で特別に扱うキー（selenium.webdriver.common.keys.Keys の値）
+SPECIAL_KEYS = {
+    Keys.BACK_SPACE: ('Backspace', 8),
+    Keys.TAB: ('Tab', 9),
+    Keys.RETURN: ('Enter', 13),
+    Keys.ENTER: ('Enter', 13),
+    Keys.ESCAPE: ('Escape', 27),
+    Keys.LEFT: ('ArrowLeft', 37),
+    Keys.UP: ('ArrowUp', 38),
+    Keys.RIGHT: ('ArrowRight', 39),
+    Keys.DOWN: ('ArrowDown', 40),
+    Keys.DELETE: ('Delete', 46),
+}
+
+
+class CDPElement:
+    """
+    CDPDriver が返す要素（WebElement と同じ使い方ができる要素）
+    """
+
+    __slots__ = ('_driver', '_id')
+
+    def __init__(self, driver: 'CDPDriver', element_id: str):
+        self._driver = driver
+        self._id = element_id
+
+    @property
+    def id(self) -> str:
+        """要素ID"""
+        return self._id
+
+    @property
+    def parent(self) -> 'CDPDriver':
+        """要素を所有するドライバー"""
+        return self._driver
+
+    def _call(self, body: str, *args) -> Any:
+        """要素を arguments[0] としてスクリプトを実行する"""
+        return self._driver.execute_script(body, self, *args)
+
+    @property
+    def tag_name(self) -> str:
+        return self._call("return arguments[0].tagName.toLowerCase();")
+
+    @property
+    def text(self) -> str:
+        return self._call("return arguments[0].innerText || '';")
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        """属性値を取得する（value や checked などはプロパティを優先）"""
+        return self._call("""
+            var el = arguments[0], name = arguments[1];
+            var props = ['value', 'checked', 'selected', 'disabled', 'href', 'src', 'innerText', 'textContent'];
+            if (props.indexOf(name) !== -1 && name in el) {
+                var value = el[name];
+                if (typeof value === 'boolean') return value ? 'true' : null;
+                return value === null || value === undefined ? null : String(value);
+            }
+            return el.getAttribute(name);
+        """, name)
+
+    def get_dom_attribute(self, name: str) -> Optional[str]:
+        return self._call("return arguments[0].getAttribute(arguments[1]);", name)
+
+    def get_property(self, name: str) -> Any:
+        return self._call("return arguments[0][arguments[1]];", name)
+
+    def is_displayed(self) -> bool:
+        return bool(self._call("""
+            var el = arguments[0], rect = el.getBoundingClientRect();
+            if (rect.width <= 0 || rect.height <= 0) return false;
+            if (el.checkVisibility) return el.checkVisibility({opacityProperty: true, visibilityProperty: true});
+            var style = window.getComputedStyle(el);
+            return style.display !== 'none' && style.visibility !== 'hidden' && parseFloat(style.opacity) !== 0;
+        """))
+
+    def is_enabled(self) -> bool:
+        return not self._call("return !!arguments[0].disabled;")
+
+    def is_selected(self) -> bool:
+        return bool(self._call("return !!(arguments[0].checked || arguments[0].selected);"))
+
+    @property
+    def rect(self) -> Dict[str, float]:
+        return self._call("""
+            var r = arguments[0].getBoundingClientRect();
+            return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+        """)
+
+    @property
+    def location(self) -> Dict[str, int]:
+        rect = self.rect
+        return {'x': int(rect['x']), 'y': int(rect['y'])}
+
+    @property
+    def size(self) -> Dict[str, int]:
+        rect = self.rect
+        return {'width': int(rect['width']), 'height': int(rect['height'])}
+
+    def click(self):
+        """要素の中心をマウスでクリックする（実際の入力イベントを発生させる）"""
+        center = self._call("""
+            var el = arguments[0];
+            el.scrollIntoView({block: 'center', inline: 'center'});
+            var r = el.getBoundingClientRect();
+            return {x: r.left + r.width / 2, y: r.top + r.height / 2};
+        """)
+        for event_type in ('mousePressed', 'mouseReleased'):
+            self._driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
+                'type': event_type, 'x': center['x'], 'y': center['y'], 'button': 'left', 'clickCount': 1
+            })
+
+    def clear(self):
+        self._call("""
+            var el = arguments[0];
+            if (el.isContentEditable) { el.textContent = ''; }
+            else { el.value = ''; }
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+        """)
+
+    def send_keys(self, *value):
+        """文字列を入力する（Keys.ENTER などの特殊キーはキーイベントとして送信）"""
+        self._call("arguments[0].focus();")
+        text = ''.join(str(v) for v in value)
+        buffer = ''
+        for char in text:
+            if char in SPECIAL_KEYS:
+                if buffer:
+                    self._driver.execute_cdp_cmd('Input.insertText', {'text': buffer})
+                    buffer = ''
+                key, code = SPECIAL_KEYS[char]
+                for event_type in ('keyDown', 'keyUp'):
+                    params = {'type': event_type, 'key': key, 'windowsVirtualKeyCode': code}
+                    if key == 'Enter' and event_type == 'keyDown':
+                        params['text'] = '\r'
+                    self._driver.execute_cdp_cmd('Input.dispatchKeyEvent', params)
+            else:
+                buffer += char
+        if buffer:
+            self._driver.execute_cdp_cmd('Input.insertText', {'text': buffer})
+
+    def submit(self):
+        self._call("""
+            var form = arguments[0].form || arguments[0].closest('form');
+            if (form) { form.requestSubmit ? form.requestSubmit() : form.submit(); }
+        """)
+
+    def find_elements(self, by: str = By.ID, value: Optional[str] = None) -> List['CDPElement']:
+        return self._driver.find_elements(by, value, root=self)
+
+    def find_element(self, by: str = By.ID, value: Optional[str] = None) -> 'CDPElement':
+        return self._driver.find_element(by, value, root=self)
+
+    def screenshot_as_png(self) -> bytes:
+        rect = self.rect
+        return self._driver.get_screenshot_as_png(clip=rect)
+
+    def __eq__(self, other):
+        return isinstance(other, CDPElement) and other._id == self._id
+
+    def __hash__(self):
+        return hash(self._id)
+
+    def __repr__(self):
+        return f"CDPElement({self._id})"
+
+
+class CDPAlert:
+    """JavaScriptのダイアログ（alert/confirm/prompt）"""
+
+    def __init__(self, driver: 'CDPDriver', params: Dict[str, Any]):
+        self._driver = driver
+        self.text = params.get('message', '')
+        self.type = params.get('type', 'alert')
+        self._prompt_text = None
+
+    def send_keys(self, text: str):
+        self._prompt_text = text
+
+    def accept(self):
+        params = {'accept': True}
+        if self._prompt_text is not None:
+            params['promptText'] = self._prompt_text
+        self._driver.execute_cdp_cmd('Page.handleJavaScriptDialog', params)
+
+    def dismiss(self):
+        self._driver.execute_cdp_cmd('Page.handleJavaScriptDialog', {'accept': False})
+
+
+class _SwitchTo:
+    """driver.switch_to の代わり（ウィンドウとダイアログのみ対応）"""
+
+    def __init__(self, driver: 'CDPDriver'):
+        self._driver = driver
+
+    def window(self, handle: str):
+        self._driver._activate_target(handle)
+
+    def frame(self, frame_reference: Any):
+        """
+        フレームへの切り替えには対応していない
+
+        Raises:
+            WebDriverException: 常に発生（iframe 内の操作は webdriver エンジンを使用してください）
+        """
+        raise WebDriverException(
+            "CDPエンジンは switch_to.frame に対応していません。iframe 内を操作する場合は "
+            "[BROWSER] engine = webdriver を使用するか、execute_script で contentDocument を参照してください"
+        )
+
+    def default_content(self):
+        """最上位のドキュメントを操作する（CDPエンジンは常に最上位のドキュメントを操作するため何もしない）"""
+
+    def parent_frame(self):
+        """親のフレームに戻る（CDPエンジンは常に最上位のドキュメントを操作するため何もしない）"""
+
+    @property
+    def alert(self) -> CDPAlert:
+        params = self._driver._dialogs.get(self._driver._session_id)
+        if params is None:
+            raise NoAlertPresentException()
+        return CDPAlert(self._driver, params)
+
+
+def find_chrome_binary() -> Optional[str]:
+    """
+    Chrome の実行ファイルを探す
+
+    Returns:
+        str or None: 実行ファイルのパス。見つからない場合はNone
+    """
+    for name in ('google-chrome', 'google-chrome-stable', 'chrome', 'chromium', 'chromium-browser'):
+        path = shutil.which(name)
+        if path:
+            return path
+
+    candidates = []
+    if sys.platform.startswith('win'):
+        for base in (os.environ.get('PROGRAMFILES'), os.environ.get('PROGRAMFILES(X86)'), os.environ.get('LOCALAPPDATA')):
+            if base:
+                candidates.append(os.path.join(base, 'Google', 'Chrome', 'Application', 'chrome.exe'))
+    elif sys.platform == 'darwin':
+        candidates.append('/Applications/Google Chrome.app/Contents/MacOS/Google Chrome')
+
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def launch_chrome(arguments: Optional[List[str]] = None, binary: Optional[str] = None, timeout: float = 30.0,
+                  detach: bool = False) -> Tuple[subprocess.Popen, str, str, Optional[str]]:
+    """
+    デバッグポートを有効にして Chrome を起動する
+
+    Args:
+        arguments: Chrome の起動オプション（Options.arguments）
+        binary: Chrome の実行ファイルのパス（省略時は自動検出）
+        timeout: 起動待ちのタイムアウト（秒）
+        detach: 呼び出し元のプロセスが終了しても Chrome を動かし続けるかどうか
+
+    Returns:
+        tuple: (プロセス, デバッガーアドレス, WebSocketのパス, 作成した一時プロファイルのディレクトリ)
+
+    Raises:
+        WebDriverException: Chrome が見つからない、または起動に失敗した場合
+    """
+    binary = binary or find_chrome_binary()
+    if not binary:
+        raise WebDriverException("Chrome の実行ファイルが見つかりません")
+
+    arguments = list(arguments or [])
+    user_data_dir = None
+    if not any(arg.startswith('--user-data-dir') for arg in arguments):
+        user_data_dir = tempfile.mkdtemp(prefix='cdp-profile-')
+        arguments.append(f'--user-data-dir={user_data_dir}')
+    profile_dir = user_data_dir or next(
+        arg.split('=', 1)[1] for arg in arguments if arg.startswith('--user-data-dir=')
+    )
+
+    port_file = os.path.join(profile_dir, 'DevToolsActivePort')
+    if os.path.exists(port_file):
+        os.remove(port_file)
+
+    popen_kwargs = {}
+    if detach:
+        if sys.platform.startswith('win'):
+            popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+        else:
+            popen_kwargs['start_new_session'] = True
+
+    command = [binary, '--remote-debugging-port=0', '--no-first-run', '--no-default-browser-check']
+    command += arguments + ['about:blank']
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_kwargs)
+
+    # Chrome が書き出すポート番号のファイルを待つ
+    deadline = time.monotonic() + timeout
+    ws_path = None
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            with open(port_file, 'r', encoding='utf-8') as f:
+                lines = f.read().split()
+            if len(lines) >= 2:
+                port, ws_path = lines[0], lines[1]
+                break
+        except OSError:
+            pass
+        time.sleep(0.05)
+
+    if ws_path is None:
+        process.kill()
+        if user_data_dir:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+        raise WebDriverException("Chrome の起動を確認できませんでした")
+
+    return process, f"127.0.0.1:{port}", ws_path, user_data_dir
+
+
+class CDPDriver:
+    """
+    CDPで Chrome を操作するドライバー
+
+    Browser が使用する WebDriver のメソッド（get, execute_script, find_elements,
+    save_screenshot, window_handles, switch_to など）を同じ名前で提供するため、
+    WebDriverWait や expected_conditions とも組み合わせて使用できます。
+    """
+
+    def __init__(self, session: CDPSession, process: Optional[subprocess.Popen] = None,
+                 user_data_dir: Optional[str] = None, debugger_address: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None, target_id: Optional[str] = None,
+                 browser_context_id: Optional[str] = None):
+        """
+        Args:
+            session: ブラウザ全体に接続したCDPセッション
+            process: このドライバーが起動した Chrome のプロセス（終了時に停止する）
+            user_data_dir: 一時プロファイルのディレクトリ（終了時に削除する）
+            debugger_address: Chrome のデバッガーアドレス
+            logger: ロガー（省略可能）
+            target_id: 最初に操作するタブ（省略時は既存の最初のタブ）
+            browser_context_id: 操作するブラウザコンテキスト（指定した場合、window_handles は
+                このコンテキストのタブのみを返す）
+        """
+        self.session = session
+        self.process = process
+        self.user_data_dir = user_data_dir
+        self.debugger_address = debugger_address
+        self.logger = logger or logging.getLogger(__name__)
+        self.browser_context_id = browser_context_id
+
+        self.implicit_wait = 0.0
+        self.page_load_timeout = 300.0
+        # ページ読み込みの待機方式（normal: load / eager: DOMContentLoaded / none: 待たない）
+        self.page_load_strategy = 'normal'
+        self.script_timeout = 30.0
+
+        self._sessions = {}
+        self._dialogs = {}
+        self._target_id = None
+        self._session_id = None
+        self.switch_to = _SwitchTo(self)
+
+        if target_id is None:
+            targets = session.page_targets(browser_context_id)
+            if targets:
+                target_id = targets[0]['targetId']
+            else:
+                params = {'url': 'about:blank'}
+                if browser_context_id is not None:
+                    params['browserContextId'] = browser_context_id
+                target_id = session.send('Target.createTarget', params)['targetId']
+        self._activate_target(target_id)
+
+    @classmethod
+    def launch(cls, arguments: Optional[List[str]] = None, binary: Optional[str] = None, timeout: float = 30.0,
+               logger: Optional[logging.Logger] = None) -> 'CDPDriver':
+        """
+        Chrome を起動して接続する
+
+        Args:
+            arguments: Chrome の起動オプション（Options.arguments）
+            binary: Chrome の実行ファイルのパス（省略時は自動検出）
+            timeout: 起動待ちのタイムアウト（秒）
+            logger: ロガー（省略可能）
+
+        Returns:
+            CDPDriver: 起動したドライバー
+
+        Raises:
+            WebDriverException: Chrome が見つからない、または起動に失敗した場合
+        """
+        process, address, ws_path, user_data_dir = launch_chrome(arguments, binary, timeout)
+        session = CDPSession(f"ws://{address}{ws_path}", timeout, logger)
+        return cls(session, process, user_data_dir, address, logger)
+
+    @classmethod
+    def attach(cls, debugger_address: str, timeout: float = 30.0,
+               logger: Optional[logging.Logger] = None) -> 'CDPDriver':
+        """
+        起動済みの Chrome に接続する（終了時に Chrome は停止しない）
+
+        Args:
+            debugger_address: Chrome のデバッガーアドレス（host:port）
+            timeout: コマンドの応答待ちのタイムアウト（秒）
+            logger: ロガー（省略可能）
+
+        Returns:
+            CDPDriver: 接続したドライバー
+        """
+        session = CDPSession.connect(debugger_address, timeout, logger)
+        return cls(session, debugger_address=debugger_address, logger=logger)
+
+    # --- タブ管理 ---
+
+    def _activate_target(self, target_id: str):
+        """操作対象のタブを切り替える"""
+        session_id = self._sessions.get(target_id)
+        if session_id is None:
+            try:
+                session_id = self.session.attach(target_id)
+            except CDPError as e:
+                raise NoSuchWindowException(str(e))
+            self._sessions[target_id] = session_id
+            self.session.on('Page.javascriptDialogOpening',
+                            lambda params, sid=session_id: self._dialogs.__setitem__(sid, params), session_id)
+            self.session.on('Page.javascriptDialogClosed',
+                            lambda params, sid=session_id: self._dialogs.pop(sid, None), session_id)
+            self.session.enable('Page', session_id=session_id)
+        self._target_id = target_id
+        self._session_id = session_id
+
+    @property
+    def session_id(self) -> Optional[str]:
+        """現在のタブのCDPセッションID"""
+        return self._session_id
+
+    @property
+    def window_handles(self) -> List[str]:
+        return [target['targetId'] for target in self.session.page_targets(self.browser_context_id)]
+
+    @property
+    def current_window_handle(self) -> str:
+        return self._target_id
+
+    def close(self):
+        """現在のタブを閉じる"""
+        self.session.send('Target.closeTarget', {'targetId': self._target_id})
+        self._sessions.pop(self._target_id, None)
+
+    # --- WebDriver互換のメソッド ---
+
+    @property
+    def capabilities(self) -> Dict[str, Any]:
+        return {
+            'browserName': 'chrome',
+            'engine': 'cdp',
+            'goog:chromeOptions': {'debuggerAddress': self.debugger_address}
+        }
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """現在のタブにCDPコマンドを送信する（WebDriverの execute_cdp_cmd と同じ）"""
+        return self.session.send(cmd, cmd_args, self._session_id)
+
+    def implicitly_wait(self, time_to_wait: float):
+        self.implicit_wait = float(time_to_wait)
+
+    def set_page_load_timeout(self, time_to_wait: float):
+        self.page_load_timeout = float(time_to_wait)
+
+    def set_script_timeout(self, time_to_wait: float):
+        self.script_timeout = float(time_to_wait)
+
+    def get(self, url: str):
+        """
+        URLに移動し、page_load_strategy に応じたイベントまで待機する
+
+        Raises:
+            TimeoutException: page_load_timeout 以内に読み込みが完了しなかった場合
+            WebDriverException: 移動に失敗した場合
+        """
+        if self.page_load_strategy == 'none':
+            result = self.execute_cdp_cmd('Page.navigate', {'url': url})
+            if result.get('errorText'):
+                raise WebDriverException(f"ページへの移動に失敗しました: {result['errorText']}")
+            return
+
+        event = 'Page.domContentEventFired' if self.page_load_strategy == 'eager' else 'Page.loadEventFired'
+        waiter = self.session.expect_event(event, session_id=self._session_id)
+        try:
+            result = self.execute_cdp_cmd('Page.navigate', {'url': url})
+        except Exception:
+            waiter.cancel()
+            raise
+
+        if result.get('errorText'):
+            waiter.cancel()
+            raise WebDriverException(f"ページへの移動に失敗しました: {result['errorText']}")
+
+        # 同一ドキュメント内の移動（#hash など）では load イベントが発生しない
+        if not result.get('loaderId'):
+            waiter.cancel()
+            return
+
+        if waiter.wait(self.page_load_timeout) is None:
+            raise TimeoutException(f"ページの読み込みがタイムアウトしました: {url}")
+
+    def _evaluate(self, expression: str) -> Any:
+        """式を評価して値を返す"""
+        result = self.execute_cdp_cmd('Runtime.evaluate', {'expression': expression, 'returnByValue': True})
+        if 'exceptionDetails' in result:
+            raise JavascriptException(_exception_message(result['exceptionDetails']))
+        return result.get('result', {}).get('value')
+
+    @property
+    def current_url(self) -> str:
+        return self._evaluate('location.href')
+
+    @property
+    def title(self) -> str:
+        return self._evaluate('document.title')
+
+    @property
+    def page_source(self) -> str:
+        return self._evaluate(
+            "(document.doctype ? new XMLSerializer().serializeToString(document.doctype) : '')"
+            " + document.documentElement.outerHTML"
+        )
+
+    def execute_script(self, script: str, *args) -> Any:
+        """
+        JavaScriptを実行する（WebDriverの execute_script と同じく arguments で引数を参照できる）
+
+        要素を返した場合は CDPElement に変換し、CDPElement を引数に渡すとページ内の要素として参照できます。
+        """
+        expression = (
+            f"{SCRIPT_RUNTIME_JS}(function() {{\n{script}\n}}, {json.dumps(self._encode(list(args)))})"
+        )
+        result = self.session.send('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'userGesture': True
+        }, self._session_id, timeout=self.script_timeout)
+
+        if 'exceptionDetails' in result:
+            message = _exception_message(result['exceptionDetails'])
+            if 'stale element reference' in message:
+                raise StaleElementReferenceException(message)
+            raise JavascriptException(message)
+        return self._decode(result.get('result', {}).get('value'))
+
+    def _encode(self, value: Any) -> Any:
+        """引数の CDPElement をページ内の参照に変換する"""
+        if isinstance(value, CDPElement):
+            return {'__cdp_node__': value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._encode(v) for k, v in value.items()}
+        return value
+
+    def _decode(self, value: Any) -> Any:
+        """戻り値のページ内の参照を CDPElement に変換する"""
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        if isinstance(value, dict):
+            if '__cdp_node__' in value and len(value) == 1:
+                return CDPElement(self, value['__cdp_node__'])
+            return {k: self._decode(v) for k, v in value.items()}
+        return value
+
+    def find_elements(self, by: str = By.ID, value: Optional[str] = None,
+                      root: Optional[CDPElement] = None) -> List[CDPElement]:
+        """
+        要素を検索する（implicitly_wait の時間内は見つかるまで再検索）
+        """
+        deadline = time.monotonic() + self.implicit_wait
+        while True:
+            elements = self.execute_script(FIND_ELEMENTS_JS, root, by, value) or []
+            if elements or time.monotonic() >= deadline:
+                return elements
+            time.sleep(0.1)
+
+    def find_element(self, by: str = By.ID, value: Optional[str] = None,
+                     root: Optional[CDPElement] = None) -> CDPElement:
+        elements = self.find_elements(by, value, root)
+        if not elements:
+            raise NoSuchElementException(f"要素が見つかりません: {by}={value}")
+        return elements[0]
+
+    def get_screenshot_as_png(self, clip: Optional[Dict[str, float]] = None) -> bytes:
+        params = {'format': 'png'}
+        if clip:
+            params['clip'] = {'x': clip['x'], 'y': clip['y'], 'width': clip['width'],
+                              'height': clip['height'], 'scale': 1}
+            params['captureBeyondViewport'] = True
+        return base64.b64decode(self.execute_cdp_cmd('Page.captureScreenshot', params)['data'])
+
+    def get_screenshot_as_base64(self) -> str:
+        return self.execute_cdp_cmd('Page.captureScreenshot', {'format': 'png'})['data']
+
+    def save_screenshot(self, filename: str) -> bool:
+        with open(filename, 'wb') as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+    get_screenshot_as_file = save_screenshot
+
+    def refresh(self):
+        waiter = self.session.expect_event('Page.loadEventFired', session_id=self._session_id)
+        self.execute_cdp_cmd('Page.reload')
+        if waiter.wait(self.page_load_timeout) is None:
+            raise TimeoutException("ページの再読み込みがタイムアウトしました")
+
+    def back(self):
+        self.execute_script("history.back();")
+
+    def forward(self):
+        self.execute_script("history.forward();")
+
+    def get_cookies(self) -> List[Dict[str, Any]]:
+        return self.execute_cdp_cmd('Network.getCookies').get('cookies', [])
+
+    def quit(self):
+        """接続を閉じ、このドライバーが起動した Chrome を停止する"""
+        if self.process is not None:
+            try:
+                self.session.send('Browser.close', timeout=5)
+            except Exception:
+                pass
+        self.session.close()
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait(timeout=5)
+            self.process = None
+
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+
+def _exception_message(details: Dict[str, Any]) -> str:
+    """Runtime.evaluate の exceptionDetails からメッセージを取り出す"""
+    exception = details.get('exception') or {}
+    return exception.get('description') or details.get('text') or 'JavaScript error'
+
+
+# --- ベンチマーク ---
+
+BENCHMARK_PAGE = (
+    "data:text/html;charset=utf-8,"
+    "<html><head><title>benchmark</title></head><body>"
+    "<form id='f'><input id='q' name='q' value='test'><button id='b' type='submit'>送信</button></form>"
+    + "".join(f"<p class='item'>item {i}</p>" for i in range(100)) +
+    "</body></html>"
+)
+
+
+def benchmark_latency(driver, iterations: int = 50) -> Dict[str, Dict[str, float]]:
+    """
+    よく使う操作ごとの応答時間を計測する
+
+    現在表示しているページで計測します（BENCHMARK_PAGE を表示してから呼び出すことを推奨）。
+
+    Args:
+        driver: WebDriver または CDPDriver
+        iterations: 各操作の実行回数
+
+    Returns:
+        dict: {操作名: {mean_ms, p50_ms, p95_ms}}
+    """
+    element = driver.find_element(By.ID, 'q')
+    operations = {
+        'execute_script': lambda: driver.execute_script("return 1;"),
+        'title': lambda: driver.title,
+        'find_element': lambda: driver.find_element(By.ID, 'q'),
+        'find_elements': lambda: driver.find_elements(By.CSS_SELECTOR, 'p.item'),
+        'get_attribute': lambda: element.get_attribute('value'),
+        'is_displayed': lambda: element.is_displayed(),
+    }
+
+    results = {}
+    for name, operation in operations.items():
+        operation()  # ウォームアップ
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            operation()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        results[name] = {
+            'mean_ms': round(statistics.mean(samples), 3),
+            'p50_ms': round(samples[len(samples) // 2], 3),
+            'p95_ms': round(samples[min(int(len(samples) * 0.95), len(samples) - 1)], 3)
+        }
+    return results
+
+
+def compare_engines(iterations: int = 50, **browser_kwargs) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    webdriver エンジンと cdp エンジンの応答時間を比較する
+
+    Args:
+        iterations: 各操作の実行回数
+        **browser_kwargs: Browser に渡す引数（headless など）
+
+    Returns:
+        dict: {エンジン名: benchmark_latency の結果}
+    """
+    from .browser import Browser
+
+    results = {}
+    base_config = browser_kwargs.pop('config', None) or {}
+    for engine in ('webdriver', 'cdp'):
+        config = {section: dict(values) for section, values in base_config.items()}
+        config.setdefault('BROWSER', {})['engine'] = engine
+        browser = Browser(config=config, **browser_kwargs)
+        try:
+            if not browser.setup():
+                continue
+            if browser.engine != engine:
+                browser.logger.warning(f"{engine} エンジンを使用できないため、計測をスキップします")
+                continue
+            browser.driver.implicitly_wait(0)
+            browser.driver.get(BENCHMARK_PAGE)
+            results[engine] = benchmark_latency(browser.driver, iterations)
+        finally:
+            browser.quit()
+    return results
+
+
+def format_benchmark(results: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    """compare_engines の結果を表形式の文字列にする"""
+    engines = list(results)
+    operations = list(next(iter(results.values()), {}))
+    lines = ["操作".ljust(16) + "".join(f"{engine} p50/p95 (ms)".rjust(26) for engine in engines)]
+    for operation in operations:
+        row = operation.ljust(16)
+        for engine in engines:
+            stats = results[engine][operation]
+            row += f"{stats['p50_ms']:.2f} / {stats['p95_ms']:.2f}".rjust(26)
+        lines.append(row)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='webdriver / cdp エンジンの応答時間の比較')
+    parser.add_argument('--iterations', type=int, default=50, help='各操作の実行回数')
+    parser.add_argument('--headed', action='store_true', help='ヘッドレスモードを使用しない')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(format_benchmark(compare_engines(args.iterations, headless=not args.headed)))
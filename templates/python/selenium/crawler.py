@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+並列クローラーモジュール
+
+複数のURLを、スレッドごとに独立したブラウザセッションで並列に処理します。
+各ページの処理が完了した順に結果をジェネレーターで返すため、
+大量のURLでも結果を逐次保存しながら処理できます。
+"""
+
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+
+def default_extractor(browser) -> Dict[str, Any]:
+    """
+    デフォルトの抽出処理（タイトルと最終URLのみを返す）
+
+    Args:
+        browser: ページを表示しているBrowserインスタンス
+
+    Returns:
+        dict: title, url
+    """
+    return {'title': browser.driver.title, 'url': browser.get_current_url()}
+
+
+class CrawlResult:
+    """1つのURLの処理結果"""
+
+    __slots__ = ('url', 'ok', 'data', 'error', 'attempts', 'elapsed', 'worker')
+
+    def __init__(self, url: str, ok: bool, data: Any = None, error: Optional[str] = None,
+                 attempts: int = 1, elapsed: float = 0.0, worker: Optional[str] = None):
+        """
+        Args:
+            url: 処理したURL
+            ok: 成功したかどうか
+            data: 抽出処理の戻り値
+            error: 失敗時のエラーメッセージ
+            attempts: 試行回数
+            elapsed: 処理時間（秒、リトライを含む）
+            worker: 処理したワーカースレッド名
+        """
+        self.url = url
+        self.ok = ok
+        self.data = data
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.worker = worker
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONシリアライズ可能な辞書に変換する"""
+        return {
+            'url': self.url,
+            'ok': self.ok,
+            'data': self.data,
+            'error': self.error,
+            'attempts': self.attempts,
+            'elapsed': round(self.elapsed, 3),
+            'worker': self.worker
+        }
+
+    def __repr__(self):
+        status = 'ok' if self.ok else f'error={self.error!r}'
+        return f"CrawlResult({self.url}, {status}, attempts={self.attempts})"
+
+
+class CrawlStats:
+    """クロールの進捗と処理速度"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.pages = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+
+    def add(self, result: CrawlResult):
+        """処理結果を集計に加える"""
+        self.pages += 1
+        self.retries += max(result.attempts - 1, 0)
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def finish(self):
+        """計測を終了する"""
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        """経過時間（秒）"""
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def pages_per_second(self) -> float:
+        """1秒あたりの処理ページ数"""
+        elapsed = self.elapsed
+        return self.pages / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """集計結果を辞書で返す"""
+        return {
+            'pages': self.pages,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'retries': self.retries,
+            'elapsed': round(self.elapsed, 3),
+            'pages_per_second': round(self.pages_per_second, 3)
+        }
+
+    def __str__(self):
+        return (f"{self.pages}ページ (成功: {self.succeeded}, 失敗: {self.failed}, リトライ: {self.retries}) "
+                f"/ {self.elapsed:.1f}秒 ({self.pages_per_second:.2f} pages/sec)")
+
+
+class Crawler:
+    """
+    スレッドプールで複数のブラウザセッションを使ってURLを処理するクローラー
+
+    各ワーカースレッドは最初のURLを処理する時にブラウザを1つ作成し、
+    クロールが終わるまで使い回します。ブラウザが応答しなくなった場合は作り直します。
+    """
+
+    def __init__(self, browser_factory: Callable[[], Any], concurrency: int = 4,
+                 extractor: Optional[Callable[[Any], Any]] = None, timeout: Optional[float] = None,
+                 retries: int = 1, progress_interval: int = 100,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            browser_factory: セットアップ前のBrowserインスタンスを返す関数
+            concurrency: 同時に使用するブラウザセッション数
+            extractor: ページ表示後に呼び出す抽出処理 extractor(browser)
+            timeout: 1ページあたりの読み込みタイムアウト（秒）
+            retries: 失敗時のリトライ回数
+            progress_interval: 進捗をログ出力する間隔（ページ数、0で出力しない）
+            logger: ロガー（省略可能）
+        """
+        self.browser_factory = browser_factory
+        self.concurrency = max(int(concurrency), 1)
+        self.extractor = extractor or default_extractor
+        self.timeout = timeout
+        self.retries = max(int(retries), 0)
+        self.progress_interval = progress_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = CrawlStats()
+
+        self._local = threading.local()
+        self._browsers = []
+        self._lock = threading.Lock()
+
+    def _get_browser(self):
+        """現在のワーカースレッドのブラウザを取得する（なければ作成する）"""
+        browser = getattr(self._local, 'browser', None)
+        if browser is not None and browser.driver is not None:
+            return browser
+
+        browser = self.browser_factory()
+        if not browser.setup():
+            raise RuntimeError("ブラウザのセットアップに失敗しました")
+
+        if self.timeout:
+            browser.driver.set_page_load_timeout(self.timeout)
+            browser.driver.set_script_timeout(self.timeout)
+
+        self._local.browser = browser
+        with self._lock:
+            self._browsers.append(browser)
+        self.logger.debug(f"ワーカー {threading.current_thread().name} のブラウザを作成しました")
+        return browser
+
+    def _discard_browser(self):
+        """現在のワーカースレッドのブラウザを破棄する（次の試行で作り直す）"""
+        browser = getattr(self._local, 'browser', None)
+        self._local.browser = None
+        if browser is None:
+            return
+        with self._lock:
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+        browser.quit()
+
+    def _process(self, url: str) -> CrawlResult:
+        """1つのURLを処理する（ワーカースレッドで実行）"""
+        worker = threading.current_thread().name
+        started = time.monotonic()
+        error = None
+
+        for attempt in range(1, self.retries + 2):
+            try:
+                browser = self._get_browser()
+                if not browser.navigate_to(url):
+                    raise RuntimeError("ページへの移動に失敗しました")
+                data = self.extractor(browser)
+                return CrawlResult(url, True, data, None, attempt, time.monotonic() - started, worker)
+
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                self.logger.warning(f"URLの処理に失敗しました ({attempt}/{self.retries + 1}): {url} - {error}")
+                self.logger.debug(traceback.format_exc())
+
+                # セッションが応答しない場合に備えて、ブラウザを作り直す
+                browser = getattr(self._local, 'browser', None)
+                if browser is not None and not self._is_alive(browser):
+                    self._discard_browser()
+
+        return CrawlResult(url, False, None, error, self.retries + 1, time.monotonic() - started, worker)
+
+    @staticmethod
+    def _is_alive(browser) -> bool:
+        """ブラウザセッションが応答するかどうか"""
+        if browser.driver is None:
+            return False
+        try:
+            browser.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def crawl(self, urls: Iterable[str]) -> Iterator[CrawlResult]:
+        """
+        URLを並列に処理し、完了した順に結果を返す
+
+        同時に処理待ちにするURLは concurrency の2倍までに制限するため、
+        大量のURLを渡してもメモリを消費しません。
+
+        Args:
+            urls: 処理するURLのリストまたはイテレーター
+
+        Yields:
+            CrawlResult: 各URLの処理結果（完了順）
+        """
+        self.stats = CrawlStats()
+        url_iter = iter(urls)
+        max_pending = self.concurrency * 2
+        pending = set()
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawler')
+        self.logger.info(f"クロールを開始します (並列数: {self.concurrency})")
+
+        try:
+            for url in url_iter:
+                pending.add(executor.submit(self._process, url))
+                if len(pending) < max_pending:
+                    continue
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._collect(future)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._collect(future)
+
+        finally:
+            # 途中で中断された場合は未着手のURLを取り消す
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self.close()
+            self.stats.finish()
+            self.logger.info(f"クロールが完了しました: {self.stats}")
+
+    def _collect(self, future) -> CrawlResult:
+        """完了したタスクの結果を集計する"""
+        result = future.result()
+        self.stats.add(result)
+        if self.progress_interval and self.stats.pages % self.progress_interval == 0:
+            self.logger.info(f"クロール進捗: {self.stats}")
+        return result
+
+    def close(self):
+        """作成したすべてのブラウザを終了する"""
+        with self._lock:
+            browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            browser.quit()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DOM差分モジュール
+
+2つのページソースを軽量なツリーに変換し、部分木ごとのハッシュ（Merkle方式）を
+比較することで、変化のない領域を読み飛ばしながら追加・削除・変更された要素を検出します。
+標準ライブラリの html.parser のみを使用します。
+"""
+
+import hashlib
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# 終了タグを持たない要素
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+# デフォルトで比較対象から除外する要素
+DEFAULT_IGNORE_TAGS = ('script', 'style', 'noscript')
+
+
+class DomNode:
+    """
+    差分計算用の軽量なDOMノード
+
+    要素名、属性、直下のテキスト、子要素と、部分木全体のハッシュを保持します。
+    """
+
+    __slots__ = ('tag', 'attrs', 'text', 'children', 'parent', 'digest', '_text_parts')
+
+    def __init__(self, tag: str, attrs: Tuple[Tuple[str, str], ...] = (), parent: Optional['DomNode'] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.text = ''
+        self.children = []
+        self.parent = parent
+        self.digest = b''
+        self._text_parts = []
+
+    def get_attr(self, name: str, default: str = '') -> str:
+        """属性値を取得する"""
+        for key, value in self.attrs:
+            if key == name:
+                return value
+        return default
+
+    def text_content(self, limit: int = 200) -> str:
+        """
+        部分木全体のテキストを取得する
+
+        Args:
+            limit: 最大文字数
+
+        Returns:
+            str: 空白を正規化したテキスト
+        """
+        parts = []
+        stack = [self]
+        length = 0
+        while stack and length < limit:
+            node = stack.pop()
+            if node.text:
+                parts.append(node.text)
+                length += len(node.text) + 1
+            stack.extend(reversed(node.children))
+        return ' '.join(parts)[:limit]
+
+    def path(self) -> str:
+        """
+        ルートからのCSS風パスを取得する
+
+        Returns:
+            str: 例 "html>body>div#main>ul>li:nth-of-type(3)"
+        """
+        segments = []
+        node = self
+        while node is not None and node.parent is not None:
+            segment = node.tag
+            node_id = node.get_attr('id')
+            if node_id:
+                segment = f"{segment}#{node_id}"
+            else:
+                siblings = [c for c in node.parent.children if c.tag == node.tag]
+                if len(siblings) > 1:
+                    segment = f"{segment}:nth-of-type({siblings.index(node) + 1})"
+            segments.append(segment)
+            node = node.parent
+        return '>'.join(reversed(segments))
+
+    def count(self) -> int:
+        """部分木のノード数を数える"""
+        total = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            total += 1
+            stack.extend(node.children)
+        return total
+
+
+class _TreeBuilder(HTMLParser):
+    """HTMLをDomNodeツリーに変換するパーサー"""
+
+    def __init__(self, ignore_tags: Iterable[str]):
+        super().__init__(convert_charrefs=True)
+        self.root = DomNode('#document')
+        self.stack = [self.root]
+        self.ignore_tags = frozenset(ignore_tags)
+        self.ignore_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.ignore_depth:
+            if tag == self.stack[-1].tag and tag not in VOID_ELEMENTS:
+                self.ignore_depth += 1
+            return
+        if tag in self.ignore_tags:
+            self.ignore_depth = 1
+            # 除外要素は終了タグまで読み飛ばすため、目印としてスタックに積む
+            self.stack.append(DomNode(tag))
+            return
+
+        parent = self.stack[-1]
+        node = DomNode(tag, tuple(sorted((k, v or '') for k, v in attrs)), parent)
+        parent.children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if self.ignore_depth or tag in self.ignore_tags:
+            return
+        parent = self.stack[-1]
+        parent.children.append(DomNode(tag, tuple(sorted((k, v or '') for k, v in attrs)), parent))
+
+    def handle_endtag(self, tag):
+        if self.ignore_depth:
+            if tag == self.stack[-1].tag:
+                self.ignore_depth -= 1
+                if not self.ignore_depth:
+                    self.stack.pop()
+            return
+        if tag in VOID_ELEMENTS:
+            return
+
+        # 閉じ忘れのタグを許容し、一致する要素までスタックを戻す
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        if self.ignore_depth:
+            return
+        text = ' '.join(data.split())
+        if text:
+            self.stack[-1]._text_parts.append(text)
+
+
+def _finalize(root: DomNode):
+    """テキストを確定し、部分木ハッシュを後順で計算する"""
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node.children)
+
+    for node in reversed(order):
+        node.text = ' '.join(node._text_parts)
+        node._text_parts = []
+        h = hashlib.blake2b(digest_size=12)
+        h.update(node.tag.encode('utf-8'))
+        for key, value in node.attrs:
+            h.update(b'\x00' + key.encode('utf-8') + b'=' + value.encode('utf-8'))
+        h.update(b'\x01' + node.text.encode('utf-8'))
+        for child in node.children:
+            h.update(child.digest)
+        node.digest = h.digest()
+
+
+def parse_html(html: str, ignore_tags: Iterable[str] = DEFAULT_IGNORE_TAGS) -> DomNode:
+    """
+    HTMLを差分計算用のツリーに変換する
+
+    Args:
+        html: HTMLソース
+        ignore_tags: 比較対象から除外する要素名
+
+    Returns:
+        DomNode: ルートノード（tag='#document'）
+    """
+    builder = _TreeBuilder(ignore_tags)
+    builder.feed(html or '')
+    builder.close()
+    _finalize(builder.root)
+    return builder.root
+
+
+class DomChange:
+    """1件の変更を表すレコード"""
+
+    __slots__ = ('kind', 'path', 'tag', 'details', 'node')
+
+    def __init__(self, kind: str, node: DomNode, details: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            kind: 変更種別（added, removed, modified）
+            node: 対象ノード（removedの場合は旧ツリー側、それ以外は新ツリー側）
+            details: 変更内容（属性やテキストの前後の値）
+        """
+        self.kind = kind
+        self.node = node
+        self.path = node.path()
+        self.tag = node.tag
+        self.details = details or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONシリアライズ可能な辞書に変換する"""
+        result = {'kind': self.kind, 'path': self.path, 'tag': self.tag}
+        if self.details:
+            result['details'] = self.details
+        return result
+
+    def __repr__(self):
+        return f"DomChange({self.kind}, {self.path})"
+
+
+class DomDiff:
+    """2つのDOMツリーの差分結果"""
+
+    _SYMBOLS = {'added': '+', 'removed': '-', 'modified': '~'}
+
+    def __init__(self, changes: List[DomChange], compared_nodes: int, total_nodes: int):
+        """
+        Args:
+            changes: 検出された変更のリスト
+            compared_nodes: 実際に比較したノード数
+            total_nodes: 新ツリーの総ノード数
+        """
+        self.changes = changes
+        self.compared_nodes = compared_nodes
+        self.total_nodes = total_nodes
+
+    @property
+    def is_empty(self) -> bool:
+        """変更がなかったかどうか"""
+        return not self.changes
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def _of_kind(self, kind: str) -> List[DomChange]:
+        return [c for c in self.changes if c.kind == kind]
+
+    @property
+    def added(self) -> List[DomChange]:
+        """追加された要素"""
+        return self._of_kind('added')
+
+    @property
+    def removed(self) -> List[DomChange]:
+        """削除された要素"""
+        return self._of_kind('removed')
+
+    @property
+    def modified(self) -> List[DomChange]:
+        """属性またはテキストが変更された要素"""
+        return self._of_kind('modified')
+
+    def summary(self) -> Dict[str, int]:
+        """変更種別ごとの件数"""
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'modified': len(self.modified),
+            'compared_nodes': self.compared_nodes,
+            'total_nodes': self.total_nodes
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONシリアライズ可能な辞書に変換する"""
+        return {
+            'summary': self.summary(),
+            'changes': [c.to_dict() for c in self.changes]
+        }
+
+    def format(self, limit: int = 50) -> str:
+        """
+        デバッグ用の簡潔なテキスト表現を作成する
+
+        Args:
+            limit: 出力する最大件数
+
+        Returns:
+            str: 1行1変更の差分表現
+        """
+        lines = []
+        for change in self.changes[:limit]:
+            line = f"{self._SYMBOLS[change.kind]} {change.path}"
+            if change.kind == 'modified':
+                line += f" [{', '.join(sorted(change.details))}]"
+            lines.append(line)
+        if len(self.changes) > limit:
+            lines.append(f"... 他 {len(self.changes) - limit} 件")
+        return '\n'.join(lines)
+
+
+def _node_key(node: DomNode, occurrence: int) -> Tuple[str, str]:
+    """子要素の対応付けに使用するキー（id属性があれば優先）"""
+    node_id = node.get_attr('id')
+    if node_id:
+        return (node.tag, '#' + node_id)
+    return (node.tag, str(occurrence))
+
+
+def _own_changes(old: DomNode, new: DomNode) -> Dict[str, Any]:
+    """ノード自身の属性・テキストの変更内容を取得する"""
+    details = {}
+    if old.attrs != new.attrs:
+        old_attrs = dict(old.attrs)
+        new_attrs = dict(new.attrs)
+        changed = {}
+        for key in sorted(set(old_attrs) | set(new_attrs)):
+            if old_attrs.get(key) != new_attrs.get(key):
+                changed[key] = [old_attrs.get(key), new_attrs.get(key)]
+        details['attrs'] = changed
+    if old.text != new.text:
+        details['text'] = [old.text, new.text]
+    return details
+
+
+def diff_trees(old: DomNode, new: DomNode) -> DomDiff:
+    """
+    2つのDOMツリーの差分を計算する
+
+    部分木ハッシュが一致する領域は比較せずに読み飛ばすため、
+    計算量は変更された部分の大きさに比例します。
+
+    Args:
+        old: 変更前のツリー
+        new: 変更後のツリー
+
+    Returns:
+        DomDiff: 差分結果
+    """
+    changes = []
+    compared = 0
+    stack = [(old, new)]
+
+    while stack:
+        old_node, new_node = stack.pop()
+        compared += 1
+        if old_node.digest == new_node.digest:
+            continue
+
+        details = _own_changes(old_node, new_node)
+        if details:
+            changes.append(DomChange('modified', new_node, details))
+
+        # 1. 同一ハッシュの子要素を対応付け（変更なしとして読み飛ばす）
+        old_by_digest = {}
+        for child in old_node.children:
+            old_by_digest.setdefault(child.digest, []).append(child)
+        matched_old = set()
+        remaining_new = []
+        for child in new_node.children:
+            candidates = old_by_digest.get(child.digest)
+            if candidates:
+                matched_old.add(id(candidates.pop(0)))
+            else:
+                remaining_new.append(child)
+        remaining_old = [c for c in old_node.children if id(c) not in matched_old]
+
+        # 2. 残りの子要素をid属性または出現順で対応付けて再帰的に比較
+        old_by_key = {}
+        occurrences = {}
+        for child in remaining_old:
+            occurrences[child.tag] = occurrences.get(child.tag, 0) + 1
+            old_by_key[_node_key(child, occurrences[child.tag])] = child
+        occurrences = {}
+        pairs = []
+        for child in remaining_new:
+            occurrences[child.tag] = occurrences.get(child.tag, 0) + 1
+            counterpart = old_by_key.pop(_node_key(child, occurrences[child.tag]), None)
+            if counterpart is None:
+                changes.append(DomChange('added', child))
+            else:
+                pairs.append((counterpart, child))
+        for child in old_by_key.values():
+            changes.append(DomChange('removed', child))
+
+        stack.extend(reversed(pairs))
+
+    return DomDiff(changes, compared, new.count())
+
+
+def diff_html(old_html: str, new_html: str, ignore_tags: Iterable[str] = DEFAULT_IGNORE_TAGS) -> DomDiff:
+    """
+    2つのHTMLソースの差分を計算する
+
+    Args:
+        old_html: 変更前のHTML
+        new_html: 変更後のHTML
+        ignore_tags: 比較対象から除外する要素名
+
+    Returns:
+        DomDiff: 差分結果
+    """
+    return diff_trees(parse_html(old_html, ignore_tags), parse_html(new_html, ignore_tags))
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ダウンロード管理モジュール
+
+Chrome のダウンロード先をセッションごとのディレクトリに設定し（Browser.setDownloadBehavior）、
+ダウンロードの完了を待機します。DevTools のダウンロードのイベント（Browser.downloadProgress）を受け取れる場合は
+それを、受け取れない場合はファイルシステムのイベント（watchdog。Linux では inotify）で .crdownload が
+最終的なファイル名に変わるのを検出するため、待機中にポーリングしません。
+複数のダウンロードを同時に待機でき、開始された順に待機中の expect() に割り当てます。
+
+使用例:
+    with browser.expect_download("*.csv", timeout=60) as download:
+        browser.with_element(("report", "csv_button"), lambda element: element.click())
+    print(download.path)
+"""
+
+import fnmatch
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# watchdogが利用可能かどうか（インポートはディレクトリの監視を開始する時点で行う）
+FS_EVENTS_AVAILABLE = importlib.util.find_spec("watchdog") is not None
+
+# ダウンロード中のファイルの拡張子
+TEMPORARY_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+# watchdog がない場合にディレクトリを確認する間隔（秒）
+POLL_INTERVAL = 0.5
+
+
+def is_temporary(path: str) -> bool:
+    """ダウンロード中の一時ファイルかどうか"""
+    name = os.path.basename(path)
+    return name.endswith(TEMPORARY_SUFFIXES) or name.startswith('.com.google.Chrome')
+
+
+def unique_path(directory: str, filename: str) -> str:
+    """
+    ディレクトリ内で重複しないファイルのパスを作成する（重複する場合は「名前 (1).csv」のように番号を付ける）
+    """
+    filename = os.path.basename(filename) or 'download'
+    base, ext = os.path.splitext(filename)
+    path = os.path.join(directory, filename)
+    number = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{base} ({number}){ext}")
+        number += 1
+    return path
+
+
+class Download:
+    """1件のダウンロード"""
+
+    __slots__ = ('guid', 'url', 'filename', 'path', 'state', 'total_bytes', 'received_bytes', 'started', 'finished')
+
+    def __init__(self, guid: str, url: Optional[str], filename: str, path: str, state: str = 'in_progress'):
+        self.guid = guid
+        self.url = url
+        self.filename = filename
+        self.path = path
+        self.state = state
+        self.total_bytes = 0
+        self.received_bytes = 0
+        self.started = time.monotonic()
+        self.finished = self.started if state != 'in_progress' else None
+
+    @property
+    def done(self) -> bool:
+        """完了またはキャンセルされたかどうか"""
+        return self.state != 'in_progress'
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        """開始から完了までの秒数（完了していない場合はNone）"""
+        return self.finished - self.started if self.finished is not None else None
+
+    def __repr__(self):
+        return f"Download({self.filename}, {self.state})"
+
+
+class DownloadWaiter:
+    """
+    expect() の後に開始されたダウンロードの完了を待機する
+
+    with 文の中でダウンロードを開始し、path で完了したファイルのパスを取得します。
+    """
+
+    def __init__(self, manager: 'DownloadManager', filename: Optional[str] = None, timeout: float = 120.0):
+        """
+        Args:
+            manager: DownloadManager
+            filename: 対象にするファイル名のパターン（"*.csv" など。省略時は最初のダウンロード）
+            timeout: path で待機する秒数
+        """
+        self.manager = manager
+        self.filename = filename
+        self.timeout = timeout
+        self.download: Optional[Download] = None
+
+    def matches(self, download: Download) -> bool:
+        """このダウンロードを待機の対象にするかどうか"""
+        return self.filename is None or fnmatch.fnmatch(download.filename, self.filename)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        ダウンロードが完了するまで待機する
+
+        Args:
+            timeout: 待機する秒数（省略時は作成時の timeout）
+
+        Returns:
+            str or None: 完了したファイルのパス。キャンセルされた場合やタイムアウトした場合はNone
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        condition = self.manager.condition
+        with condition:
+            while not (self.download is not None and self.download.done) and not self.manager.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                condition.wait(remaining)
+            self.manager.cancel(self)
+
+        if self.download is None:
+            self.manager.logger.warning(f"ダウンロードが開始されませんでした: {self.filename or 'すべて'}")
+            return None
+        if self.download.state != 'completed':
+            self.manager.logger.warning(f"ダウンロードが完了しませんでした: {self.download.filename} ({self.download.state})")
+            return None
+        return self.download.path
+
+    @property
+    def path(self) -> Optional[str]:
+        """完了したファイルのパス（完了するまで待機する）"""
+        return self.wait()
+
+    def __enter__(self) -> 'DownloadWaiter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.manager.cancel(self)
+
+
+class DownloadManager:
+    """
+    ダウンロード先のディレクトリのダウンロードを記録し、待機中の DownloadWaiter に割り当てる
+
+    使用例:
+        manager = DownloadManager("downloads/20240101_120000_abcd")
+        manager.attach_session(session)
+        waiter = manager.expect("*.pdf")
+        ...
+        path = waiter.wait(60)
+    """
+
+    def __init__(self, directory: str, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            directory: ダウンロード先のディレクトリ
+            logger: ロガー（省略可能）
+        """
+        self.directory = directory
+        self.logger = logger or logging.getLogger(__name__)
+        os.makedirs(directory, exist_ok=True)
+
+        self.mode = None
+        self.downloads: 'OrderedDict[str, Download]' = OrderedDict()
+        self.condition = threading.Condition()
+        self.closed = False
+        self._waiters: List[DownloadWaiter] = []
+        self._known = set(os.listdir(directory))
+        self._session = None
+        self._listeners = []
+        self._observer = None
+        self._browser_context_id = None
+        # フレームID -> ブラウザコンテキストID（判定できない場合はNone）
+        self._frame_contexts: Dict[str, Optional[str]] = {}
+
+    # --- ダウンロード先の設定 ---
+
+    def attach_session(self, session, browser_context_id: Optional[str] = None):
+        """
+        DevTools でダウンロード先を設定し、ダウンロードのイベントで完了を検出する
+
+        一時的なファイル名（guid）で保存し、完了した時点で元のファイル名に変更します。
+        ブラウザコンテキストを指定した場合は、そのコンテキストのダウンロードのみを対象にします
+        （ブラウザデーモンでほかの実行と Chrome を共有している場合）。
+
+        Args:
+            session: ブラウザ全体の CDPSession
+            browser_context_id: 対象のブラウザコンテキスト（省略時は既定のコンテキスト）
+        """
+        self._session = session
+        self._browser_context_id = browser_context_id
+        for method, callback in (('Browser.downloadWillBegin', self._on_will_begin),
+                                 ('Browser.downloadProgress', self._on_progress)):
+            self._listeners.append((method, session.on(method, callback)))
+        params = {
+            'behavior': 'allowAndName',
+            'downloadPath': self.directory,
+            'eventsEnabled': True
+        }
+        if browser_context_id is not None:
+            params['browserContextId'] = browser_context_id
+        session.send('Browser.setDownloadBehavior', params)
+        self.mode = 'events'
+
+    def attach_driver(self, driver):
+        """
+        DevTools に接続できない場合に、WebDriver 経由でダウンロード先を設定してディレクトリを監視する
+
+        Args:
+            driver: WebDriverインスタンス（execute_cdp_cmd を使用）
+        """
+        driver.execute_cdp_cmd('Browser.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': self.directory})
+        self.watch_directory()
+
+    def watch_directory(self):
+        """ディレクトリに完成したファイルが現れるのを監視する（watchdog がない場合は定期的に確認）"""
+        self.mode = 'filesystem'
+        if FS_EVENTS_AVAILABLE:
+            from watchdog.observers import Observer
+            self._observer = Observer()
+            self._observer.schedule(_DirectoryHandler(self), self.directory, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            self.logger.debug("watchdogがインストールされていないため、ダウンロード先を定期的に確認します")
+            threading.Thread(target=self._poll_loop, name='download-poll', daemon=True).start()
+
+    def close(self):
+        """イベントの受信と監視を終了し、待機中の DownloadWaiter を終了させる"""
+        for method, listener in self._listeners:
+            self._session.off(method, listener)
+        self._listeners = []
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    # --- 待機 ---
+
+    def expect(self, filename: Optional[str] = None, timeout: float = 120.0) -> DownloadWaiter:
+        """
+        この後に開始されるダウンロードの待機を開始する（ダウンロードを開始する操作の前に呼び出す）
+
+        Args:
+            filename: 対象にするファイル名のパターン（省略時は最初のダウンロード）
+            timeout: 待機する秒数
+
+        Returns:
+            DownloadWaiter: 待機
+        """
+        waiter = DownloadWaiter(self, filename, timeout)
+        with self.condition:
+            self._waiters.append(waiter)
+        return waiter
+
+    def cancel(self, waiter: DownloadWaiter):
+        """待機を終了する（以降のダウンロードは割り当てない）"""
+        with self.condition:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def completed(self) -> List[Download]:
+        """完了したダウンロードを開始された順に取得する"""
+        with self.condition:
+            return [download for download in self.downloads.values() if download.state == 'completed']
+
+    def _add(self, download: Download):
+        """ダウンロードを記録し、最初に一致した待機中の DownloadWaiter に割り当てる（condition を取得して呼び出す）"""
+        self.downloads[download.guid] = download
+        for waiter in self._waiters:
+            if waiter.download is None and waiter.matches(download):
+                waiter.download = download
+                break
+        self.condition.notify_all()
+
+    # --- DevTools のイベント（配信スレッドで呼び出される） ---
+
+    def _is_own_frame(self, frame_id: Optional[str]) -> bool:
+        """
+        ダウンロードを開始したフレームが対象のブラウザコンテキストのものかどうか
+
+        メインフレームのIDはタブのターゲットIDと同じため、Target.getTargetInfo でコンテキストを確認します。
+        判定できない場合（子フレームなど）は対象とします。
+        """
+        if self._browser_context_id is None or not frame_id:
+            return True
+        if frame_id not in self._frame_contexts:
+            try:
+                info = self._session.send('Target.getTargetInfo', {'targetId': frame_id})['targetInfo']
+                self._frame_contexts[frame_id] = info.get('browserContextId')
+            except Exception:
+                self._frame_contexts[frame_id] = None
+        context_id = self._frame_contexts[frame_id]
+        return context_id is None or context_id == self._browser_context_id
+
+    def _on_will_begin(self, params: Dict[str, Any]):
+        if not self._is_own_frame(params.get('frameId')):
+            return
+        guid = params['guid']
+        filename = params.get('suggestedFilename') or 'download'
+        with self.condition:
+            self._known.add(guid)
+            self._add(Download(guid, params.get('url'), filename, os.path.join(self.directory, guid)))
+        self.logger.debug(f"ダウンロードを開始しました: {filename}")
+
+    def _on_progress(self, params: Dict[str, Any]):
+        with self.condition:
+            download = self.downloads.get(params['guid'])
+            if download is None or download.done:
+                return
+            download.total_bytes = params.get('totalBytes', download.total_bytes)
+            download.received_bytes = params.get('receivedBytes', download.received_bytes)
+            state = params.get('state')
+            if state == 'inProgress':
+                return
+
+            if state == 'completed':
+                # 一時的なファイル名（guid）から元のファイル名に変更する
+                path = unique_path(self.directory, download.filename)
+                try:
+                    os.replace(params.get('filePath') or download.path, path)
+                    download.path = path
+                    self._known.add(os.path.basename(path))
+                except OSError as e:
+                    self.logger.warning(f"ダウンロードしたファイルの名前を変更できませんでした: {str(e)}")
+                download.state = 'completed'
+            else:
+                download.state = 'canceled'
+            download.finished = time.monotonic()
+            self.condition.notify_all()
+        self.logger.info(f"ダウンロードが{'完了' if download.state == 'completed' else 'キャンセル'}しました: "
+                         f"{download.path} ({download.received_bytes} bytes, {download.elapsed:.1f}秒)")
+
+    # --- ファイルシステムのイベント ---
+
+    def _on_file_ready(self, path: str):
+        """完成したファイルがディレクトリに現れた場合"""
+        name = os.path.basename(path)
+        if is_temporary(name) or os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.directory):
+            return
+        with self.condition:
+            if name in self._known:
+                return
+            self._known.add(name)
+            download = Download(name, None, name, path, state='completed')
+            download.total_bytes = download.received_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+            self._add(download)
+        self.logger.info(f"ダウンロードが完了しました: {path}")
+
+    def _poll_loop(self):
+        while not self.closed:
+            try:
+                for name in os.listdir(self.directory):
+                    if name not in self._known:
+                        self._on_file_ready(os.path.join(self.directory, name))
+            except OSError as e:
+                self.logger.debug(f"ダウンロード先を確認できませんでした: {str(e)}")
+            time.sleep(POLL_INTERVAL)
+
+
+class _DirectoryHandler:
+    """
+    一時ファイルから名前が変わったファイルと、書き込みが終わったファイルを DownloadManager に渡す
+
+    watchdog の Observer はイベントごとに dispatch() を呼び出すため、FileSystemEventHandler を
+    継承せずに処理します（watchdog はディレクトリの監視を開始する時点でインポートする）。
+    """
+
+    def __init__(self, manager: DownloadManager):
+        self.manager = manager
+
+    def dispatch(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == 'moved':
+            self.manager._on_file_ready(event.dest_path)
+        elif event.event_type == 'closed':
+            self.manager._on_file_ready(event.src_path)
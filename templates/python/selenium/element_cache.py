@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+要素キャッシュモジュール
+
+同じページで同じロケーターの要素を繰り返し取得する場合に、見つけた要素を再利用します。
+ページごとにDOMの変更を数える MutationObserver を設置し、要素を見つけた時点からページの移動・
+ウィンドウの切り替え・要素の追加や削除があった場合は、キャッシュを使わずに検索し直します。
+表示されていることを条件にする場合は、style・class・hidden 属性の変更でも検索し直します。
+
+キャッシュの確認とロケーターでの検索は1回のスクリプト実行で行うため、キャッシュにない場合も
+スクリプトの実行回数は増えません。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+# キャッシュした要素がそのまま使えるかを確認し、使えない場合はロケーターで検索するスクリプト
+# 初回の呼び出しで MutationObserver を設置し、[ページの状態, 要素, キャッシュの要素かどうか, DOM内にあるかどうか] を返す
+# ロケーターでの検索には、先頭に連結した __locateElement(by, value) を使用する
+CACHE_LOOKUP_JS = """
+    var state = window.__elementCacheState;
+    if (!state) {
+        state = window.__elementCacheState = {token: Math.random().toString(36).slice(2), version: 0, attributes: 0};
+        new MutationObserver(function(records) {
+            for (var i = 0; i < records.length; i++) {
+                if (records[i].type === 'childList') state.version++; else state.attributes++;
+            }
+        }).observe(document, {childList: true, subtree: true, attributes: true,
+                              attributeFilter: ['style', 'class', 'hidden']});
+    }
+    var cached = arguments[0], cachedState = arguments[1], locator = arguments[2], visible = arguments[3];
+    // 表示されていることを条件にする場合のみ、属性の変更もページの状態に含める
+    var current = state.token + ':' + state.version + (visible ? ':' + state.attributes : '');
+    function isVisible(el) {
+        var style = window.getComputedStyle(el);
+        return el.getClientRects().length > 0 && style.visibility !== 'hidden';
+    }
+    var connected = cached ? cached.isConnected : null;
+    if (connected && cachedState === current && (!visible || isVisible(cached))) {
+        return [current, cached, true, true];
+    }
+    var found = null;
+    if (locator && typeof __locateElement === 'function') {
+        try {
+            found = __locateElement(locator[0], locator[1]);
+        } catch (e) {
+            found = null;
+        }
+        if (found && visible && !isVisible(found)) found = null;
+    }
+    return [current, found, false, connected];
+"""
+
+
+class ElementCache:
+    """
+    ロケーターごとに見つけた要素とページの状態を保持するキャッシュ
+
+    使用例:
+        element, state, cached = cache.lookup(driver, key, (By.ID, "username"))
+        if element is None:
+            element = find(...)
+        if not cached:
+            cache.store(key, element, state)
+    """
+
+    def __init__(self, max_entries: int = 256, locate_js: str = ''):
+        """
+        Args:
+            max_entries: 保持する要素の最大数（超えた場合は古いものから削除）
+            locate_js: ロケーターで要素を検索する関数 __locateElement(by, value) の定義
+                （省略時はキャッシュの確認のみを行う）
+        """
+        self.max_entries = max_entries
+        self.script = locate_js + CACHE_LOOKUP_JS
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+
+    def lookup(self, driver, key: Hashable, locator: Optional[Sequence[str]] = None,
+               visible: bool = False) -> Tuple[Any, Optional[str], bool]:
+        """
+        キャッシュから要素を取得し、キャッシュにない場合はロケーターで検索する
+
+        Args:
+            driver: WebDriverインスタンス
+            key: ロケーターのキー
+            locator: キャッシュにない場合に検索する (By種別, 値)（省略時は検索しない）
+            visible: 要素が表示されていることを条件にするかどうか
+
+        Returns:
+            tuple: (要素またはNone, 現在のページの状態, キャッシュの要素かどうか)。
+                キャッシュの要素でない場合は、見つけた要素を状態とともに store() に渡す
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        locator = list(locator) if locator else None
+        try:
+            try:
+                state, element, cached, connected = driver.execute_script(
+                    self.script, entry[0] if entry else None, entry[1] if entry else None, locator, visible
+                )
+            except StaleElementReferenceException:
+                # キャッシュした要素が古くなっている場合は、要素を渡さずに検索する
+                state, element, cached, connected = driver.execute_script(self.script, None, None, locator, visible)
+                connected = False
+        except WebDriverException:
+            return None, None, False
+
+        with self._lock:
+            if cached:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return element, state, True
+
+            if entry is not None:
+                self._entries.pop(key, None)
+                if not connected:
+                    self.stale += 1
+            self.misses += 1
+        return element, state, False
+
+    def store(self, key: Hashable, element: Any, state: Optional[str]):
+        """
+        見つけた要素を保存する
+
+        Args:
+            key: ロケーターのキー
+            element: 要素
+            state: lookup() で取得したページの状態
+        """
+        if element is None or state is None:
+            return
+        with self._lock:
+            self._entries[key] = (element, state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        """1件の要素をキャッシュから削除する"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stale += 1
+
+    def invalidate(self):
+        """すべての要素をキャッシュから削除する（ページの移動やウィンドウの切り替え時）"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの利用状況を取得する
+
+        Returns:
+            dict: {size, hits, misses, stale, invalidations, hit_rate}
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
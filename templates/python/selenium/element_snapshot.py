@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+要素スナップショットモジュール
+
+ページ解析結果の各要素を、WebElementを保持しない軽量なスナップショットとして表現します。
+フィールド名は種類ごとに共有されたスキーマで管理し、値はタプルで保持するため、
+大量の要素を扱ってもメモリ使用量を抑えられます。WebElementが必要な場合は
+ハンドル（要素IDとロケーター）から必要になった時点で解決します。
+"""
+
+import importlib.util
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+from .cdp import CDPDriver, CDPElement
+
+# pyarrowが利用可能かどうか（読み込みに時間がかかるため、インポートは使用する時点で行う）
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+class SnapshotSchema:
+    """
+    スナップショットの種類ごとのフィールド定義
+
+    同じ種類のスナップショットは1つのスキーマを共有します。
+    """
+
+    __slots__ = ('name', 'fields', 'index')
+
+    def __init__(self, name: str, fields: Sequence[str]):
+        """
+        Args:
+            name: スキーマ名（例: button, link）
+            fields: フィールド名のリスト
+        """
+        self.name = name
+        self.fields = tuple(fields)
+        self.index = {field: i for i, field in enumerate(self.fields)}
+
+    def __repr__(self):
+        return f"SnapshotSchema({self.name}, {self.fields})"
+
+
+# analyze_page_content 用のスキーマ
+FORM_SCHEMA = SnapshotSchema('form', ('id', 'action', 'method', 'is_enabled'))
+BUTTON_SCHEMA = SnapshotSchema('button', ('id', 'text', 'type', 'is_enabled', 'is_displayed'))
+LINK_SCHEMA = SnapshotSchema('link', ('text', 'href', 'target', 'is_external', 'is_enabled', 'is_displayed'))
+INPUT_SCHEMA = SnapshotSchema('input', (
+    'name', 'id', 'type', 'value', 'placeholder', 'is_required', 'is_readonly', 'is_enabled', 'is_displayed'
+))
+ERROR_SCHEMA = SnapshotSchema('error', ('text', 'is_displayed'))
+
+# find_element_by_text 用のスキーマ
+TEXT_MATCH_SCHEMA = SnapshotSchema('text_match', ('text', 'tag', 'is_displayed', 'is_enabled', 'location', 'size'))
+
+# find_interactive_elements 用のスキーマ
+CLICKABLE_SCHEMA = SnapshotSchema('clickable', (
+    'text', 'tag', 'is_enabled', 'is_displayed', 'location', 'size', 'accessible_name', 'in_viewport'
+))
+INTERACTIVE_INPUT_SCHEMA = SnapshotSchema('interactive_input', (
+    'tag', 'type', 'name', 'value', 'is_enabled', 'is_displayed', 'location', 'size', 'accessible_name', 'in_viewport'
+))
+MEDIA_SCHEMA = SnapshotSchema('media', (
+    'tag', 'src', 'is_displayed', 'location', 'size', 'accessible_name', 'in_viewport'
+))
+
+
+class ElementHandle:
+    """
+    WebElementを必要な時に解決するためのハンドル
+
+    WebDriverの要素IDを優先して使用し、要素が古くなっている場合は
+    ロケーターと出現順から再検索します。
+    """
+
+    __slots__ = ('element_id', 'by', 'value', 'index')
+
+    def __init__(self, element_id: Optional[str] = None, by: Optional[str] = None,
+                 value: Optional[str] = None, index: int = 0):
+        """
+        Args:
+            element_id: WebDriverの要素ID
+            by: 再検索用のロケーター種別（By.XX）
+            value: 再検索用のロケーター値
+            index: ロケーターで検索した結果の中での位置
+        """
+        self.element_id = element_id
+        self.by = by
+        self.value = value
+        self.index = index
+
+    @classmethod
+    def from_element(cls, element: WebElement, by: Optional[str] = None,
+                     value: Optional[str] = None, index: int = 0) -> 'ElementHandle':
+        """WebElementからハンドルを作成する（ドライバーへの通信は発生しない）"""
+        return cls(element.id, by, value, index)
+
+    def resolve(self, driver) -> Optional[WebElement]:
+        """
+        WebElementを解決する
+
+        Args:
+            driver: WebDriverインスタンスまたは CDPDriver
+
+        Returns:
+            WebElement or None: 解決できた要素（CDPDriver の場合は CDPElement）。見つからない場合はNone
+        """
+        if driver is None:
+            return None
+
+        if self.element_id:
+            # CDPDriver の execute_script は CDPElement のみをページ内の要素として渡せる
+            element_class = CDPElement if isinstance(driver, CDPDriver) else WebElement
+            element = element_class(driver, self.element_id)
+            try:
+                if driver.execute_script("return arguments[0].isConnected;", element):
+                    return element
+            except (StaleElementReferenceException, WebDriverException):
+                pass
+
+        if self.by and self.value is not None:
+            elements = driver.find_elements(self.by, self.value)
+            if self.index < len(elements):
+                return elements[self.index]
+
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONシリアライズ可能な辞書に変換する"""
+        return {'element_id': self.element_id, 'by': self.by, 'value': self.value, 'index': self.index}
+
+    def __repr__(self):
+        return f"ElementHandle({self.by}={self.value}[{self.index}])"
+
+
+class ElementSnapshot:
+    """
+    要素の状態を保持する軽量なスナップショット
+
+    従来の辞書形式の結果と同様に snapshot['text'] や snapshot.get('href') で値を参照でき、
+    snapshot['element'] を参照した時点でWebElementを解決します。
+    """
+
+    __slots__ = ('schema', 'values', 'handle', '_browser', '_element')
+
+    def __init__(self, schema: SnapshotSchema, values: Sequence[Any],
+                 handle: Optional[ElementHandle] = None, browser: Optional[Any] = None):
+        """
+        Args:
+            schema: フィールド定義
+            values: スキーマのフィールド順に並んだ値
+            handle: WebElement解決用のハンドル
+            browser: 解決時にドライバーを参照するBrowserインスタンス
+        """
+        self.schema = schema
+        self.values = tuple(values)
+        self.handle = handle
+        self._browser = browser
+        self._element = None
+
+    @property
+    def element(self) -> Optional[WebElement]:
+        """WebElement（最初の参照時に解決）"""
+        if self._element is None and self.handle is not None and self._browser is not None:
+            self._element = self.handle.resolve(getattr(self._browser, 'driver', None))
+        return self._element
+
+    def release(self):
+        """解決済みのWebElementへの参照を破棄する"""
+        self._element = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'element':
+            return self.element
+        try:
+            return self.values[self.schema.index[key]]
+        except KeyError:
+            raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """辞書と同様に値を取得する"""
+        if key == 'element':
+            return self.element
+        index = self.schema.index.get(key)
+        return self.values[index] if index is not None else default
+
+    def keys(self) -> Tuple[str, ...]:
+        """フィールド名の一覧（element を含む）"""
+        return self.schema.fields + ('element',)
+
+    def __contains__(self, key: str) -> bool:
+        return key == 'element' or key in self.schema.index
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.schema.fields) + 1
+
+    def to_dict(self, include_handle: bool = True) -> Dict[str, Any]:
+        """
+        JSONシリアライズ可能な辞書に変換する
+
+        Args:
+            include_handle: ハンドル情報を含めるかどうか
+
+        Returns:
+            dict: フィールド名と値の辞書
+        """
+        result = dict(zip(self.schema.fields, self.values))
+        if include_handle and self.handle is not None:
+            result['handle'] = self.handle.to_dict()
+        return result
+
+    def __repr__(self):
+        preview = ', '.join(f"{k}={v!r}" for k, v in list(zip(self.schema.fields, self.values))[:3])
+        return f"ElementSnapshot[{self.schema.name}]({preview})"
+
+
+def capture_snapshot(schema: SnapshotSchema, values: Sequence[Any], element: Optional[WebElement] = None,
+                     by: Optional[str] = None, value: Optional[str] = None, index: int = 0,
+                     browser: Optional[Any] = None) -> ElementSnapshot:
+    """
+    WebElementからスナップショットを作成する
+
+    Args:
+        schema: フィールド定義
+        values: スキーマのフィールド順に並んだ値
+        element: 元のWebElement（要素IDのみを保持）
+        by: 再検索用のロケーター種別
+        value: 再検索用のロケーター値
+        index: ロケーターで検索した結果の中での位置
+        browser: Browserインスタンス
+
+    Returns:
+        ElementSnapshot: 作成したスナップショット
+    """
+    handle = None
+    if element is not None:
+        handle = ElementHandle.from_element(element, by, value, index)
+    elif by is not None:
+        handle = ElementHandle(None, by, value, index)
+    return ElementSnapshot(schema, values, handle, browser)
+
+
+def snapshots_to_columns(snapshots: Iterable[ElementSnapshot], include_handle: bool = False) -> Dict[str, List[Any]]:
+    """
+    同じスキーマのスナップショットを列指向の辞書に変換する
+
+    Args:
+        snapshots: スナップショットのリスト
+        include_handle: 要素IDとロケーターの列を含めるかどうか
+
+    Returns:
+        dict: フィールド名ごとの値のリスト
+    """
+    snapshots = list(snapshots)
+    if not snapshots:
+        return {}
+
+    schema = snapshots[0].schema
+    columns = {field: [] for field in schema.fields}
+    if include_handle:
+        for key in ('element_id', 'by', 'value', 'index'):
+            columns[f'handle_{key}'] = []
+
+    for snapshot in snapshots:
+        if snapshot.schema is not schema:
+            raise ValueError(f"異なるスキーマのスナップショットが含まれています: {snapshot.schema.name}")
+        for field, value in zip(schema.fields, snapshot.values):
+            # 位置やサイズの辞書はJSON文字列として格納する
+            columns[field].append(json.dumps(value) if isinstance(value, dict) else value)
+        if include_handle:
+            handle = snapshot.handle or ElementHandle()
+            for key in ('element_id', 'by', 'value', 'index'):
+                columns[f'handle_{key}'].append(getattr(handle, key))
+
+    return columns
+
+
+def snapshots_to_arrow(snapshots: Iterable[ElementSnapshot], include_handle: bool = False):
+    """
+    スナップショットをpyarrow.Tableに変換する
+
+    Args:
+        snapshots: 同じスキーマのスナップショットのリスト
+        include_handle: 要素IDとロケーターの列を含めるかどうか
+
+    Returns:
+        pyarrow.Table: 変換結果
+
+    Raises:
+        ImportError: pyarrowがインストールされていない場合
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("pyarrowがインストールされていません")
+    import pyarrow
+    return pyarrow.Table.from_pydict(snapshots_to_columns(snapshots, include_handle))
+
+
+def to_serializable(value: Any) -> Any:
+    """
+    解析結果に含まれるスナップショットをJSONシリアライズ可能な形式に変換する
+
+    Args:
+        value: analyze_page_content などの戻り値
+
+    Returns:
+        Any: 辞書・リスト・基本型のみで構成された値
+    """
+    if isinstance(value, ElementSnapshot):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {k: to_serializable(v) for k, v in value.items() if not isinstance(v, WebElement)}
+    if isinstance(value, (list, tuple)):
+        return [to_serializable(v) for v in value]
+    return value
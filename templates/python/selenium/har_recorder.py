@@ -0,0 +1,579 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HAR記録モジュール
+
+DevTools の Network ドメインのイベントから、ページの移動ごとの通信を HAR 1.2 形式で記録します。
+各リクエストの所要時間の内訳（DNS・接続・SSL・送信・待機・受信）、転送サイズ、キャッシュの利用、
+ブロックや失敗の理由を含むため、移動が遅い場合にどのリソースが原因かを確認できます。
+ページごとに遅い・大きいリソースを集計し、実行全体の集計も作成します。
+
+使用例:
+    python -m src.modules.selenium.har_recorder logs/har
+    python -m src.modules.selenium.har_recorder logs/har/20240101_120000_example.com.har --top 20
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+# 集計で表示するリソースの数
+DEFAULT_TOP = 10
+
+# 1ページで記録するリクエストの上限
+DEFAULT_MAX_ENTRIES = 2000
+
+# 実行全体の集計で保持するリソースの数
+MAX_AGGREGATED_RESOURCES = 1000
+
+# 記録するイベント
+NETWORK_EVENTS = (
+    'Network.requestWillBeSent',
+    'Network.requestServedFromCache',
+    'Network.responseReceived',
+    'Network.dataReceived',
+    'Network.loadingFinished',
+    'Network.loadingFailed',
+    'Page.domContentEventFired',
+    'Page.loadEventFired'
+)
+
+
+def _headers(headers: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """DevTools のヘッダーの辞書を HAR のヘッダーのリストに変換する"""
+    return [{'name': name, 'value': str(value)} for name, value in (headers or {}).items()]
+
+
+def _iso_time(wall_time: float) -> str:
+    """UNIX時刻を HAR の日時の文字列に変換する"""
+    return datetime.fromtimestamp(wall_time, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def build_timings(timing: Optional[Dict[str, float]], started: float, finished: Optional[float]) -> Dict[str, float]:
+    """
+    DevTools の ResourceTiming から HAR の timings を作成する
+
+    Args:
+        timing: response.timing（キャッシュから読み込んだ場合などはNone）
+        started: requestWillBeSent の timestamp（秒）
+        finished: loadingFinished / loadingFailed の timestamp（秒。完了していない場合はNone）
+
+    Returns:
+        dict: {blocked, dns, connect, ssl, send, wait, receive}（ミリ秒。該当しない項目は -1）
+    """
+    total = max((finished - started) * 1000, 0) if finished is not None else 0
+    if not timing:
+        return {'blocked': -1, 'dns': -1, 'connect': -1, 'ssl': -1, 'send': 0, 'wait': 0, 'receive': round(total, 3)}
+
+    def span(start_key, end_key):
+        start, end = timing.get(start_key, -1), timing.get(end_key, -1)
+        return round(end - start, 3) if start >= 0 and end >= 0 else -1
+
+    # requestTime から最初の段階の開始までをキューでの待ち時間とする
+    first = next((timing[key] for key in ('dnsStart', 'connectStart', 'sendStart') if timing.get(key, -1) >= 0), 0)
+    queued = max((timing['requestTime'] - started) * 1000, 0) if 'requestTime' in timing else 0
+    headers_end = timing.get('receiveHeadersEnd', timing.get('sendEnd', 0))
+    receive = 0
+    if finished is not None and 'requestTime' in timing:
+        receive = max((finished - timing['requestTime']) * 1000 - headers_end, 0)
+    return {
+        'blocked': round(queued + first, 3),
+        'dns': span('dnsStart', 'dnsEnd'),
+        'connect': span('connectStart', 'connectEnd'),
+        'ssl': span('sslStart', 'sslEnd'),
+        'send': max(span('sendStart', 'sendEnd'), 0),
+        'wait': max(round(headers_end - timing.get('sendEnd', headers_end), 3), 0),
+        'receive': round(receive, 3)
+    }
+
+
+def entry_time(timings: Dict[str, float]) -> float:
+    """HAR の timings から合計時間を計算する（ssl は connect に含まれるため除外）"""
+    return round(sum(value for key, value in timings.items() if key != 'ssl' and value > 0), 3)
+
+
+class HarRecorder:
+    """
+    タブの通信をページの移動ごとに HAR として記録する
+
+    使用例:
+        recorder = HarRecorder(session, session_id).start()
+        recorder.begin_page(url)
+        driver.get(url)
+        har = recorder.end_page()
+    """
+
+    def __init__(self, session, session_id: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            session: CDPSession
+            session_id: 対象のタブのセッションID（省略時はブラウザ全体への接続で送信）
+            max_entries: 1ページで記録するリクエストの上限
+            logger: ロガー（省略可能）
+        """
+        self.session = session
+        self.session_id = session_id
+        self.max_entries = max_entries
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._page = None
+        self._requests: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[Dict[str, Any]] = []
+        self._page_count = 0
+        self.dropped = 0
+
+    @property
+    def active(self) -> bool:
+        """記録中かどうか"""
+        return bool(self._listeners)
+
+    def start(self) -> 'HarRecorder':
+        """
+        イベントの受信を開始する
+
+        Returns:
+            HarRecorder: 自身
+        """
+        if self.active:
+            return self
+        for method in NETWORK_EVENTS:
+            handler = getattr(self, '_on_' + method.split('.', 1)[1])
+            self._listeners.append((method, self.session.on(method, handler, self.session_id)))
+        self.session.enable('Network', session_id=self.session_id)
+        self.session.enable('Page', session_id=self.session_id)
+        return self
+
+    def stop(self):
+        """イベントの受信を終了し、ほかの機能が使用していなければ Network・Page ドメインを無効にする"""
+        if not self.active:
+            return
+        for method, listener in self._listeners:
+            self.session.off(method, listener)
+        self._listeners = []
+        for domain in ('Network', 'Page'):
+            try:
+                self.session.disable(domain, session_id=self.session_id)
+            except Exception as e:
+                self.logger.debug(f"{domain}ドメインを無効にできませんでした: {str(e)}")
+
+    def begin_page(self, url: str):
+        """
+        新しいページの記録を開始する（移動の直前に呼び出す）
+
+        Args:
+            url: 移動先のURL
+        """
+        with self._lock:
+            self._page_count += 1
+            self._page = {
+                'id': f'page_{self._page_count}',
+                'url': url,
+                'wall_time': datetime.now().timestamp(),
+                'timestamp': None,
+                'on_content_load': None,
+                'on_load': None
+            }
+            self._requests = {}
+            self._entries = []
+            self.dropped = 0
+
+    def end_page(self, title: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        ページの記録を終了し、HAR を作成する
+
+        完了していないリクエストは、その時点までの情報で _incomplete を付けて出力します。
+
+        Args:
+            title: ページのタイトル（省略時はURL）
+
+        Returns:
+            dict or None: HAR。begin_page() を呼び出していない場合はNone
+        """
+        with self._lock:
+            page = self._page
+            if page is None:
+                return None
+            entries = self._entries + [self._build_entry(request, None) for request in self._requests.values()]
+            self._page = None
+            self._requests = {}
+            self._entries = []
+
+        entries.sort(key=lambda entry: entry['startedDateTime'])
+        origin = page['timestamp']
+        page_timings = {
+            key: round((page[name] - origin) * 1000, 3) if origin is not None and page[name] is not None else -1
+            for key, name in (('onContentLoad', 'on_content_load'), ('onLoad', 'on_load'))
+        }
+        if self.dropped:
+            self.logger.warning(f"リクエストが多いため {self.dropped}件を記録しませんでした: {page['url']}")
+        return {
+            'log': {
+                'version': '1.2',
+                'creator': {'name': 'browser.har_recorder', 'version': '1.0'},
+                'pages': [{
+                    'startedDateTime': _iso_time(page['wall_time']),
+                    'id': page['id'],
+                    'title': title or page['url'],
+                    'pageTimings': page_timings
+                }],
+                'entries': entries
+            }
+        }
+
+    # --- イベントの処理（配信スレッドで呼び出される） ---
+
+    def _on_requestWillBeSent(self, params: Dict[str, Any]):
+        with self._lock:
+            if self._page is None:
+                return
+            request_id = params['requestId']
+            previous = self._requests.pop(request_id, None)
+            if previous is not None and params.get('redirectResponse'):
+                # リダイレクトは同じ requestId で続くため、前のリクエストを完了させる
+                previous['response'] = params['redirectResponse']
+                self._append(self._build_entry(previous, params['timestamp']))
+            if self._page['timestamp'] is None:
+                self._page['timestamp'] = params['timestamp']
+            if len(self._requests) + len(self._entries) >= self.max_entries:
+                self.dropped += 1
+                return
+            self._requests[request_id] = {
+                'request': params['request'],
+                'type': params.get('type', 'Other'),
+                'wall_time': params.get('wallTime', datetime.now().timestamp()),
+                'timestamp': params['timestamp'],
+                'response': None,
+                'cache': None,
+                'data_length': 0,
+                'encoded_length': 0,
+                'error': None,
+                'blocked_reason': None
+            }
+
+    def _on_requestServedFromCache(self, params: Dict[str, Any]):
+        with self._lock:
+            request = self._requests.get(params['requestId'])
+            if request is not None:
+                request['cache'] = 'memory'
+
+    def _on_responseReceived(self, params: Dict[str, Any]):
+        with self._lock:
+            request = self._requests.get(params['requestId'])
+            if request is None:
+                return
+            response = params['response']
+            request['response'] = response
+            if request['cache'] is None:
+                if response.get('fromDiskCache'):
+                    request['cache'] = 'disk'
+                elif response.get('fromServiceWorker'):
+                    request['cache'] = 'service_worker'
+                elif response.get('fromPrefetchCache'):
+                    request['cache'] = 'prefetch'
+
+    def _on_dataReceived(self, params: Dict[str, Any]):
+        with self._lock:
+            request = self._requests.get(params['requestId'])
+            if request is not None:
+                request['data_length'] += params.get('dataLength', 0)
+
+    def _on_loadingFinished(self, params: Dict[str, Any]):
+        with self._lock:
+            request = self._requests.pop(params['requestId'], None)
+            if request is None:
+                return
+            request['encoded_length'] = params.get('encodedDataLength', 0)
+            self._append(self._build_entry(request, params['timestamp']))
+
+    def _on_loadingFailed(self, params: Dict[str, Any]):
+        with self._lock:
+            request = self._requests.pop(params['requestId'], None)
+            if request is None:
+                return
+            request['error'] = params.get('errorText') or ('canceled' if params.get('canceled') else 'failed')
+            request['blocked_reason'] = params.get('blockedReason') or params.get('corsErrorStatus', {}).get('corsError')
+            self._append(self._build_entry(request, params['timestamp']))
+
+    def _on_domContentEventFired(self, params: Dict[str, Any]):
+        with self._lock:
+            if self._page is not None and self._page['on_content_load'] is None:
+                self._page['on_content_load'] = params['timestamp']
+
+    def _on_loadEventFired(self, params: Dict[str, Any]):
+        with self._lock:
+            if self._page is not None and self._page['on_load'] is None:
+                self._page['on_load'] = params['timestamp']
+
+    def _append(self, entry: Dict[str, Any]):
+        if self._page is not None:
+            self._entries.append(entry)
+
+    def _build_entry(self, request: Dict[str, Any], finished: Optional[float]) -> Dict[str, Any]:
+        """記録したリクエストから HAR のエントリーを作成する"""
+        req = request['request']
+        response = request['response'] or {}
+        timings = build_timings(response.get('timing'), request['timestamp'], finished)
+        protocol = response.get('protocol', '')
+        http_version = {'h2': 'HTTP/2', 'h3': 'HTTP/3'}.get(protocol, protocol.upper() or 'HTTP/1.1')
+        query = urllib.parse.parse_qsl(urllib.parse.urlsplit(req['url']).query, keep_blank_values=True)
+        transfer = request['encoded_length'] or response.get('encodedDataLength', 0)
+
+        entry = {
+            'pageref': self._page['id'] if self._page else None,
+            'startedDateTime': _iso_time(request['wall_time']),
+            'time': entry_time(timings),
+            'request': {
+                'method': req.get('method', 'GET'),
+                'url': req['url'],
+                'httpVersion': http_version,
+                'headers': _headers(req.get('headers')),
+                'queryString': [{'name': name, 'value': value} for name, value in query],
+                'cookies': [],
+                'headersSize': -1,
+                'bodySize': len(req.get('postData', '')) if req.get('postData') else 0
+            },
+            'response': {
+                'status': response.get('status', 0),
+                'statusText': response.get('statusText', ''),
+                'httpVersion': http_version,
+                'headers': _headers(response.get('headers')),
+                'cookies': [],
+                'content': {'size': request['data_length'], 'mimeType': response.get('mimeType', '')},
+                'redirectURL': (response.get('headers') or {}).get('location', ''),
+                'headersSize': -1,
+                'bodySize': -1 if request['cache'] else transfer
+            },
+            'cache': {},
+            'timings': timings,
+            '_resourceType': request['type'],
+            '_transferSize': transfer,
+            '_fromCache': request['cache']
+        }
+        if response.get('remoteIPAddress'):
+            entry['serverIPAddress'] = response['remoteIPAddress']
+        if request['error']:
+            entry['_error'] = request['error']
+        if request['blocked_reason']:
+            entry['_blockedReason'] = request['blocked_reason']
+        if finished is None:
+            entry['_incomplete'] = True
+        return entry
+
+
+def summarize_har(har: Dict[str, Any], top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """
+    HAR のページの通信を集計する
+
+    Args:
+        har: HAR
+        top: 遅い・大きいリソースとして表示する数
+
+    Returns:
+        dict: {url, started, requests, transfer_bytes, content_bytes, on_load, cached, failed, blocked,
+            incomplete, slowest, largest}（slowest・largest は {url, type, status, time, size} のリスト）
+    """
+    log = har['log']
+    page = log['pages'][0] if log.get('pages') else {}
+    entries = log.get('entries', [])
+
+    def resource(entry):
+        return {
+            'url': entry['request']['url'],
+            'type': entry.get('_resourceType', ''),
+            'status': entry['response']['status'],
+            'time': entry['time'],
+            'size': entry.get('_transferSize', 0)
+        }
+
+    return {
+        'url': page.get('title', ''),
+        'started': page.get('startedDateTime', ''),
+        'requests': len(entries),
+        'transfer_bytes': sum(entry.get('_transferSize', 0) for entry in entries),
+        'content_bytes': sum(entry['response']['content']['size'] for entry in entries),
+        'on_load': page.get('pageTimings', {}).get('onLoad', -1),
+        'cached': sum(1 for entry in entries if entry.get('_fromCache')),
+        'failed': sum(1 for entry in entries if entry.get('_error') and not entry.get('_blockedReason')),
+        'blocked': sum(1 for entry in entries if entry.get('_blockedReason')),
+        'incomplete': sum(1 for entry in entries if entry.get('_incomplete')),
+        'slowest': [resource(entry) for entry in sorted(entries, key=lambda e: -e['time'])[:top]],
+        'largest': [resource(entry) for entry in
+                    sorted(entries, key=lambda e: -e.get('_transferSize', 0))[:top] if entry.get('_transferSize')]
+    }
+
+
+class HarReport:
+    """
+    ページごとの集計を実行全体で集計する
+
+    リソースはクエリ文字列を除いたURLでまとめ、遅い・大きいリソースとして現れたものを集計します。
+    """
+
+    def __init__(self, top: int = DEFAULT_TOP):
+        """
+        Args:
+            top: 表示するページ・リソースの数
+        """
+        self.top = top
+        self.pages: List[Dict[str, Any]] = []
+        self.totals = {'pages': 0, 'requests': 0, 'transfer_bytes': 0, 'cached': 0, 'failed': 0, 'blocked': 0}
+        self._resources: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, summary: Dict[str, Any]):
+        """ページの集計（summarize_har() の戻り値）を追加する"""
+        with self._lock:
+            for key in self.totals:
+                self.totals[key] += 1 if key == 'pages' else summary[key]
+            self.pages.append({key: summary[key] for key in ('url', 'started', 'requests', 'transfer_bytes', 'on_load')})
+            self.pages.sort(key=lambda page: -page['on_load'])
+            del self.pages[self.top:]
+
+            seen = set()
+            for item in summary['slowest'] + summary['largest']:
+                url = item['url'].split('?', 1)[0]
+                if url in seen:
+                    continue
+                seen.add(url)
+                entry = self._resources.setdefault(
+                    url, {'url': url, 'type': item['type'], 'count': 0, 'total_time': 0.0, 'max_time': 0.0, 'bytes': 0}
+                )
+                entry['count'] += 1
+                entry['total_time'] += item['time']
+                entry['max_time'] = max(entry['max_time'], item['time'])
+                entry['bytes'] += item['size']
+            if len(self._resources) > MAX_AGGREGATED_RESOURCES:
+                # 合計時間の短いリソースから破棄する
+                keep = sorted(self._resources.values(), key=lambda e: -e['total_time'])[:MAX_AGGREGATED_RESOURCES]
+                self._resources = {entry['url']: entry for entry in keep}
+
+    def report(self) -> Dict[str, Any]:
+        """
+        実行全体の集計を取得する
+
+        Returns:
+            dict: {totals, slowest_pages, slowest_resources, largest_resources}
+        """
+        with self._lock:
+            resources = [dict(entry, total_time=round(entry['total_time'], 3)) for entry in self._resources.values()]
+            return {
+                'totals': dict(self.totals),
+                'slowest_pages': list(self.pages),
+                'slowest_resources': sorted(resources, key=lambda e: -e['total_time'])[:self.top],
+                'largest_resources': sorted(resources, key=lambda e: -e['bytes'])[:self.top]
+            }
+
+    def save(self, path: str) -> bool:
+        """
+        集計を JSON ファイルに保存する
+
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            return True
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"HARの集計を保存できませんでした: {str(e)}")
+            return False
+
+
+def har_filename(url: str, when: Optional[datetime] = None) -> str:
+    """ページのURLと日時から HAR のファイル名を作成する（例: 20240101_120000_123_example.com.har）"""
+    host = urllib.parse.urlsplit(url).hostname or 'page'
+    stamp = (when or datetime.now()).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+    return f"{stamp}_{re.sub(r'[^A-Za-z0-9.-]', '_', host)}.har"
+
+
+def save_har(har: Dict[str, Any], path: str):
+    """HAR をファイルに保存する"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(har, f, ensure_ascii=False)
+
+
+def format_har_summary(summary: Dict[str, Any]) -> str:
+    """
+    ページの集計を表形式の文字列にする
+
+    Returns:
+        str: ページの概要と、遅い・大きいリソースの一覧
+    """
+    lines = [
+        f"{summary['url']}  {summary['requests']}件  {summary['transfer_bytes'] / 1024:.1f} KB  "
+        f"onLoad: {summary['on_load']:.0f} ms  キャッシュ: {summary['cached']}  失敗: {summary['failed']}  "
+        f"ブロック: {summary['blocked']}  未完了: {summary['incomplete']}"
+    ]
+    for title, key in (("遅いリソース", 'slowest'), ("大きいリソース", 'largest')):
+        lines.append(f"  {title}:")
+        for item in summary[key]:
+            lines.append(f"    {item['time']:>10.1f} ms {item['size'] / 1024:>10.1f} KB  {str(item['status']).rjust(3)}  "
+                         f"{item['type'][:10].ljust(10)}  {item['url'][:100]}")
+    return "\n".join(lines)
+
+
+def format_har_report(report: Dict[str, Any]) -> str:
+    """
+    実行全体の集計を表形式の文字列にする
+
+    Returns:
+        str: 合計と、遅いページ・遅いリソース・大きいリソースの一覧
+    """
+    totals = report['totals']
+    lines = [
+        f"{totals['pages']}ページ  {totals['requests']}件  {totals['transfer_bytes'] / 1024 / 1024:.1f} MB  "
+        f"キャッシュ: {totals['cached']}  失敗: {totals['failed']}  ブロック: {totals['blocked']}",
+        "遅いページ:"
+    ]
+    for page in report['slowest_pages']:
+        lines.append(f"  {page['on_load']:>10.0f} ms {page['requests']:>6}件  {page['url'][:100]}")
+    lines.append("遅いリソース（合計時間）:")
+    for item in report['slowest_resources']:
+        lines.append(f"  {item['total_time']:>10.1f} ms  最大 {item['max_time']:>8.1f} ms {item['count']:>6}回  {item['url'][:100]}")
+    lines.append("大きいリソース（合計サイズ）:")
+    for item in report['largest_resources']:
+        lines.append(f"  {item['bytes'] / 1024:>10.1f} KB {item['count']:>6}回  {item['url'][:100]}")
+    return "\n".join(lines)
+
+
+def find_har_files(paths: Iterable[str]) -> List[str]:
+    """ファイルとディレクトリの一覧から HAR ファイルを探す（ディレクトリは直下の *.har）"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.har')))
+        else:
+            files.append(path)
+    return files
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='HARファイルの通信の集計')
+    parser.add_argument('paths', nargs='+', help='HARファイルまたはディレクトリ')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='表示するリソースの数')
+    args = parser.parse_args()
+
+    run_report = HarReport(args.top)
+    for har_path in find_har_files(args.paths):
+        with open(har_path, encoding='utf-8') as f:
+            page_summary = summarize_har(json.load(f), args.top)
+        run_report.add(page_summary)
+        print(format_har_summary(page_summary))
+        print()
+    print(format_har_report(run_report.report()))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+一覧ページの収集モジュール
+
+無限スクロールや「次へ」ボタンによるページ送りで追加される一覧の項目を、追加された分だけ取得して
+ジェネレーターとして返します。取得した項目には data-harvested 属性を付け、次のラウンドでは
+属性のない項目のみから値を読み取るため、一覧が長くなっても Python に返す量はラウンドごとに一定です。
+
+使用例:
+    for item in browser.harvest("li.result", fields={"title": "h3", "url": "a@href"}, key="url", max_items=500):
+        print(item["title"], item["url"])
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+# 取得済みの項目に付ける属性
+HARVESTED_ATTRIBUTE = 'data-harvested'
+
+# 取得済みの属性がない項目から、指定したフィールドの値を取得するスクリプト
+# fields は [名前, 子要素のCSSセレクタ（空の場合は項目自体）, 属性（text / html / 属性名）] のリスト
+# 項目のセレクタが "li.a, li.b" のような複数のセレクタの場合もあるため、取得済みの判定はセレクタに連結せずに行う
+HARVEST_JS = """
+    var itemSelector = arguments[0], fields = arguments[1], limit = arguments[2], round = arguments[3];
+    var attribute = '""" + HARVESTED_ATTRIBUTE + """';
+    var nodes = document.querySelectorAll(itemSelector);
+    var items = [];
+    for (var i = 0; i < nodes.length && items.length < limit; i++) {
+        var node = nodes[i], values = [];
+        if (node.hasAttribute(attribute)) continue;
+        node.setAttribute(attribute, round);
+        for (var j = 0; j < fields.length; j++) {
+            var target = fields[j][1] ? node.querySelector(fields[j][1]) : node, attr = fields[j][2];
+            if (!target) {
+                values.push(null);
+            } else if (attr === 'text') {
+                values.push((target.textContent || '').replace(/\\s+/g, ' ').trim());
+            } else if (attr === 'html') {
+                values.push(target.innerHTML);
+            } else if ((attr === 'href' || attr === 'src') && target[attr]) {
+                values.push(target[attr]);  // 絶対URLに変換済みの値
+            } else {
+                values.push(target.getAttribute(attr));
+            }
+        }
+        items.push(values);
+    }
+    return items;
+"""
+
+# 一覧を最後までスクロールするスクリプト（コンテナを指定しない場合はページ全体）
+SCROLL_JS = """
+    var container = arguments[0] ? document.querySelector(arguments[0]) : null;
+    if (container) {
+        container.scrollTop = container.scrollHeight;
+    } else {
+        window.scrollTo(0, document.documentElement.scrollHeight);
+    }
+"""
+
+
+def parse_field(spec: str) -> Tuple[str, str]:
+    """
+    フィールドの指定を (子要素のCSSセレクタ, 属性) に変換する
+
+    "h3" は h3 のテキスト、"a@href" は a の href 属性、"@data-id" は項目自体の属性、
+    "" は項目自体のテキストを表します。
+
+    Returns:
+        tuple: (CSSセレクタ, 属性)
+    """
+    selector, _, attr = spec.rpartition('@') if '@' in spec else (spec, '', 'text')
+    return selector.strip(), (attr.strip() or 'text')
+
+
+class Harvester:
+    """
+    一覧の項目を、スクロールまたは「次へ」のクリックで追加されなくなるまで収集する
+
+    使用例:
+        harvester = Harvester(browser, "li.result", fields={"title": "h3"}, next_locator=("list", "next"))
+        for item in harvester:
+            ...
+        print(harvester.stats)
+    """
+
+    def __init__(self, browser, item_selector: str, fields: Optional[Dict[str, str]] = None,
+                 key: Optional[str] = None, next_locator: Any = None, scroll_container: Optional[str] = None,
+                 max_items: int = 0, max_rounds: int = 0, max_seconds: float = 0, idle_rounds: int = 2,
+                 round_timeout: float = 5.0, batch_size: int = 500, seen_limit: int = 100000,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            browser: Browser インスタンス
+            item_selector: 一覧の項目のCSSセレクタ
+            fields: {フィールド名: 指定} の辞書（指定は parse_field を参照。省略時は項目のテキスト）
+            key: 重複の判定に使うフィールド名（省略時は取得済みの属性のみで判定）
+            next_locator: 「次へ」ボタンのロケーター（省略時はスクロールで読み込む）
+            scroll_container: スクロールする要素のCSSセレクタ（省略時はページ全体）
+            max_items: 収集する項目の上限（0で無制限）
+            max_rounds: スクロール・ページ送りの回数の上限（0で無制限）
+            max_seconds: 収集する時間の上限（0で無制限）
+            idle_rounds: 新しい項目がないラウンドがこの回数続いたら終了する
+            round_timeout: 1ラウンドで新しい項目を待つ秒数
+            batch_size: 1回のスクリプト実行で取得する項目の上限
+            seen_limit: 重複の判定のために保持するキーの数
+            logger: ロガー（省略時はブラウザのロガー）
+        """
+        self.browser = browser
+        self.item_selector = item_selector
+        self.fields = [(name,) + parse_field(spec) for name, spec in (fields or {'text': ''}).items()]
+        self.key = key
+        self.next_locator = next_locator
+        self.scroll_container = scroll_container
+        self.max_items = max_items
+        self.max_rounds = max_rounds
+        self.max_seconds = max_seconds
+        self.idle_rounds = idle_rounds
+        self.round_timeout = round_timeout
+        self.batch_size = batch_size
+        self.seen_limit = seen_limit
+        self.logger = logger or getattr(browser, 'logger', None) or logging.getLogger(__name__)
+
+        self._seen: 'OrderedDict[Any, None]' = OrderedDict()
+        self.stats = {'rounds': 0, 'items': 0, 'duplicates': 0, 'elapsed': 0.0, 'stop_reason': None}
+
+    def _is_new(self, item: Dict[str, Any]) -> bool:
+        """キーが取得済みでなければ記録してTrueを返す（保持するキーの数は seen_limit まで）"""
+        if self.key is None:
+            return True
+        value = item.get(self.key)
+        if value in self._seen:
+            self.stats['duplicates'] += 1
+            return False
+        self._seen[value] = None
+        if len(self._seen) > self.seen_limit:
+            self._seen.popitem(last=False)
+        return True
+
+    def _collect(self, round_number: int, timeout: float) -> List[Dict[str, Any]]:
+        """新しい項目が現れるまで待ち（最大 timeout 秒）、追加された項目を取得する"""
+        names = [name for name, _, _ in self.fields]
+        payload = [[name, selector, attr] for name, selector, attr in self.fields]
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                rows = self.browser.driver.execute_script(
+                    HARVEST_JS, self.item_selector, payload, self.batch_size, str(round_number)
+                )
+            except WebDriverException as e:
+                # ページの移動中はスクリプトを実行できないため、再試行する
+                self.logger.debug(f"項目の取得を再試行します: {str(e)}")
+                rows = []
+            if rows or time.monotonic() >= deadline:
+                return [dict(zip(names, row)) for row in rows or []]
+            time.sleep(0.2)
+
+    def _advance(self) -> bool:
+        """スクロールまたは「次へ」のクリックで次の項目を読み込む（次がない場合はFalse）"""
+        if self.next_locator is None:
+            self.browser.driver.execute_script(SCROLL_JS, self.scroll_container)
+            return True
+
+        button = self.browser.wait_for_element(self.next_locator, timeout=1, visible=True)
+        if button is None or not button.is_enabled() or button.get_attribute('aria-disabled') == 'true':
+            return False
+        button.click()
+        return True
+
+    def _stop_reason(self, started: float) -> Optional[str]:
+        if self.max_items and self.stats['items'] >= self.max_items:
+            return 'max_items'
+        if self.max_rounds and self.stats['rounds'] >= self.max_rounds:
+            return 'max_rounds'
+        if self.max_seconds and time.monotonic() - started >= self.max_seconds:
+            return 'max_seconds'
+        return None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        started = time.monotonic()
+        idle = 0
+        waited = False
+        pending = self._collect(0, 0)
+        try:
+            while True:
+                # 取得した項目を返す（ページ内に残っている分は次のラウンドで取得）
+                fresh = 0
+                while pending:
+                    new_items = [item for item in pending if self._is_new(item)]
+                    fresh += len(new_items)
+                    for item in new_items:
+                        if self.max_items and self.stats['items'] >= self.max_items:
+                            break
+                        self.stats['items'] += 1
+                        yield item
+                    if len(pending) < self.batch_size or self._stop_reason(started):
+                        break
+                    pending = self._collect(self.stats['rounds'], 0)
+
+                reason = self._stop_reason(started)
+                if reason:
+                    self.stats['stop_reason'] = reason
+                    return
+
+                # 新しい項目（取得済みのキーと重複しない項目）がないラウンドを数える
+                # （仮想スクロールで作り直された項目だけが取得された場合も、新しい項目がないとみなす）
+                if waited:
+                    idle = 0 if fresh else idle + 1
+                    if idle >= self.idle_rounds:
+                        self.stats['stop_reason'] = 'exhausted'
+                        return
+
+                # 「次へ」をクリックした後に項目が現れていない場合は、次のページに進まずに待機を続ける
+                # （読み込み中にクリックすると、読み込み中のページを飛ばしてしまう）
+                if not (idle and self.next_locator is not None):
+                    if not self._advance():
+                        self.stats['stop_reason'] = 'no_next'
+                        return
+                    self.stats['rounds'] += 1
+
+                pending = self._collect(self.stats['rounds'], self.round_timeout)
+                waited = True
+        finally:
+            self.stats['elapsed'] = time.monotonic() - started
+            self.logger.info(
+                f"一覧の収集を終了しました: {self.stats['items']}件, {self.stats['rounds']}ラウンド, "
+                f"理由: {self.stats['stop_reason'] or '中断'}"
+            )
@@ -0,0 +1,522 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ジョブランナーモジュール
+
+SQLiteに保存した作業キューを、複数のワーカープロセスで処理します。
+各ワーカーは自身のBrowserを持ち、URLを一定時間だけ借り受け（リース）て処理し、
+抽出結果をキューと同じデータベースに保存します。プロセスが異常終了しても
+リースの期限が切れたURLは他のワーカーが再処理するため、再起動すると
+中断したところから処理を再開できます。
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .element_snapshot import to_serializable
+
+
+# タスクの状態
+STATUS_PENDING = 'pending'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class WorkQueue:
+    """
+    SQLiteを使用した永続的な作業キュー
+
+    1つのデータベースファイルを複数のプロセスから同時に使用できます。
+    接続はプロセスごとに作成してください。
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        """
+        Args:
+            db_path: データベースファイルのパス
+            timeout: ロック待機のタイムアウト（秒）
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        """テーブルを作成する（既存の場合は何もしない）"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                data TEXT,
+                completed_at REAL
+            );
+        """)
+
+    def close(self):
+        """接続を閉じる"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        URLをキューに追加する（登録済みのURLは無視）
+
+        Args:
+            urls: 追加するURL
+
+        Returns:
+            int: 新たに追加した件数
+        """
+        now = time.time()
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, status, updated_at) VALUES (?, ?, ?)",
+                ((url, STATUS_PENDING, now) for url in urls)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.conn.total_changes - before
+
+    def lease(self, owner: str, visibility_timeout: float, max_attempts: int) -> Optional[Tuple[int, str, int]]:
+        """
+        処理待ちのURLを1件借り受ける
+
+        リース期限が切れたURL（処理中のワーカーが停止したもの）も対象になります。
+
+        Args:
+            owner: ワーカーの識別子
+            visibility_timeout: リースの有効期間（秒）
+            max_attempts: 最大試行回数
+
+        Returns:
+            tuple or None: (タスクID, URL, 試行回数)。処理対象がない場合はNone
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 試行回数の上限に達したまま期限切れになったリースは失敗扱いにする
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (STATUS_FAILED, now, STATUS_LEASED, now, max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT id, url, attempts FROM tasks "
+                "WHERE (status = ? OR (status = ? AND lease_expires < ?)) AND attempts < ? "
+                "ORDER BY id LIMIT 1",
+                (STATUS_PENDING, STATUS_LEASED, now, max_attempts)
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            task_id, url, attempts = row
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, attempts = ?, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = ?",
+                (STATUS_LEASED, attempts + 1, owner, now + visibility_timeout, now, task_id)
+            )
+            self.conn.execute("COMMIT")
+            return task_id, url, attempts + 1
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def renew(self, task_id: int, owner: str, visibility_timeout: float) -> bool:
+        """
+        リースの期限を延長する（処理中のワーカーが定期的に呼び出す）
+
+        Args:
+            task_id: タスクID
+            owner: ワーカーの識別子
+            visibility_timeout: 現在時刻からのリースの有効期間（秒）
+
+        Returns:
+            bool: 延長した場合はTrue。リースが期限切れで他のワーカーに移っている場合はFalse
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (now + visibility_timeout, now, task_id, STATUS_LEASED, owner)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: int, url: str, data: Any, owner: str) -> bool:
+        """
+        処理結果を保存し、タスクを完了にする
+
+        リースが期限切れで他のワーカーに移っている場合は、結果を保存しません。
+
+        Args:
+            task_id: タスクID
+            url: 処理したURL
+            data: 保存する結果（JSONシリアライズ可能な値）
+            owner: リースを借り受けたワーカーの識別子
+
+        Returns:
+            bool: 保存した場合はTrue。リースを保持していない場合はFalse
+        """
+        now = time.time()
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, last_error = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (STATUS_DONE, now, task_id, STATUS_LEASED, owner)
+            )
+            if cursor.rowcount != 1:
+                self.conn.execute("ROLLBACK")
+                return False
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (url, data, completed_at) VALUES (?, ?, ?)",
+                (url, payload, now)
+            )
+            self.conn.execute("COMMIT")
+            return True
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def fail(self, task_id: int, error: str, max_attempts: int, owner: str) -> bool:
+        """
+        処理の失敗を記録する
+
+        試行回数が上限未満の場合は処理待ちに戻し、上限に達した場合は失敗にします。
+        リースが期限切れで他のワーカーに移っている場合は何もしません。
+
+        Args:
+            task_id: タスクID
+            error: エラーメッセージ
+            max_attempts: 最大試行回数
+            owner: リースを借り受けたワーカーの識別子
+
+        Returns:
+            bool: 記録した場合はTrue。リースを保持していない場合はFalse
+        """
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (max_attempts, STATUS_FAILED, STATUS_PENDING, error, time.time(), task_id, STATUS_LEASED, owner)
+        )
+        return cursor.rowcount == 1
+
+    def retry_failed(self) -> int:
+        """
+        失敗したタスクを処理待ちに戻す（試行回数もリセット）
+
+        Returns:
+            int: 戻した件数
+        """
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = ?, attempts = 0, updated_at = ? WHERE status = ?",
+            (STATUS_PENDING, time.time(), STATUS_FAILED)
+        )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """
+        状態ごとのタスク数を取得する
+
+        Returns:
+            dict: {pending, leased, done, failed, total}
+        """
+        counts = {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        for status, count in self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            counts[status] = count
+        counts['total'] = sum(counts.values())
+        return counts
+
+    def has_unfinished(self) -> bool:
+        """処理待ちまたは処理中のタスクがあるかどうか"""
+        row = self.conn.execute(
+            "SELECT 1 FROM tasks WHERE status IN (?, ?) LIMIT 1", (STATUS_PENDING, STATUS_LEASED)
+        ).fetchone()
+        return row is not None
+
+    def results(self) -> Iterator[Tuple[str, Any]]:
+        """
+        保存済みの結果を順に取得する
+
+        Yields:
+            tuple: (URL, 結果)
+        """
+        for url, data in self.conn.execute("SELECT url, data FROM results ORDER BY completed_at"):
+            yield url, json.loads(data) if data is not None else None
+
+    def failures(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        失敗したタスクを取得する
+
+        Yields:
+            tuple: (URL, 最後のエラーメッセージ)
+        """
+        yield from self.conn.execute("SELECT url, last_error FROM tasks WHERE status = ? ORDER BY id", (STATUS_FAILED,))
+
+
+class LeaseHeartbeat:
+    """
+    処理中のタスクのリースを別スレッドで定期的に延長する
+
+    1ページの処理が visibility_timeout より長くかかっても、処理中のワーカーが動いている間は
+    他のワーカーにリースが移らないようにします。SQLiteの接続はスレッド間で共有できないため、
+    延長用の接続をスレッド内で作成します。
+
+    使用例:
+        with LeaseHeartbeat(db_path, task_id, worker_id, visibility_timeout):
+            ...
+    """
+
+    def __init__(self, db_path: str, task_id: int, owner: str, visibility_timeout: float,
+                 interval: Optional[float] = None, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            db_path: キューのデータベースファイルのパス
+            task_id: タスクID
+            owner: ワーカーの識別子
+            visibility_timeout: 延長するリースの有効期間（秒）
+            interval: 延長する間隔（秒。省略時は有効期間の1/3）
+            logger: ロガー（省略可能）
+        """
+        self.db_path = db_path
+        self.task_id = task_id
+        self.owner = owner
+        self.visibility_timeout = visibility_timeout
+        self.interval = interval if interval is not None else max(visibility_timeout / 3, 0.1)
+        self.logger = logger or logging.getLogger(__name__)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'LeaseHeartbeat':
+        """延長を開始する"""
+        self._thread = threading.Thread(target=self._run, name=f"lease-{self.task_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """延長を終了する"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        queue = WorkQueue(self.db_path)
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    if not queue.renew(self.task_id, self.owner, self.visibility_timeout):
+                        self.lost = True
+                        self.logger.warning(f"タスク {self.task_id} のリースが他のワーカーに移りました")
+                        return
+                except sqlite3.Error as e:
+                    self.logger.debug(f"リースを延長できませんでした: {str(e)}")
+        finally:
+            queue.close()
+
+    def __enter__(self) -> 'LeaseHeartbeat':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def default_extractor(browser) -> Dict[str, Any]:
+    """デフォルトの抽出処理（analyze_page_content の結果をシリアライズ可能な形式で返す）"""
+    return to_serializable(browser.analyze_page_content())
+
+
+def _worker_main(db_path: str, worker_id: str, options: Dict[str, Any]):
+    """
+    ワーカープロセスの処理
+
+    キューが空になり、他のワーカーが処理中のタスクもなくなるまでURLを処理します。
+    extractor はプロセス間で受け渡すため、モジュールのトップレベルで定義された関数にしてください。
+    """
+    from .browser import Browser
+
+    logger = logging.getLogger(f"{__name__}.{worker_id}")
+    queue = WorkQueue(db_path)
+    browser = Browser(logger=logger, **options['browser_kwargs'])
+    extractor = options['extractor'] or default_extractor
+    processed = 0
+
+    try:
+        if not browser.setup():
+            logger.error(f"ワーカー {worker_id} のブラウザのセットアップに失敗しました")
+            return
+
+        while True:
+            task = queue.lease(worker_id, options['visibility_timeout'], options['max_attempts'])
+            if task is None:
+                # 他のワーカーのリース切れを拾うため、処理中のタスクがなくなるまで待機する
+                if not queue.has_unfinished():
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            task_id, url, attempt = task
+            try:
+                # 処理中はリースを延長し続ける
+                with LeaseHeartbeat(db_path, task_id, worker_id, options['visibility_timeout'], logger=logger):
+                    if not browser.navigate_to(url):
+                        raise RuntimeError("ページへの移動に失敗しました")
+                    data = extractor(browser)
+                if queue.complete(task_id, url, data, worker_id):
+                    processed += 1
+                else:
+                    logger.warning(f"リースが他のワーカーに移ったため、結果を破棄しました: {url}")
+            except Exception as e:
+                logger.warning(f"URLの処理に失敗しました ({attempt}/{options['max_attempts']}): {url} - {str(e)}")
+                logger.debug(traceback.format_exc())
+                queue.fail(task_id, str(e), options['max_attempts'], worker_id)
+
+    finally:
+        browser.quit()
+        queue.close()
+        logger.info(f"ワーカー {worker_id} を終了します（処理件数: {processed}）")
+
+
+class JobRunner:
+    """
+    作業キューを複数のワーカープロセスで処理するランナー
+
+    使用例:
+        runner = JobRunner("data/jobs/nightly.db", workers=4, notifier=SlackNotifier())
+        runner.enqueue(urls)
+        runner.run()
+        for url, data in runner.queue.results():
+            ...
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, extractor: Optional[Callable[[Any], Any]] = None,
+                 visibility_timeout: float = 300, max_attempts: int = 3, poll_interval: float = 5.0,
+                 browser_kwargs: Optional[Dict[str, Any]] = None, notifier: Optional[Any] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            db_path: キューのデータベースファイルのパス
+            workers: ワーカープロセス数
+            extractor: ページ表示後に呼び出す抽出処理 extractor(browser)（トップレベルの関数）
+            visibility_timeout: リースの有効期間（秒）。処理中は有効期間の1/3ごとに延長されるため、
+                ワーカーが異常終了してから他のワーカーが再処理するまでの時間になります
+            max_attempts: 1つのURLの最大試行回数
+            poll_interval: 他のワーカーのリース切れを待つ間隔（秒）
+            browser_kwargs: 各ワーカーのBrowserに渡す引数（headless, selectors_path, config など）
+            notifier: 完了通知に使用するオブジェクト（SlackNotifier など、send_success を持つもの）
+            logger: ロガー（省略可能）
+        """
+        self.db_path = db_path
+        self.workers = max(int(workers), 1)
+        self.extractor = extractor
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.browser_kwargs = browser_kwargs or {}
+        self.notifier = notifier
+        self.logger = logger or logging.getLogger(__name__)
+        self.queue = WorkQueue(db_path)
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        URLをキューに追加する（登録済みのURLは無視されるため、再実行しても重複しない）
+
+        Args:
+            urls: 追加するURL
+
+        Returns:
+            int: 新たに追加した件数
+        """
+        added = self.queue.enqueue(urls)
+        self.logger.info(f"{added}件のURLをキューに追加しました")
+        return added
+
+    def run(self) -> Dict[str, int]:
+        """
+        ワーカープロセスを起動し、キューが空になるまで処理する
+
+        Returns:
+            dict: 処理後の状態ごとのタスク数
+        """
+        counts = self.queue.counts()
+        self.logger.info(f"ジョブを開始します (ワーカー: {self.workers}, 状態: {counts})")
+        started = time.monotonic()
+
+        options = {
+            'extractor': self.extractor,
+            'visibility_timeout': self.visibility_timeout,
+            'max_attempts': self.max_attempts,
+            'poll_interval': self.poll_interval,
+            'browser_kwargs': self.browser_kwargs
+        }
+
+        processes = []
+        for i in range(self.workers):
+            worker_id = f"worker-{os.getpid()}-{i + 1}"
+            process = multiprocessing.Process(
+                target=_worker_main, args=(self.db_path, worker_id, options), name=worker_id
+            )
+            process.start()
+            processes.append(process)
+
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                self.logger.warning(f"{process.name} が異常終了しました (終了コード: {process.exitcode})")
+
+        counts = self.queue.counts()
+        elapsed = time.monotonic() - started
+        self.logger.info(f"ジョブが終了しました ({elapsed:.1f}秒): {counts}")
+        self._notify_completion(counts, elapsed)
+        return counts
+
+    def _notify_completion(self, counts: Dict[str, int], elapsed: float):
+        """完了通知を送信する"""
+        if not self.notifier:
+            return
+
+        try:
+            message = f"{counts[STATUS_DONE]}/{counts['total']}件のURLを処理しました"
+            context = {
+                "完了": str(counts[STATUS_DONE]),
+                "失敗": str(counts[STATUS_FAILED]),
+                "未処理": str(counts[STATUS_PENDING] + counts[STATUS_LEASED]),
+                "処理時間": f"{elapsed:.1f}秒",
+                "キュー": self.db_path
+            }
+            self.notifier.send_success(message, title="スクレイピングジョブ完了", context=context)
+        except Exception as e:
+            self.logger.error(f"完了通知の送信に失敗しました: {str(e)}")
+
+    def close(self):
+        """キューへの接続を閉じる"""
+        self.queue.close()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+起動プロファイルモジュール
+
+用途に合わせた Chrome の起動オプションの組み合わせ（プロファイル）を名前で管理します。
+[BROWSER] launch_profile で使用するプロファイルを指定し、[LAUNCH_PROFILE:名前] セクションで
+組み込みのプロファイルを変更したり、新しいプロファイルを追加したりできます。
+
+使用例:
+    python -m src.modules.selenium.launch_profiles --list
+    python -m src.modules.selenium.launch_profiles --url https://example.com --profiles lite full-render
+"""
+
+import logging
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# ページ読み込みの待機方式（normal: すべてのリソース / eager: DOM構築まで / none: 待たない）
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# バックグラウンドでの通信や描画の抑制など、大量処理向けの共通オプション
+THROUGHPUT_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-renderer-backgrounding',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--metrics-recording-only',
+    '--mute-audio'
+]
+
+# 組み込みのプロファイル
+BUILTIN_PROFILES = {
+    'lite': {
+        'description': '画像とGPUを使用せず、DOMの構築までを待つ大量処理向けの設定',
+        'headless': True,
+        'arguments': THROUGHPUT_ARGUMENTS + ['--disable-gpu', '--blink-settings=imagesEnabled=false'],
+        'page_load_strategy': 'eager'
+    },
+    'full-render': {
+        'description': 'ヘッドレスで画像やフォントを含めて描画し、すべてのリソースの読み込みを待つ設定',
+        'headless': True,
+        'arguments': THROUGHPUT_ARGUMENTS,
+        'page_load_strategy': 'normal'
+    },
+    'debug': {
+        'description': '画面を表示し、開発者ツールを開いた状態で起動する調査用の設定',
+        'headless': False,
+        'arguments': ['--disable-extensions', '--auto-open-devtools-for-tabs'],
+        'page_load_strategy': 'normal'
+    }
+}
+
+
+def parse_bool(value: Any) -> Optional[bool]:
+    """設定値を真偽値に変換する（空欄の場合はNone）"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('true', '1', 'yes', 'on')
+
+
+def parse_arguments(value: Any) -> List[str]:
+    """カンマ区切りの起動オプションをリストに変換する"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(arg).strip() for arg in value if str(arg).strip()]
+    return [arg.strip() for arg in str(value).split(',') if arg.strip()]
+
+
+class LaunchProfile:
+    """Chrome の起動オプションの組み合わせ"""
+
+    __slots__ = ('name', 'description', 'headless', 'arguments', 'page_load_strategy')
+
+    def __init__(self, name: str, arguments: Optional[List[str]] = None, headless: Optional[bool] = None,
+                 page_load_strategy: str = 'normal', description: str = ''):
+        """
+        Args:
+            name: プロファイル名
+            arguments: Chrome の起動オプション
+            headless: ヘッドレスモード（None の場合は [BROWSER] headless に従う）
+            page_load_strategy: ページ読み込みの待機方式
+            description: 説明
+        """
+        self.name = name
+        self.description = description
+        self.headless = headless
+        self.arguments = list(arguments or [])
+        self.page_load_strategy = page_load_strategy
+
+    def validate(self) -> List[str]:
+        """
+        設定内容を検証する
+
+        Returns:
+            list: 問題点のメッセージのリスト（問題がない場合は空）
+        """
+        errors = []
+        if self.page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            errors.append(
+                f"page_load_strategy は {', '.join(PAGE_LOAD_STRATEGIES)} のいずれかを指定してください: "
+                f"{self.page_load_strategy}"
+            )
+
+        seen = {}
+        for arg in self.arguments:
+            if not arg.startswith('--'):
+                errors.append(f"起動オプションは -- で始めてください: {arg}")
+                continue
+            if arg.split('=', 1)[0] == '--headless':
+                errors.append(f"ヘッドレスモードは headless で指定してください: {arg}")
+                continue
+            flag = arg.split('=', 1)[0]
+            if flag in seen and seen[flag] != arg:
+                errors.append(f"起動オプションの値が重複しています: {seen[flag]} / {arg}")
+            seen[flag] = arg
+        return errors
+
+    def apply(self, options, headless: bool):
+        """
+        Chrome のオプションにプロファイルの設定を追加する
+
+        Args:
+            options: selenium の Options
+            headless: ヘッドレスモードで起動するかどうか
+        """
+        if headless:
+            options.add_argument('--headless=new')
+        for arg in self.arguments:
+            if arg not in options.arguments:
+                options.add_argument(arg)
+        options.page_load_strategy = self.page_load_strategy
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換する"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'headless': self.headless,
+            'arguments': list(self.arguments),
+            'page_load_strategy': self.page_load_strategy
+        }
+
+    def __repr__(self):
+        return f"LaunchProfile({self.name}, headless={self.headless}, strategy={self.page_load_strategy})"
+
+
+def load_profile(name: str, get_config: Optional[Callable[[str, str, Any], Any]] = None) -> LaunchProfile:
+    """
+    プロファイルを読み込んで検証する
+
+    [LAUNCH_PROFILE:名前] セクションの base（元にするプロファイル）、headless、arguments、
+    remove_arguments、page_load_strategy、description で組み込みのプロファイルを上書きします。
+
+    Args:
+        name: プロファイル名
+        get_config: 設定値の取得関数 get_config(section, key, default)（省略時は組み込みのみ）
+
+    Returns:
+        LaunchProfile: 読み込んだプロファイル
+
+    Raises:
+        ValueError: プロファイルが存在しない、または設定内容に問題がある場合
+    """
+    get_config = get_config or (lambda section, key, default: default)
+    section = f"LAUNCH_PROFILE:{name}"
+
+    base_name = str(get_config(section, 'base', '') or '').strip()
+    if base_name and base_name not in BUILTIN_PROFILES:
+        raise ValueError(f"起動プロファイル {name} の base が見つかりません: {base_name}")
+    base = BUILTIN_PROFILES.get(base_name or name)
+
+    arguments = parse_arguments(get_config(section, 'arguments', ''))
+    if base is None and not arguments and get_config(section, 'page_load_strategy', None) is None:
+        available = ', '.join(BUILTIN_PROFILES)
+        raise ValueError(f"起動プロファイルが見つかりません: {name}（組み込み: {available}）")
+    base = base or {}
+
+    removed = set(parse_arguments(get_config(section, 'remove_arguments', '')))
+    merged = [arg for arg in base.get('arguments', []) if arg not in removed]
+    merged += [arg for arg in arguments if arg not in merged]
+
+    headless = parse_bool(get_config(section, 'headless', ''))
+    profile = LaunchProfile(
+        name,
+        arguments=merged,
+        headless=base.get('headless') if headless is None else headless,
+        page_load_strategy=str(get_config(section, 'page_load_strategy', base.get('page_load_strategy', 'normal'))).lower(),
+        description=str(get_config(section, 'description', base.get('description', '')))
+    )
+
+    errors = profile.validate()
+    if errors:
+        raise ValueError(f"起動プロファイル {name} の設定が正しくありません: " + " / ".join(errors))
+    return profile
+
+
+def benchmark_profiles(urls: Iterable[str], profiles: Iterable[str], runs: int = 1,
+                       **browser_kwargs) -> Dict[str, Dict[str, float]]:
+    """
+    プロファイルごとに起動・ページ移動の所要時間とメモリ使用量を計測する
+
+    Args:
+        urls: 移動するURL
+        profiles: 比較するプロファイル名
+        runs: 各プロファイルの実行回数
+        **browser_kwargs: Browser に渡す引数（config など）
+
+    Returns:
+        dict: {プロファイル名: {setup_s, navigate_p50_s, navigate_p95_s, peak_rss_mb}}
+    """
+    from .browser import Browser
+
+    urls = list(urls)
+    results = {}
+    base_config = browser_kwargs.pop('config', None) or {}
+    for name in profiles:
+        config = {section: dict(values) for section, values in base_config.items()}
+        browser_config = config.setdefault('BROWSER', {})
+        browser_config['launch_profile'] = name
+        browser_config['use_daemon'] = 'false'
+        browser_config['auto_screenshot'] = 'false'
+
+        setups, navigations, peaks = [], [], []
+        for _ in range(runs):
+            browser = Browser(config=config, **browser_kwargs)
+            try:
+                if not browser.setup():
+                    break
+                setups.append(browser.setup_timings.get('total', 0.0))
+                for url in urls:
+                    started = time.perf_counter()
+                    browser.navigate_to(url)
+                    navigations.append(time.perf_counter() - started)
+                peaks.append(browser.get_process_metrics()['peak_rss_mb'])
+            finally:
+                browser.quit()
+
+        if setups:
+            navigations.sort()
+            results[name] = {
+                'setup_s': statistics.mean(setups),
+                'navigate_p50_s': statistics.median(navigations) if navigations else 0.0,
+                'navigate_p95_s': navigations[min(int(len(navigations) * 0.95), len(navigations) - 1)] if navigations else 0.0,
+                'peak_rss_mb': max(peaks) if peaks else 0.0
+            }
+    return results
+
+
+def format_profile_benchmark(results: Dict[str, Dict[str, float]]) -> str:
+    """benchmark_profiles の結果を表形式の文字列にする"""
+    columns = ('setup_s', 'navigate_p50_s', 'navigate_p95_s', 'peak_rss_mb')
+    lines = ["プロファイル".ljust(14) + "".join(column.rjust(16) for column in columns)]
+    for name, stats in results.items():
+        lines.append(name.ljust(14) + "".join(f"{stats[column]:.3f}".rjust(16) for column in columns))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Chrome の起動プロファイルの一覧と比較')
+    parser.add_argument('--list', action='store_true', help='組み込みのプロファイルを表示する')
+    parser.add_argument('--url', action='append', default=[], help='移動するURL（複数指定可）')
+    parser.add_argument('--profiles', nargs='+', default=list(BUILTIN_PROFILES), help='比較するプロファイル')
+    parser.add_argument('--runs', type=int, default=1, help='各プロファイルの実行回数')
+    args = parser.parse_args()
+
+    if args.list or not args.url:
+        for profile_name in BUILTIN_PROFILES:
+            profile = load_profile(profile_name)
+            print(f"{profile.name}: {profile.description}")
+            print(f"    headless={profile.headless}, page_load_strategy={profile.page_load_strategy}")
+            print(f"    {' '.join(profile.arguments)}")
+    else:
+        logging.basicConfig(level=logging.INFO)
+        print(format_profile_benchmark(benchmark_profiles(args.url, args.profiles, args.runs)))
@@ -64,6 +64,10 @@ def handle_errors(screenshot_name=None, raise_exception=False):
                     screenshot_file = f"{screenshot_name}_{int(time.time())}.png"
                     self.browser.save_screenshot(screenshot_file)
                 
+                # 画面を録画している場合は、エラーに至るまでの直近の画面を保存
+                if hasattr(self, 'browser') and hasattr(self.browser, 'save_screencast'):
+                    self.browser.save_screencast(f"{screenshot_name or method_name}_error")
+                
                 if raise_exception:
                     raise
                 return False
@@ -91,6 +95,22 @@ class LoginPage:
     login_button = None
     popup_notice = None
     
+    # selectors.csv の (グループ, 名前) と POM のロケーターの対応
+    LOCATOR_MAP = {
+        ('login', 'account_key'): 'account_key_input',
+        ('login', 'username'): 'username_input',
+        ('login', 'password'): 'password_input',
+        ('login', 'login_button'): 'login_button',
+        ('popup', 'login_notice'): 'popup_notice'
+    }
+    
+    # selectors.csv のセレクタが一致しない場合の候補
+    FALLBACK_XPATHS = {
+        'username_input': '//input[@name="username" or @id="username" or contains(@class, "username")]',
+        'password_input': '//input[@name="password" or @id="password" or @type="password"]',
+        'login_button': '//button[@type="submit" or contains(@class, "submit") or contains(@class, "login")]'
+    }
+    
     def __init__(
         self, 
         selector_group: str = 'login', 
@@ -122,6 +142,9 @@ class LoginPage:
         self.browser_created = False
         self._init_browser(browser)
         
+        # 入力済みのフィールド名（submit_login_form では残りのフィールドのみを入力する）
+        self.filled_fields = set()
+        
         # セレクタとフォールバックロケーターの設定
         self._load_selectors_from_browser()
         
@@ -227,17 +250,8 @@ class LoginPage:
             self.logger.warning("Browser クラスでセレクタが読み込まれていません")
             return
         
-        # POMで必要なロケーターのマッピング定義
-        locator_map = {
-            ('login', 'account_key'): 'account_key_input',
-            ('login', 'username'): 'username_input',
-            ('login', 'password'): 'password_input',
-            ('login', 'login_button'): 'login_button',
-            ('popup', 'login_notice'): 'popup_notice'
-        }
-        
         # 各ロケーターをマッピングに基づいて設定
-        for (group, name), attr_name in locator_map.items():
+        for (group, name), attr_name in self.LOCATOR_MAP.items():
             if group in self.browser.selectors and name in self.browser.selectors[group]:
                 selector_info = self.browser.selectors[group][name]
                 by_type = self.browser._get_by_type(selector_info['selector_type'])
@@ -258,19 +272,19 @@ class LoginPage:
     
     def _setup_fallback_locators(self):
         """
-        セレクタが見つからない場合のフォールバックロケーターを設定
+        フォールバックロケーターを設定
+        
+        汎用的なXPathを selectors.csv のセレクタの優先順位の低い候補として追加し、
+        selectors.csv のセレクタが一致しない場合でも同じ検索の中で見つけられるようにします。
         """
-        # ユーザー名入力欄
-        if LoginPage.username_input is None:
-            LoginPage.username_input = (By.XPATH, '//input[@name="username" or @id="username" or contains(@class, "username")]')
-            
-        # パスワード入力欄
-        if LoginPage.password_input is None:
-            LoginPage.password_input = (By.XPATH, '//input[@name="password" or @id="password" or @type="password"]')
+        for (group, name), attr_name in self.LOCATOR_MAP.items():
+            fallback = self.FALLBACK_XPATHS.get(attr_name)
+            if fallback is None:
+                continue
             
-        # ログインボタン
-        if LoginPage.login_button is None:
-            LoginPage.login_button = (By.XPATH, '//button[@type="submit" or contains(@class, "submit") or contains(@class, "login")]')
+            self.browser.add_selector_candidate(group, name, 'xpath', fallback, 'フォールバック')
+            if getattr(LoginPage, attr_name) is None:
+                setattr(LoginPage, attr_name, (By.XPATH, fallback))
             
         self.logger.debug("フォールバックロケーターを設定しました")
     
@@ -327,6 +341,20 @@ class LoginPage:
         element_timeout_value = self._get_config_value("LOGIN", "element_timeout", "10")
         self.element_timeout = int(element_timeout_value) if isinstance(element_timeout_value, str) else int(element_timeout_value or 10)
     
+    def _get_secret(self, name: str) -> str:
+        """
+        secrets.env の値を環境変数から取得する（secrets.env は最初の取得時に読み込まれる）
+        
+        Args:
+            name: 環境変数名
+            
+        Returns:
+            str: 値。設定されていない場合は空文字列
+        """
+        if ENV_UTILS_AVAILABLE:
+            return env.get_env_var(name, "") or ""
+        return os.environ.get(name, "")
+    
     def _load_auth_config(self):
         """認証関連設定を読み込む"""
         # ベーシック認証設定
@@ -335,11 +363,11 @@ class LoginPage:
         
         if self.basic_auth_enabled:
             # 環境変数から認証情報を取得（secrets.envに保存）
-            self.basic_auth_username = os.environ.get("LOGIN_BASIC_AUTH_USERNAME", "")
+            self.basic_auth_username = self._get_secret("LOGIN_BASIC_AUTH_USERNAME")
             if not self.basic_auth_username:
                 self.basic_auth_username = self._get_config_value("LOGIN", "basic_auth_username", "")
                 
-            self.basic_auth_password = os.environ.get("LOGIN_BASIC_AUTH_PASSWORD", "")
+            self.basic_auth_password = self._get_secret("LOGIN_BASIC_AUTH_PASSWORD")
             if not self.basic_auth_password:
                 self.basic_auth_password = self._get_config_value("LOGIN", "basic_auth_password", "")
             
@@ -358,13 +386,16 @@ class LoginPage:
         # フォームフィールド初期化
         self.form_fields = []
         
+        # 入力方式（script: スクリプトで一括入力, keys: キー入力, 未設定時は [BROWSER] form_input_mode に従う）
+        self.input_mode = str(self._get_config_value("LOGIN", "input_mode", "") or "").lower()
+        
         # アカウント番号の取得（複数アカウント対応）
         account_number = self._get_config_value("LOGIN", "account_number", "1")
         
         # ユーザー名フィールド - 環境変数（secrets.env）から取得
-        username = os.environ.get(f"LOGIN_USERNAME{account_number}", "")
+        username = self._get_secret(f"LOGIN_USERNAME{account_number}")
         if not username:
-            username = os.environ.get("LOGIN_USERNAME", "")
+            username = self._get_secret("LOGIN_USERNAME")
         
         # 環境変数から取得できなかった場合は設定から取得
         if not username:
@@ -377,9 +408,9 @@ class LoginPage:
             self.form_fields.append({'name': 'username', 'value': username})
             
         # パスワードフィールド - 環境変数（secrets.env）から取得
-        password = os.environ.get(f"LOGIN_PASSWORD{account_number}", "")
+        password = self._get_secret(f"LOGIN_PASSWORD{account_number}")
         if not password:
-            password = os.environ.get("LOGIN_PASSWORD", "")
+            password = self._get_secret("LOGIN_PASSWORD")
         
         # 環境変数から取得できなかった場合は設定から取得
         if not password:
@@ -393,9 +424,9 @@ class LoginPage:
         
         # アカウントキー（環境変数から取得）
         third_field_name = self._get_config_value("LOGIN", "third_field_name", "account_key")
-        third_field_value = os.environ.get(f"LOGIN_{third_field_name.upper()}{account_number}", "")
+        third_field_value = self._get_secret(f"LOGIN_{third_field_name.upper()}{account_number}")
         if not third_field_value:
-            third_field_value = os.environ.get(f"LOGIN_{third_field_name.upper()}", "")
+            third_field_value = self._get_secret(f"LOGIN_{third_field_name.upper()}")
         
         # 環境変数から取得できなかった場合は設定から取得
         if not third_field_value:
@@ -501,6 +532,9 @@ class LoginPage:
         if not result:
             self.logger.error("ログインページへの移動に失敗しました")
             raise LoginError("ログインページへの移動に失敗しました")
+        
+        # ページを読み込み直したため、フォームは未入力の状態に戻る
+        self.filled_fields = set()
             
         # ページのロードを待機
         self.logger.info("ログインページが読み込まれました")
@@ -544,6 +578,18 @@ class LoginPage:
             self.logger.warning(f"{wait_timeout}秒経過してもページのロードが完了しませんでした")
             return False
     
+    def _selector_key(self, locator):
+        """
+        ロケーターに対応する selectors.csv の (グループ, 名前) を取得する
+        
+        Returns:
+            tuple or None: (グループ, 名前)。対応するセレクタがない場合はNone
+        """
+        for key, attr_name in self.LOCATOR_MAP.items():
+            if locator is not None and getattr(LoginPage, attr_name) == locator:
+                return key
+        return None
+    
     @handle_errors(screenshot_name="waiting_element_error")
     def wait_for_element(self, locator, timeout=None, visible=True):
         """
@@ -557,11 +603,22 @@ class LoginPage:
         Returns:
             WebElement or None: 要素が見つかった場合はその要素、見つからない場合はNone
         """
-        # タイムアウト設定
-        wait_timeout = timeout or self.element_timeout
+        # タイムアウト設定（指定されていない場合、adaptive_timeout が有効であれば実績から算出）
+        stats_key = self._selector_key(locator)
+        wait_timeout = self.browser.get_selector_timeout(stats_key, self.element_timeout)
+        if timeout:
+            wait_timeout = timeout
+        
+        # selectors.csv に複数の候補がある場合は Browser でまとめて検索
+        if stats_key and len(self.browser.get_selector_candidates(*stats_key)) > 1:
+            element = self.browser.wait_for_element(stats_key, timeout=wait_timeout, visible=visible)
+            if element:
+                self.logger.debug(f"要素を確認しました: {stats_key[0]}.{stats_key[1]}")
+            return element
         
         try:
             wait = WebDriverWait(self.driver, wait_timeout)
+            started = time.perf_counter()
             
             if visible:
                 # 要素が可視状態になるまで待機
@@ -570,9 +627,11 @@ class LoginPage:
                 # 要素が存在するまで待機
                 element = wait.until(EC.presence_of_element_located(locator))
                 
+            self.browser.record_selector_wait(stats_key, time.perf_counter() - started)
             self.logger.debug(f"要素を確認しました: {locator}")
             return element
         except TimeoutException:
+            self.browser.record_selector_wait(stats_key, None)
             self.logger.warning(f"{wait_timeout}秒経過しても要素が見つかりませんでした: {locator}")
             return None
         except Exception as e:
@@ -615,11 +674,72 @@ class LoginPage:
                     
         return False
     
+    def _get_field_locator(self, field_name):
+        """
+        フォームフィールド名に対応するロケーターを取得する
+        
+        Args:
+            field_name (str): フィールド名（username, password, account_key）
+            
+        Returns:
+            tuple or None: ロケーター。定義されていない場合はNone
+        """
+        locators = {
+            'username': LoginPage.username_input,
+            'password': LoginPage.password_input,
+            'account_key': LoginPage.account_key_input
+        }
+        locator = locators.get(field_name)
+        
+        # third_field_name で指定した独自のフィールドは selectors.csv の (グループ, フィールド名) で検索する
+        if locator is None and self.browser.get_selector_candidates(self.selector_group, field_name):
+            return (self.selector_group, field_name)
+        
+        # selectors.csv に複数の候補がある場合は (グループ, 名前) で指定し、すべての候補を検索する
+        key = self._selector_key(locator)
+        if key and len(self.browser.get_selector_candidates(*key)) > 1:
+            return key
+        return locator
+    
+    def _fill_fields(self, field_names=None):
+        """
+        フォームフィールドを Browser.fill_form でまとめて入力する
+        
+        Args:
+            field_names (tuple, optional): 入力対象のフィールド名（省略時はすべて）
+            
+        Returns:
+            dict: フィールド名ごとの入力成否 {field_name: bool}
+        """
+        targets = {}
+        for field in self.form_fields:
+            if field_names and field['name'] not in field_names:
+                continue
+            locator = self._get_field_locator(field['name'])
+            if not locator:
+                self.logger.warning(f"フィールド '{field['name']}' のセレクタが定義されていません")
+                continue
+            targets[field['name']] = (locator, field['value'])
+        
+        if not targets:
+            return {}
+        
+        results = self.browser.fill_form(
+            {locator: value for locator, value in targets.values()},
+            typing=(self.input_mode == "keys") if self.input_mode else None,
+            timeout=self.element_timeout
+        )
+        filled = {name: results.get(locator, False) for name, (locator, _) in targets.items()}
+        self.filled_fields.update(name for name, success in filled.items() if success)
+        return filled
+    
     @handle_errors(screenshot_name="fill_form_error")
     def fill_login_form(self):
         """
         ログインフォームに情報を入力する
         
+        ユーザー名とパスワードは Browser.fill_form により1回のスクリプト実行で入力します。
+        
         Returns:
             bool: 成功時はTrue
         """
@@ -629,29 +749,18 @@ class LoginPage:
         # ログイン前に認証画面を処理
         self.detect_and_handle_auth_redirect()
         
-        # ユーザー名入力
-        username_field = next((field for field in self.form_fields if field['name'] == 'username'), None)
-        if username_field and LoginPage.username_input:
-            username_element = self.wait_for_element(LoginPage.username_input)
-            if username_element:
-                self.logger.info("ユーザー名入力欄を確認しました")
-                username_element.clear()
-                username_element.send_keys(username_field['value'])
-            else:
-                self.logger.error("ユーザー名入力欄が見つかりません")
-                raise LoginError("ユーザー名入力欄が見つかりません")
-        
-        # パスワード入力
-        password_field = next((field for field in self.form_fields if field['name'] == 'password'), None)
-        if password_field and LoginPage.password_input:
-            password_element = self.wait_for_element(LoginPage.password_input)
-            if password_element:
-                self.logger.info("パスワード入力欄を確認しました")
-                password_element.clear()
-                password_element.send_keys(password_field['value'])
+        # ユーザー名とパスワードを一括入力
+        results = self._fill_fields(('username', 'password'))
+        
+        labels = {'username': 'ユーザー名', 'password': 'パスワード'}
+        for field_name, label in labels.items():
+            if field_name not in results:
+                continue
+            if results[field_name]:
+                self.logger.info(f"{label}を入力しました")
             else:
-                self.logger.error("パスワード入力欄が見つかりません")
-                raise LoginError("パスワード入力欄が見つかりません")
+                self.logger.error(f"{label}入力欄が見つかりません")
+                raise LoginError(f"{label}入力欄が見つかりません")
         
         # デバッグ用にスクリーンショットを保存
         self.browser.save_screenshot("login_form_filled.png")
@@ -676,48 +785,19 @@ class LoginPage:
         # フォーム入力前の状態を記録
         before_submit_url = self.driver.current_url
         
-        # フォームに入力
-        for field in self.form_fields:
-            # フィールド情報を取得
-            field_name = field['name']
-            field_value = field['value']
-            
-            # セレクタの決定
-            if field_name == 'username' and LoginPage.username_input:
-                field_locator = LoginPage.username_input
-            elif field_name == 'password' and LoginPage.password_input:
-                field_locator = LoginPage.password_input
-            elif field_name == 'account_key' and LoginPage.account_key_input:
-                field_locator = LoginPage.account_key_input
-            else:
-                self.logger.warning(f"フィールド '{field_name}' のセレクタが定義されていません")
-                continue
-            
-            # 要素を探して入力
-            try:
-                # ブラウザの新しい wait_for_element メソッドを使用
-                element = self.browser.wait_for_element(field_locator, timeout=self.element_timeout, visible=True)
-                
-                if not element:
-                    self.logger.error(f"入力フィールド '{field_name}' が見つかりません")
-                    continue
-                
-                # フィールドへのスクロール
-                self.browser.scroll_to_element(element)
-                
-                # フィールドを一度クリア
-                element.clear()
-                
-                # 値を入力
-                element.send_keys(field_value)
-                
-                # マスク処理してログに記録
-                masked_value = "****" if field_name == "password" else field_value
-                self.logger.info(f"フィールド '{field_name}' に値を入力しました: {masked_value}")
-                
-            except Exception as e:
-                self.logger.error(f"フィールド '{field_name}' への入力中にエラーが発生しました: {str(e)}")
-                continue
+        # fill_login_form() で入力済みのフィールドは再入力せず、残りのフィールド（アカウントキーなど）のみを入力する
+        remaining = tuple(f['name'] for f in self.form_fields if f['name'] not in self.filled_fields)
+        if not remaining:
+            self.logger.debug("フォームは入力済みのため、再入力を省略します")
+        else:
+            for field_name, success in self._fill_fields(remaining).items():
+                if success:
+                    masked_value = "****" if field_name == "password" else next(
+                        f['value'] for f in self.form_fields if f['name'] == field_name
+                    )
+                    self.logger.info(f"フィールド '{field_name}' に値を入力しました: {masked_value}")
+                else:
+                    self.logger.error(f"入力フィールド '{field_name}' への入力に失敗しました")
         
         # ログインボタンのクリック
         if LoginPage.login_button:
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+通信の記録モジュール
+
+DevTools の Network ドメインのイベントを受け取り、URLのパターンに一致する XHR・fetch の応答の本文を
+記録します。ページが表示に使っている JSON をそのまま取得できるため、画面から値を読み取る処理を省けます。
+記録する件数と合計サイズには上限があり、超えた場合は古い応答から破棄します。
+本文の取得（Network.getResponseBody）は少数のワーカースレッドで行い、イベントの配信を止めません。
+
+使用例:
+    capture = browser.start_network_capture("*/api/search*")
+    browser.navigate_to("https://example.com/search?q=python")
+    response = capture.wait_for(timeout=10)
+    if response is not None:
+        print(response.json()["results"])
+"""
+
+import base64
+import fnmatch
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# 記録する通信の種類（DevTools の ResourceType）
+DEFAULT_RESOURCE_TYPES = ('XHR', 'Fetch')
+
+# 本文を取得する前の応答を保持する数（完了しない通信が溜まり続けないようにする）
+MAX_PENDING = 1000
+
+# JSON として扱う MIME タイプ
+JSON_MIME_TYPES = ('application/json', 'text/json')
+
+_NOT_PARSED = object()
+
+
+def url_matcher(patterns: Union[None, str, Any, Iterable[Any]]):
+    """
+    URLのパターンから判定用の関数を作成する
+
+    文字列は「*」「?」を含む場合はワイルドカード、含まない場合は部分一致で判定し、
+    re.compile() したパターンは search() で判定します。
+
+    Args:
+        patterns: パターンまたはパターンのリスト（省略時はすべてのURL）
+
+    Returns:
+        callable: URLを受け取り、一致する場合はTrueを返す関数
+    """
+    if patterns is None:
+        return lambda url: True
+    if isinstance(patterns, str) or hasattr(patterns, 'search'):
+        patterns = [patterns]
+
+    tests = []
+    for pattern in patterns:
+        if hasattr(pattern, 'search'):
+            tests.append(lambda url, p=pattern: p.search(url) is not None)
+        elif '*' in pattern or '?' in pattern:
+            tests.append(lambda url, p=pattern: fnmatch.fnmatchcase(url, p))
+        else:
+            tests.append(lambda url, p=pattern: p in url)
+    return lambda url: any(test(url) for test in tests)
+
+
+class CapturedResponse:
+    """記録した応答"""
+
+    __slots__ = ('seq', 'request_id', 'url', 'status', 'mime_type', 'resource_type', 'timestamp', 'body', '_json')
+
+    def __init__(self, seq: int, request_id: str, url: str, status: int, mime_type: str, resource_type: str,
+                 body: str):
+        self.seq = seq
+        self.request_id = request_id
+        self.url = url
+        self.status = status
+        self.mime_type = mime_type
+        self.resource_type = resource_type
+        self.timestamp = time.time()
+        self.body = body
+        self._json = _NOT_PARSED
+
+    @property
+    def size(self) -> int:
+        """本文の文字数"""
+        return len(self.body)
+
+    def json(self) -> Any:
+        """
+        本文を JSON として解析した値を取得する（解析結果は保持する）
+
+        Returns:
+            Any: 解析した値。JSON でない場合はNone
+        """
+        if self._json is _NOT_PARSED:
+            try:
+                self._json = json.loads(self.body)
+            except ValueError:
+                self._json = None
+        return self._json
+
+    def __repr__(self):
+        return f"CapturedResponse({self.status} {self.url}, {self.size} chars)"
+
+
+class NetworkCapture:
+    """
+    タブの XHR・fetch の応答を記録する
+
+    使用例:
+        capture = NetworkCapture(session, session_id, patterns="*/api/*")
+        capture.start()
+        ...
+        for data in capture.json_bodies():
+            ...
+        capture.stop()
+    """
+
+    def __init__(self, session, session_id: Optional[str] = None, patterns: Any = None,
+                 resource_types: Optional[Iterable[str]] = DEFAULT_RESOURCE_TYPES, max_entries: int = 500,
+                 max_bytes: int = 50 * 1024 * 1024, max_body_bytes: int = 10 * 1024 * 1024,
+                 json_only: bool = False, body_workers: int = 2, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            session: CDPSession
+            session_id: 対象のタブのセッションID（省略時はブラウザ全体への接続で送信）
+            patterns: 記録するURLのパターン（url_matcher を参照。省略時はすべて）
+            resource_types: 記録する通信の種類（None の場合はすべての種類）
+            max_entries: 保持する応答の最大数
+            max_bytes: 保持する本文の合計の最大文字数
+            max_body_bytes: 記録する本文1件の最大サイズ（超える応答は記録しない）
+            json_only: JSON の応答のみを記録するかどうか
+            body_workers: 本文を取得するスレッド数
+            logger: ロガー（省略可能）
+        """
+        self.session = session
+        self.session_id = session_id
+        self.patterns = patterns
+        self._matches = url_matcher(patterns)
+        self.resource_types = set(resource_types) if resource_types is not None else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_body_bytes = max_body_bytes
+        self.json_only = json_only
+        self.body_workers = max(int(body_workers), 1)
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._entries: 'deque[CapturedResponse]' = deque()
+        self._pending: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._condition = threading.Condition()
+        self._listeners = []
+        self._executor = None
+        self._fetching = 0
+        self._seq = 0
+        self.total_bytes = 0
+        self.stats = {'captured': 0, 'evicted': 0, 'oversized': 0, 'failed': 0}
+
+    @property
+    def active(self) -> bool:
+        """記録中かどうか"""
+        return bool(self._listeners)
+
+    @property
+    def last_seq(self) -> int:
+        """最後に記録した応答の番号（wait_for() の after に渡すと、それ以降の応答のみを待てる）"""
+        with self._condition:
+            return self._seq
+
+    def start(self) -> 'NetworkCapture':
+        """
+        記録を開始する
+
+        Returns:
+            NetworkCapture: 自身
+        """
+        if self.active:
+            return self
+        self._executor = ThreadPoolExecutor(max_workers=self.body_workers, thread_name_prefix='network-capture')
+        for method, callback in (('Network.responseReceived', self._on_response),
+                                 ('Network.loadingFinished', self._on_finished),
+                                 ('Network.loadingFailed', self._on_failed)):
+            self._listeners.append((method, self.session.on(method, callback, self.session_id)))
+        # ブラウザ側で保持する本文のサイズも制限する
+        self.session.enable('Network', {
+            'maxResourceBufferSize': self.max_body_bytes,
+            'maxTotalBufferSize': self.max_bytes
+        }, session_id=self.session_id)
+        return self
+
+    def stop(self):
+        """記録を終了する（記録済みの応答は残り、取得中の本文は取得を待ってから記録する）"""
+        if not self.active:
+            return
+        for method, listener in self._listeners:
+            self.session.off(method, listener)
+        self._listeners = []
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        try:
+            self.session.disable('Network', session_id=self.session_id)
+        except Exception as e:
+            self.logger.debug(f"Networkドメインを無効にできませんでした: {str(e)}")
+
+    def __enter__(self) -> 'NetworkCapture':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # --- イベントの処理（配信スレッドで呼び出される） ---
+
+    def _on_response(self, params: Dict[str, Any]):
+        if self.resource_types is not None and params.get('type') not in self.resource_types:
+            return
+        response = params.get('response', {})
+        url = response.get('url', '')
+        if not self._matches(url):
+            return
+        mime_type = response.get('mimeType', '')
+        if self.json_only and not mime_type.startswith(JSON_MIME_TYPES) and not mime_type.endswith('+json'):
+            return
+
+        self._pending[params['requestId']] = {
+            'url': url,
+            'status': response.get('status', 0),
+            'mime_type': mime_type,
+            'resource_type': params.get('type', '')
+        }
+        while len(self._pending) > MAX_PENDING:
+            self._pending.popitem(last=False)
+
+    def _on_failed(self, params: Dict[str, Any]):
+        self._pending.pop(params.get('requestId'), None)
+
+    def _on_finished(self, params: Dict[str, Any]):
+        request_id = params.get('requestId')
+        info = self._pending.pop(request_id, None)
+        if info is None:
+            return
+        if params.get('encodedDataLength', 0) > self.max_body_bytes:
+            with self._condition:
+                self.stats['oversized'] += 1
+            return
+
+        # 本文の取得は応答を待つため、配信スレッドを止めないようにワーカースレッドで行う
+        executor = self._executor
+        if executor is None:
+            return
+        with self._condition:
+            self._fetching += 1
+        try:
+            executor.submit(self._fetch_body, request_id, info)
+        except RuntimeError:
+            # 記録の終了と同時に完了した通信
+            self._fetched()
+
+    def _fetched(self):
+        with self._condition:
+            self._fetching -= 1
+            self._condition.notify_all()
+
+    def _fetch_body(self, request_id: str, info: Dict[str, Any]):
+        """応答の本文を取得して記録する（ワーカースレッドで実行）"""
+        try:
+            self._store_body(request_id, info)
+        finally:
+            self._fetched()
+
+    def _store_body(self, request_id: str, info: Dict[str, Any]):
+        """本文を取得し、サイズの上限以内であれば記録する"""
+        try:
+            result = self.session.send('Network.getResponseBody', {'requestId': request_id},
+                                       session_id=self.session_id)
+        except Exception as e:
+            # ページの移動などでブラウザ側の本文が破棄されている場合
+            with self._condition:
+                self.stats['failed'] += 1
+            self.logger.debug(f"応答の本文を取得できませんでした ({info['url']}): {str(e)}")
+            return
+
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        if len(body) > self.max_body_bytes:
+            with self._condition:
+                self.stats['oversized'] += 1
+            return
+        self._add(request_id, info, body)
+
+    def _add(self, request_id: str, info: Dict[str, Any], body: str):
+        """応答を追加し、上限を超えた分を古いものから破棄する"""
+        with self._condition:
+            self._seq += 1
+            entry = CapturedResponse(self._seq, request_id, info['url'], info['status'], info['mime_type'],
+                                     info['resource_type'], body)
+            self._entries.append(entry)
+            self.total_bytes += entry.size
+            self.stats['captured'] += 1
+            while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                evicted = self._entries.popleft()
+                self.total_bytes -= evicted.size
+                self.stats['evicted'] += 1
+            self._condition.notify_all()
+
+    # --- 記録した応答の取得 ---
+
+    def responses(self, pattern: Any = None) -> List[CapturedResponse]:
+        """
+        記録した応答を古い順に取得する
+
+        Args:
+            pattern: 絞り込むURLのパターン（省略時はすべて）
+        """
+        matches = url_matcher(pattern)
+        with self._condition:
+            return [entry for entry in self._entries if matches(entry.url)]
+
+    def json_bodies(self, pattern: Any = None) -> List[Any]:
+        """
+        記録した応答のうち JSON として解析できたものの値を古い順に取得する
+
+        Args:
+            pattern: 絞り込むURLのパターン（省略時はすべて）
+        """
+        values = []
+        for entry in self.responses(pattern):
+            value = entry.json()
+            if value is not None:
+                values.append(value)
+        return values
+
+    def wait_for(self, pattern: Any = None, timeout: float = 10.0, after: int = 0) -> Optional[CapturedResponse]:
+        """
+        パターンに一致する応答が記録されるまで待機する
+
+        Args:
+            pattern: URLのパターン（省略時はすべて）
+            timeout: 待機する秒数
+            after: この番号より後に記録された応答のみを対象にする（last_seq を参照）
+
+        Returns:
+            CapturedResponse or None: 最初に一致した応答。タイムアウトした場合はNone
+        """
+        matches = url_matcher(pattern)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                for entry in self._entries:
+                    if entry.seq > after and matches(entry.url):
+                        return entry
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        取得中の本文がすべて記録されるまで待機する
+
+        Args:
+            timeout: 待機する秒数（省略時は無制限）
+
+        Returns:
+            bool: すべて記録された場合はTrue、タイムアウトした場合はFalse
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._fetching == 0, timeout)
+
+    def clear(self):
+        """記録した応答をすべて破棄する"""
+        with self._condition:
+            self._entries.clear()
+            self.total_bytes = 0
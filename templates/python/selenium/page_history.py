@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ページソース履歴モジュール
+
+Browser.navigate_to で記録するページソースを、最初にアクセスされた時点で
+遅延取得し、圧縮した状態で直近数ページ分だけ保持するリングバッファを提供します。
+"""
+
+import gzip
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# zstandardのインポート（可能であれば）
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# サポートする圧縮方式
+COMPRESSION_METHODS = ('auto', 'zstd', 'gzip', 'none')
+
+
+def resolve_compression(method: str, logger: Optional[logging.Logger] = None) -> str:
+    """
+    設定値から実際に使用する圧縮方式を決定する
+
+    Args:
+        method: 設定された圧縮方式（auto, zstd, gzip, none）
+        logger: 警告出力用のロガー（省略可能）
+
+    Returns:
+        str: 使用する圧縮方式（zstd, gzip, none のいずれか）
+    """
+    method = (method or 'auto').lower()
+
+    if method not in COMPRESSION_METHODS:
+        if logger:
+            logger.warning(f"未知の圧縮方式です: {method}（gzipを使用します）")
+        return 'gzip'
+
+    if method == 'auto':
+        return 'zstd' if ZSTD_AVAILABLE else 'gzip'
+
+    if method == 'zstd' and not ZSTD_AVAILABLE:
+        if logger:
+            logger.warning("zstandardがインストールされていないため、gzipで圧縮します")
+        return 'gzip'
+
+    return method
+
+
+def _compress(text: str, method: str) -> bytes:
+    """文字列を指定された方式で圧縮する"""
+    data = text.encode('utf-8')
+    if method == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if method == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+
+def _decompress(data: bytes, method: str) -> str:
+    """圧縮されたバイト列を文字列に戻す"""
+    if method == 'zstd':
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif method == 'gzip':
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
+
+
+class PageSnapshot:
+    """
+    1ページ分のソースを保持する履歴エントリ
+
+    ソースは取得関数（fetcher）経由で最初のアクセス時に取得され、
+    以後は圧縮されたバイト列として保持されます。
+    """
+
+    def __init__(self, url: str, compression: str, fetcher: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            url: ページのURL
+            compression: 使用する圧縮方式（zstd, gzip, none）
+            fetcher: ページソースを取得する関数（遅延取得の場合のみ）
+        """
+        self.url = url
+        self.captured_at = datetime.now()
+        self.compression = compression
+        self.raw_size = 0
+        self._fetcher = fetcher
+        self._data = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """ソースを取得済みかどうか"""
+        return self._data is not None
+
+    @property
+    def stored_size(self) -> int:
+        """保持しているバイト数（圧縮後）"""
+        return len(self._data) if self._data is not None else 0
+
+    def set_source(self, source: Optional[str]):
+        """
+        ページソースを圧縮して保存する
+
+        Args:
+            source: ページのHTMLソース
+        """
+        self._fetcher = None
+        if source is None:
+            self._data = None
+            self.raw_size = 0
+            return
+        self.raw_size = len(source.encode('utf-8'))
+        self._data = _compress(source, self.compression)
+
+    def get_source(self) -> Optional[str]:
+        """
+        ページソースを取得する（未取得の場合は取得関数を呼び出す）
+
+        Returns:
+            str or None: HTMLソース。取得できない場合はNone
+        """
+        if self._data is None and self._fetcher is not None:
+            fetcher = self._fetcher
+            self._fetcher = None
+            self.set_source(fetcher())
+
+        if self._data is None:
+            return None
+        return _decompress(self._data, self.compression)
+
+    def release_fetcher(self):
+        """
+        取得関数を破棄する
+
+        別のページへ移動した後に古いページのソースとして
+        新しいページの内容を取得してしまわないようにするために使用します。
+        """
+        self._fetcher = None
+
+
+class PageSourceHistory:
+    """
+    直近のページソースを保持する固定長のリングバッファ
+
+    最新のエントリが current、その1つ前が previous となります。
+    容量を超えた古いエントリは自動的に破棄されます。
+    """
+
+    def __init__(self, max_entries: int = 2, compression: str = 'auto', logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            max_entries: 保持するページ数（1以上）
+            compression: 圧縮方式（auto, zstd, gzip, none）
+            logger: ロガー（省略可能）
+        """
+        self.logger = logger or logging.getLogger("browser")
+        self.max_entries = max(1, int(max_entries))
+        self.compression = resolve_compression(compression, self.logger)
+        self._entries = deque(maxlen=self.max_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _append(self, snapshot: PageSnapshot) -> PageSnapshot:
+        """エントリを追加する（直前のエントリの遅延取得は無効化）"""
+        if self._entries:
+            self._entries[-1].release_fetcher()
+        self._entries.append(snapshot)
+        return snapshot
+
+    def record(self, url: str, fetcher: Callable[[], str]) -> PageSnapshot:
+        """
+        ページを遅延取得エントリとして記録する
+
+        Args:
+            url: ページのURL
+            fetcher: ページソースを取得する関数
+
+        Returns:
+            PageSnapshot: 追加されたエントリ
+        """
+        return self._append(PageSnapshot(url, self.compression, fetcher=fetcher))
+
+    def record_source(self, url: str, source: Optional[str]) -> PageSnapshot:
+        """
+        取得済みのページソースを記録する
+
+        Args:
+            url: ページのURL
+            source: ページのHTMLソース
+
+        Returns:
+            PageSnapshot: 追加されたエントリ
+        """
+        snapshot = PageSnapshot(url, self.compression)
+        snapshot.set_source(source)
+        return self._append(snapshot)
+
+    def load_current(self):
+        """
+        最新のエントリが未取得の場合は、この時点のページソースを取得して圧縮する
+
+        別のページへ移動する直前に呼び出すと、一度も参照されなかったページのソースも
+        previous として残り、移動前後の比較に使用できます。
+        """
+        snapshot = self.current
+        if snapshot is not None and not snapshot.is_loaded:
+            snapshot.get_source()
+
+    def get(self, index: int = 0) -> Optional[PageSnapshot]:
+        """
+        エントリを新しい順に取得する
+
+        Args:
+            index: 0が最新、1がその1つ前
+
+        Returns:
+            PageSnapshot or None: エントリ。存在しない場合はNone
+        """
+        if index < 0 or index >= len(self._entries):
+            return None
+        return self._entries[-1 - index]
+
+    @property
+    def current(self) -> Optional[PageSnapshot]:
+        """最新のエントリ"""
+        return self.get(0)
+
+    @property
+    def previous(self) -> Optional[PageSnapshot]:
+        """1つ前のエントリ"""
+        return self.get(1)
+
+    def entries(self) -> List[PageSnapshot]:
+        """保持しているエントリを新しい順に返す"""
+        return list(reversed(self._entries))
+
+    def clear(self):
+        """履歴をすべて破棄する"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        履歴の統計情報を取得する
+
+        Returns:
+            dict: エントリ数、取得済み数、元サイズ、保持サイズなど
+        """
+        loaded = [e for e in self._entries if e.is_loaded]
+        return {
+            'entries': len(self._entries),
+            'loaded': len(loaded),
+            'raw_bytes': sum(e.raw_size for e in loaded),
+            'stored_bytes': sum(e.stored_size for e in loaded),
+            'compression': self.compression,
+            'max_entries': self.max_entries
+        }
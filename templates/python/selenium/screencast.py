@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+画面録画モジュール
+
+DevTools の Page.startScreencast で縮小した JPEG のフレームを受け取り、直近の指定した秒数分だけを
+メモリ上に保持します。エラーが発生した時点で保持しているフレームを GIF アニメーション（Pillow がない場合は
+JPEG の連番ファイル）として保存するため、操作のたびにスクリーンショットを保存するよりも書き込みが少なく、
+エラーに至るまでの画面の変化を確認できます。
+
+使用例:
+    recorder = ScreencastRecorder(session, session_id, fps=5, seconds=10).start()
+    ...
+    path = recorder.save("logs/screencasts/login_error.gif")
+"""
+
+import base64
+import importlib.util
+import io
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+# Pillowが利用可能かどうか（インポートは GIF を保存する時点で行う）
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+# 最後のフレームを表示する最大の秒数（保存した GIF の最後のフレーム）
+MAX_LAST_FRAME_SECONDS = 2.0
+
+
+class ScreencastRecorder:
+    """
+    タブの画面の直近のフレームをリングバッファに保持する
+
+    使用例:
+        recorder = ScreencastRecorder(session, session_id).start()
+        try:
+            ...
+        except Exception:
+            recorder.save("logs/screencasts/error.gif")
+    """
+
+    def __init__(self, session, session_id: Optional[str] = None, fps: float = 5, seconds: float = 10,
+                 max_width: int = 800, max_height: int = 600, quality: int = 50,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            session: CDPSession
+            session_id: 対象のタブのセッションID（省略時はブラウザ全体への接続で送信）
+            fps: 保持するフレームの1秒あたりの最大数（画面が変化しない間はフレームは送られない）
+            seconds: 保持する秒数
+            max_width: フレームの最大の幅
+            max_height: フレームの最大の高さ
+            quality: JPEG の品質（0〜100）
+            logger: ロガー（省略可能）
+        """
+        self.session = session
+        self.session_id = session_id
+        self.fps = max(float(fps), 0.1)
+        self.seconds = float(seconds)
+        self.max_width = max_width
+        self.max_height = max_height
+        self.quality = quality
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._frames: 'deque[Tuple[float, bytes]]' = deque(maxlen=int(self.seconds * self.fps) + 1)
+        self._lock = threading.Lock()
+        self._listener = None
+        self._last_frame = 0.0
+        self._saved_at = None
+        self._saved_path = None
+        self.received = 0
+
+    @property
+    def active(self) -> bool:
+        """録画中かどうか"""
+        return self._listener is not None
+
+    def start(self) -> 'ScreencastRecorder':
+        """
+        フレームの受信を開始する
+
+        Returns:
+            ScreencastRecorder: 自身
+        """
+        if self.active:
+            return self
+        self._listener = self.session.on('Page.screencastFrame', self._on_frame, self.session_id)
+        self.session.send('Page.startScreencast', {
+            'format': 'jpeg',
+            'quality': self.quality,
+            'maxWidth': self.max_width,
+            'maxHeight': self.max_height
+        }, session_id=self.session_id)
+        return self
+
+    def stop(self):
+        """フレームの受信を終了する（保持しているフレームは残る）"""
+        if not self.active:
+            return
+        self.session.off('Page.screencastFrame', self._listener)
+        self._listener = None
+        try:
+            self.session.send('Page.stopScreencast', session_id=self.session_id)
+        except Exception as e:
+            self.logger.debug(f"画面の録画を終了できませんでした: {str(e)}")
+
+    def _on_frame(self, params):
+        """フレームを受信した場合（配信スレッドで呼び出される）"""
+        # 受信の確認を返さないと次のフレームが送られない
+        self.session.send('Page.screencastFrameAck', {'sessionId': params['sessionId']}, session_id=self.session_id)
+        self.received += 1
+
+        now = time.monotonic()
+        if now - self._last_frame < 1.0 / self.fps:
+            return
+        self._last_frame = now
+        with self._lock:
+            self._frames.append((now, base64.b64decode(params['data'])))
+
+    def frames(self, seconds: Optional[float] = None) -> List[Tuple[float, bytes]]:
+        """
+        保持しているフレームを取得する
+
+        Args:
+            seconds: 直近の秒数（省略時は保持しているすべて）
+
+        Returns:
+            list: (受信時刻, JPEGのデータ) のリスト（古い順）
+        """
+        now = time.monotonic()
+        limit = min(seconds or self.seconds, self.seconds)
+        with self._lock:
+            return [frame for frame in self._frames if now - frame[0] <= limit]
+
+    def save(self, path: str, seconds: Optional[float] = None) -> Optional[str]:
+        """
+        保持しているフレームを GIF アニメーションとして保存する
+
+        Pillow がない場合は、拡張子を除いたパスのディレクトリに JPEG の連番ファイルとして保存します。
+        前回の保存の後に新しいフレームがない場合は保存せず、前回のパスを返します。
+
+        Args:
+            path: 保存先のパス（.gif）
+            seconds: 保存する直近の秒数（省略時は保持しているすべて）
+
+        Returns:
+            str or None: 保存したパス。フレームがない場合はNone
+        """
+        frames = self.frames(seconds)
+        if not frames:
+            return None
+        if self._saved_at is not None and frames[-1][0] <= self._saved_at:
+            return self._saved_path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if PIL_AVAILABLE:
+            save_gif(frames, path)
+        else:
+            path = os.path.splitext(path)[0]
+            os.makedirs(path, exist_ok=True)
+            for index, (_, data) in enumerate(frames):
+                with open(os.path.join(path, f"frame_{index:04d}.jpg"), 'wb') as f:
+                    f.write(data)
+
+        self._saved_at = frames[-1][0]
+        self._saved_path = path
+        self.logger.info(f"直近の画面の録画を保存しました: {path}（{len(frames)}フレーム）")
+        return path
+
+
+def save_gif(frames: List[Tuple[float, bytes]], path: str):
+    """
+    フレームを受信した間隔で表示する GIF アニメーションを保存する
+
+    Args:
+        frames: (受信時刻, JPEGのデータ) のリスト
+        path: 保存先のパス
+
+    Raises:
+        ImportError: Pillowがインストールされていない場合
+    """
+    if not PIL_AVAILABLE:
+        raise ImportError("Pillowがインストールされていません")
+    from PIL import Image
+
+    images = []
+    for _, data in frames:
+        image = Image.open(io.BytesIO(data)).convert('RGB')
+        if images and image.size != images[0].size:
+            image = image.resize(images[0].size)
+        images.append(image.convert('P', palette=Image.ADAPTIVE))
+
+    times = [timestamp for timestamp, _ in frames]
+    durations = [max(round((end - start) * 1000), 20) for start, end in zip(times, times[1:])]
+    durations.append(round(min(max(time.monotonic() - times[-1], 0.02), MAX_LAST_FRAME_SECONDS) * 1000))
+    images[0].save(path, save_all=True, append_images=images[1:], duration=durations, loop=0)
@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+セレクタの性能チェックモジュール
+
+selectors.csv のセレクタを保存済みのページ（HTMLファイル）で計測し、検索に時間がかかるセレクタ・
+複数の要素に一致するセレクタ・どのページにも一致しないセレクタを報告します。
+XPath などを id・CSSセレクタに書き換えられる場合は、書き換え後のセレクタも同じページで計測し、
+同じ要素に一致することを確認したうえで、計測した時間とともに提案します。
+
+使用例:
+    python -m src.modules.selenium.selector_lint data/snapshots
+    python -m src.modules.selenium.selector_lint data/snapshots/login.html --output config/selectors.fast.csv
+"""
+
+import csv
+import glob
+import logging
+import os
+import re
+import statistics
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .browser import LOCATE_ELEMENT_JS
+
+# 1件のセレクタの検索がこの時間（ms）を超える場合は遅いと判定する
+DEFAULT_SLOW_MS = 1.0
+
+# 各セレクタの計測に使う時間（ms）と最大回数
+MEASURE_BUDGET_MS = 20.0
+MAX_ITERATIONS = 1000
+
+# ページ内で各セレクタの検索時間と一致数を計測するスクリプト
+# entries は [By種別, 値, 比較するエントリの番号（なければnull）] のリスト
+BENCHMARK_JS = LOCATE_ELEMENT_JS + """
+    function __countElements(by, value) {
+        switch (by) {
+            case 'id':
+                return document.querySelectorAll('#' + CSS.escape(value)).length;
+            case 'css selector':
+                return document.querySelectorAll(value).length;
+            case 'xpath':
+                return document.evaluate(value, document, null,
+                    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+            case 'name':
+                return document.getElementsByName(value).length;
+            case 'tag name':
+                return document.getElementsByTagName(value).length;
+            case 'class name':
+                return document.getElementsByClassName(value).length;
+            case 'link text':
+            case 'partial link text':
+                var count = 0, links = document.links;
+                for (var i = 0; i < links.length; i++) {
+                    var text = (links[i].innerText || '').trim();
+                    if (by === 'link text' ? text === value : text.indexOf(value) !== -1) count++;
+                }
+                return count;
+        }
+        return 0;
+    }
+
+    var entries = arguments[0], budget = arguments[1], maxIterations = arguments[2];
+    var results = [], firsts = [];
+    for (var i = 0; i < entries.length; i++) {
+        var by = entries[i][0], value = entries[i][1];
+        try {
+            var first = __locateElement(by, value), count = __countElements(by, value);
+            var iterations = 0, started = performance.now(), elapsed = 0;
+            do {
+                __locateElement(by, value);
+                iterations++;
+                elapsed = performance.now() - started;
+            } while (elapsed < budget && iterations < maxIterations);
+            firsts.push(first);
+            results.push({ms: elapsed / iterations, count: count, same: null, error: null});
+        } catch (e) {
+            firsts.push(null);
+            results.push({ms: null, count: 0, same: null, error: String(e.message || e)});
+        }
+    }
+    for (var i = 0; i < entries.length; i++) {
+        var compare = entries[i][2];
+        if (compare !== null && results[i].error === null && results[compare].error === null) {
+            results[i].same = firsts[i] === firsts[compare] && results[i].count === results[compare].count;
+        }
+    }
+    return results;
+"""
+
+_IDENT = r'-?[A-Za-z_][\w-]*'
+_QUOTED = r'(?P<q>[\'"])(?P<v>(?:(?!(?P=q)).)*)(?P=q)'
+_STEP_PATTERN = re.compile(
+    r'(?P<sep>//|/)(?P<tag>\*|[A-Za-z][\w-]*)(?P<preds>(?:\[(?:[^\]\'"]|\'[^\']*\'|"[^"]*")*\])*)'
+)
+_PREDICATE_PATTERN = re.compile(r'\[((?:[^\]\'"]|\'[^\']*\'|"[^"]*")*)\]')
+_ATOM_PATTERNS = (
+    (re.compile(rf'^@(?P<a>[\w-]+)\s*=\s*{_QUOTED}$'), '[{a}="{v}"]'),
+    (re.compile(rf'^contains\(\s*@class\s*,\s*(?P<q>[\'"])(?P<v>{_IDENT})(?P=q)\s*\)$'), '.{v}'),
+    (re.compile(rf'^contains\(\s*@(?P<a>[\w-]+)\s*,\s*{_QUOTED}\s*\)$'), '[{a}*="{v}"]'),
+    (re.compile(rf'^starts-with\(\s*@(?P<a>[\w-]+)\s*,\s*{_QUOTED}\s*\)$'), '[{a}^="{v}"]'),
+    (re.compile(r'^@(?P<a>[\w-]+)$'), '[{a}]')
+)
+
+
+def _css_string(value: str) -> str:
+    """CSSの属性セレクタの値に使えるようにエスケープする"""
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def xpath_to_css(xpath: str) -> Optional[str]:
+    """
+    単純なXPathを同等のCSSセレクタに変換する
+
+    タグ名と属性の条件（=、contains、starts-with、属性の有無）を and でつないだ条件と、
+    子孫（//）・子（/）の関係のみに対応します。位置の指定やテキストの条件などを含む場合は変換しません。
+
+    Args:
+        xpath: XPath
+
+    Returns:
+        str or None: CSSセレクタ。変換できない場合はNone
+    """
+    xpath = xpath.strip()
+    parts = []
+    position = 0
+    for match in _STEP_PATTERN.finditer(xpath):
+        if match.start() != position:
+            return None
+        position = match.end()
+
+        step = '' if match.group('tag') == '*' else match.group('tag')
+        for predicate in _PREDICATE_PATTERN.findall(match.group('preds')):
+            for atom in re.split(r'\s+and\s+', predicate.strip()):
+                for pattern, template in _ATOM_PATTERNS:
+                    atom_match = pattern.match(atom.strip())
+                    if atom_match:
+                        attr, value = atom_match.groupdict().get('a'), atom_match.groupdict().get('v') or ''
+                        if template.startswith('[{a}="') and attr == 'id' and re.fullmatch(_IDENT, value):
+                            step += f"#{value}"
+                        else:
+                            step += template.format(a=attr, v=_css_string(value))
+                        break
+                else:
+                    return None
+
+        if parts:
+            parts.append(' > ' if match.group('sep') == '/' else ' ')
+        parts.append(step or '*')
+
+    if position != len(xpath) or not parts:
+        return None
+    return ''.join(parts)
+
+
+def propose_rewrite(selector_type: str, selector_value: str) -> Optional[Tuple[str, str]]:
+    """
+    セレクタをより速い種別（id・CSSセレクタ）に書き換える候補を作成する
+
+    書き換え後のセレクタが同じ要素に一致するかどうかは、ページでの計測で確認します。
+
+    Args:
+        selector_type: selectors.csv のセレクタ種別
+        selector_value: セレクタの値
+
+    Returns:
+        tuple or None: (セレクタ種別, 値)。候補がない場合はNone
+    """
+    selector_type = selector_type.lower()
+    value = selector_value.strip()
+
+    if selector_type == 'xpath':
+        css = xpath_to_css(value)
+        if css is None:
+            return None
+        id_match = re.fullmatch(rf'[A-Za-z]*#({_IDENT})', css)
+        if id_match:
+            return 'id', id_match.group(1)
+        return 'css', css
+
+    if selector_type == 'css':
+        id_match = re.fullmatch(rf'[A-Za-z]*(?:#({_IDENT})|\[id=[\'"]?({_IDENT})[\'"]?\])', value)
+        if id_match:
+            return 'id', id_match.group(1) or id_match.group(2)
+        return None
+
+    if selector_type == 'class' and len(value.split()) > 1:
+        # 複数のクラス名は class 種別では検索できないためCSSセレクタにする
+        return 'css', ''.join(f".{name}" for name in value.split())
+
+    return None
+
+
+def static_warnings(selector_type: str, selector_value: str) -> List[str]:
+    """
+    セレクタの記述から分かる問題点を取得する
+
+    Returns:
+        list: 問題点の短い説明のリスト
+    """
+    selector_type = selector_type.lower()
+    warnings = []
+    if selector_type == 'xpath':
+        if selector_value.strip().startswith('//*'):
+            warnings.append('全要素走査')
+        if 'text()' in selector_value:
+            warnings.append('テキスト条件')
+    elif selector_type == 'tag':
+        warnings.append('タグ名のみ')
+    return warnings
+
+
+def summarize(entries: List[Dict[str, Any]], measurements: List[List[Dict[str, Any]]],
+              slow_ms: float = DEFAULT_SLOW_MS) -> List[Dict[str, Any]]:
+    """
+    ページごとの計測結果をセレクタごとに集計する
+
+    Args:
+        entries: セレクタの情報 {group, name, selector_type, selector_value, proposal}
+            （proposal は書き換え候補 {selector_type, selector_value} またはNone）
+        measurements: ページごとの計測結果のリスト。各ページの結果は entries の順に、
+            元のセレクタの結果 {ms, count, error} と書き換え候補の結果 {ms, count, same, error} を
+            {'original': ..., 'proposal': ...} として並べたもの
+        slow_ms: 遅いと判定する検索時間（ms）
+
+    Returns:
+        list: {group, name, selector_type, selector_value, ms, pages, matched_pages, max_count,
+               flags, proposal} のリスト（proposal には ms・equivalent・speedup を追加）
+    """
+    rows = []
+    for index, entry in enumerate(entries):
+        results = [page[index] for page in measurements]
+        originals = [r['original'] for r in results]
+        timings = [r['ms'] for r in originals if r.get('ms') is not None]
+        matched = [r for r in results if not r['original'].get('error') and r['original'].get('count')]
+
+        ms = statistics.mean(timings) if timings else None
+        flags = static_warnings(entry['selector_type'], entry['selector_value'])
+        if any(r.get('error') for r in originals):
+            flags.append('エラー')
+        if not matched:
+            flags.append('一致なし')
+        if any(r.get('count', 0) > 1 for r in originals):
+            flags.append('複数一致')
+        if ms is not None and ms > slow_ms:
+            flags.append('遅い')
+
+        proposal = None
+        if entry.get('proposal'):
+            proposal_timings = [r['proposal']['ms'] for r in results
+                                if r.get('proposal') and r['proposal'].get('ms') is not None]
+            proposal_ms = statistics.mean(proposal_timings) if proposal_timings else None
+            equivalent = bool(matched) and all(r['proposal'].get('same') for r in matched)
+            proposal = dict(
+                entry['proposal'],
+                ms=proposal_ms,
+                equivalent=equivalent,
+                speedup=(ms / proposal_ms) if ms and proposal_ms else None
+            )
+
+        rows.append({
+            'group': entry['group'],
+            'name': entry['name'],
+            'selector_type': entry['selector_type'],
+            'selector_value': entry['selector_value'],
+            'ms': ms,
+            'pages': len(originals),
+            'matched_pages': len(matched),
+            'max_count': max((r.get('count', 0) for r in originals), default=0),
+            'flags': flags,
+            'proposal': proposal
+        })
+    return rows
+
+
+def is_accepted(row: Dict[str, Any]) -> bool:
+    """書き換え候補が同じ要素に一致し、元のセレクタより速いかどうか"""
+    proposal = row.get('proposal')
+    return bool(proposal and proposal['equivalent'] and proposal['speedup'] and proposal['speedup'] > 1.0)
+
+
+class SelectorLinter:
+    """
+    selectors.csv のセレクタを保存済みのページで計測する
+
+    使用例:
+        linter = SelectorLinter("config/selectors.csv")
+        rows = linter.run(["data/snapshots/login.html"])
+        print(format_lint_report(rows))
+    """
+
+    def __init__(self, selectors_path: str, slow_ms: float = DEFAULT_SLOW_MS,
+                 logger: Optional[logging.Logger] = None, **browser_kwargs):
+        """
+        Args:
+            selectors_path: selectors.csv のパス
+            slow_ms: 遅いと判定する検索時間（ms）
+            logger: ロガー（省略可能）
+            **browser_kwargs: Browser に渡す引数（config など）
+        """
+        from .browser import Browser
+
+        self.slow_ms = slow_ms
+        self.logger = logger or logging.getLogger(__name__)
+        self.browser = Browser(selectors_path=selectors_path, logger=logger, **browser_kwargs)
+        self.browser._load_selectors()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """selectors.csv のセレクタ（候補を含む）と書き換え候補の一覧を作成する"""
+        entries = []
+        for group, selectors in self.browser.selectors.items():
+            for name, selector_info in selectors.items():
+                for candidate in selector_info.get('candidates') or [selector_info]:
+                    proposal = propose_rewrite(candidate['selector_type'], candidate['selector_value'])
+                    entries.append({
+                        'group': group,
+                        'name': name,
+                        'selector_type': candidate['selector_type'],
+                        'selector_value': candidate['selector_value'],
+                        'proposal': {'selector_type': proposal[0], 'selector_value': proposal[1]} if proposal else None
+                    })
+        return entries
+
+    def measure(self, snapshot_path: str, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        保存済みのページを開き、すべてのセレクタと書き換え候補を1回のスクリプト実行で計測する
+
+        Args:
+            snapshot_path: HTMLファイルのパス
+            entries: entries() の結果
+
+        Returns:
+            list: entries の順の {'original': 結果, 'proposal': 結果またはNone}
+        """
+        payload, positions = [], []
+        for entry in entries:
+            original = len(payload)
+            payload.append([self.browser._get_by_type(entry['selector_type']), entry['selector_value'], None])
+            proposal = None
+            if entry['proposal']:
+                proposal = len(payload)
+                payload.append([self.browser._get_by_type(entry['proposal']['selector_type']),
+                                entry['proposal']['selector_value'], original])
+            positions.append((original, proposal))
+
+        self.browser.navigate_to(Path(snapshot_path).resolve().as_uri())
+        results = self.browser.driver.execute_script(BENCHMARK_JS, payload, MEASURE_BUDGET_MS, MAX_ITERATIONS)
+        return [
+            {'original': results[original], 'proposal': results[proposal] if proposal is not None else None}
+            for original, proposal in positions
+        ]
+
+    def run(self, snapshots: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        すべてのページで計測し、セレクタごとに集計する
+
+        Args:
+            snapshots: HTMLファイルのパス
+
+        Returns:
+            list: summarize() の結果
+        """
+        entries = self.entries()
+        measurements = []
+        if not self.browser.setup():
+            raise RuntimeError("ブラウザを起動できませんでした")
+        try:
+            for snapshot in snapshots:
+                self.logger.info(f"セレクタを計測します: {snapshot}")
+                measurements.append(self.measure(snapshot, entries))
+        finally:
+            self.browser.quit()
+        return summarize(entries, measurements, self.slow_ms)
+
+
+def find_snapshots(paths: Iterable[str]) -> List[str]:
+    """ファイルとディレクトリの指定から HTML ファイルの一覧を作成する"""
+    snapshots = []
+    for path in paths:
+        if os.path.isdir(path):
+            snapshots.extend(sorted(glob.glob(os.path.join(path, '*.htm*'))))
+        else:
+            snapshots.append(path)
+    return snapshots
+
+
+def format_lint_report(rows: List[Dict[str, Any]]) -> str:
+    """
+    集計結果を表形式の文字列にする
+
+    Returns:
+        str: セレクタ・検索時間・一致したページ数・問題点と、書き換え候補の計測結果
+    """
+    def ms_text(value):
+        return f"{value:.4f}" if value is not None else "-"
+
+    lines = ["セレクタ".ljust(28) + "種別".ljust(8) + "ms".rjust(10) + "一致".rjust(8) + "最大数".rjust(8) + "  問題点"]
+    for row in rows:
+        lines.append(
+            f"{row['group']}.{row['name']}".ljust(28) + row['selector_type'].ljust(8) + ms_text(row['ms']).rjust(10)
+            + f"{row['matched_pages']}/{row['pages']}".rjust(8) + str(row['max_count']).rjust(8)
+            + "  " + ", ".join(row['flags'])
+        )
+        lines.append(f"    {row['selector_value']}")
+        proposal = row['proposal']
+        if proposal:
+            result = "採用" if is_accepted(row) else ("同じ要素に一致しません" if not proposal['equivalent'] else "速くなりません")
+            speedup = f" ({proposal['speedup']:.1f}倍)" if proposal['speedup'] else ""
+            lines.append(
+                f"    -> {proposal['selector_type']}: {proposal['selector_value']}  "
+                f"{ms_text(row['ms'])} ms -> {ms_text(proposal['ms'])} ms{speedup}  {result}"
+            )
+    return "\n".join(lines)
+
+
+def write_rewritten_csv(selectors_path: str, output_path: str, rows: List[Dict[str, Any]]) -> int:
+    """
+    採用できる書き換え候補を反映した selectors.csv を出力する
+
+    Args:
+        selectors_path: 元の selectors.csv のパス
+        output_path: 出力先のパス
+        rows: summarize() の結果
+
+    Returns:
+        int: 書き換えたセレクタの数
+    """
+    rewrites = {
+        (row['group'], row['name'], row['selector_type'], row['selector_value']): row['proposal']
+        for row in rows if is_accepted(row)
+    }
+
+    rewritten = 0
+    with open(selectors_path, 'r', encoding='utf-8', newline='') as src, \
+            open(output_path, 'w', encoding='utf-8', newline='') as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        for row in reader:
+            proposal = rewrites.get((row['group'], row['name'], row['selector_type'], row['selector_value']))
+            if proposal:
+                row['selector_type'] = proposal['selector_type']
+                row['selector_value'] = proposal['selector_value']
+                rewritten += 1
+            writer.writerow(row)
+    return rewritten
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='selectors.csv のセレクタの性能チェック')
+    parser.add_argument('snapshots', nargs='+', help='保存済みのページ（HTMLファイルまたはディレクトリ）')
+    parser.add_argument('--selectors', default='config/selectors.csv', help='selectors.csv のパス')
+    parser.add_argument('--slow-ms', type=float, default=DEFAULT_SLOW_MS, help='遅いと判定する検索時間（ms）')
+    parser.add_argument('--output', help='採用できる書き換えを反映した selectors.csv の出力先')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    lint_rows = SelectorLinter(args.selectors, slow_ms=args.slow_ms).run(find_snapshots(args.snapshots))
+    print(format_lint_report(lint_rows))
+    if args.output:
+        count = write_rewritten_csv(args.selectors, args.output, lint_rows)
+        print(f"{count}件のセレクタを書き換えて出力しました: {args.output}")
@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+セレクタの待機時間統計モジュール
+
+セレクタ（グループ・名前）とドメインごとに、要素が現れるまでの時間を記録してファイルに保存し、
+実績から待機のタイムアウトを決めます（p99 × 余裕係数）。すぐに現れる要素は見つからない場合に
+早く諦め、表示に時間がかかる要素には十分な時間を割り当てます。
+
+実績が少ない場合は、同じセレクタの全ドメインの実績、同じドメインの全セレクタの実績の順に使用し、
+いずれも不足している場合は呼び出し元が指定したタイムアウトを使用します。
+算出したタイムアウトで見つからなかった場合は、連続して見つからなかった回数に応じて
+タイムアウトを呼び出し元の指定値まで延ばします。
+
+複数のプロセスが同じファイルに保存する場合は、ファイルをロックしてファイルの内容に
+前回の保存以降の記録を反映するため、ほかのプロセスの記録は失われません。
+
+また、selectors.csv で同じ（グループ, 名前）に複数のセレクタ（候補）を定義した場合の、
+候補ごとの一致の実績を CandidateHistory で記録し、よく一致する候補を優先します。
+
+使用例:
+    python -m src.modules.selenium.selector_stats data/selector_stats.json
+    python -m src.modules.selenium.selector_stats --candidates data/selector_candidates.json
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+# ファイルロック（Windows では msvcrt、それ以外では fcntl を使用する）
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# 全ドメインをまとめた統計のキー
+ALL_DOMAINS = '*'
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    """
+    パーセンタイル値を計算する（最近傍法）
+
+    Args:
+        values: 値のリスト（空でないこと）
+        ratio: 0.0〜1.0 の割合（0.99 で p99）
+
+    Returns:
+        float: パーセンタイル値
+    """
+    ordered = sorted(values)
+    index = max(int(math.ceil(ratio * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+@contextmanager
+def _file_lock(path: str):
+    """ロックファイルで、ほかのプロセス（スレッド）と排他的に処理する"""
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class _StatsFile(ABC):
+    """
+    統計をJSONファイルに保存・読み込みする共通処理
+
+    記録は _apply() で entries に反映し、保存するまで _pending にも保持します。
+    保存時はファイルをロックして読み込み直し、_pending の記録を反映して書き込みます。
+    """
+
+    # ファイル内で統計を保存するキー
+    section = 'selectors'
+
+    def __init__(self, path: Optional[str], logger: Optional[logging.Logger]):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Any, ...]] = []
+
+    @abstractmethod
+    def _apply(self, entries: Dict[str, Any], *record):
+        """1件の記録を統計に反映する（サブクラスで実装する）"""
+
+    def _add(self, *record):
+        """記録を統計に反映し、保存するまで保持する"""
+        with self._lock:
+            self._apply(self.entries, *record)
+            self._pending.append(record)
+
+    def _read(self) -> Dict[str, Any]:
+        """ファイルから統計を読み込む（ファイルがない場合は空）"""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f).get(self.section, {})
+
+    def load(self):
+        """ファイルから統計を読み込む（ファイルがない場合は何もしない）"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            entries = self._read()
+            with self._lock:
+                self.entries = entries
+            self.logger.debug(f"セレクタの統計を読み込みました: {self.path} ({len(self.entries)}件)")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"セレクタの統計を読み込めませんでした: {str(e)}")
+
+    def save(self):
+        """
+        前回の保存以降の記録をファイルに反映する（記録がない場合は何もしない）
+
+        ほかのプロセスが同じファイルに保存している場合も、ファイルの内容に記録を追加するため
+        互いの記録を上書きしません。
+        """
+        if not self.path:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with _file_lock(f"{self.path}.lock"):
+                try:
+                    entries = self._read()
+                    records = pending
+                except ValueError as e:
+                    # ファイルが壊れている場合は、この実行の統計で置き換える
+                    self.logger.warning(f"セレクタの統計を読み込めないため、置き換えます: {str(e)}")
+                    with self._lock:
+                        entries = json.loads(json.dumps(self.entries))
+                    records = []
+                for record in records:
+                    self._apply(entries, *record)
+
+                # 一時ファイルはプロセスごとに別の名前で作成し、書き込みが終わってから置き換える
+                fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump({'version': 1, self.section: entries}, f, ensure_ascii=False, indent=1)
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+
+            # ほかのプロセスの記録を取り込み、保存中に追加された記録を反映する
+            with self._lock:
+                for record in self._pending:
+                    self._apply(entries, *record)
+                self.entries = entries
+        except OSError as e:
+            with self._lock:
+                self._pending = pending + self._pending
+            self.logger.warning(f"セレクタの統計を保存できませんでした: {str(e)}")
+
+
+def selector_key(selector: Tuple[str, str]) -> str:
+    """(グループ, 名前) を保存用のキーに変換する"""
+    return f"{selector[0]}.{selector[1]}"
+
+
+class SelectorStats(_StatsFile):
+    """
+    セレクタごとの要素の出現時間を記録し、タイムアウトを算出する
+
+    使用例:
+        stats = SelectorStats("data/selector_stats.json")
+        timeout = stats.timeout_for(("login", "username"), "example.com", default=10)
+        ...
+        stats.record(("login", "username"), "example.com", 0.42)
+        stats.save()
+    """
+
+    def __init__(self, path: Optional[str] = None, margin: float = 1.5, min_timeout: float = 1.0,
+                 max_timeout: float = 60.0, min_samples: int = 20, history_size: int = 200,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            path: 統計を保存するJSONファイルのパス（省略時は保存しない）
+            margin: p99 に掛ける余裕係数
+            min_timeout: 算出するタイムアウトの下限（秒）
+            max_timeout: 算出するタイムアウトの上限（秒）
+            min_samples: 実績からタイムアウトを算出するのに必要な記録数
+            history_size: セレクタ・ドメインごとに保持する記録数
+            logger: ロガー（省略可能）
+        """
+        super().__init__(path, logger)
+        self.margin = margin
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.history_size = history_size
+
+        # entries: {"group.name": {domain: {"latencies": [...], "misses": n, "streak": 連続して見つからなかった回数}}}
+        if path:
+            self.load()
+
+    key = staticmethod(selector_key)
+
+    def record(self, selector: Tuple[str, str], domain: Optional[str], seconds: Optional[float]):
+        """
+        要素の待機結果を記録する
+
+        Args:
+            selector: (グループ, 名前)
+            domain: ページのドメイン
+            seconds: 要素が現れるまでの時間（秒）。見つからなかった場合はNone
+        """
+        self._add(self.key(selector), domain, None if seconds is None else round(seconds, 4))
+
+    def _apply(self, entries: Dict[str, Any], key: str, domain: Optional[str], seconds: Optional[float]):
+        for bucket_domain in {domain or ALL_DOMAINS, ALL_DOMAINS}:
+            entry = entries.setdefault(key, {}).setdefault(bucket_domain, {'latencies': [], 'misses': 0})
+            if seconds is None:
+                entry['misses'] += 1
+                entry['streak'] = entry.get('streak', 0) + 1
+            else:
+                entry['latencies'].append(seconds)
+                del entry['latencies'][:-self.history_size]
+                entry['streak'] = 0
+
+    def _samples(self, selector: Tuple[str, str], domain: Optional[str]) -> List[Tuple[str, List[float]]]:
+        """タイムアウトの算出に使用する候補を優先順に返す"""
+        key = self.key(selector)
+        domain = domain or ALL_DOMAINS
+        per_selector = self.entries.get(key, {})
+
+        candidates = [
+            ('selector+domain', per_selector.get(domain, {}).get('latencies', [])),
+            ('selector', per_selector.get(ALL_DOMAINS, {}).get('latencies', []))
+        ]
+        if domain != ALL_DOMAINS:
+            pooled = []
+            for domains in self.entries.values():
+                pooled.extend(domains.get(domain, {}).get('latencies', []))
+            candidates.append(('domain', pooled))
+        return candidates
+
+    def timeout_for(self, selector: Tuple[str, str], domain: Optional[str], default: float) -> float:
+        """
+        セレクタの待機タイムアウトを算出する
+
+        算出したタイムアウトで見つからなかった場合は、連続して見つからなかった回数ごとに
+        タイムアウトを2倍にします（default を超えない範囲）。見つかった時点で元に戻ります。
+
+        Args:
+            selector: (グループ, 名前)
+            domain: ページのドメイン
+            default: 実績が不足している場合のタイムアウト（秒）
+
+        Returns:
+            float: タイムアウト（秒）
+        """
+        with self._lock:
+            for _, latencies in self._samples(selector, domain):
+                if len(latencies) >= self.min_samples:
+                    timeout = min(max(percentile(latencies, 0.99) * self.margin, self.min_timeout), self.max_timeout)
+                    streak = self.entries.get(self.key(selector), {}).get(domain or ALL_DOMAINS, {}).get('streak', 0)
+                    if streak and default is not None:
+                        timeout = max(min(timeout * 2 ** min(streak, 10), default), timeout)
+                    return round(timeout, 3)
+        return default
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        セレクタ・ドメインごとの統計を取得する
+
+        Returns:
+            list: {selector, domain, samples, misses, p50, p99, timeout} のリスト
+        """
+        rows = []
+        with self._lock:
+            for key, domains in sorted(self.entries.items()):
+                for domain, entry in sorted(domains.items()):
+                    latencies = entry['latencies']
+                    rows.append({
+                        'selector': key,
+                        'domain': domain,
+                        'samples': len(latencies),
+                        'misses': entry['misses'],
+                        'p50': percentile(latencies, 0.5) if latencies else None,
+                        'p99': percentile(latencies, 0.99) if latencies else None
+                    })
+        for row in rows:
+            group, name = row['selector'].split('.', 1)
+            domain = None if row['domain'] == ALL_DOMAINS else row['domain']
+            row['timeout'] = self.timeout_for((group, name), domain, default=None)
+        return rows
+
+
+class CandidateHistory(_StatsFile):
+    """
+    セレクタの候補ごとの一致の実績を記録し、候補の優先順位を決める
+
+    一致率が高く、ページ内での検索が速い候補を優先します。実績のない候補は selectors.csv の順序に従います。
+    selectors.csv の第1候補が一致せず別の候補が使われている状態を「ずれ」として報告します。
+
+    使用例:
+        history = CandidateHistory("data/selector_candidates.json")
+        ranked = history.rank(("login", "username"), ["id=username", "css=#login input"])
+        history.record(("login", "username"), {"id=username": (False, 0.1), "css=#login input": (True, 0.3)})
+    """
+
+    section = 'candidates'
+
+    def __init__(self, path: Optional[str] = None, decay: float = 0.9, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            path: 実績を保存するJSONファイルのパス（省略時は保存しない）
+            decay: 過去の実績の重み（0〜1。小さいほど最近の結果を重視する）
+            logger: ロガー（省略可能）
+        """
+        super().__init__(path, logger)
+        self.decay = decay
+
+        # entries: {"group.name": {"種別=値": {"rate": 一致率, "ms": 検索時間, "hits": n, "misses": n}}}
+        if path:
+            self.load()
+
+    def record(self, selector: Tuple[str, str], results: Dict[str, Tuple[bool, float]]):
+        """
+        1回の検索での候補ごとの結果を記録する
+
+        Args:
+            selector: (グループ, 名前)
+            results: {候補: (一致したかどうか, ページ内での検索時間(ms))}
+        """
+        self._add(selector_key(selector), {candidate: [bool(matched), ms] for candidate, (matched, ms) in results.items()})
+
+    def _apply(self, entries: Dict[str, Any], key: str, results: Dict[str, List[Any]]):
+        candidates = entries.setdefault(key, {})
+        for candidate, (matched, ms) in results.items():
+            entry = candidates.get(candidate)
+            if entry is None:
+                entry = candidates[candidate] = {'rate': 1.0 if matched else 0.0, 'ms': round(ms, 3),
+                                                 'hits': 0, 'misses': 0}
+            else:
+                entry['rate'] = round(entry['rate'] * self.decay + (1.0 - self.decay) * (1.0 if matched else 0.0), 4)
+                entry['ms'] = round(entry['ms'] * self.decay + (1.0 - self.decay) * ms, 3)
+            entry['hits' if matched else 'misses'] += 1
+
+    def rank(self, selector: Tuple[str, str], candidates: List[str]) -> List[str]:
+        """
+        候補を優先順に並べ替える
+
+        Args:
+            selector: (グループ, 名前)
+            candidates: selectors.csv の順序の候補
+
+        Returns:
+            list: 一致率の高い順（同じ場合は検索時間の短い順、実績のない候補は一致率0.5として扱う）
+        """
+        with self._lock:
+            history = self.entries.get(selector_key(selector), {})
+
+            def sort_key(item):
+                index, candidate = item
+                entry = history.get(candidate)
+                if entry is None:
+                    return (-0.5, 0.0, index)
+                return (-round(entry['rate'], 1), entry['ms'], index)
+
+            return [candidate for _, candidate in sorted(enumerate(candidates), key=sort_key)]
+
+    def drift(self, selector: Tuple[str, str], candidates: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        selectors.csv の第1候補が使われなくなっているかどうかを確認する
+
+        Args:
+            selector: (グループ, 名前)
+            candidates: selectors.csv の順序の候補
+
+        Returns:
+            dict or None: ずれがある場合は {selector, primary, active, primary_rate, active_rate}
+        """
+        if len(candidates) < 2:
+            return None
+        active = self.rank(selector, candidates)[0]
+        with self._lock:
+            history = self.entries.get(selector_key(selector), {})
+            primary_entry = history.get(candidates[0])
+            active_entry = history.get(active)
+        if active == candidates[0] or active_entry is None or primary_entry is None:
+            return None
+        return {
+            'selector': selector_key(selector),
+            'primary': candidates[0],
+            'active': active,
+            'primary_rate': primary_entry['rate'],
+            'active_rate': active_entry['rate']
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='セレクタの待機時間統計の表示')
+    parser.add_argument('path', nargs='?', default='data/selector_stats.json', help='統計ファイルのパス')
+    parser.add_argument('--candidates', help='候補ごとの一致の実績を表示する（data/selector_candidates.json など）')
+    args = parser.parse_args()
+
+    if args.candidates:
+        print("セレクタ".ljust(32) + "候補".ljust(48) + "一致率".rjust(8) + "ms".rjust(10) + "一致".rjust(8) + "不一致".rjust(8))
+        for key, candidates in sorted(CandidateHistory(args.candidates).entries.items()):
+            for candidate, entry in candidates.items():
+                print(key.ljust(32) + candidate[:47].ljust(48) + f"{entry['rate']:.2f}".rjust(8)
+                      + f"{entry['ms']:.3f}".rjust(10) + str(entry['hits']).rjust(8) + str(entry['misses']).rjust(8))
+    else:
+        print("セレクタ".ljust(32) + "ドメイン".ljust(24) + "件数".rjust(8) + "失敗".rjust(8)
+              + "p50".rjust(10) + "p99".rjust(10) + "タイムアウト".rjust(12))
+        for row in SelectorStats(args.path).report():
+            values = [f"{row[column]:.3f}" if row[column] is not None else "-" for column in ('p50', 'p99', 'timeout')]
+            print(row['selector'].ljust(32) + row['domain'].ljust(24) + str(row['samples']).rjust(8)
+                  + str(row['misses']).rjust(8) + values[0].rjust(10) + values[1].rjust(10) + values[2].rjust(12))
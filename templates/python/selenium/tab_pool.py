@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+タブプールモジュール
+
+1つの Chrome の中に複数のタブを開き、CDPで各タブに同時に移動を指示して、
+読み込みが完了したタブから順に結果を取り出します。ブラウザをワーカーごとに
+起動する crawler.py に比べてメモリ使用量が少なく、軽いページの大量処理に向いています。
+"""
+
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from selenium.common.exceptions import JavascriptException
+
+from .cdp import CDPSession, _exception_message
+from .crawler import CrawlResult, CrawlStats
+
+
+class Tab:
+    """タブプールの1つのタブ"""
+
+    __slots__ = ('session', 'target_id', 'session_id', 'uses', 'url', 'started', 'error', 'busy',
+                 'generation', 'loader_id', 'last_load', 'listener')
+
+    def __init__(self, session: CDPSession, target_id: str, session_id: str):
+        self.session = session
+        self.target_id = target_id
+        self.session_id = session_id
+        self.uses = 0
+        self.url = None
+        self.started = 0.0
+        self.error = None
+        self.busy = False
+        # 移動の指示ごとに増やし、前の指示の完了やエラーを今の URL の結果として扱わないようにする
+        self.generation = 0
+        # 今の移動のドキュメントの loaderId と、最後に読み込みが完了したドキュメントの loaderId
+        self.loader_id = None
+        self.last_load = None
+        self.listener = None
+
+    @property
+    def handle(self) -> str:
+        """WebDriverのウィンドウハンドル（driver.switch_to.window に指定可能）"""
+        return self.target_id
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """このタブにCDPコマンドを送信する"""
+        return self.session.send(method, params, self.session_id)
+
+    def evaluate(self, expression: str) -> Any:
+        """
+        このタブでJavaScriptの式を評価する
+
+        Args:
+            expression: 評価する式
+
+        Returns:
+            式の値（JSONに変換可能な値）
+        """
+        result = self.send('Runtime.evaluate', {'expression': expression, 'returnByValue': True})
+        if 'exceptionDetails' in result:
+            raise JavascriptException(_exception_message(result['exceptionDetails']))
+        return result.get('result', {}).get('value')
+
+    @property
+    def title(self) -> str:
+        return self.evaluate('document.title')
+
+    @property
+    def current_url(self) -> str:
+        return self.evaluate('location.href')
+
+    @property
+    def page_source(self) -> str:
+        return self.evaluate('document.documentElement.outerHTML')
+
+    def __repr__(self):
+        return f"Tab({self.target_id}, url={self.url})"
+
+
+def default_extractor(tab: Tab) -> Dict[str, Any]:
+    """デフォルトの抽出処理（タイトルと最終URLのみを返す）"""
+    return tab.evaluate('({title: document.title, url: location.href})')
+
+
+class TabPool:
+    """
+    1つの Chrome の中で複数のタブを使い回して URL を処理するプール
+
+    使用例:
+        with TabPool(browser.get_cdp_session(), size=8) as pool:
+            for result in pool.map(urls):
+                print(result.url, result.data)
+    """
+
+    def __init__(self, session: CDPSession, size: int = 4, timeout: float = 30.0, max_uses: int = 50,
+                 logger: Optional[logging.Logger] = None, browser_context_id: Optional[str] = None):
+        """
+        Args:
+            session: ブラウザ全体に接続したCDPセッション
+            size: 同時に開くタブ数
+            timeout: 1ページの読み込みタイムアウト（秒）
+            max_uses: 1つのタブで処理するページ数の上限（超えるとタブを作り直す）
+            logger: ロガー（省略可能）
+            browser_context_id: タブを開くブラウザコンテキスト（省略時は既定のコンテキスト）
+        """
+        self.session = session
+        self.browser_context_id = browser_context_id
+        self.size = max(int(size), 1)
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = CrawlStats()
+
+        self.tabs: List[Tab] = []
+        # (タブ, 移動の世代) の完了通知
+        self._completions = queue.Queue()
+        self._executor = None
+
+    def open(self):
+        """タブを開く"""
+        if self.tabs:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='tab-pool')
+        for _ in range(self.size):
+            self.tabs.append(self._create_tab())
+        self.logger.info(f"{self.size}個のタブを開きました")
+
+    def _create_tab(self) -> Tab:
+        """
+        バックグラウンドのタブを作成し、読み込み完了イベントを購読する
+
+        Page.loadEventFired にはどの移動の完了かを示す情報がないため、loaderId を含む
+        Page.lifecycleEvent の load で完了を判定します。
+        """
+        params = {'url': 'about:blank', 'background': True}
+        if self.browser_context_id is not None:
+            params['browserContextId'] = self.browser_context_id
+        target_id = self.session.send('Target.createTarget', params)['targetId']
+        session_id = self.session.attach(target_id)
+        tab = Tab(self.session, target_id, session_id)
+
+        tab.listener = self.session.on('Page.lifecycleEvent', lambda params, t=tab: self._on_lifecycle(t, params),
+                                       session_id)
+        tab.send('Page.enable')
+        tab.send('Page.setLifecycleEventsEnabled', {'enabled': True})
+        return tab
+
+    def _on_lifecycle(self, tab: Tab, params: Dict[str, Any]):
+        """メインフレームの load で、今の移動のドキュメントであれば完了とする（配信スレッドで呼び出される）"""
+        if params.get('name') != 'load' or params.get('frameId', tab.target_id) != tab.target_id:
+            return
+        generation = tab.generation
+        tab.last_load = params.get('loaderId')
+        if tab.loader_id is not None and tab.last_load == tab.loader_id:
+            self._completions.put((tab, generation))
+
+    def _close_tab(self, tab: Tab):
+        """タブを閉じる（読み込み完了イベントの購読も終了する）"""
+        if tab.listener is not None:
+            self.session.off('Page.lifecycleEvent', tab.listener)
+            tab.listener = None
+        try:
+            self.session.send('Target.closeTarget', {'targetId': tab.target_id})
+        except Exception as e:
+            self.logger.debug(f"タブを閉じる際にエラーが発生しました: {str(e)}")
+
+    def _recycle(self, tab: Tab) -> Tab:
+        """使用回数が上限に達したタブを作り直す"""
+        if tab.uses < self.max_uses:
+            return tab
+        self._close_tab(tab)
+        new_tab = self._create_tab()
+        self.tabs[self.tabs.index(tab)] = new_tab
+        self.logger.debug(f"タブを作り直しました: {tab.target_id} -> {new_tab.target_id}")
+        return new_tab
+
+    def _dispatch(self, tab: Tab, url: str):
+        """タブに移動を指示する（応答は待たない）"""
+        tab.generation += 1
+        tab.loader_id = None
+        tab.url = url
+        tab.error = None
+        tab.busy = True
+        tab.uses += 1
+        tab.started = time.monotonic()
+        self._executor.submit(self._navigate, tab, url, tab.generation)
+
+    def _navigate(self, tab: Tab, url: str, generation: int):
+        """Page.navigate を送信する（プールのスレッドで実行）"""
+        try:
+            result = tab.send('Page.navigate', {'url': url})
+        except Exception as e:
+            # 応答を待つ間に次の移動が指示された場合は、前の移動のエラーとして無視する
+            if tab.generation == generation:
+                tab.error = str(e)
+                self._completions.put((tab, generation))
+            return
+
+        if tab.generation != generation:
+            return
+        if result.get('errorText') or not result.get('loaderId'):
+            # 移動の失敗と同一ドキュメント内の移動（#hash など）は load イベントを待たない
+            tab.error = result.get('errorText')
+            self._completions.put((tab, generation))
+            return
+
+        tab.loader_id = result['loaderId']
+        # 応答より先に load イベントを受信していた場合
+        if tab.last_load == tab.loader_id:
+            self._completions.put((tab, generation))
+
+    def _harvest(self, tab: Tab, extractor: Callable[[Tab], Any]) -> CrawlResult:
+        """読み込みが完了したタブから結果を取り出す"""
+        elapsed = time.monotonic() - tab.started
+        if tab.error:
+            return CrawlResult(tab.url, False, None, tab.error, 1, elapsed, tab.target_id)
+        try:
+            return CrawlResult(tab.url, True, extractor(tab), None, 1, elapsed, tab.target_id)
+        except Exception as e:
+            return CrawlResult(tab.url, False, None, str(e), 1, elapsed, tab.target_id)
+
+    def map(self, urls: Iterable[str], extractor: Optional[Callable[[Tab], Any]] = None) -> Iterator[CrawlResult]:
+        """
+        URLを複数のタブで同時に読み込み、完了した順に結果を返す
+
+        Args:
+            urls: 処理するURLのリストまたはイテレーター
+            extractor: 読み込み完了後に呼び出す抽出処理 extractor(tab)（省略時はタイトルとURL）
+
+        Yields:
+            CrawlResult: 各URLの処理結果（完了順、worker はタブのターゲットID）
+        """
+        self.open()
+        extractor = extractor or default_extractor
+        url_iter = iter(urls)
+        self.stats = CrawlStats()
+
+        def dispatch_next(tab: Tab) -> bool:
+            url = next(url_iter, None)
+            if url is None:
+                return False
+            self._dispatch(self._recycle(tab), url)
+            return True
+
+        for tab in list(self.tabs):
+            if not dispatch_next(tab):
+                break
+
+        while any(tab.busy for tab in self.tabs):
+            try:
+                finished = [self._completions.get(timeout=0.2)]
+            except queue.Empty:
+                finished = []
+
+            # タイムアウトしたタブは読み込みを止めて失敗とする
+            now = time.monotonic()
+            for tab in self.tabs:
+                if tab.busy and now - tab.started > self.timeout:
+                    tab.error = tab.error or f"ページの読み込みがタイムアウトしました ({self.timeout}秒)"
+                    try:
+                        tab.send('Page.stopLoading')
+                    except Exception:
+                        pass
+                    finished.append((tab, tab.generation))
+
+            for tab, generation in finished:
+                # 作り直す前のタブや、前の移動の完了通知は無視する
+                if not tab.busy or generation != tab.generation or tab not in self.tabs:
+                    continue
+                tab.busy = False
+                result = self._harvest(tab, extractor)
+                self.stats.add(result)
+                yield result
+                dispatch_next(tab)
+
+        self.stats.finish()
+        self.logger.info(f"タブプールでの処理が完了しました: {self.stats}")
+
+    def close(self):
+        """すべてのタブを閉じる"""
+        for tab in self.tabs:
+            self._close_tab(tab)
+        self.tabs = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+テーブル抽出モジュール
+
+ページ内のHTMLテーブルのセルの値を、rowspan・colspan を展開した表として取得し、
+CSV・Arrow・Parquet ファイルに書き出します。大きなテーブルは指定した行数ずつ取得して書き出すため、
+すべての行をメモリに保持することはありません。Parquet ファイルはそのまま BigQuery に読み込めます。
+
+使用例:
+    result = browser.extract_table("table#sales", "data/sales.parquet")
+    # {'path': 'data/sales.parquet', 'format': 'parquet', 'rows': 120000, 'columns': [...]}
+"""
+
+import csv
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+# pyarrowのインポート（可能であれば）
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# 1回のスクリプト実行で取得する行数
+DEFAULT_CHUNK_SIZE = 1000
+
+# 出力形式と拡張子
+FORMATS = {'.csv': 'csv', '.arrow': 'arrow', '.feather': 'arrow', '.parquet': 'parquet'}
+
+# テーブルの行数と見出し行の数を取得するスクリプト
+TABLE_INFO_JS = """
+    var table = arguments[0];
+    var headerRows = 0;
+    if (table.tHead) {
+        headerRows = table.tHead.rows.length;
+    } else if (table.rows.length) {
+        var cells = table.rows[0].cells, allHeaders = cells.length > 0;
+        for (var i = 0; i < cells.length; i++) {
+            if (cells[i].tagName !== 'TH') { allHeaders = false; break; }
+        }
+        headerRows = allHeaders ? 1 : 0;
+    }
+    return {rows: table.rows.length, header_rows: headerRows};
+"""
+
+# 指定した行から指定した行数のセルの値を、rowspan・colspan を展開して取得するスクリプト
+# carry は前回までの rowspan の続き（列ごとの [残りの行数, 値]）で、次の呼び出しに引き継ぐ
+TABLE_CHUNK_JS = """
+    var table = arguments[0], start = arguments[1], limit = arguments[2];
+    var carry = arguments[3] || [], fill = arguments[4];
+    var rows = table.rows, out = [], index = start;
+
+    function cellText(cell) {
+        return (cell.textContent || '').replace(/\\s+/g, ' ').trim();
+    }
+
+    for (; index < rows.length && out.length < limit; index++) {
+        var cells = rows[index].cells, values = [], col = 0, c = 0;
+        while (c < cells.length || col < carry.length) {
+            if (carry[col] && carry[col][0] > 0) {
+                values[col] = carry[col][1];
+                carry[col][0]--;
+                col++;
+                continue;
+            }
+            if (c >= cells.length) {
+                col++;
+                continue;
+            }
+            var cell = cells[c++], value = cellText(cell);
+            var colspan = Math.max(cell.colSpan || 1, 1);
+            var rowspan = cell.rowSpan === 0 ? rows.length - index : Math.max(cell.rowSpan || 1, 1);
+            for (var k = 0; k < colspan; k++) {
+                var spanned = (k === 0 || fill) ? value : '';
+                values[col + k] = spanned;
+                carry[col + k] = rowspan > 1 ? [rowspan - 1, fill ? spanned : ''] : null;
+            }
+            col += colspan;
+        }
+        for (var k = 0; k < values.length; k++) {
+            if (values[k] === undefined) values[k] = '';
+        }
+        out.push(values);
+    }
+    return {rows: out, next: index, carry: carry};
+"""
+
+
+def detect_format(path: str, format: Optional[str] = None) -> str:
+    """
+    出力形式を決める（指定がない場合は拡張子から判定）
+
+    Raises:
+        ValueError: 対応していない形式の場合
+    """
+    format = (format or FORMATS.get(os.path.splitext(path)[1].lower(), '')).lower()
+    if format not in set(FORMATS.values()):
+        raise ValueError(f"対応していない出力形式です: {format or path}（csv / arrow / parquet）")
+    return format
+
+
+def column_names(header_rows: List[List[str]], width: int) -> List[str]:
+    """
+    見出し行から列名を作成する
+
+    複数の見出し行は列ごとに「 / 」でつなぎ、空の列名や重複する列名には番号を付けます。
+
+    Args:
+        header_rows: rowspan・colspan を展開した見出し行
+        width: 列数
+
+    Returns:
+        list: 列名
+    """
+    names = []
+    for index in range(width):
+        parts = []
+        for row in header_rows:
+            value = row[index] if index < len(row) else ''
+            if value and (not parts or parts[-1] != value):
+                parts.append(value)
+        names.append(' / '.join(parts) or f'column_{index + 1}')
+
+    seen = {}
+    for index, name in enumerate(names):
+        if name in seen:
+            seen[name] += 1
+            names[index] = f'{name}_{seen[name]}'
+        else:
+            seen[name] = 1
+    return names
+
+
+class TableExtractor:
+    """
+    ページ内のテーブルを行数ごとに取得する
+
+    使用例:
+        extractor = TableExtractor(driver, table_element)
+        for rows in extractor.iter_chunks():
+            ...
+    """
+
+    def __init__(self, driver, table, chunk_size: int = DEFAULT_CHUNK_SIZE, fill_spans: bool = True,
+                 header: Optional[bool] = None, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            driver: WebDriverインスタンス
+            table: table要素
+            chunk_size: 1回のスクリプト実行で取得する行数
+            fill_spans: rowspan・colspan で結合されたセルの値をすべての列・行に入れるかどうか
+                （Falseの場合は最初のセル以外を空にする）
+            header: 見出し行があるかどうか（None の場合は thead または th のみの先頭行で判定）
+            logger: ロガー（省略可能）
+        """
+        self.driver = driver
+        self.table = table
+        self.chunk_size = max(int(chunk_size), 1)
+        self.fill_spans = fill_spans
+        self.logger = logger or logging.getLogger(__name__)
+
+        info = driver.execute_script(TABLE_INFO_JS, table)
+        self.total_rows = info['rows']
+        header_count = info['header_rows'] if header is None else (max(info['header_rows'], 1) if header else 0)
+
+        self._carry: List[Any] = []
+        self._next = 0
+        header_rows = self._fetch(header_count) if header_count else []
+        self._first_chunk = self._fetch(self.chunk_size)
+
+        width = max([len(row) for row in header_rows + self._first_chunk] or [0])
+        self.columns = column_names(header_rows, width)
+        self.truncated_rows = 0
+
+    def _fetch(self, limit: int) -> List[List[str]]:
+        """次の行から指定した行数を取得する"""
+        if self._next >= self.total_rows:
+            return []
+        result = self.driver.execute_script(TABLE_CHUNK_JS, self.table, self._next, limit, self._carry, self.fill_spans)
+        self._next = result['next']
+        self._carry = result['carry']
+        return result['rows']
+
+    def _normalize(self, rows: List[List[str]]) -> List[List[str]]:
+        """行の列数を列名の数にそろえる（多い列は切り捨てて件数を記録する）"""
+        width = len(self.columns)
+        for index, row in enumerate(rows):
+            if len(row) < width:
+                rows[index] = row + [''] * (width - len(row))
+            elif len(row) > width:
+                self.truncated_rows += 1
+                rows[index] = row[:width]
+        return rows
+
+    def iter_chunks(self) -> Iterator[List[List[str]]]:
+        """
+        見出し行以外の行を chunk_size 行ずつ取得する
+
+        Yields:
+            list: 列名の順の値のリスト（行）のリスト
+        """
+        rows, self._first_chunk = self._first_chunk, []
+        while rows:
+            yield self._normalize(rows)
+            rows = self._fetch(self.chunk_size)
+        if self.truncated_rows:
+            self.logger.warning(f"列数が見出しより多い {self.truncated_rows} 行の余分な列を切り捨てました")
+
+
+def write_csv(columns: List[str], chunks: Iterator[List[List[str]]], path: str) -> int:
+    """
+    行のまとまりを順にCSVファイルに書き出す
+
+    Returns:
+        int: 書き出した行数
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_arrow(columns: List[str], chunks: Iterator[List[List[str]]], path: str, parquet: bool = False) -> int:
+    """
+    行のまとまりを列に変換し、Arrow（IPC）または Parquet ファイルに順に書き出す
+
+    すべての列は文字列として書き出します。
+
+    Returns:
+        int: 書き出した行数
+
+    Raises:
+        ImportError: pyarrowがインストールされていない場合
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("pyarrowがインストールされていません")
+
+    schema = pyarrow.schema([(name, pyarrow.string()) for name in columns])
+    writer = pyarrow.parquet.ParquetWriter(path, schema) if parquet else pyarrow.ipc.new_file(path, schema)
+    count = 0
+    try:
+        for rows in chunks:
+            arrays = [pyarrow.array(values, type=pyarrow.string()) for values in zip(*rows)]
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
+
+
+def extract_table(driver, table, path: str, format: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  fill_spans: bool = True, header: Optional[bool] = None,
+                  logger: Optional[logging.Logger] = None) -> Dict[str, Any]:
+    """
+    テーブルをファイルに書き出す
+
+    Args:
+        driver: WebDriverインスタンス
+        table: table要素
+        path: 出力先のパス（拡張子 .csv / .arrow / .feather / .parquet で形式を判定）
+        format: 出力形式（csv / arrow / parquet。省略時は拡張子から判定）
+        chunk_size: 1回のスクリプト実行で取得する行数
+        fill_spans: 結合されたセルの値をすべての列・行に入れるかどうか
+        header: 見出し行があるかどうか（None の場合は自動判定）
+        logger: ロガー（省略可能）
+
+    Returns:
+        dict: {path, format, rows, columns}
+    """
+    format = detect_format(path, format)
+    if format != 'csv' and not ARROW_AVAILABLE:
+        raise ImportError("pyarrowがインストールされていません")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    extractor = TableExtractor(driver, table, chunk_size, fill_spans, header, logger)
+    if format == 'csv':
+        count = write_csv(extractor.columns, extractor.iter_chunks(), path)
+    else:
+        count = write_arrow(extractor.columns, extractor.iter_chunks(), path, parquet=(format == 'parquet'))
+    return {'path': path, 'format': format, 'rows': count, 'columns': extractor.columns}
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+プロセス監視モジュール
+
+chromedriver と Chrome のプロセスツリーのメモリ使用量・CPU使用率・ハンドル数を計測し、
+一定回数の移動やメモリ使用量の上限を超えたセッションの作り直しを判断します。
+終了時に応答しないプロセスや、ドライバーが異常終了して残ったプロセスを強制終了します。
+"""
+
+import importlib.util
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# psutilが利用可能かどうか（インポートは監視を開始する時点で行う）
+PSUTIL_AVAILABLE = importlib.util.find_spec("psutil") is not None
+
+
+def get_driver_pids(driver) -> List[int]:
+    """
+    ドライバーが起動したプロセスのIDを取得する
+
+    Args:
+        driver: WebDriver（chromedriver のサービスプロセス）または CDPDriver（Chrome のプロセス）
+
+    Returns:
+        list: プロセスIDのリスト
+    """
+    pids = []
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None) or getattr(driver, 'process', None)
+    if process is not None and getattr(process, 'pid', None):
+        pids.append(process.pid)
+    return pids
+
+
+class SessionMetrics:
+    """1つのブラウザセッションの計測結果"""
+
+    def __init__(self, history_size: int = 100):
+        """
+        Args:
+            history_size: 保持するサンプル数
+        """
+        self.started_at = datetime.now()
+        self.navigations = 0
+        self.recycles = 0
+        self.killed_processes = 0
+        self.peak_rss_mb = 0.0
+        self.samples = deque(maxlen=history_size)
+
+    @property
+    def last(self) -> Optional[Dict[str, Any]]:
+        """最新のサンプル"""
+        return self.samples[-1] if self.samples else None
+
+    def add_sample(self, sample: Dict[str, Any]):
+        """サンプルを追加する"""
+        self.samples.append(sample)
+        self.peak_rss_mb = max(self.peak_rss_mb, sample['rss_mb'])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONシリアライズ可能な辞書に変換する"""
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'navigations': self.navigations,
+            'recycles': self.recycles,
+            'killed_processes': self.killed_processes,
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'last': self.last,
+            'samples': list(self.samples)
+        }
+
+    def export(self, path: str):
+        """
+        計測結果をJSON Lines形式のファイルに追記する（1セッション1行）
+
+        Args:
+            path: 出力先のパス
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        record = self.to_dict()
+        record['ended_at'] = datetime.now().isoformat(timespec='seconds')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class ProcessWatchdog:
+    """
+    ブラウザのプロセスツリーを監視し、セッションの作り直しと強制終了を行う
+
+    psutil がインストールされていない場合、メモリなどの計測と強制終了は行わず、
+    移動回数による作り直しの判断のみを行います。
+    """
+
+    def __init__(self, max_navigations: int = 0, memory_limit_mb: float = 0, quit_timeout: float = 10,
+                 history_size: int = 100, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            max_navigations: セッションを作り直すまでの移動回数（0で無効）
+            memory_limit_mb: セッションを作り直すメモリ使用量の上限（MB、0で無効）
+            quit_timeout: 終了を待つ時間（秒）。超えた場合はプロセスを強制終了する
+            history_size: 保持するサンプル数
+            logger: ロガー（省略可能）
+        """
+        self.max_navigations = max_navigations
+        self.memory_limit_mb = memory_limit_mb
+        self.quit_timeout = quit_timeout
+        self.history_size = history_size
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.metrics = SessionMetrics(history_size)
+        # psutil.Process はプロセスの開始時刻も保持するため、終了したプロセスのIDが再利用されても
+        # 別のプロセスを対象にしない（プロセスIDだけを保持して後から psutil.Process を作らない）
+        self._roots: List[Any] = []
+        self._seen: Dict[int, Any] = {}
+        self._processes: Dict[int, Any] = {}
+
+        if (memory_limit_mb or quit_timeout) and not PSUTIL_AVAILABLE:
+            self.logger.debug("psutilがインストールされていないため、プロセスの計測は行いません")
+
+    def attach(self, driver):
+        """
+        監視対象のドライバーを設定する（セッションを作り直した場合も呼び出す）
+
+        Args:
+            driver: WebDriver または CDPDriver
+        """
+        recycles = self.metrics.recycles
+        self.metrics = SessionMetrics(self.history_size)
+        self.metrics.recycles = recycles
+        self._roots = []
+        self._seen = {}
+        self._processes = {}
+        if PSUTIL_AVAILABLE:
+            import psutil
+            for pid in get_driver_pids(driver):
+                try:
+                    self._roots.append(psutil.Process(pid))
+                except psutil.Error:
+                    continue
+        self._collect()
+
+    def _collect(self) -> List[Any]:
+        """監視対象のプロセス（ルートとその子孫）を取得し、これまでに確認したプロセスとして記録する"""
+        if not PSUTIL_AVAILABLE:
+            return []
+        import psutil
+
+        processes = []
+        for root in self._roots:
+            try:
+                children = root.children(recursive=True)
+            except psutil.Error:
+                continue
+            processes.append(root)
+            processes.extend(children)
+
+        current = {}
+        for process in processes:
+            # CPU使用率は前回の呼び出しからの差分で計算されるため、同じプロセスのオブジェクトを使い回す
+            # （psutil.Process の比較はプロセスIDと開始時刻で行われる）
+            previous = self._processes.get(process.pid)
+            current[process.pid] = previous if previous is not None and previous == process else process
+        self._processes = current
+        for pid, process in current.items():
+            seen = self._seen.get(pid)
+            if seen is None or seen != process:
+                self._seen[pid] = process
+        return list(current.values())
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """
+        プロセスツリーのリソース使用量を計測する
+
+        Returns:
+            dict or None: {timestamp, navigations, processes, rss_mb, cpu_percent, handles}。計測できない場合はNone
+        """
+        if not PSUTIL_AVAILABLE or not self._roots:
+            return None
+        import psutil
+
+        rss = 0
+        cpu = 0.0
+        handles = 0
+        count = 0
+        for process in self._collect():
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    cpu += process.cpu_percent(interval=None)
+                    handles += process.num_handles() if os.name == 'nt' else process.num_fds()
+                count += 1
+            except psutil.Error:
+                continue
+
+        sample = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'navigations': self.metrics.navigations,
+            'processes': count,
+            'rss_mb': round(rss / (1024 * 1024), 1),
+            'cpu_percent': round(cpu, 1),
+            'handles': handles
+        }
+        self.metrics.add_sample(sample)
+        return sample
+
+    def record_navigation(self):
+        """ページの移動を記録し、リソース使用量を計測する"""
+        self.metrics.navigations += 1
+        self.sample()
+
+    def should_recycle(self) -> Optional[str]:
+        """
+        セッションを作り直すべきかどうかを判断する
+
+        Returns:
+            str or None: 作り直す理由。作り直す必要がない場合はNone
+        """
+        if self.max_navigations and self.metrics.navigations >= self.max_navigations:
+            return f"移動回数が上限に達しました ({self.metrics.navigations}回)"
+
+        last = self.metrics.last
+        if self.memory_limit_mb and last and last['rss_mb'] >= self.memory_limit_mb:
+            return f"メモリ使用量が上限を超えました ({last['rss_mb']}MB / {self.memory_limit_mb}MB)"
+
+        return None
+
+    def terminate(self, timeout: Optional[float] = None) -> int:
+        """
+        監視対象のプロセスの終了を待ち、残っているプロセスを強制終了する
+
+        ドライバーの quit() の後に呼び出します。親プロセスが先に終了した場合でも、
+        これまでに確認したすべてのプロセスを対象にします。確認した時点の psutil.Process を使用するため、
+        終了したプロセスのIDが別のプロセスに再利用されていても、そのプロセスは終了させません。
+
+        Args:
+            timeout: 終了を待つ時間（秒、省略時は quit_timeout）
+
+        Returns:
+            int: 強制終了したプロセス数
+        """
+        if not PSUTIL_AVAILABLE:
+            return 0
+        import psutil
+
+        self._collect()
+        processes = list(self._seen.values())
+
+        timeout = self.quit_timeout if timeout is None else timeout
+        _, alive = psutil.wait_procs(processes, timeout=timeout)
+
+        killed = 0
+        for process in alive:
+            try:
+                process.kill()
+                killed += 1
+            except psutil.Error:
+                continue
+        if alive:
+            psutil.wait_procs(alive, timeout=5)
+            self.logger.warning(f"終了しなかったプロセスを強制終了しました: {killed}個")
+
+        self.metrics.killed_processes += killed
+        self._roots = []
+        self._seen = {}
+        self._processes = {}
+        return killed
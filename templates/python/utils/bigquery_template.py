@@ -9,16 +9,20 @@ Google BigQueryとGoogle Cloud Storageとの連携に必要な最小限の機能
 - BigQuery認証
 - テーブルスキーマ確認
 - GCSファイル操作
+
+google-cloud-* は読み込みに時間がかかるため、クライアントを作成する時点でインポートします。
 """
 
+from __future__ import annotations
+
 import os
 from pathlib import Path
-from typing import Optional, List, BinaryIO, Union
+from typing import TYPE_CHECKING, Optional, List, BinaryIO, Union
 
-from google.cloud import bigquery
-from google.cloud import storage
-from google.oauth2 import service_account
-from google.cloud.exceptions import NotFound
+if TYPE_CHECKING:
+    from google.cloud import bigquery
+    from google.cloud import storage
+    from google.oauth2 import service_account
 
 from src.utils.logging_config import get_logger
 from src.utils.environment import env
@@ -77,6 +81,8 @@ class GoogleCloudAuth:
             return None
         
         try:
+            from google.oauth2 import service_account
+            
             # 認証情報を作成
             self.credentials = service_account.Credentials.from_service_account_file(
                 self.key_path,
@@ -102,6 +108,8 @@ class GoogleCloudAuth:
             return None
         
         try:
+            from google.cloud import bigquery
+            
             # BigQueryクライアントを初期化
             self.bigquery_client = bigquery.Client(
                 credentials=credentials,
@@ -130,6 +138,8 @@ class GoogleCloudAuth:
             return None
         
         try:
+            from google.cloud import storage
+            
             # GCSクライアントを初期化
             self.storage_client = storage.Client(
                 credentials=credentials,
@@ -162,6 +172,8 @@ class GoogleCloudAuth:
             logger.error("データセットIDが指定されていません")
             return False
         
+        from google.cloud.exceptions import NotFound
+        
         try:
             dataset_ref = client.dataset(dataset_id)
             client.get_dataset(dataset_ref)
@@ -194,6 +206,8 @@ class GoogleCloudAuth:
             logger.error("データセットIDが指定されていません")
             return False
         
+        from google.cloud.exceptions import NotFound
+        
         try:
             table_ref = client.dataset(dataset_id).table(table_id)
             client.get_table(table_ref)
@@ -226,6 +240,8 @@ class GoogleCloudAuth:
             logger.error("データセットIDが指定されていません")
             return None
         
+        from google.cloud.exceptions import NotFound
+        
         try:
             table_ref = client.dataset(dataset_id).table(table_id)
             table = client.get_table(table_ref)
@@ -263,6 +279,8 @@ class GoogleCloudAuth:
             logger.error("バケット名が指定されていません")
             return False
         
+        from google.cloud.exceptions import NotFound
+        
         try:
             bucket = client.get_bucket(bucket_name)
             logger.info(f"バケット '{bucket_name}' は存在します")
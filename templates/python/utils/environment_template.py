@@ -1,6 +1,5 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 from typing import Optional, Any
 import configparser
 
@@ -10,6 +9,13 @@ class EnvironmentUtils:
     # プロジェクトルートのデフォルト値
     BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+    # secrets.env を読み込んだかどうか（最初に環境変数を取得する時に読み込む）
+    _env_loaded = False
+
+    # 読み込み済みの settings.ini と、その時点のファイルの更新時刻
+    _config_cache = None
+    _config_mtime = None
+
     @staticmethod
     def get_project_root() -> Path:
         """
@@ -33,7 +39,23 @@ class EnvironmentUtils:
         if not env_file.exists():
             raise FileNotFoundError(f"{env_file} が見つかりません。正しいパスを指定してください。")
 
+        from dotenv import load_dotenv
         load_dotenv(env_file)
+        EnvironmentUtils._env_loaded = True
+
+    @staticmethod
+    def ensure_env_loaded() -> None:
+        """
+        secrets.env をまだ読み込んでいない場合に読み込みます。
+        ファイルがない場合は何もしません。
+        """
+        if EnvironmentUtils._env_loaded:
+            return
+        EnvironmentUtils._env_loaded = True
+        try:
+            EnvironmentUtils.load_env()
+        except FileNotFoundError:
+            pass  # 設定ファイルがない場合はスキップ
 
     @staticmethod
     def get_env_var(key: str, default: Optional[Any] = None) -> Any:
@@ -47,8 +69,32 @@ class EnvironmentUtils:
         Returns:
             Any: 環境変数の値またはデフォルト値
         """
+        EnvironmentUtils.ensure_env_loaded()
         return os.getenv(key, default)
 
+    @staticmethod
+    def get_config() -> Optional[configparser.ConfigParser]:
+        """
+        settings.ini を読み込みます。
+        読み込んだ内容はファイルが更新されるまで再利用します。
+
+        Returns:
+            Optional[configparser.ConfigParser]: 設定。ファイルがない場合はNone
+        """
+        config_path = EnvironmentUtils.BASE_DIR / "config" / "settings.ini"
+
+        try:
+            mtime = config_path.stat().st_mtime
+        except OSError:
+            return None
+
+        if EnvironmentUtils._config_cache is None or EnvironmentUtils._config_mtime != mtime:
+            config = configparser.ConfigParser()
+            config.read(config_path, encoding='utf-8')
+            EnvironmentUtils._config_cache = config
+            EnvironmentUtils._config_mtime = mtime
+        return EnvironmentUtils._config_cache
+
     @staticmethod
     def get_config_value(section: str, key: str, default: Optional[Any] = None) -> Any:
         """
@@ -62,13 +108,9 @@ class EnvironmentUtils:
         Returns:
             Any: 設定値
         """
-        config_path = EnvironmentUtils.BASE_DIR / "config" / "settings.ini"
-        
-        if not config_path.exists():
+        config = EnvironmentUtils.get_config()
+        if config is None:
             return default
-            
-        config = configparser.ConfigParser()
-        config.read(config_path, encoding='utf-8')
 
         if not config.has_section(section):
             return default
@@ -128,8 +170,5 @@ class EnvironmentUtils:
 # これにより、from src.utils.environment import env として使用できる
 env = EnvironmentUtils
 
-# 初期化時に環境変数を自動で読み込む
-try:
-    env.load_env()
-except FileNotFoundError:
-    pass  # 設定ファイルがない場合はスキップ
+# secrets.env はインポート時には読み込まず、env.get_env_var() で最初に値を取得する時に読み込む
+# （os.environ を直接参照する場合は、先に env.ensure_env_loaded() を呼び出してください）
@@ -10,6 +10,7 @@ Git一括管理ツール (Python実装)
 import os
 import sys
 import time
+import argparse
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
@@ -25,6 +26,12 @@ except ImportError:
     logging.basicConfig(level=logging.INFO)
     get_logger = lambda name: logging.getLogger(name)
 
+# シャーディング（複数マシンでの分担実行）
+try:
+    from src.utils.sharding import parse_shard
+except ImportError:
+    parse_shard = None
+
 # ロガー設定
 logger = get_logger(__name__)
 
@@ -515,6 +522,7 @@ def execute_git_command(command: str, **kwargs) -> Dict[str, Any]:
             - message: コミットメッセージ (commitコマンド用)
             - recursive: サブディレクトリも再帰的に検索するかどうか (デフォルト: False)
             - depth: 再帰検索時の最大深度 (デフォルト: 2)
+            - shard: 複数のマシンで分担する場合の担当分 (例: "0/4")
     
     Returns:
         実行結果の辞書
@@ -525,6 +533,7 @@ def execute_git_command(command: str, **kwargs) -> Dict[str, Any]:
     message = kwargs.get('message', None)
     recursive = kwargs.get('recursive', False)
     depth = kwargs.get('depth', 2)
+    shard_spec = kwargs.get('shard', None)
     
     # Git設定の取得（設定ファイルからの読み込み）
     if env:
@@ -555,6 +564,25 @@ def execute_git_command(command: str, **kwargs) -> Dict[str, Any]:
             'error': 'リポジトリが見つかりませんでした'
         }
     
+    # 担当するシャードのリポジトリに絞り込む（キーはマシン間で共通の相対パス）
+    if shard_spec:
+        if parse_shard is None:
+            logger.error("シャーディングモジュールが見つかりません")
+            return {
+                'success': False,
+                'error': 'シャーディングモジュールが見つかりません'
+            }
+        try:
+            shard = parse_shard(shard_spec)
+        except ValueError as e:
+            logger.error(str(e))
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        repos = list(shard.filter(repos, key=lambda repo: Path(os.path.relpath(repo, path)).as_posix()))
+        logger.info(f"シャード {shard} の担当リポジトリに絞り込みました")
+    
     logger.info(f"{len(repos)}個のリポジトリが見つかりました:")
     for repo in repos:
         logger.info(f"- {repo}")
@@ -595,6 +623,7 @@ def parse_args():
     parser.add_argument('--recursive', action='store_true', help='サブディレクトリも再帰的に検索')
     parser.add_argument('--depth', type=int, default=2, help='再帰検索時の最大深度')
     parser.add_argument('--no-stash', action='store_true', help='force-pull時にstashを試みない')
+    parser.add_argument('--shard', help='複数のマシンで分担する場合の担当分（例: 0/4）')
     
     return parser.parse_args()
 
@@ -631,7 +660,8 @@ def main():
         branch=args.branch,
         message=args.message,
         recursive=args.recursive,
-        depth=args.depth
+        depth=args.depth,
+        shard=args.shard
     )
     
     if result['success']:
@@ -39,6 +39,10 @@ class OpenAIGitHelper:
     
     def __init__(self):
         """初期化処理"""
+        # OPENAI_API_KEY などを os.environ から参照するため、secrets.env を読み込んでおく
+        if env:
+            env.ensure_env_loaded()
+        
         # 設定の読み込み
         self.use_openai = self._get_config_value("GIT", "use_openai", "true").lower() == "true"
         self.api_key = self._get_config_value("OPENAI", "api_key", os.environ.get("OPENAI_API_KEY", ""))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+シャーディングユーティリティ
+
+同じ処理を複数のマシンで分担して実行するためのユーティリティを提供します。
+各タスクのキー（URL、リポジトリのパス、スプレッドシートの行IDなど）から
+担当するシャードを決定的に計算するため、マシン間の調整は不要です。
+各シャードの出力は merge_shard_outputs() で1つのファイルに結合できます。
+"""
+
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+# 設定管理とロギングのインポート
+try:
+    from src.utils.logging_config import get_logger
+except ImportError:
+    # 直接実行時のフォールバック
+    import logging
+    logging.basicConfig(level=logging.INFO)
+    get_logger = lambda name: logging.getLogger(name)
+
+# ロガー設定
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+# シャードごとの出力ファイル名（例: results.shard-0-of-4.jsonl）
+SHARD_FILE_PATTERN = re.compile(r'\.shard-(\d+)-of-(\d+)$')
+
+
+def _score(shard_index: int, key: str) -> int:
+    """シャードとキーの組み合わせに対する重みを計算する"""
+    digest = hashlib.blake2b(f"{shard_index}:{key}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def shard_for_key(key: Any, total: int) -> int:
+    """
+    キーを担当するシャード番号を計算する
+
+    ランデブーハッシュ（最大重み法）を使用するため、シャード数を変更しても
+    担当が変わるキーは全体の一部に限られます。Pythonの hash() と異なり、
+    プロセスやマシンが変わっても同じ結果になります。
+
+    Args:
+        key: タスクのキー（文字列に変換して使用）
+        total: シャード数
+
+    Returns:
+        int: 担当するシャード番号（0 から total-1）
+    """
+    key = str(key)
+    return max(range(total), key=lambda index: _score(index, key))
+
+
+class Shard:
+    """
+    シャードの指定（全体 total 個のうち index 番目）
+
+    index は 0 から始まります（--shard 0/4 から --shard 3/4 まで）。
+    """
+
+    def __init__(self, index: int = 0, total: int = 1):
+        """
+        Args:
+            index: このシャードの番号（0 から total-1）
+            total: シャード数
+
+        Raises:
+            ValueError: 番号が範囲外の場合
+        """
+        if total < 1:
+            raise ValueError(f"シャード数は1以上を指定してください: {total}")
+        if not 0 <= index < total:
+            raise ValueError(f"シャード番号は 0 から {total - 1} の範囲で指定してください: {index}")
+        self.index = index
+        self.total = total
+
+    @property
+    def is_sharded(self) -> bool:
+        """複数のシャードに分割されているかどうか"""
+        return self.total > 1
+
+    def owns(self, key: Any) -> bool:
+        """
+        このシャードがキーを担当するかどうか
+
+        Args:
+            key: タスクのキー
+
+        Returns:
+            bool: 担当する場合はTrue
+        """
+        return not self.is_sharded or shard_for_key(key, self.total) == self.index
+
+    def filter(self, items: Iterable[T], key: Optional[Callable[[T], Any]] = None) -> Iterator[T]:
+        """
+        このシャードが担当する要素だけを返す
+
+        Args:
+            items: 入力（URLのリスト、find_git_repos の結果、スプレッドシートの行など）
+            key: 要素からタスクのキーを取り出す関数（省略時は要素そのもの）
+
+        Yields:
+            担当する要素
+        """
+        for item in items:
+            if self.owns(key(item) if key else item):
+                yield item
+
+    def output_path(self, path: str) -> str:
+        """
+        シャードごとの出力ファイルのパスを返す
+
+        Args:
+            path: 結合後の出力ファイルのパス（例: data/results.jsonl）
+
+        Returns:
+            str: シャードの出力パス（例: data/results.shard-0-of-4.jsonl）。分割しない場合はそのまま
+        """
+        if not self.is_sharded:
+            return path
+        base, ext = os.path.splitext(path)
+        return f"{base}.shard-{self.index}-of-{self.total}{ext}"
+
+    def __str__(self):
+        return f"{self.index}/{self.total}"
+
+    def __repr__(self):
+        return f"Shard({self.index}/{self.total})"
+
+
+def parse_shard(spec: Optional[str]) -> Shard:
+    """
+    "i/n" 形式の文字列からシャードを作成する（argparse の type としても使用可能）
+
+    Args:
+        spec: シャードの指定（例: "0/4"）。None または空文字の場合は分割しない
+
+    Returns:
+        Shard: シャード
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    if not spec:
+        return Shard()
+
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', spec)
+    if not match:
+        raise ValueError(f"シャードは 'i/n' の形式で指定してください: {spec}")
+    return Shard(int(match.group(1)), int(match.group(2)))
+
+
+def find_shard_outputs(path: str) -> Dict[int, str]:
+    """
+    出力ファイルに対応するシャードの出力ファイルを探す
+
+    Args:
+        path: 結合後の出力ファイルのパス
+
+    Returns:
+        dict: {シャード番号: ファイルパス}
+
+    Raises:
+        ValueError: シャード数が異なるファイルが混在している場合
+    """
+    base, ext = os.path.splitext(path)
+    outputs = {}
+    totals = set()
+    for file_path in glob.glob(f"{glob.escape(base)}.shard-*-of-*{ext}"):
+        match = SHARD_FILE_PATTERN.search(os.path.splitext(file_path)[0])
+        if not match:
+            continue
+        outputs[int(match.group(1))] = file_path
+        totals.add(int(match.group(2)))
+
+    if len(totals) > 1:
+        raise ValueError(f"シャード数が異なる出力ファイルが混在しています: {sorted(totals)}")
+
+    if totals:
+        total = totals.pop()
+        missing = [i for i in range(total) if i not in outputs]
+        if missing:
+            logger.warning(f"出力ファイルが見つからないシャードがあります: {missing} / {total}")
+
+    return dict(sorted(outputs.items()))
+
+
+def merge_shard_outputs(path: str, remove: bool = False) -> int:
+    """
+    シャードごとの出力ファイルを1つのファイルに結合する
+
+    拡張子に応じて結合方法を切り替えます。
+    - .json: 各ファイルのリストを連結
+    - .csv: ヘッダー行は最初のファイルのものだけを使用
+    - その他（.jsonl, .txt など）: 行をそのまま連結
+
+    Args:
+        path: 結合後の出力ファイルのパス（シャードの出力はこのパスから推定）
+        remove: 結合後にシャードの出力ファイルを削除するかどうか
+
+    Returns:
+        int: 結合したレコード数（行数または要素数）
+
+    Raises:
+        FileNotFoundError: シャードの出力ファイルが見つからない場合
+    """
+    outputs = find_shard_outputs(path)
+    if not outputs:
+        raise FileNotFoundError(f"シャードの出力ファイルが見つかりません: {path}")
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    ext = os.path.splitext(path)[1].lower()
+    count = 0
+
+    if ext == '.json':
+        merged: List[Any] = []
+        for file_path in outputs.values():
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            merged.extend(data if isinstance(data, list) else [data])
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        count = len(merged)
+
+    elif ext == '.csv':
+        with open(path, 'w', encoding='utf-8', newline='') as out:
+            writer = csv.writer(out)
+            header = None
+            for file_path in outputs.values():
+                with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                    reader = csv.reader(f)
+                    file_header = next(reader, None)
+                    if file_header is None:
+                        continue
+                    if header is None:
+                        header = file_header
+                        writer.writerow(header)
+                    elif file_header != header:
+                        logger.warning(f"ヘッダーが一致しません: {file_path}")
+                    for row in reader:
+                        writer.writerow(row)
+                        count += 1
+
+    else:
+        with open(path, 'w', encoding='utf-8') as out:
+            for file_path in outputs.values():
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        out.write(line if line.endswith('\n') else line + '\n')
+                        count += 1
+
+    logger.info(f"{len(outputs)}個のシャードの出力を結合しました: {path} ({count}件)")
+
+    if remove:
+        for file_path in outputs.values():
+            os.remove(file_path)
+
+    return count
@@ -11,7 +11,6 @@ Slack通知機能
 
 import os
 import json
-import requests
 from typing import Dict, Any, Optional, Union
 import traceback
 import platform
@@ -179,7 +178,9 @@ class SlackNotifier:
                 ]
             }
             
-            # POSTリクエストを送信
+            # POSTリクエストを送信（requests は読み込みに時間がかかるため送信時にインポート）
+            import requests
+            
             logger.info(f"Slack通知を送信しています: {title}")
             response = requests.post(
                 self.webhook_url,
@@ -5,13 +5,16 @@
 Google Spreadsheetへの認証機能
 
 環境変数から認証情報を取得し、Google Spreadsheetに認証するための最小限の機能を提供します。
+gspread と google-auth は認証を行う時点でインポートします。
 """
 
+from __future__ import annotations
+
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import gspread
-from google.oauth2.service_account import Credentials
+if TYPE_CHECKING:
+    import gspread
 
 from src.utils.logging_config import get_logger
 from src.utils.environment import env
@@ -61,6 +64,9 @@ class SpreadsheetAuth:
             return None
         
         try:
+            import gspread
+            from google.oauth2.service_account import Credentials
+            
             # 認証スコープ
             scopes = [
                 'https://www.googleapis.com/auth/spreadsheets',
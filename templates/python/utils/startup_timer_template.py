@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+起動時間の計測ユーティリティ
+
+インポート・設定の読み込み・ドライバーの解決・最初のページ移動など、
+処理の開始までにかかる時間を段階ごとに記録し、表形式で出力します。
+計測対象の時間に影響しないよう、標準ライブラリ以外はインポートしません。
+
+使用例:
+    from src.utils.startup_timer import startup_timer   # 最初にインポートする
+    import ...                                           # 重いモジュール
+    startup_timer.checkpoint("import")
+
+    with startup_timer.measure("config"):
+        setup()
+
+    print(startup_timer.report())
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StartupTimer:
+    """段階ごとの所要時間を記録するタイマー"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last_checkpoint = self.started
+        self.phases: Dict[str, float] = {}
+
+    def record(self, phase: str, seconds: float):
+        """
+        段階の所要時間を記録する（同じ段階は合計する）
+
+        Args:
+            phase: 段階名
+            seconds: 所要時間（秒）
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def checkpoint(self, phase: str) -> float:
+        """
+        前回の checkpoint（初回は計測開始）からの経過時間を段階として記録する
+
+        Args:
+            phase: 段階名
+
+        Returns:
+            float: 記録した時間（秒）
+        """
+        now = time.perf_counter()
+        seconds = now - self._last_checkpoint
+        self._last_checkpoint = now
+        self.record(phase, seconds)
+        return seconds
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """with ブロックの所要時間を段階として記録する"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    @property
+    def elapsed(self) -> float:
+        """計測開始からの経過時間（秒）"""
+        return time.perf_counter() - self.started
+
+    def to_dict(self) -> Dict[str, float]:
+        """段階ごとの所要時間と経過時間の合計を辞書で返す"""
+        return dict(self.phases, total=self.elapsed)
+
+    def report(self) -> str:
+        """
+        段階ごとの所要時間を表形式の文字列にする
+
+        Returns:
+            str: 段階・秒数・経過時間に対する割合の表
+        """
+        total = self.elapsed
+        lines = ["段階".ljust(28) + "秒".rjust(10) + "割合".rjust(10)]
+        for phase, seconds in self.phases.items():
+            ratio = seconds / total * 100 if total else 0.0
+            lines.append(phase.ljust(28) + f"{seconds:.3f}".rjust(10) + f"{ratio:.1f}%".rjust(10))
+        lines.append("合計".ljust(28) + f"{total:.3f}".rjust(10))
+        return "\n".join(lines)
+
+
+# プロセス全体で共有するタイマー（このモジュールのインポート時に計測を開始）
+startup_timer = StartupTimer()
@@ -23,3 +23,106 @@ def environment():
     """環境設定を提供するフィクスチャ"""
     from src.utils.environment import env
     return env
+
+
+class FakeWaiter:
+    """expect_event() の戻り値（記録済みのイベントから条件に一致するものを返す）"""
+
+    def __init__(self, events, predicate):
+        self.events = events
+        self.predicate = predicate
+
+    def wait(self, timeout):
+        return next((params for params in self.events if self.predicate(params)), None)
+
+    def cancel(self):
+        pass
+
+
+class FakeDevToolsSession:
+    """
+    CDPSession の代わりに使うダミーの DevTools 接続
+
+    送信したコマンドを sent に (メソッド, パラメーター, セッションID) として記録し、応答は
+    handle() で登録した値または関数 handler(params, session_id) から返します（未登録の場合は空の辞書）。
+    イベントは emit() で手動で発生させます。
+    """
+
+    def __init__(self, targets=None, events=None):
+        """
+        Args:
+            targets: page_targets() で返すタブの一覧（targetId, type, browserContextId）
+            events: expect_event() で返すイベントのパラメーターのリスト
+        """
+        self.targets = list(targets or [])
+        self.events = list(events or [])
+        self.listeners = {}
+        self.handlers = {}
+        self.sent = []
+        self.attached = []
+        self.detached = []
+        self.closed = False
+
+    def handle(self, method, response):
+        """コマンドの応答を登録する（値、または handler(params, session_id) を呼び出す関数）"""
+        self.handlers[method] = response
+        return self
+
+    def methods(self):
+        """送信したコマンドのメソッド名を送信順に返す"""
+        return [method for method, _, _ in self.sent]
+
+    def send(self, method, params=None, session_id=None, timeout=None):
+        self.sent.append((method, params, session_id))
+        response = self.handlers.get(method, {})
+        return response(params or {}, session_id) if callable(response) else response
+
+    def on(self, method, callback, session_id=None):
+        listener = (callback, session_id)
+        self.listeners.setdefault(method, []).append(listener)
+        return listener
+
+    def off(self, method, listener):
+        self.listeners[method].remove(listener)
+
+    def emit(self, method, params=None, session_id=None, **fields):
+        """イベントを発生させる（session_id を指定した場合は、そのセッションの購読とすべての購読に配信）"""
+        params = dict(params or {}, **fields)
+        for callback, listener_session in list(self.listeners.get(method, [])):
+            if session_id is None or listener_session in (None, session_id):
+                callback(params)
+
+    def expect_event(self, method, predicate, session_id=None):
+        return FakeWaiter(self.events, predicate)
+
+    def attach(self, target_id):
+        self.attached.append(target_id)
+        return f"S-{target_id}"
+
+    def detach(self, session_id):
+        self.detached.append(session_id)
+
+    def enable(self, domain, params=None, session_id=None):
+        return self.send(f"{domain}.enable", params, session_id)
+
+    def disable(self, domain, session_id=None):
+        self.send(f"{domain}.disable", None, session_id)
+
+    def page_targets(self, browser_context_id=None):
+        return [target for target in self.targets
+                if browser_context_id in (None, target.get("browserContextId"))]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def make_devtools_session():
+    """ダミーの DevTools 接続を作成する関数を提供するフィクスチャ"""
+    return FakeDevToolsSession
+
+
+@pytest.fixture
+def devtools_session():
+    """ダミーの DevTools 接続を提供するフィクスチャ"""
+    return FakeDevToolsSession()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+非同期ブラウザのテスト
+
+ドライバー呼び出しがイベントループをブロックしないこと、
+複数セッションの並行実行、非同期の要素待機を確認します。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+
+from src.modules.selenium.async_browser import AsyncBrowser
+from src.modules.selenium.browser import Browser
+
+
+class FakeBrowser:
+    def __init__(self, wait_seconds=0.0, element="element"):
+        self.driver = object()
+        self.logger = logging.getLogger(__name__)
+        self.timeout = 1
+        self.wait_seconds = wait_seconds
+        self.element = element
+        self.waits = []
+
+    def navigate_to(self, url):
+        time.sleep(0.2)
+        return True
+
+    def wait_for_element(self, by_or_tuple, value=None, condition=None, timeout=None, visible=False):
+        self.waits.append((by_or_tuple, value, timeout, visible, threading.current_thread().name))
+        time.sleep(self.wait_seconds)
+        return self.element
+
+    _resolve_locator = Browser._resolve_locator
+
+    def quit(self):
+        self.driver = None
+
+
+class TestAsyncBrowser:
+    """AsyncBrowserのテスト"""
+
+    def test_sessions_run_concurrently(self):
+        """複数セッションのブロッキング処理が並行して実行されること"""
+        async def scenario():
+            sessions = [AsyncBrowser(FakeBrowser()) for _ in range(3)]
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(5):
+                    await asyncio.sleep(0.02)
+                    ticks += 1
+
+            started = time.monotonic()
+            results = await asyncio.gather(ticker(), *(s.navigate_to("https://example.com") for s in sessions))
+            elapsed = time.monotonic() - started
+            for session in sessions:
+                await session.quit()
+            return results[1:], elapsed, ticks
+
+        results, elapsed, ticks = asyncio.run(scenario())
+
+        assert results == [True, True, True]
+        assert elapsed < 0.5
+        assert ticks == 5
+
+    def test_wait_for_element_delegates_to_browser(self):
+        """Browser.wait_for_element に引数をそのまま渡し、専用スレッドで実行すること"""
+        browser = FakeBrowser()
+
+        async def scenario():
+            session = AsyncBrowser(browser)
+            element = await session.wait_for_element(("login", "username"), timeout=3, visible=True)
+            await session.quit()
+            return element
+
+        assert asyncio.run(scenario()) == "element"
+        (locator, value, timeout, visible, thread), = browser.waits
+        assert (locator, value, timeout, visible) == (("login", "username"), None, 3, True)
+        assert thread != threading.main_thread().name
+
+    def test_wait_for_element_accepts_css_selector(self):
+        """値を省略した文字列は CSS セレクタとして Browser.wait_for_element に渡すこと"""
+        browser = FakeBrowser()
+
+        async def scenario():
+            session = AsyncBrowser(browser)
+            await session.wait_for_element("#login")
+            await session.wait_for_element(By.ID, "login")
+            await session.quit()
+
+        asyncio.run(scenario())
+        assert [wait[:2] for wait in browser.waits] == [((By.CSS_SELECTOR, "#login"), None), (By.ID, "login")]
+
+    def test_wait_for_element_does_not_block_loop(self):
+        """待機中も同じイベントループの他の処理が進むこと"""
+        async def scenario():
+            session = AsyncBrowser(FakeBrowser(wait_seconds=0.2, element=None))
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(5):
+                    await asyncio.sleep(0.02)
+                    ticks += 1
+
+            results = await asyncio.gather(session.wait_for_element((By.ID, "missing"), timeout=0.2), ticker())
+            await session.quit()
+            return results[0], ticks
+
+        assert asyncio.run(scenario()) == (None, 5)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ブラウザデーモンのテスト
+
+/json/version に応答するだけのHTTPサーバーを Chrome の代わりに使い、
+状態ファイルによるデーモンの検出、停止時の後片付け、起動時間の比較表を確認します。
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.modules.selenium import browser as browser_module
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.browser_daemon import BrowserDaemon, find_daemon, format_startup_report
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"webSocketDebuggerUrl": "ws://127.0.0.1:1/devtools/browser/x"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def devtools_server():
+    server = HTTPServer(("127.0.0.1", 0), VersionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def daemon_session(make_devtools_session):
+    """2つの実行のブラウザコンテキストのタブが開いているデーモンへの接続を作成する関数"""
+    def create(targets, events=()):
+        return make_devtools_session(targets, events).handle("Browser.getWindowForTarget", {"windowId": 7})
+    return create
+
+
+class AllHandlesDriver:
+    """chromedriver と同様に、すべてのブラウザコンテキストのタブを返すドライバー"""
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def window_handles(self):
+        return [t["targetId"] for t in self.session.targets]
+
+
+def page(target_id, context_id):
+    return {"targetId": target_id, "type": "page", "browserContextId": context_id}
+
+
+def write_state(path, address, **extra):
+    path.write_text(json.dumps(dict({"debugger_address": address}, **extra)), encoding="utf-8")
+
+
+class TestBrowserDaemon:
+    """BrowserDaemonのテスト"""
+
+    def test_find_daemon_checks_debugger_endpoint(self, tmp_path, devtools_server):
+        """状態ファイルがあり、デバッガーが応答する場合のみ動作中と判定すること"""
+        state_path = tmp_path / "daemon.json"
+        assert find_daemon(str(state_path)) is None
+
+        write_state(state_path, "127.0.0.1:1")
+        assert find_daemon(str(state_path)) is None
+        assert BrowserDaemon(str(state_path)).status()["alive"] is False
+
+        write_state(state_path, devtools_server)
+        assert find_daemon(str(state_path))["debugger_address"] == devtools_server
+
+    def test_stop_removes_stale_state(self, tmp_path):
+        """応答しないデーモンの状態ファイルと一時プロファイルを削除すること"""
+        state_path = tmp_path / "daemon.json"
+        profile = tmp_path / "profile"
+        profile.mkdir()
+        write_state(state_path, "127.0.0.1:1", user_data_dir=str(profile))
+
+        assert BrowserDaemon(str(state_path)).stop(timeout=0.5) is True
+        assert not state_path.exists()
+        assert not profile.exists()
+        assert BrowserDaemon(str(state_path)).stop() is False
+
+    def test_setup_without_daemon_falls_back(self, tmp_path):
+        """デーモンが動作していない場合は接続せず、Chrome を起動する流れに進むこと"""
+        browser = Browser(
+            config={"BROWSER": {"use_daemon": "true", "daemon_state_path": str(tmp_path / "daemon.json")}},
+            project_root=str(tmp_path)
+        )
+
+        assert browser._attach_daemon(browser.build_chrome_options()) is None
+        assert "daemon_lookup" in browser.setup_timings
+        assert browser._daemon_context is None
+
+    def test_startup_report_shows_saving(self):
+        """起動方式ごとの所要時間と短縮時間を表にすること"""
+        report = format_startup_report({
+            "launch": {"driver_resolution": 0.8, "launch": 1.5, "total": 2.4},
+            "daemon": {"daemon_lookup": 0.01, "context": 0.05, "launch": 0.2, "total": 0.3}
+        })
+
+        lines = report.splitlines()
+        assert lines[0].startswith("段階")
+        assert any(line.startswith("daemon_lookup") and line.split()[1] == "-" for line in lines)
+        assert lines[-1] == "短縮: 2.100秒 / 回"
+
+    def test_new_windows_are_scoped_to_context(self, tmp_path, daemon_session):
+        """ほかの実行のブラウザコンテキストで開いたタブを新しいウィンドウとして扱わないこと"""
+        session = daemon_session(
+            [page("a1", "ctx-a"), page("b1", "ctx-b"), page("b2", "ctx-b")],
+            events=[{"targetInfo": page("b3", "ctx-b")}, {"targetInfo": page("a2", "ctx-a")}]
+        )
+        browser = Browser(project_root=str(tmp_path))
+        browser.driver = AllHandlesDriver(session)
+        browser._cdp_session = session
+        browser._daemon_context = (session, "ctx-a")
+
+        assert browser._window_handles() == ["a1"]
+        assert browser._wait_for_new_target(["a1"], timeout=1) == "a2"
+
+    def test_attach_applies_window_size_and_reports_ignored_options(self, tmp_path, monkeypatch, daemon_session):
+        """ウィンドウサイズはタブに設定し、デーモンの起動時にない起動オプションは警告すること"""
+        from selenium.webdriver.chrome.options import Options
+
+        session = daemon_session([page("a1", "ctx-a")])
+        options = Options()
+        for arg in ("--no-sandbox", "--window-size=800,600", "--blink-settings=imagesEnabled=false"):
+            options.add_argument(arg)
+        browser = Browser(project_root=str(tmp_path))
+        warnings = []
+        monkeypatch.setattr(browser.logger, "warning", warnings.append)
+
+        browser._apply_daemon_options(session, "a1", options, {"arguments": ["--no-sandbox"]})
+
+        assert ("Browser.setWindowBounds", {"windowId": 7, "bounds": {"width": 800, "height": 600}},
+                None) in session.sent
+        assert len(warnings) == 1
+        assert "--blink-settings=imagesEnabled=false" in warnings[0]
+        assert "--no-sandbox" not in warnings[0]
+
+    def test_failed_attach_disposes_context(self, tmp_path, monkeypatch, daemon_session):
+        """接続の途中で失敗した場合、作成したブラウザコンテキストをデーモンに残さないこと"""
+        session = daemon_session([page("a1", "ctx-a")])
+        monkeypatch.setattr(browser_module, "find_daemon", lambda path: {"debugger_address": "127.0.0.1:1"})
+        monkeypatch.setattr(browser_module, "open_context", lambda address, logger=None: (session, "ctx-a", "a1"))
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("attach failed")
+
+        monkeypatch.setattr(browser_module, "CDPDriver", fail)
+        browser = Browser(config={"BROWSER": {"use_daemon": "true", "engine": "cdp"}}, project_root=str(tmp_path))
+
+        assert browser._attach_daemon(browser.build_chrome_options()) is None
+        assert session.sent == [("Target.disposeBrowserContext", {"browserContextId": "ctx-a"}, None)]
+        assert session.closed
+        assert browser._daemon_context is None
+
+    def test_quit_stops_recorders_before_disposing_context(self, tmp_path, daemon_session):
+        """終了時は記録とドライバーを終了してから、ブラウザコンテキストを破棄して接続を閉じること"""
+        session = daemon_session([page("a1", "ctx-a")])
+        order = []
+        session.handle("Target.disposeBrowserContext", lambda params, session_id: order.append("dispose") or {})
+
+        class Recorder:
+            active = True
+            session_id = "S1"
+
+            def stop(self):
+                order.append("recorder.stop")
+                self.active = False
+
+        class Driver:
+            def quit(self):
+                order.append("driver.quit")
+
+        browser = Browser(project_root=str(tmp_path))
+        browser.driver = Driver()
+        browser._cdp_session = session
+        browser._daemon_context = (session, "ctx-a")
+        browser.network_capture = browser._hold_tab_session(Recorder())
+
+        browser.quit()
+
+        assert order == ["recorder.stop", "driver.quit", "dispose"]
+        assert session.closed
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+CDPドライバーのテスト
+
+DevTools への接続を模したセッションを使い、execute_script の引数・戻り値の変換、
+例外の対応付け、要素検索、ダイアログの扱いを確認します。
+"""
+
+import json
+import shutil
+import subprocess
+import threading
+
+import pytest
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoAlertPresentException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException
+)
+from selenium.webdriver.common.by import By
+
+from src.modules.selenium.cdp import NODE_REGISTRY_LIMIT, SCRIPT_RUNTIME_JS, CDPDriver, CDPElement, CDPSession
+from src.modules.selenium.element_snapshot import ElementHandle
+
+
+@pytest.fixture
+def cdp_session(make_devtools_session):
+    """Runtime.evaluate の結果を順に返すダミーの DevTools 接続を作成する関数"""
+    def create(*responses):
+        pending = list(responses)
+        session = make_devtools_session(targets=[{"targetId": "T1", "type": "page"}])
+        return session.handle("Runtime.evaluate", lambda params, session_id: pending.pop(0))
+    return create
+
+
+def value(v):
+    return {"result": {"type": "object", "value": v}}
+
+
+class TestCDPDriver:
+    """CDPDriverのテスト"""
+
+    def test_elements_are_passed_and_returned_by_reference(self, cdp_session):
+        """要素は参照IDで受け渡され、戻り値は CDPElement になること"""
+        session = cdp_session(value({"items": [{"__cdp_node__": "n2"}], "count": 1}))
+        driver = CDPDriver(session)
+
+        result = driver.execute_script("return arguments[0];", CDPElement(driver, "n1"), "text")
+
+        method, params, session_id = session.sent[-1]
+        assert session_id == "S-T1"
+        assert json.dumps([{"__cdp_node__": "n1"}, "text"]) in params["expression"]
+        assert result["count"] == 1
+        assert result["items"] == [CDPElement(driver, "n2")]
+
+    def test_element_handle_resolves_to_cdp_element(self, cdp_session):
+        """要素のハンドルは CDPElement として解決され、ページ内の参照として渡されること"""
+        session = cdp_session(value(True))
+        driver = CDPDriver(session)
+
+        element = ElementHandle("n1").resolve(driver)
+
+        assert element == CDPElement(driver, "n1")
+        assert json.dumps([{"__cdp_node__": "n1"}]) in session.sent[-1][1]["expression"]
+
+    def test_exceptions_are_mapped(self, cdp_session):
+        """ページ内の例外が WebDriver と同じ例外として送出されること"""
+        stale = {"exceptionDetails": {"exception": {"description": "Error: stale element reference: n1"}}}
+        error = {"exceptionDetails": {"exception": {"description": "ReferenceError: foo is not defined"}}}
+        driver = CDPDriver(cdp_session(stale, error))
+
+        with pytest.raises(StaleElementReferenceException):
+            driver.execute_script("return arguments[0];", CDPElement(driver, "n1"))
+        with pytest.raises(JavascriptException):
+            driver.execute_script("return foo;")
+
+    def test_find_element_uses_implicit_wait(self, cdp_session):
+        """見つからない場合は implicitly_wait の時間内で再検索すること"""
+        session = cdp_session(value([]), value([{"__cdp_node__": "n5"}]), value([]))
+        driver = CDPDriver(session)
+        driver.implicitly_wait(1)
+
+        assert driver.find_element(By.ID, "username").id == "n5"
+
+        driver.implicitly_wait(0)
+        with pytest.raises(NoSuchElementException):
+            driver.find_element(By.ID, "missing")
+
+    def test_alert_follows_dialog_events(self, cdp_session):
+        """ダイアログのイベントに応じて switch_to.alert が取得できること"""
+        session = cdp_session()
+        driver = CDPDriver(session)
+
+        with pytest.raises(NoAlertPresentException):
+            driver.switch_to.alert
+
+        session.emit("Page.javascriptDialogOpening", {"message": "削除しますか？", "type": "confirm"})
+        alert = driver.switch_to.alert
+        alert.accept()
+
+        assert alert.text == "削除しますか？"
+        assert session.sent[-1] == ("Page.handleJavaScriptDialog", {"accept": True}, "S-T1")
+
+    def test_capabilities_expose_debugger_address(self, cdp_session):
+        """他のモジュールが再接続できるようにデバッガーアドレスを返すこと"""
+        driver = CDPDriver(cdp_session(), debugger_address="127.0.0.1:9222")
+
+        assert driver.capabilities["goog:chromeOptions"]["debuggerAddress"] == "127.0.0.1:9222"
+
+    def test_switch_to_frame_is_rejected(self, cdp_session):
+        """フレームへの切り替えは明示的なエラーになり、最上位への切り替えは何もしないこと"""
+        driver = CDPDriver(cdp_session())
+
+        with pytest.raises(WebDriverException, match="switch_to.frame"):
+            driver.switch_to.frame("content")
+        driver.switch_to.default_content()
+        driver.switch_to.parent_frame()
+
+    def test_domain_is_disabled_after_last_user(self):
+        """同じタブで複数の機能が有効にしたドメインは、最後の機能が無効にした時点で無効になること"""
+        session = CDPSession.__new__(CDPSession)
+        session._enabled = {}
+        session._enabled_lock = threading.Lock()
+        sent = []
+        session.send = lambda method, params=None, session_id=None, timeout=None: sent.append((method, session_id))
+
+        session.enable("Network", session_id="S1")
+        session.enable("Network", session_id="S1")
+        session.disable("Network", session_id="S1")
+        assert sent == [("Network.enable", "S1"), ("Network.enable", "S1")]
+
+        session.disable("Network", session_id="S1")
+        assert sent[-1] == ("Network.disable", "S1")
+
+
+# DOM の代わりに最小限の Node を定義し、execute_script の実行環境を node で評価する
+NODE_REGISTRY_SCRIPT = """
+globalThis.window = globalThis;
+class Node { constructor() { this.isConnected = true; } }
+class NodeList {}
+class HTMLCollection {}
+var runtime = %s;
+var nodes = [];
+for (var i = 0; i < 20; i++) {
+    var node = new Node();
+    nodes.push(node);
+    runtime(function() { return node; }, []);
+    // 偶数番目の要素は登録の後にDOMから外れる
+    if (i %% 2 === 0) node.isConnected = false;
+}
+var stale;
+try { runtime(function(n) { return n; }, [{__cdp_node__: 'n1'}]); } catch (e) { stale = e.message; }
+var live = runtime(function(n) { return n === nodes[1]; }, [{__cdp_node__: 'n2'}]);
+console.log(JSON.stringify({size: window.__cdpNodes.size, entries: Object.keys(window.__cdpNodes.nodes).length,
+                            stale: stale, live: live}));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node がインストールされていません")
+def test_node_registry_is_pruned():
+    """DOMから外れた要素の登録は上限を超えた時点で削除され、DOMに残っている要素は参照できること"""
+    runtime = SCRIPT_RUNTIME_JS.replace(f"limit: {NODE_REGISTRY_LIMIT}", "limit: 4")
+    output = subprocess.run(["node", "-e", NODE_REGISTRY_SCRIPT % runtime], capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout)
+
+    assert result["entries"] < 20 and result["size"] == result["entries"]
+    assert result["stale"] == "stale element reference: n1"
+    assert result["live"] is True
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+並列クローラーのテスト
+
+ワーカーごとのブラウザ作成、並列数の上限、リトライ、
+完了順での結果の返却と集計を確認します。
+"""
+
+import threading
+import time
+
+from src.modules.selenium.crawler import Crawler
+
+
+class FakeDriver:
+    title = "テストページ"
+
+    def set_page_load_timeout(self, timeout):
+        self.page_load_timeout = timeout
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_script(self, script, *args):
+        return 1
+
+
+class FakeBrowser:
+    """navigate_to の成否と所要時間をURLで制御するダミーのブラウザ"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.driver = None
+        self.url = None
+        self.quit_called = False
+
+    def setup(self):
+        self.driver = self.initial_driver = FakeDriver()
+        return True
+
+    def navigate_to(self, url):
+        with FakeBrowser.lock:
+            FakeBrowser.active += 1
+            FakeBrowser.max_active = max(FakeBrowser.max_active, FakeBrowser.active)
+        try:
+            time.sleep(0.05 if "slow" in url else 0.01)
+            if self.failures.get(url, 0) > 0:
+                self.failures[url] -= 1
+                return False
+            self.url = url
+            return True
+        finally:
+            with FakeBrowser.lock:
+                FakeBrowser.active -= 1
+
+    def get_current_url(self):
+        return self.url
+
+    def quit(self):
+        self.quit_called = True
+        self.driver = None
+
+
+class TestCrawler:
+    """Crawlerのテスト"""
+
+    def _crawler(self, failures=None, **kwargs):
+        self.created = []
+        failures = failures if failures is not None else {}
+
+        def factory():
+            browser = FakeBrowser(failures)
+            self.created.append(browser)
+            return browser
+
+        FakeBrowser.active = FakeBrowser.max_active = 0
+        return Crawler(factory, progress_interval=0, **kwargs)
+
+    def test_results_are_streamed_and_browsers_closed(self):
+        """すべてのURLの結果が返され、終了時にブラウザが閉じられること"""
+        urls = [f"https://example.com/{i}" for i in range(20)]
+        crawler = self._crawler(concurrency=3)
+
+        results = list(crawler.crawl(urls))
+
+        assert sorted(r.url for r in results) == sorted(urls)
+        assert all(r.ok and r.data["title"] == "テストページ" for r in results)
+        assert 1 <= len(self.created) <= 3
+        assert FakeBrowser.max_active <= 3
+        assert all(b.quit_called for b in self.created)
+        assert crawler.stats.pages == 20 and crawler.stats.pages_per_second > 0
+
+    def test_fast_pages_are_returned_before_slow_ones(self):
+        """処理が完了した順に結果が返されること"""
+        crawler = self._crawler(concurrency=2)
+        urls = ["https://example.com/slow", "https://example.com/fast"]
+
+        results = list(crawler.crawl(urls))
+
+        assert [r.url for r in results] == ["https://example.com/fast", "https://example.com/slow"]
+
+    def test_retries_and_failures(self):
+        """失敗したURLがリトライされ、上限を超えると失敗として返されること"""
+        failures = {"https://example.com/flaky": 1, "https://example.com/broken": 5}
+        crawler = self._crawler(failures, concurrency=2, retries=1)
+
+        results = {r.url: r for r in crawler.crawl(["https://example.com/flaky", "https://example.com/broken"])}
+
+        assert results["https://example.com/flaky"].ok
+        assert results["https://example.com/flaky"].attempts == 2
+        assert not results["https://example.com/broken"].ok
+        assert results["https://example.com/broken"].attempts == 2
+        assert crawler.stats.to_dict()["failed"] == 1
+
+    def test_extractor_and_timeout(self):
+        """抽出処理の戻り値が返され、タイムアウトがドライバーに設定されること"""
+        crawler = self._crawler(concurrency=1, timeout=15, extractor=lambda b: b.get_current_url().upper())
+
+        results = list(crawler.crawl(["https://example.com/a"]))
+
+        assert results[0].data == "HTTPS://EXAMPLE.COM/A"
+        assert self.created[0].initial_driver.page_load_timeout == 15
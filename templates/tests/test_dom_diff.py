@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+DOM差分エンジンのテスト
+
+ページソース同士の構造的な差分（追加・削除・変更）の検出と、
+変化のない部分木の読み飛ばしを確認します。
+"""
+
+from src.modules.selenium.dom_diff import diff_html, parse_html
+
+
+BASE_HTML = """
+<html>
+  <head><title>一覧</title><script>var t = 1;</script></head>
+  <body>
+    <div id="header"><h1>商品一覧</h1></div>
+    <ul id="items">
+      <li class="item">りんご</li>
+      <li class="item">みかん</li>
+    </ul>
+    <form id="search"><input name="q" value=""><button type="submit">検索</button></form>
+  </body>
+</html>
+"""
+
+
+class TestDomDiff:
+    """DOM差分のテスト"""
+
+    def test_identical_sources_have_no_changes(self):
+        """同一のソースでは変更がなく、ルートのみ比較されること"""
+        diff = diff_html(BASE_HTML, BASE_HTML)
+
+        assert diff.is_empty
+        assert diff.compared_nodes == 1
+
+    def test_script_changes_are_ignored(self):
+        """script要素の変更は比較対象外であること"""
+        changed = BASE_HTML.replace("var t = 1;", "var t = 2;")
+
+        assert diff_html(BASE_HTML, changed).is_empty
+
+    def test_added_item_is_detected(self):
+        """追加された要素が検出されること"""
+        changed = BASE_HTML.replace(
+            '<li class="item">みかん</li>',
+            '<li class="item">みかん</li><li class="item new">ぶどう</li>'
+        )
+        diff = diff_html(BASE_HTML, changed)
+
+        assert len(diff.added) == 1
+        assert diff.added[0].tag == "li"
+        assert diff.added[0].node.text_content() == "ぶどう"
+        assert diff.added[0].path.startswith("html>body>ul#items>li")
+        assert not diff.removed
+
+    def test_removed_item_is_detected(self):
+        """削除された要素が検出されること"""
+        changed = BASE_HTML.replace('<div id="header"><h1>商品一覧</h1></div>', "")
+        diff = diff_html(BASE_HTML, changed)
+
+        assert [c.path for c in diff.removed] == ["html>body>div#header"]
+
+    def test_modified_attribute_and_text(self):
+        """属性とテキストの変更が検出されること"""
+        changed = BASE_HTML.replace('value=""', 'value="test"').replace("検索</button>", "検索中</button>")
+        diff = diff_html(BASE_HTML, changed)
+
+        details = {c.tag: c.details for c in diff.modified}
+        assert details["input"]["attrs"]["value"] == ["", "test"]
+        assert details["button"]["text"] == ["検索", "検索中"]
+
+    def test_unchanged_subtrees_are_skipped(self):
+        """変化のない部分木は比較されないこと"""
+        items = "".join(f"<li>項目{i}</li>" for i in range(500))
+        old = f"<html><body><ul>{items}</ul><p id='status'>待機中</p></body></html>"
+        new = old.replace("待機中", "完了")
+        diff = diff_html(old, new)
+
+        assert len(diff.modified) == 1
+        assert diff.compared_nodes < 10
+        assert diff.total_nodes == parse_html(new).count()
+
+    def test_to_dict_is_serializable(self):
+        """結果をJSON形式に変換できること"""
+        import json
+
+        changed = BASE_HTML.replace("りんご", "バナナ")
+        payload = json.dumps(diff_html(BASE_HTML, changed).to_dict(), ensure_ascii=False)
+
+        assert "バナナ" in payload
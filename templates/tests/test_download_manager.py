@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ダウンロード管理のテスト
+
+DevTools のダウンロードのイベントによる完了の検出とファイル名の変更、複数の待機への割り当て、
+ファイルシステムの監視による .crdownload の完了の検出を確認します。
+"""
+
+import os
+
+from src.modules.selenium.download_manager import DownloadManager
+
+
+def target_contexts(contexts):
+    """Target.getTargetInfo の応答（ターゲットID -> ブラウザコンテキストID。ないターゲットはエラー）"""
+    def handler(params, session_id):
+        if params['targetId'] not in contexts:
+            raise RuntimeError('No target with given id found')
+        return {'targetInfo': {'targetId': params['targetId'], 'browserContextId': contexts[params['targetId']]}}
+    return handler
+
+
+def download(session, directory, guid, filename, content=b'data', state='completed', frame_id='F1'):
+    """ダウンロードの開始から完了までのイベントを発生させる"""
+    session.emit('Browser.downloadWillBegin', guid=guid, url=f'https://example.com/{filename}',
+                 suggestedFilename=filename, frameId=frame_id)
+    with open(os.path.join(directory, guid), 'wb') as f:
+        f.write(content)
+    session.emit('Browser.downloadProgress', guid=guid, state='inProgress', receivedBytes=1, totalBytes=len(content))
+    session.emit('Browser.downloadProgress', guid=guid, state=state, receivedBytes=len(content),
+                 totalBytes=len(content))
+
+
+def test_events_assign_downloads_to_waiters(tmp_path, devtools_session):
+    """開始された順にファイル名が一致する待機に割り当て、元のファイル名に変更すること"""
+    directory = str(tmp_path)
+    (tmp_path / 'report.csv').write_text('old')
+    session = devtools_session
+    manager = DownloadManager(directory)
+    manager.attach_session(session)
+    assert session.sent == [('Browser.setDownloadBehavior',
+                             {'behavior': 'allowAndName', 'downloadPath': directory, 'eventsEnabled': True}, None)]
+
+    pdf_waiter = manager.expect('*.pdf', timeout=1)
+    with manager.expect('*.csv', timeout=1) as csv_waiter:
+        download(session, directory, 'guid-1', 'report.csv', b'a,b\n')
+        download(session, directory, 'guid-2', 'invoice.pdf', b'%PDF')
+
+    assert csv_waiter.path == os.path.join(directory, 'report (1).csv')
+    assert open(csv_waiter.path, 'rb').read() == b'a,b\n'
+    assert pdf_waiter.path == os.path.join(directory, 'invoice.pdf')
+    assert not os.path.exists(os.path.join(directory, 'guid-1'))
+    assert [item.filename for item in manager.completed()] == ['report.csv', 'invoice.pdf']
+
+    manager.close()
+    assert not session.listeners['Browser.downloadProgress']
+
+
+def test_canceled_and_missing_downloads_return_none(tmp_path, devtools_session):
+    """キャンセルされた場合や開始されなかった場合は None を返すこと"""
+    session = devtools_session
+    manager = DownloadManager(str(tmp_path))
+    manager.attach_session(session)
+
+    waiter = manager.expect(timeout=1)
+    download(session, str(tmp_path), 'guid-1', 'large.zip', state='canceled')
+    assert waiter.path is None and waiter.download.state == 'canceled'
+
+    assert manager.expect('*.csv').wait(timeout=0.05) is None
+    assert manager.completed() == []
+
+
+def test_downloads_are_scoped_to_browser_context(tmp_path, devtools_session):
+    """ブラウザコンテキストを指定した場合、ほかのコンテキストのタブのダウンロードを割り当てないこと"""
+    directory = str(tmp_path)
+    session = devtools_session.handle('Target.getTargetInfo', target_contexts({'A1': 'ctx-a', 'B1': 'ctx-b'}))
+    manager = DownloadManager(directory)
+    manager.attach_session(session, 'ctx-a')
+    assert session.sent[0][1]['browserContextId'] == 'ctx-a'
+
+    waiter = manager.expect('*.csv', timeout=1)
+    download(session, directory, 'guid-b', 'other.csv', frame_id='B1')
+    download(session, directory, 'guid-a', 'mine.csv', frame_id='A1')
+    # 子フレームなどコンテキストを判定できない場合は対象にする
+    download(session, directory, 'guid-c', 'frame.csv', frame_id='child')
+
+    assert waiter.path == os.path.join(directory, 'mine.csv')
+    assert [item.filename for item in manager.completed()] == ['mine.csv', 'frame.csv']
+
+
+def test_filesystem_detects_renamed_crdownload(tmp_path):
+    """DevTools のイベントがない場合に、.crdownload から名前が変わったファイルを検出すること"""
+    (tmp_path / 'existing.csv').write_text('old')
+    manager = DownloadManager(str(tmp_path))
+    manager.watch_directory()
+    assert manager.mode == 'filesystem'
+
+    waiter = manager.expect('*.csv', timeout=5)
+    partial = tmp_path / 'export.csv.crdownload'
+    partial.write_text('id,name\n')
+    os.replace(str(partial), str(tmp_path / 'export.csv'))
+
+    assert waiter.path == str(tmp_path / 'export.csv')
+    assert [item.filename for item in manager.completed()] == ['export.csv']
+    manager.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+要素キャッシュのテスト
+
+同じページでの要素の再利用と、ページの状態の変化・古くなった要素による無効化を確認します。
+"""
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.element_cache import ElementCache
+
+
+class FakeElement:
+    def __init__(self, name):
+        self.name = name
+        self.connected = True
+
+
+class FakeDriver:
+    """ページの状態を書き換えられるダミーのドライバー（CACHE_LOOKUP_JS と同じ結果を返す）"""
+
+    def __init__(self):
+        self.state = "page1:0"
+        self.attributes = 0
+        self.elements = {}
+        self.scripts = 0
+        self.finds = 0
+
+    def execute_script(self, script, cached=None, cached_state=None, locator=None, visible=False):
+        self.scripts += 1
+        if cached is not None and cached.connected is None:
+            raise StaleElementReferenceException("stale")
+        current = self.state + (f":{self.attributes}" if visible else "")
+        connected = cached.connected if cached is not None else None
+        if connected and cached_state == current:
+            return [current, cached, True, True]
+        return [current, self.elements.get(locator[1]) if locator else None, False, connected]
+
+    def find_element(self, by, value):
+        self.finds += 1
+        return FakeElement(f"{by}={value}#{self.finds}")
+
+
+class TestElementCache:
+    """ElementCacheのテスト"""
+
+    def test_reuses_element_until_page_changes(self):
+        """ページの状態が同じ間は要素を再利用し、DOMの変更・切り離し・古い要素で検索し直すこと"""
+        driver = FakeDriver()
+        cache = ElementCache()
+
+        element, state, cached = cache.lookup(driver, "username")
+        assert element is None and not cached
+        cache.store("username", FakeElement("username"), state)
+        element, _, cached = cache.lookup(driver, "username")
+        assert element.name == "username" and cached
+
+        # DOMの変更
+        driver.state = "page1:1"
+        assert cache.lookup(driver, "username")[0] is None
+
+        # DOMから切り離された要素と古くなった要素
+        for connected in (False, None):
+            detached = FakeElement("username")
+            cache.store("username", detached, driver.state)
+            detached.connected = connected
+            assert cache.lookup(driver, "username")[0] is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 4
+        assert stats["stale"] == 2
+        assert stats["hit_rate"] == 0.2
+
+    def test_attribute_changes_invalidate_visible_lookups(self):
+        """属性の変更では、表示されていることを条件にした要素のみ検索し直すこと"""
+        driver = FakeDriver()
+        cache = ElementCache()
+        for visible in (False, True):
+            _, state, _ = cache.lookup(driver, ("menu", visible), visible=visible)
+            cache.store(("menu", visible), FakeElement("menu"), state)
+
+        driver.attributes += 1
+
+        assert cache.lookup(driver, ("menu", False))[2] is True
+        assert cache.lookup(driver, ("menu", True), visible=True)[2] is False
+
+    def test_browser_wait_for_element_uses_cache(self, tmp_path):
+        """キャッシュの確認と検索を1回のスクリプト実行で行い、ページの移動で検索し直すこと"""
+        assert Browser(project_root=str(tmp_path)).element_cache is None
+
+        browser = Browser(project_root=str(tmp_path), config={
+            "BROWSER": {"screenshot_on_error": "false", "element_cache": "true"}
+        })
+        browser.driver = FakeDriver()
+        browser.driver.elements["username"] = FakeElement("username")
+
+        first = browser.wait_for_element((By.ID, "username"), timeout=1)
+        second = browser.wait_for_element((By.ID, "username"), timeout=1)
+        assert first is second
+        assert browser.driver.scripts == 2
+        assert browser.driver.finds == 0
+
+        # ページにない要素は待機して検索する
+        browser.driver.state = "page2:0"
+        assert browser.wait_for_element((By.ID, "password"), timeout=1).name == "id=password#1"
+        assert browser.get_element_cache_stats()["hits"] == 1
+
+    def test_with_element_discards_only_stale_entry(self, tmp_path):
+        """要素が古くなった場合はその要素のキャッシュだけを削除して検索し直すこと"""
+        browser = Browser(project_root=str(tmp_path), config={
+            "BROWSER": {"screenshot_on_error": "false", "element_cache": "true"}
+        })
+        browser.driver = FakeDriver()
+        browser.driver.elements["username"] = FakeElement("username")
+        browser.driver.elements["password"] = FakeElement("password")
+        password = browser.wait_for_element((By.ID, "password"), timeout=1)
+
+        calls = []
+
+        def action(element):
+            calls.append(element.name)
+            if len(calls) == 1:
+                raise StaleElementReferenceException("stale")
+            return element.name
+
+        assert browser.with_element((By.ID, "username"), action, timeout=1) == "username"
+        assert calls == ["username", "username"]
+        stats = browser.get_element_cache_stats()
+        assert stats["stale"] == 1
+        assert stats["invalidations"] == 0
+        assert browser.wait_for_element((By.ID, "password"), timeout=1) is password
+        assert browser.get_element_cache_stats()["hits"] == 1
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+要素スナップショットのテスト
+
+ElementSnapshot の辞書互換アクセス、シリアライズ、
+ハンドルによるWebElementの遅延解決を確認します。
+"""
+
+import json
+
+from selenium.webdriver.common.by import By
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.element_snapshot import (
+    BUTTON_SCHEMA,
+    ElementHandle,
+    ElementSnapshot,
+    snapshots_to_columns,
+    to_serializable
+)
+
+
+class FakeDriver:
+    """find_elements と execute_script のみを持つダミーのドライバー"""
+
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.find_calls = []
+
+    def execute_script(self, script, *args):
+        return self.connected
+
+    def find_elements(self, by, value):
+        self.find_calls.append((by, value))
+        return ["first", "second"]
+
+
+class FakeBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+
+
+class TestElementSnapshot:
+    """ElementSnapshotのテスト"""
+
+    def _snapshot(self, browser=None):
+        handle = ElementHandle(None, By.TAG_NAME, "button", 1)
+        return ElementSnapshot(BUTTON_SCHEMA, ("submit-btn", "送信", "submit", True, True), handle, browser)
+
+    def test_mapping_access(self):
+        """従来の辞書形式と同様に値を参照できること"""
+        snapshot = self._snapshot()
+
+        assert snapshot["text"] == "送信"
+        assert snapshot.get("type") == "submit"
+        assert snapshot.get("unknown", "default") == "default"
+        assert "id" in snapshot and "element" in snapshot
+        assert not hasattr(snapshot, "__dict__"), "__slots__ が使用されていません"
+
+    def test_element_resolved_lazily_by_locator(self):
+        """element を参照した時点でロケーターから解決されること"""
+        driver = FakeDriver()
+        snapshot = self._snapshot(FakeBrowser(driver))
+
+        assert driver.find_calls == []
+        assert snapshot["element"] == "second"
+        assert snapshot["element"] == "second"
+        assert driver.find_calls == [(By.TAG_NAME, "button")]
+
+    def test_serialization(self):
+        """JSONと列指向形式に変換できること"""
+        snapshots = [self._snapshot(), self._snapshot()]
+        payload = to_serializable({"buttons": snapshots, "page_title": "テスト"})
+
+        assert json.loads(json.dumps(payload))["buttons"][0]["handle"]["index"] == 1
+
+        columns = snapshots_to_columns(snapshots, include_handle=True)
+        assert columns["text"] == ["送信", "送信"]
+        assert columns["handle_value"] == ["button", "button"]
+
+
+class FakeWebElement:
+    def __init__(self, element_id):
+        self.id = element_id
+
+
+class InventoryDriver:
+    """一覧取得のスクリプトの呼び出しを記録し、ページ内で計算した結果を返すダミーのドライバー"""
+
+    def __init__(self, inventory):
+        self.inventory = inventory
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.inventory
+
+    def find_element(self, by, value):
+        raise AssertionError("要素ごとの問い合わせは行わないこと")
+
+    find_elements = find_element
+
+
+class TestInteractiveInventory:
+    """find_interactive_elements のテスト"""
+
+    def _browser(self, tmp_path, inventory):
+        browser = Browser(project_root=str(tmp_path), config={"BROWSER": {"screenshot_on_error": "false"}})
+        browser.driver = InventoryDriver(inventory)
+        return browser
+
+    def test_single_script_call(self, tmp_path):
+        """1回のスクリプト実行で種類ごとのセレクタと表示判定の指定を渡すこと"""
+        browser = self._browser(tmp_path, {"clickable": [], "input": [], "media": []})
+
+        result = browser.find_interactive_elements(check_visibility=False, viewport_only=True)
+
+        assert result == {"clickable": [], "input": [], "media": []}
+        assert len(browser.driver.calls) == 1
+        selectors, check_visibility, viewport_only = browser.driver.calls[0]
+        assert set(selectors) == {"clickable", "input", "media"}
+        assert "button" in selectors["clickable"] and "textarea" in selectors["input"]
+        assert (check_visibility, viewport_only) == (False, True)
+
+    def test_rows_become_snapshots(self, tmp_path):
+        """スクリプトが返した行を種類ごとの ElementSnapshot に変換すること"""
+        inventory = {
+            "clickable": [[FakeWebElement("btn"), 3, "", "input", "submit", "go", "送信", "", True, True, 10, 20, 80, 30, "送信する", True]],
+            "input": [[FakeWebElement("txt"), 0, "", "input", "", "q", "abc", "", False, True, 5, 6, 200, 24, "検索", False]],
+            "media": [[FakeWebElement("vid"), 1, "", "video", "", "", "", "https://example.com/a.mp4", True, False,
+                       0, 900, 640, 360, "", False]],
+        }
+        browser = self._browser(tmp_path, inventory)
+
+        result = browser.find_interactive_elements()
+        clickable, field, media = result["clickable"][0], result["input"][0], result["media"][0]
+
+        # テキストがない場合は value を使用する
+        assert clickable["text"] == "送信" and clickable["tag"] == "input"
+        assert clickable["location"] == {"x": 10, "y": 20} and clickable["size"] == {"width": 80, "height": 30}
+        assert clickable["accessible_name"] == "送信する" and clickable["in_viewport"] is True
+        assert clickable.handle.index == 3 and clickable.handle.by == By.CSS_SELECTOR
+
+        # type 属性がない場合はタグ名を type とする
+        assert (field["type"], field["name"], field["value"], field["is_enabled"]) == ("input", "q", "abc", False)
+        assert field["accessible_name"] == "検索" and field["in_viewport"] is False
+
+        assert media["src"] == "https://example.com/a.mp4" and media["is_displayed"] is False
+        assert media.handle.element_id == "vid"
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HAR記録のテスト
+
+DevTools のイベントから HAR のエントリー（所要時間の内訳・サイズ・キャッシュ・ブロック）を作成すること、
+ページごとの集計と実行全体の集計を確認します。
+"""
+
+from src.modules.selenium.har_recorder import HarRecorder, HarReport, build_timings, summarize_har
+
+
+def request(session, request_id, url, timestamp, resource_type='Script'):
+    session.emit('Network.requestWillBeSent', requestId=request_id, timestamp=timestamp, wallTime=1700000000 + timestamp,
+                 type=resource_type, request={'url': url, 'method': 'GET', 'headers': {'Accept': '*/*'}})
+
+
+def response(session, request_id, url, request_time, **extra):
+    timing = {'requestTime': request_time, 'dnsStart': 1, 'dnsEnd': 11, 'connectStart': 11, 'connectEnd': 41,
+              'sslStart': 21, 'sslEnd': 41, 'sendStart': 41, 'sendEnd': 42, 'receiveHeadersEnd': 142}
+    session.emit('Network.responseReceived', requestId=request_id, type='Script',
+                 response=dict({'url': url, 'status': 200, 'statusText': 'OK', 'mimeType': 'text/javascript',
+                                'protocol': 'h2', 'headers': {'content-type': 'text/javascript'}, 'timing': timing},
+                               **extra))
+
+
+def record_page(session, recorder):
+    """遅いスクリプト・キャッシュ・ブロック・未完了のリクエストを含むページを記録する"""
+    recorder.begin_page('https://example.com/')
+    request(session, 'doc', 'https://example.com/', 10.0, 'Document')
+    response(session, 'doc', 'https://example.com/', 10.0)
+    session.emit('Network.dataReceived', requestId='doc', dataLength=3000)
+    session.emit('Network.loadingFinished', requestId='doc', timestamp=10.2, encodedDataLength=1200)
+
+    request(session, 'app', 'https://cdn.example.com/app.js?v=1', 10.25)
+    response(session, 'app', 'https://cdn.example.com/app.js?v=1', 10.25)
+    session.emit('Network.dataReceived', requestId='app', dataLength=900000)
+    session.emit('Network.loadingFinished', requestId='app', timestamp=11.5, encodedDataLength=300000)
+
+    request(session, 'logo', 'https://example.com/logo.png', 10.3, 'Image')
+    session.emit('Network.requestServedFromCache', requestId='logo')
+    session.emit('Network.loadingFinished', requestId='logo', timestamp=10.31, encodedDataLength=0)
+
+    request(session, 'ads', 'https://ads.example.net/tag.js', 10.3)
+    session.emit('Network.loadingFailed', requestId='ads', timestamp=10.3, errorText='net::ERR_BLOCKED_BY_CLIENT',
+                 blockedReason='inspector')
+
+    request(session, 'beacon', 'https://example.com/beacon', 11.0, 'Ping')
+    session.emit('Page.domContentEventFired', timestamp=10.5)
+    session.emit('Page.loadEventFired', timestamp=11.6)
+    return recorder.end_page()
+
+
+def test_build_timings_splits_phases():
+    """ResourceTiming の各段階を HAR の timings に変換すること"""
+    timing = {'requestTime': 10.005, 'dnsStart': 1, 'dnsEnd': 11, 'connectStart': 11, 'connectEnd': 41,
+              'sslStart': 21, 'sslEnd': 41, 'sendStart': 41, 'sendEnd': 42, 'receiveHeadersEnd': 142}
+    timings = build_timings(timing, 10.0, 10.2)
+    assert timings == {'blocked': 6.0, 'dns': 10, 'connect': 30, 'ssl': 20, 'send': 1, 'wait': 100, 'receive': 53.0}
+
+    # キャッシュから読み込んだ場合など、timing がない場合は全体を受信時間とする
+    assert build_timings(None, 10.0, 10.05)['receive'] == 50.0
+
+
+def test_recorder_builds_har_entries(devtools_session):
+    """ページの移動ごとの通信を HAR のエントリーとして記録すること"""
+    session = devtools_session
+    recorder = HarRecorder(session, 'tab-1').start()
+    assert {'Network.enable', 'Page.enable'} <= set(session.methods())
+
+    har = record_page(session, recorder)
+    page = har['log']['pages'][0]
+    entries = {entry['request']['url']: entry for entry in har['log']['entries']}
+    assert page['pageTimings'] == {'onContentLoad': 500.0, 'onLoad': 1600.0}
+    assert len(entries) == 5 and all(entry['pageref'] == page['id'] for entry in entries.values())
+
+    app = entries['https://cdn.example.com/app.js?v=1']
+    assert app['response']['httpVersion'] == 'HTTP/2'
+    assert app['response']['content']['size'] == 900000 and app['_transferSize'] == 300000
+    assert app['request']['queryString'] == [{'name': 'v', 'value': '1'}]
+    assert app['time'] == 1250.0
+    assert entries['https://example.com/logo.png']['_fromCache'] == 'memory'
+    assert entries['https://ads.example.net/tag.js']['_blockedReason'] == 'inspector'
+    assert entries['https://example.com/beacon']['_incomplete'] is True
+
+    # 記録していない間のイベントは無視する
+    request(session, 'late', 'https://example.com/late', 12.0)
+    assert recorder.end_page() is None
+    recorder.stop()
+    assert not session.listeners['Network.requestWillBeSent']
+    assert {'Network.disable', 'Page.disable'} <= set(session.methods())
+
+
+def test_summary_and_run_report(devtools_session):
+    """ページごとの遅い・大きいリソースと、実行全体の集計を作成すること"""
+    session = devtools_session
+    recorder = HarRecorder(session).start()
+    report = HarReport(top=2)
+    for _ in range(2):
+        summary = summarize_har(record_page(session, recorder), top=2)
+        report.add(summary)
+
+    assert summary['requests'] == 5 and summary['transfer_bytes'] == 301200
+    assert (summary['cached'], summary['failed'], summary['blocked'], summary['incomplete']) == (1, 0, 1, 1)
+    assert summary['on_load'] == 1600.0
+    assert summary['slowest'][0]['url'] == 'https://cdn.example.com/app.js?v=1'
+    assert [item['size'] for item in summary['largest']] == [300000, 1200]
+
+    result = report.report()
+    assert result['totals'] == {'pages': 2, 'requests': 10, 'transfer_bytes': 602400,
+                                'cached': 2, 'failed': 0, 'blocked': 2}
+    top = result['slowest_resources'][0]
+    assert top['url'] == 'https://cdn.example.com/app.js' and top['count'] == 2 and top['total_time'] == 2500.0
+    assert len(result['slowest_pages']) == 2
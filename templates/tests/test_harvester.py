@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+一覧ページの収集のテスト
+
+スクロールごとに追加された項目のみを取得すること、重複の除外、上限による終了、
+「次へ」によるページ送りを確認します。
+"""
+
+import json
+import logging
+import shutil
+import subprocess
+
+import pytest
+
+from src.modules.selenium.harvester import HARVEST_JS, SCROLL_JS, Harvester, parse_field
+
+
+class FakeListDriver:
+    """スクロールするたびに項目が追加されるダミーのドライバー"""
+
+    def __init__(self, total, per_scroll=3, repeat_last=False, rerender=False):
+        self.total = total
+        self.per_scroll = per_scroll
+        self.repeat_last = repeat_last
+        self.rerender = rerender
+        self.loaded = per_scroll
+        self.harvested = 0
+        self.batches = []
+
+    def execute_script(self, script, *args):
+        if script == SCROLL_JS:
+            self.loaded = min(self.loaded + self.per_scroll, self.total)
+            return None
+        assert script == HARVEST_JS
+        _, fields, limit, _ = args
+        start, end = self.harvested, min(self.loaded, self.harvested + limit)
+        rows = [[f"item{i}", f"/items/{i}"] for i in range(start, end)]
+        self.batches.append(len(rows))
+        self.harvested = end
+        if self.repeat_last and rows and start > 0:
+            # 仮想スクロールで作り直された項目が再び取得される場合
+            rows.insert(0, [f"item{start - 1}", f"/items/{start - 1}"])
+        if self.rerender and not rows and start > 0:
+            # 末尾に達した後も、作り直された最後の項目が毎回取得される場合
+            rows = [[f"item{start - 1}", f"/items/{start - 1}"]]
+        return rows
+
+
+class FakePagedDriver:
+    """「次へ」をクリックすると、1回目の取得では読み込み中で次のページの項目を返さないダミーのドライバー"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+        self.loading = False
+        self.harvested = set()
+        self.clicks = 0
+
+    def execute_script(self, script, *args):
+        assert script == HARVEST_JS
+        if self.loading:
+            self.loading = False
+            return []
+        rows = [[item, f"/{item}"] for item in self.pages[self.page] if item not in self.harvested]
+        self.harvested.update(row[0] for row in rows)
+        return rows
+
+
+class NextButton:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def is_enabled(self):
+        return self.driver.page < len(self.driver.pages) - 1
+
+    def get_attribute(self, name):
+        return None
+
+    def click(self):
+        self.driver.clicks += 1
+        self.driver.page += 1
+        self.driver.loading = True
+
+
+class FakeBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.logger = logging.getLogger(__name__)
+
+    def wait_for_element(self, locator, timeout=None, visible=False):
+        return NextButton(self.driver)
+
+
+FIELDS = {"title": "", "url": "a@href"}
+
+
+class TestHarvester:
+    """Harvesterのテスト"""
+
+    def test_parse_field(self):
+        """フィールドの指定が (CSSセレクタ, 属性) に変換されること"""
+        assert parse_field("h3") == ("h3", "text")
+        assert parse_field("a.title@href") == ("a.title", "href")
+        assert parse_field("@data-id") == ("", "data-id")
+        assert parse_field("") == ("", "text")
+
+    def test_collects_only_new_items_until_exhausted(self):
+        """追加された項目のみを取得し、新しい項目がなくなったら終了すること"""
+        driver = FakeListDriver(total=10)
+        harvester = Harvester(FakeBrowser(driver), "li", fields=FIELDS, round_timeout=0, idle_rounds=1, batch_size=2)
+
+        items = list(harvester)
+
+        assert [item["title"] for item in items] == [f"item{i}" for i in range(10)]
+        assert items[0] == {"title": "item0", "url": "/items/0"}
+        assert max(driver.batches) <= 2
+        assert harvester.stats["stop_reason"] == "exhausted"
+        assert harvester.stats["items"] == 10
+
+    def test_duplicates_and_limits(self):
+        """キーが同じ項目を除外し、max_items で終了すること"""
+        driver = FakeListDriver(total=100, repeat_last=True)
+        harvester = Harvester(FakeBrowser(driver), "li", fields=FIELDS, key="url", max_items=7, round_timeout=0)
+
+        items = list(harvester)
+
+        assert [item["url"] for item in items] == [f"/items/{i}" for i in range(7)]
+        assert harvester.stats["duplicates"] >= 1
+        assert harvester.stats["stop_reason"] == "max_items"
+
+    def test_rerendered_duplicates_count_as_idle(self):
+        """キーが取得済みの項目だけのラウンドは新しい項目がないとみなし、上限なしでも終了すること"""
+        driver = FakeListDriver(total=6, rerender=True)
+        harvester = Harvester(FakeBrowser(driver), "li", fields=FIELDS, key="url", round_timeout=0, idle_rounds=2)
+
+        items = list(harvester)
+
+        assert [item["url"] for item in items] == [f"/items/{i}" for i in range(6)]
+        assert harvester.stats["stop_reason"] == "exhausted"
+        assert harvester.stats["duplicates"] >= 2
+
+    def test_next_button_waits_for_slow_pages(self):
+        """「次へ」の後に項目が現れていない場合は、もう一度クリックせずに待機すること"""
+        driver = FakePagedDriver([["a1", "a2"], ["b1", "b2"], ["c1"]])
+        harvester = Harvester(FakeBrowser(driver), "li", fields=FIELDS, next_locator=("list", "next"),
+                              round_timeout=0, idle_rounds=2)
+
+        items = list(harvester)
+
+        assert [item["title"] for item in items] == ["a1", "a2", "b1", "b2", "c1"]
+        assert driver.clicks == 2
+        assert harvester.stats["stop_reason"] == "no_next"
+
+
+# DOM の代わりに最小限の要素を定義し、HARVEST_JS を node で評価する
+HARVEST_SCRIPT = """
+class Element {
+    constructor(text) { this.textContent = text; this.attributes = {}; }
+    hasAttribute(name) { return name in this.attributes; }
+    setAttribute(name, value) { this.attributes[name] = String(value); }
+    getAttribute(name) { return name in this.attributes ? this.attributes[name] : null; }
+    querySelector() { return null; }
+}
+var items = [new Element('a'), new Element('b'), new Element('c')];
+items[1].setAttribute('data-harvested', '0');
+var selectors = [];
+globalThis.document = {querySelectorAll: function(selector) { selectors.push(selector); return items; }};
+var harvest = new Function(%s);
+var rows = harvest('li.result, div.card', [['text', '', 'text']], 10, '1');
+console.log(JSON.stringify({rows: rows, selectors: selectors, round: items[2].getAttribute('data-harvested')}));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node がインストールされていません")
+def test_harvest_script_accepts_selector_lists():
+    """複数のセレクタをそのまま検索し、取得済みの属性がある項目を除くこと"""
+    output = subprocess.run(["node", "-e", HARVEST_SCRIPT % json.dumps(HARVEST_JS)],
+                            capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout)
+
+    assert result["selectors"] == ["li.result, div.card"]
+    assert result["rows"] == [["a"], ["c"]]
+    assert result["round"] == "1"
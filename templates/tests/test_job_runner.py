@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+作業キューのテスト
+
+SQLiteの作業キューにおけるリース、期限切れリースの再取得、
+結果の保存、失敗時のリトライ、再接続後の再開を確認します。
+"""
+
+import time
+
+from src.modules.selenium.job_runner import LeaseHeartbeat, WorkQueue
+
+
+URLS = ["https://example.com/1", "https://example.com/2", "https://example.com/3"]
+
+
+class TestWorkQueue:
+    """WorkQueueのテスト"""
+
+    def test_enqueue_ignores_duplicates(self, tmp_path):
+        """登録済みのURLは重複して追加されないこと"""
+        queue = WorkQueue(str(tmp_path / "jobs.db"))
+
+        assert queue.enqueue(URLS) == 3
+        assert queue.enqueue(URLS + ["https://example.com/4"]) == 1
+        assert queue.counts()["pending"] == 4
+
+    def test_lease_and_complete(self, tmp_path):
+        """借り受けたURLが他のワーカーに渡されず、結果が保存されること"""
+        queue = WorkQueue(str(tmp_path / "jobs.db"))
+        queue.enqueue(URLS)
+
+        first = queue.lease("a", 60, 3)
+        second = queue.lease("b", 60, 3)
+        assert first[1] != second[1]
+
+        queue.complete(first[0], first[1], {"title": "テスト"}, "a")
+
+        assert queue.counts() == {"pending": 1, "leased": 1, "done": 1, "failed": 0, "total": 3}
+        assert list(queue.results()) == [(first[1], {"title": "テスト"})]
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        """リース期限が切れたURLは別のワーカーが再取得できること"""
+        queue = WorkQueue(str(tmp_path / "jobs.db"))
+        queue.enqueue(URLS[:1])
+
+        task_id, url, attempt = queue.lease("crashed", 0, 3)
+        reclaimed = queue.lease("b", 60, 3)
+
+        assert reclaimed == (task_id, url, 2)
+        assert queue.lease("c", 60, 3) is None
+
+    def test_fail_retries_until_max_attempts(self, tmp_path):
+        """失敗したURLは上限まで再試行され、その後は失敗になること"""
+        queue = WorkQueue(str(tmp_path / "jobs.db"))
+        queue.enqueue(URLS[:1])
+
+        for _ in range(2):
+            task_id, _, _ = queue.lease("a", 60, 2)
+            queue.fail(task_id, "timeout", 2, "a")
+
+        assert queue.lease("a", 60, 2) is None
+        assert list(queue.failures()) == [(URLS[0], "timeout")]
+        assert not queue.has_unfinished()
+
+        assert queue.retry_failed() == 1
+        assert queue.lease("a", 60, 2)[1] == URLS[0]
+
+    def test_resume_after_reopen(self, tmp_path):
+        """接続し直しても処理状況が引き継がれること"""
+        db_path = str(tmp_path / "jobs.db")
+        queue = WorkQueue(db_path)
+        queue.enqueue(URLS)
+        task_id, url, _ = queue.lease("a", 60, 3)
+        queue.complete(task_id, url, None, "a")
+        queue.close()
+
+        resumed = WorkQueue(db_path)
+        remaining = {resumed.lease("b", 60, 3)[1], resumed.lease("b", 60, 3)[1]}
+
+        assert remaining == set(URLS) - {url}
+        assert resumed.lease("b", 60, 3) is None
+
+    def test_reclaimed_lease_rejects_previous_owner(self, tmp_path):
+        """期限切れで他のワーカーに移ったタスクは、元のワーカーが完了・失敗にできないこと"""
+        queue = WorkQueue(str(tmp_path / "jobs.db"))
+        queue.enqueue(URLS[:1])
+
+        task_id, url, _ = queue.lease("slow", 0, 3)
+        queue.lease("b", 60, 3)
+
+        assert not queue.complete(task_id, url, {"stale": True}, "slow")
+        assert not queue.fail(task_id, "timeout", 3, "slow")
+        assert not queue.renew(task_id, "slow", 60)
+        assert list(queue.results()) == []
+
+        assert queue.complete(task_id, url, {"title": "テスト"}, "b")
+        assert list(queue.results()) == [(url, {"title": "テスト"})]
+
+    def test_heartbeat_keeps_lease(self, tmp_path):
+        """処理中はリースが延長され、期限を過ぎても他のワーカーに渡されないこと"""
+        db_path = str(tmp_path / "jobs.db")
+        queue = WorkQueue(db_path)
+        queue.enqueue(URLS[:1])
+
+        task_id, url, _ = queue.lease("a", 0.3, 3)
+        with LeaseHeartbeat(db_path, task_id, "a", 0.3, interval=0.05) as heartbeat:
+            time.sleep(0.6)
+            assert queue.lease("b", 60, 3) is None
+        assert not heartbeat.lost
+        assert queue.complete(task_id, url, None, "a")
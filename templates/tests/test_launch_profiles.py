@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+起動プロファイルのテスト
+
+組み込みのプロファイルの読み込み、settings.ini による上書きと検証、
+Browser の起動オプションへの反映を確認します。
+"""
+
+import pytest
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.launch_profiles import BUILTIN_PROFILES, load_profile
+
+
+def config_getter(config):
+    return lambda section, key, default: config.get(section, {}).get(key, default)
+
+
+class TestLaunchProfiles:
+    """load_profileのテスト"""
+
+    def test_builtin_profiles_are_valid(self):
+        """組み込みのプロファイルがすべて検証を通ること"""
+        for name in BUILTIN_PROFILES:
+            assert load_profile(name).validate() == []
+
+        lite = load_profile("lite")
+        assert lite.headless is True
+        assert lite.page_load_strategy == "eager"
+        assert "--disable-background-networking" in lite.arguments
+
+    def test_settings_extend_and_override(self):
+        """[LAUNCH_PROFILE:名前] で組み込みのプロファイルを元に新しいプロファイルを定義できること"""
+        get_config = config_getter({
+            "LAUNCH_PROFILE:scraper": {
+                "base": "lite",
+                "arguments": "--proxy-server=http://127.0.0.1:8080",
+                "remove_arguments": "--blink-settings=imagesEnabled=false",
+                "page_load_strategy": "none"
+            }
+        })
+
+        profile = load_profile("scraper", get_config)
+
+        assert profile.page_load_strategy == "none"
+        assert "--proxy-server=http://127.0.0.1:8080" in profile.arguments
+        assert "--blink-settings=imagesEnabled=false" not in profile.arguments
+        assert "--disable-gpu" in profile.arguments
+
+    def test_invalid_profiles_are_rejected(self):
+        """存在しないプロファイルや不正な設定はエラーになること"""
+        with pytest.raises(ValueError, match="見つかりません"):
+            load_profile("turbo")
+
+        get_config = config_getter({
+            "LAUNCH_PROFILE:lite": {"page_load_strategy": "fast", "arguments": "disable-gpu,--headless=old"}
+        })
+        with pytest.raises(ValueError) as excinfo:
+            load_profile("lite", get_config)
+        message = str(excinfo.value)
+        assert "page_load_strategy" in message
+        assert "disable-gpu" in message
+        assert "--headless=old" in message
+
+    def test_browser_applies_profile(self, tmp_path):
+        """Browser の起動オプションにプロファイルが反映されること"""
+        browser = Browser(
+            config={"BROWSER": {"launch_profile": "lite", "additional_options": "--disable-gpu,--foo"}},
+            project_root=str(tmp_path)
+        )
+
+        options = browser.build_chrome_options()
+
+        assert browser.headless is True
+        assert options.arguments.count("--headless=new") == 1
+        assert options.arguments.count("--disable-gpu") == 1
+        assert "--foo" in options.arguments
+        assert options.page_load_strategy == "eager"
+
+        explicit = Browser(headless=False, config={"BROWSER": {"launch_profile": "lite"}}, project_root=str(tmp_path))
+        assert "--headless=new" not in explicit.build_chrome_options().arguments
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+フォーム入力のテスト
+
+Browser.fill_form の一括入力と再試行、LoginPage の入力済みフィールドの管理
+（fill_login_form の後に submit_login_form で残りのフィールドのみを入力すること）を確認します。
+"""
+
+from selenium.webdriver.common.by import By
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.login_page import LoginPage
+
+
+class FakeDriver:
+    """一括入力のスクリプトに渡された値を記録し、指定した結果を返すダミーのドライバー"""
+
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+        self.payloads = []
+        self.current_url = "https://example.com/login"
+        self.title = "ログイン"
+
+    def execute_script(self, script, payload=None, *args):
+        self.payloads.append(payload)
+        if self.rounds:
+            return self.rounds.pop(0)
+        return ["ok"] * len(payload)
+
+    def save_screenshot(self, path):
+        return True
+
+
+def make_browser(tmp_path, driver):
+    selectors = tmp_path / "selectors.csv"
+    selectors.write_text(
+        "group,name,selector_type,selector_value,description\n"
+        "login,username,id,username,ユーザー名\n"
+        "login,password,id,password,パスワード\n"
+        "login,company_id,name,company,会社ID\n",
+        encoding="utf-8"
+    )
+    browser = Browser(selectors_path=str(selectors), project_root=str(tmp_path), config={"BROWSER": {
+        "screenshot_on_error": "false", "auto_screenshot": "false"}})
+    browser.driver = driver
+    return browser
+
+
+class TestFillForm:
+    """Browser.fill_form のテスト"""
+
+    def test_fills_all_fields_in_one_script(self, tmp_path):
+        """すべてのフィールドを1回のスクリプト実行で入力し、フィールドごとの成否を返すこと"""
+        driver = FakeDriver(["ok", "mismatch", "ok"])
+        browser = make_browser(tmp_path, driver)
+
+        results = browser.fill_form({(By.ID, "user"): "alice", "input[name=pw]": 1234, (By.ID, "agree"): True})
+
+        assert len(driver.payloads) == 1
+        assert [value for _, value in driver.payloads[0]] == ["alice", "1234", True]
+        assert driver.payloads[0][1][0] == [[By.CSS_SELECTOR, "input[name=pw]"]]
+        assert results == {(By.ID, "user"): True, "input[name=pw]": False, (By.ID, "agree"): True}
+
+    def test_retries_only_missing_fields(self, tmp_path):
+        """未描画のフィールドのみを再試行し、selectors.csv の候補をまとめて渡すこと"""
+        driver = FakeDriver(["ok", "not_found"], ["ok"])
+        browser = make_browser(tmp_path, driver)
+
+        results = browser.fill_form({("login", "username"): "alice", ("login", "company_id"): "acme"}, timeout=2)
+
+        assert results == {("login", "username"): True, ("login", "company_id"): True}
+        assert driver.payloads[1] == [[[[By.NAME, "company"]], "acme"]]
+
+
+class TestLoginForm:
+    """LoginPage のフォーム入力のテスト"""
+
+    def _login_page(self, tmp_path, monkeypatch, driver):
+        for attr in ("account_key_input", "username_input", "password_input", "login_button"):
+            monkeypatch.setattr(LoginPage, attr, None)
+        return LoginPage(browser=make_browser(tmp_path, driver), config={"LOGIN": {
+            "url": "https://example.com/login", "username": "alice", "password": "secret",
+            "third_field_name": "company_id", "company_id": "acme"}})
+
+    def test_fill_fields_records_filled_names(self, tmp_path, monkeypatch):
+        """入力に成功したフィールドのみを入力済みとして記録すること"""
+        driver = FakeDriver(["ok", "mismatch"])
+        login_page = self._login_page(tmp_path, monkeypatch, driver)
+
+        assert login_page._fill_fields(("username", "company_id")) == {"username": True, "company_id": False}
+        assert login_page.filled_fields == {"username"}
+
+    def test_submit_fills_remaining_third_field(self, tmp_path, monkeypatch):
+        """fill_login_form の後の submit_login_form で、3つ目のフィールドのみを入力すること"""
+        driver = FakeDriver()
+        login_page = self._login_page(tmp_path, monkeypatch, driver)
+
+        assert login_page.fill_login_form()
+        assert [value for _, value in driver.payloads[0]] == ["alice", "secret"]
+        assert login_page.filled_fields == {"username", "password"}
+
+        # ログインボタンのクリック以降は対象外
+        monkeypatch.setattr(LoginPage, "login_button", None)
+        login_page.submit_login_form()
+        assert driver.payloads[1] == [[[[By.NAME, "company"]], "acme"]]
+        assert login_page.filled_fields == {"username", "password", "company_id"}
+
+        # すべて入力済みの場合は再入力しない
+        login_page.submit_login_form()
+        assert len(driver.payloads) == 2
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+通信の記録のテスト
+
+URLのパターンと種類による絞り込み、JSON の解析、件数とサイズの上限、応答の待機と、
+本文の取得がイベントの配信を止めないことを確認します。
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.network_capture import NetworkCapture, url_matcher
+
+
+def response_body(bodies, params, session_id):
+    """Network.getResponseBody の応答（bodies に threading.Event を登録した応答は、設定されるまで待つ）"""
+    body = bodies[params['requestId']]
+    if isinstance(body, threading.Event):
+        # 本文の取得に時間がかかる応答
+        body.wait(5)
+        return {'body': '"slow"', 'base64Encoded': False}
+    return body
+
+
+@pytest.fixture
+def session(devtools_session):
+    """応答の本文を bodies から返すダミーの DevTools 接続"""
+    devtools_session.bodies = {}
+    return devtools_session.handle(
+        'Network.getResponseBody',
+        lambda params, session_id: response_body(devtools_session.bodies, params, session_id)
+    )
+
+
+def respond(session, request_id, url, body, resource_type='XHR', mime_type='application/json', encode=False):
+    """応答の受信から読み込み完了までのイベントを発生させる"""
+    session.bodies[request_id] = (
+        {'body': base64.b64encode(body.encode('utf-8')).decode('ascii'), 'base64Encoded': True}
+        if encode else {'body': body, 'base64Encoded': False}
+    )
+    session.emit('Network.responseReceived', {
+        'requestId': request_id, 'type': resource_type,
+        'response': {'url': url, 'status': 200, 'mimeType': mime_type}
+    })
+    session.emit('Network.loadingFinished', {'requestId': request_id, 'encodedDataLength': len(body)})
+
+
+def test_capture_filters_by_pattern_and_type(session):
+    """パターンに一致する XHR・fetch の応答のみを記録し、JSON として解析すること"""
+    capture = NetworkCapture(session, 'tab-1', patterns='*/api/*', body_workers=1).start()
+    assert ('Network.enable', 'tab-1') in [(method, session_id) for method, _, session_id in session.sent]
+
+    respond(session, '1', 'https://example.com/api/items?page=1', json.dumps({'items': [1, 2]}))
+    respond(session, '2', 'https://example.com/static/app.js', 'var a;', resource_type='Script')
+    respond(session, '3', 'https://example.com/track', '{}', resource_type='Fetch')
+    respond(session, '4', 'https://example.com/api/user', '{"name": "テスト"}', resource_type='Fetch', encode=True)
+    respond(session, '5', 'https://example.com/api/logo.png', 'not json', resource_type='Fetch',
+                    mime_type='image/png')
+    assert capture.flush(timeout=5)
+
+    assert [entry.url for entry in capture.responses()] == [
+        'https://example.com/api/items?page=1', 'https://example.com/api/user', 'https://example.com/api/logo.png'
+    ]
+    assert capture.json_bodies() == [{'items': [1, 2]}, {'name': 'テスト'}]
+    assert capture.json_bodies('/api/user') == [{'name': 'テスト'}]
+
+    assert url_matcher(re.compile(r'/api/items\?page=\d+$'))('https://example.com/api/items?page=10')
+    assert not url_matcher(['*/v2/*', 'graphql'])('https://example.com/api/items')
+
+
+def test_capture_buffer_is_bounded(session):
+    """件数・合計サイズ・1件のサイズの上限を超えた応答を破棄すること"""
+    capture = NetworkCapture(session, patterns='/api/', max_entries=3, max_bytes=25, max_body_bytes=12,
+                             json_only=True, body_workers=1).start()
+
+    for index in range(5):
+        respond(session, str(index), f'https://example.com/api/{index}', f'[{index}, "xx"]')
+    respond(session, 'big', 'https://example.com/api/big', '"' + 'x' * 20 + '"')
+    respond(session, 'html', 'https://example.com/api/page', '<html>', mime_type='text/html')
+    assert capture.flush(timeout=5)
+
+    assert [entry.url[-1] for entry in capture.responses()] == ['3', '4']
+    assert capture.total_bytes <= 25
+    assert capture.stats == {'captured': 5, 'evicted': 3, 'oversized': 1, 'failed': 0}
+
+    capture.stop()
+    assert not session.listeners['Network.responseReceived']
+    assert session.sent[-1] == ('Network.disable', None, None)
+    respond(session, 'after', 'https://example.com/api/after', '[]')
+    assert len(capture.responses()) == 2
+
+
+def test_wait_for_returns_responses_after_mark(session):
+    """after に指定した番号より後に記録された応答を待機できること"""
+    capture = NetworkCapture(session).start()
+    respond(session, '1', 'https://example.com/api/search?page=1', '{"page": 1}')
+    assert capture.wait_for('search', timeout=5).json() == {'page': 1}
+
+    mark = capture.last_seq
+    assert capture.wait_for('search', timeout=0.05, after=mark) is None
+
+    timer = threading.Timer(0.05, respond, (session, '2', 'https://example.com/api/search?page=2', '{"page": 2}'))
+    timer.start()
+    response = capture.wait_for('search', timeout=5, after=mark)
+    timer.join()
+    assert response.json() == {'page': 2}
+
+
+def test_slow_body_does_not_block_dispatch(session):
+    """本文の取得に時間がかかる応答があっても、配信スレッドはほかの応答の処理を続けること"""
+    capture = NetworkCapture(session, body_workers=2).start()
+    release = threading.Event()
+
+    started = time.monotonic()
+    session.emit('Network.responseReceived', {
+        'requestId': 'slow', 'type': 'XHR', 'response': {'url': 'https://example.com/api/slow', 'status': 200,
+                                                         'mimeType': 'application/json'}
+    })
+    session.bodies['slow'] = release
+    session.emit('Network.loadingFinished', {'requestId': 'slow', 'encodedDataLength': 10})
+    respond(session, 'fast', 'https://example.com/api/fast', '"fast"')
+    assert time.monotonic() - started < 1
+
+    assert capture.wait_for('/api/fast', timeout=5).json() == 'fast'
+    assert capture.wait_for('/api/slow', timeout=0.05) is None
+
+    release.set()
+    capture.stop()
+    assert [entry.json() for entry in capture.responses()] == ['fast', 'slow']
+
+
+class TabDriver:
+    """現在のタブのハンドルだけを返すドライバー"""
+
+    current_window_handle = 'T1'
+
+
+def test_browser_shares_tab_session(tmp_path, session):
+    """通信の記録と HAR の記録が同じタブのセッションを使い、両方を終了した時点で切断すること"""
+    browser = Browser(project_root=str(tmp_path))
+    browser.driver = TabDriver()
+    browser._cdp_session = session
+    browser.har_recording = True
+
+    capture = browser.start_network_capture()
+    browser._begin_har_page('https://example.com/')
+    assert session.attached == ['T1']
+    assert capture.session_id == browser.har_recorder.session_id == 'S-T1'
+
+    browser.stop_network_capture()
+    browser.stop_network_capture()
+    assert session.detached == []
+
+    browser._stop_tab_recorder(browser.har_recorder)
+    assert session.detached == ['S-T1']
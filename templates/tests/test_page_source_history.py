@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ページソース履歴のテスト
+
+PageSourceHistory の遅延取得、圧縮保存、リングバッファの挙動を
+ブラウザを起動せずに確認します。
+"""
+
+import pytest
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.page_history import PageSourceHistory, resolve_compression
+
+
+class TestPageSourceHistory:
+    """PageSourceHistoryのテスト"""
+
+    def test_lazy_fetch_only_on_access(self):
+        """ソースは最初のアクセス時にのみ取得されること"""
+        calls = []
+
+        def fetcher():
+            calls.append(1)
+            return "<html><body>lazy</body></html>"
+
+        history = PageSourceHistory(max_entries=2, compression="gzip")
+        snapshot = history.record("https://example.com", fetcher)
+
+        assert not snapshot.is_loaded
+        assert calls == []
+
+        assert history.current.get_source() == "<html><body>lazy</body></html>"
+        assert history.current.get_source() == "<html><body>lazy</body></html>"
+        assert len(calls) == 1, "取得関数が複数回呼ばれています"
+
+    def test_unread_page_is_not_fetched_after_navigation(self):
+        """移動後は前のページの遅延取得が無効になること"""
+        history = PageSourceHistory(max_entries=2, compression="none")
+        history.record("https://example.com/a", lambda: "page-b-content")
+        history.record("https://example.com/b", lambda: "page-b-content")
+
+        assert history.previous.get_source() is None
+        assert history.current.get_source() == "page-b-content"
+
+    def test_ring_buffer_is_bounded(self):
+        """保持件数を超えたエントリが破棄されること"""
+        history = PageSourceHistory(max_entries=3, compression="gzip")
+        for i in range(10):
+            history.record_source(f"https://example.com/{i}", f"<p>{i}</p>")
+
+        assert len(history) == 3
+        assert history.current.url == "https://example.com/9"
+        assert history.get(2).get_source() == "<p>7</p>"
+        assert history.get(3) is None
+
+    @pytest.mark.parametrize("compression", ["gzip", "none", "auto"])
+    def test_compression_round_trip(self, compression):
+        """圧縮・展開で内容が変わらないこと"""
+        source = "<html>" + "日本語のテキスト" * 1000 + "</html>"
+        history = PageSourceHistory(max_entries=1, compression=compression)
+        history.record_source("https://example.com", source)
+
+        assert history.current.get_source() == source
+        stats = history.stats()
+        assert stats["loaded"] == 1
+        if history.compression != "none":
+            assert stats["stored_bytes"] < stats["raw_bytes"]
+
+    def test_unknown_compression_falls_back_to_gzip(self):
+        """未知の圧縮方式はgzipにフォールバックすること"""
+        assert resolve_compression("brotli") == "gzip"
+        assert resolve_compression("none") == "none"
+
+    def test_load_current_keeps_unread_page(self):
+        """load_current() で未取得のページソースを取得し、次のページの記録後も残ること"""
+        history = PageSourceHistory(max_entries=2)
+        history.record("https://example.com/1", lambda: "<p>1</p>")
+        history.load_current()
+        history.record("https://example.com/2", lambda: "<p>2</p>")
+
+        assert history.previous.is_loaded
+        assert history.previous.get_source() == "<p>1</p>"
+
+
+class FakeDriver:
+    """移動したURLに応じたページソースを返すダミーのドライバー"""
+
+    def __init__(self):
+        self.current_url = None
+        self.sources = 0
+
+    def get(self, url):
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        return "complete"
+
+    @property
+    def page_source(self):
+        self.sources += 1
+        return f"<html>{self.current_url}</html>"
+
+
+def lazy_browser(tmp_path, **settings):
+    browser = Browser(project_root=str(tmp_path), config={"BROWSER": dict({
+        "screenshot_on_error": "false", "auto_screenshot": "false", "page_source_capture": "lazy"}, **settings)})
+    browser.driver = FakeDriver()
+    return browser
+
+
+def test_lazy_navigation_does_not_fetch_unread_pages(tmp_path):
+    """lazyモードの既定では、参照しなかったページのソースを移動時に取得しないこと"""
+    browser = lazy_browser(tmp_path)
+
+    assert browser.navigate_to("https://example.com/1")
+    assert browser.navigate_to("https://example.com/2")
+
+    assert browser.driver.sources == 0
+    assert browser.last_page_source is None
+
+
+def test_lazy_navigation_keeps_previous_source(tmp_path):
+    """page_source_keep_previous を有効にすると、一度も参照しなかったページも last_page_source で取得できること"""
+    browser = lazy_browser(tmp_path, page_source_keep_previous="true")
+
+    assert browser.navigate_to("https://example.com/1")
+    assert browser.driver.sources == 0
+    assert browser.navigate_to("https://example.com/2")
+
+    assert browser.last_page_source == "<html>https://example.com/1</html>"
+    assert browser.driver.sources == 1
+
+
+def test_diff_enables_keeping_previous_source(tmp_path):
+    """diff_page_sources() を引数なしで呼び出した後は、移動前のページを残すこと"""
+    browser = lazy_browser(tmp_path)
+    browser.navigate_to("https://example.com/1")
+    assert browser.diff_page_sources() is None
+
+    browser.navigate_to("https://example.com/2")
+    assert browser.last_page_source == "<html>https://example.com/1</html>"
+
+
+def test_setting_current_source_keeps_previous_page(tmp_path):
+    """current_page_source への代入は現在のページのソースを置き換え、1つ前のページを押し出さないこと"""
+    browser = lazy_browser(tmp_path)
+    browser.page_history.record_source("https://example.com/1", "<p>1</p>")
+    browser.page_history.record_source("https://example.com/2", "<p>2</p>")
+
+    browser.current_page_source = "<p>2 edited</p>"
+
+    assert browser.current_page_source == "<p>2 edited</p>"
+    assert browser.last_page_source == "<p>1</p>"
+    assert len(browser.page_history) == 2
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+画面録画のテスト
+
+フレームの受信の確認と間引き、リングバッファの上限、GIF と JPEG の連番ファイルへの保存を確認します。
+"""
+
+import base64
+import io
+import os
+
+import pytest
+
+from src.modules.selenium import screencast
+from src.modules.selenium.screencast import ScreencastRecorder
+
+
+def send_frame(session, data, frame_session=1):
+    """画面のフレームのイベントを発生させる"""
+    session.emit('Page.screencastFrame', {'data': base64.b64encode(data).decode('ascii'), 'sessionId': frame_session,
+                                          'metadata': {'timestamp': 0}})
+
+
+class FakeClock:
+    """フレームごとに進めるダミーの時計"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_frames_are_acknowledged_and_throttled(devtools_session):
+    """すべてのフレームに受信の確認を返し、fps を超えるフレームは保持しないこと"""
+    session = devtools_session
+    recorder = ScreencastRecorder(session, 'tab-1', fps=1, seconds=10, quality=40).start()
+    assert session.sent[0] == ('Page.startScreencast', {'format': 'jpeg', 'quality': 40, 'maxWidth': 800,
+                                                        'maxHeight': 600}, 'tab-1')
+    for index in range(3):
+        send_frame(session, b'frame%d' % index, frame_session=index)
+
+    acks = [params['sessionId'] for method, params, _ in session.sent if method == 'Page.screencastFrameAck']
+    assert acks == [0, 1, 2] and recorder.received == 3
+    assert [data for _, data in recorder.frames()] == [b'frame0']
+
+    recorder.stop()
+    assert session.methods()[-1] == 'Page.stopScreencast'
+    assert not session.listeners['Page.screencastFrame']
+
+
+def test_ring_buffer_and_jpeg_fallback(tmp_path, monkeypatch, devtools_session):
+    """保持するフレーム数に上限があり、Pillow がない場合は JPEG の連番ファイルとして保存すること"""
+    monkeypatch.setattr(screencast, 'PIL_AVAILABLE', False)
+    clock = FakeClock()
+    monkeypatch.setattr(screencast, 'time', clock)
+    session = devtools_session
+    recorder = ScreencastRecorder(session, fps=2, seconds=2).start()
+    assert recorder.save(str(tmp_path / 'empty.gif')) is None
+
+    for index in range(20):
+        clock.now += 0.5
+        send_frame(session, b'jpeg%d' % index)
+    frames = recorder.frames()
+    assert [data for _, data in frames] == [b'jpeg%d' % index for index in range(15, 20)]
+    assert [data for _, data in recorder.frames(seconds=0.9)] == [b'jpeg18', b'jpeg19']
+
+    path = recorder.save(str(tmp_path / 'error.gif'))
+    assert path == str(tmp_path / 'error')
+    saved = sorted(os.listdir(path))
+    assert len(saved) == len(frames) and open(os.path.join(path, saved[-1]), 'rb').read() == b'jpeg19'
+
+    # 新しいフレームがない場合は保存し直さない
+    assert recorder.save(str(tmp_path / 'again.gif')) == path
+    assert not os.path.exists(tmp_path / 'again')
+
+
+def test_save_gif(tmp_path, monkeypatch, devtools_session):
+    """フレームを GIF アニメーションとして保存すること"""
+    image_module = pytest.importorskip("PIL.Image")
+    clock = FakeClock()
+    monkeypatch.setattr(screencast, 'time', clock)
+    session = devtools_session
+    recorder = ScreencastRecorder(session, fps=5, seconds=10).start()
+    for color, size in (('red', (80, 60)), ('blue', (80, 60)), ('green', (40, 30))):
+        clock.now += 0.3
+        buffer = io.BytesIO()
+        image_module.new('RGB', size, color).save(buffer, format='JPEG')
+        send_frame(session, buffer.getvalue())
+
+    path = recorder.save(str(tmp_path / 'screencasts' / 'login_error.gif'))
+    with image_module.open(path) as gif:
+        assert gif.format == 'GIF' and gif.n_frames == 3 and gif.size == (80, 60)
+        assert gif.info['duration'] == 300
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+セレクタの性能チェックのテスト
+
+XPath から id・CSSセレクタへの書き換え候補の作成と、計測結果の集計・selectors.csv への反映を確認します。
+"""
+
+from src.modules.selenium.selector_lint import propose_rewrite, summarize, write_rewritten_csv, xpath_to_css
+
+
+class TestRewrite:
+    """書き換え候補の作成のテスト"""
+
+    def test_simple_xpath_is_converted(self):
+        """属性の条件と子孫・子の関係のみのXPathがCSSセレクタに変換されること"""
+        assert xpath_to_css('//input[@name="password" and @type="password"]') == 'input[name="password"][type="password"]'
+        assert xpath_to_css("//div[@id='login']//button[contains(@class, 'submit')]") == 'div#login button.submit'
+        assert xpath_to_css('//form/input[starts-with(@name, "user")]') == 'form > input[name^="user"]'
+        assert propose_rewrite('xpath', '//*[@id="username"]') == ('id', 'username')
+        assert propose_rewrite('css', '#username') == ('id', 'username')
+        assert propose_rewrite('class', 'btn primary') == ('css', '.btn.primary')
+
+    def test_unsupported_xpath_is_not_converted(self):
+        """or・位置・テキストの条件を含むXPathは変換しないこと"""
+        assert xpath_to_css('//input[@name="username" or @id="username"]') is None
+        assert xpath_to_css('//ul/li[2]') is None
+        assert xpath_to_css('//a[text()="ログイン"]') is None
+        assert propose_rewrite('id', 'username') is None
+
+
+class TestSummarize:
+    """計測結果の集計のテスト"""
+
+    def test_flags_and_accepted_rewrites_are_written(self, tmp_path):
+        """遅い・複数一致のセレクタが報告され、同じ要素に一致する速い書き換えのみが反映されること"""
+        selectors_path = tmp_path / "selectors.csv"
+        selectors_path.write_text(
+            "group,name,selector_type,selector_value,description\n"
+            'login,username,xpath,//*[@id="username"],ユーザー名入力欄\n'
+            "login,submit,xpath,\"//button[contains(@class, 'btn')]\",ログインボタン\n",
+            encoding="utf-8"
+        )
+        entries = [
+            {'group': 'login', 'name': 'username', 'selector_type': 'xpath', 'selector_value': '//*[@id="username"]',
+             'proposal': {'selector_type': 'id', 'selector_value': 'username'}},
+            {'group': 'login', 'name': 'submit', 'selector_type': 'xpath',
+             'selector_value': "//button[contains(@class, 'btn')]",
+             'proposal': {'selector_type': 'css', 'selector_value': 'button.btn'}}
+        ]
+        page = [
+            {'original': {'ms': 2.0, 'count': 1, 'error': None}, 'proposal': {'ms': 0.01, 'count': 1, 'same': True}},
+            {'original': {'ms': 0.5, 'count': 3, 'error': None}, 'proposal': {'ms': 0.05, 'count': 2, 'same': False}}
+        ]
+
+        rows = summarize(entries, [page, page], slow_ms=1.0)
+
+        assert rows[0]['flags'] == ['全要素走査', '遅い']
+        assert rows[0]['proposal']['equivalent'] is True
+        assert rows[0]['proposal']['speedup'] == 200.0
+        assert rows[1]['flags'] == ['複数一致']
+        assert rows[1]['proposal']['equivalent'] is False
+
+        output_path = tmp_path / "selectors.fast.csv"
+        assert write_rewritten_csv(str(selectors_path), str(output_path), rows) == 1
+        lines = output_path.read_text(encoding="utf-8").splitlines()
+        assert lines[1] == "login,username,id,username,ユーザー名入力欄"
+        assert lines[2] == "login,submit,xpath,\"//button[contains(@class, 'btn')]\",ログインボタン"
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+セレクタの待機時間統計のテスト
+
+実績からのタイムアウトの算出、実績が少ない場合の代替、ファイルへの保存と、
+selectors.csv の候補の読み込み・優先順位の変更を確認します。
+"""
+
+import json
+import threading
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.selector_stats import CandidateHistory, SelectorStats, percentile
+
+USERNAME = ("login", "username")
+BUTTON = ("login", "login_button")
+
+
+class TestSelectorStats:
+    """SelectorStatsのテスト"""
+
+    def test_timeout_is_p99_times_margin_and_clamped(self):
+        """タイムアウトが p99 × margin になり、上限・下限に収まること"""
+        stats = SelectorStats(margin=2.0, min_timeout=1.0, max_timeout=5.0, min_samples=10)
+        for i in range(100):
+            stats.record(USERNAME, "example.com", 0.5 + i * 0.01)
+            stats.record(BUTTON, "example.com", 0.1)
+
+        assert percentile([3, 1, 2], 0.5) == 2
+        assert stats.timeout_for(USERNAME, "example.com", default=10) == round(1.48 * 2.0, 3)
+        assert stats.timeout_for(BUTTON, "example.com", default=10) == 1.0
+
+        for _ in range(100):
+            stats.record(USERNAME, "slow.example.com", 30.0)
+        assert stats.timeout_for(USERNAME, "slow.example.com", default=10) == 5.0
+
+    def test_falls_back_when_samples_are_insufficient(self):
+        """記録が少ない場合は、セレクタ全体・ドメイン全体・指定値の順に使用すること"""
+        stats = SelectorStats(margin=1.0, min_timeout=0.0, min_samples=5)
+        for _ in range(5):
+            stats.record(USERNAME, "a.example.com", 2.0)
+            stats.record(BUTTON, "b.example.com", 3.0)
+
+        # 同じセレクタの別ドメインの記録
+        assert stats.timeout_for(USERNAME, "new.example.com", default=10) == 2.0
+        # 同じドメインの別セレクタの記録
+        assert stats.timeout_for(("login", "password"), "b.example.com", default=10) == 3.0
+        # 記録がない
+        assert stats.timeout_for(("login", "password"), "new.example.com", default=10) == 10
+
+        stats.record(("login", "password"), "new.example.com", None)
+        rows = {(row["selector"], row["domain"]): row for row in stats.report()}
+        assert rows[("login.password", "new.example.com")]["misses"] == 1
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """保存した記録が次回の実行で読み込まれること"""
+        path = tmp_path / "data" / "selector_stats.json"
+        stats = SelectorStats(str(path), margin=1.0, min_timeout=0.0, min_samples=3)
+        for seconds in (0.2, 0.4, 0.6):
+            stats.record(USERNAME, "example.com", seconds)
+        stats.save()
+
+        loaded = SelectorStats(str(path), margin=1.0, min_timeout=0.0, min_samples=3)
+
+        assert loaded.timeout_for(USERNAME, "example.com", default=10) == 0.6
+        assert {row["domain"] for row in loaded.report()} == {"example.com", "*"}
+
+
+    def test_misses_widen_timeout_until_found(self):
+        """見つからなかった回数に応じて指定値までタイムアウトを延ばし、見つかると元に戻すこと"""
+        stats = SelectorStats(margin=1.0, min_timeout=0.0, min_samples=3)
+        for _ in range(3):
+            stats.record(USERNAME, "example.com", 1.0)
+
+        stats.record(USERNAME, "example.com", None)
+        assert stats.timeout_for(USERNAME, "example.com", default=10) == 2.0
+        stats.record(USERNAME, "example.com", None)
+        stats.record(USERNAME, "example.com", None)
+        stats.record(USERNAME, "example.com", None)
+        assert stats.timeout_for(USERNAME, "example.com", default=10) == 10
+
+        stats.record(USERNAME, "example.com", 1.0)
+        assert stats.timeout_for(USERNAME, "example.com", default=10) == 1.0
+
+    def test_concurrent_saves_keep_all_records(self, tmp_path):
+        """複数の実行が同じファイルに同時に保存しても、互いの記録が失われないこと"""
+        path = tmp_path / "selector_stats.json"
+        workers = [SelectorStats(str(path)) for _ in range(4)]
+        barrier = threading.Barrier(len(workers))
+
+        def run(index, stats):
+            barrier.wait()
+            for round_ in range(5):
+                for i in range(4):
+                    stats.record(("group", f"name{index}"), "example.com", round_ * 4 + i)
+                stats.save()
+
+        threads = [threading.Thread(target=run, args=(i, stats)) for i, stats in enumerate(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        entries = json.loads(path.read_text(encoding="utf-8"))["selectors"]
+        assert sorted(entries) == [f"group.name{i}" for i in range(4)]
+        assert all(entry["example.com"]["latencies"] == list(range(20)) for entry in entries.values())
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+        # 最後に保存した実行は、ほかの実行の記録も読み込んでいる
+        assert len(workers[0].entries) + len(workers[1].entries) > 2
+
+    def test_explicit_timeout_is_not_replaced(self, tmp_path, monkeypatch):
+        """wait_for_element() で timeout を指定した場合は実績から算出したタイムアウトを使用しないこと"""
+        import selenium.webdriver.support.ui as ui
+
+        timeouts = []
+
+        class FakeWait:
+            def __init__(self, driver, timeout):
+                timeouts.append(timeout)
+
+            def until(self, condition):
+                return "element"
+
+        class FakeDriver:
+            current_url = "https://example.com/login"
+
+        monkeypatch.setattr(ui, "WebDriverWait", FakeWait)
+        selectors_path = tmp_path / "selectors.csv"
+        selectors_path.write_text(
+            "group,name,selector_type,selector_value,description\nlogin,username,id,username,ユーザー名\n",
+            encoding="utf-8"
+        )
+        browser = Browser(selectors_path=str(selectors_path), project_root=str(tmp_path), config={
+            "BROWSER": {"adaptive_timeout": "true", "adaptive_timeout_min_samples": "1", "adaptive_timeout_min": "0",
+                        "selector_stats_path": str(tmp_path / "stats.json"), "element_cache": "false"}
+        })
+        browser.driver = FakeDriver()
+        browser.selector_stats.record(USERNAME, "example.com", 0.5)
+
+        assert browser.wait_for_element(USERNAME) == "element"
+        assert browser.wait_for_element(USERNAME, timeout=7) == "element"
+
+        assert timeouts == [0.75, 7]
+        assert len(browser.selector_stats.entries["login.username"]["example.com"]["latencies"]) == 3
+
+
+class TestCandidateHistory:
+    """CandidateHistoryとセレクタの候補のテスト"""
+
+    def test_matching_candidate_is_promoted_and_drift_reported(self):
+        """第1候補が一致しなくなると一致する候補が優先され、ずれとして報告されること"""
+        history = CandidateHistory(decay=0.5)
+        candidates = ["id=username", "css=#login input[name=user]", "xpath=//input[@name='username']"]
+
+        # 実績がない場合は selectors.csv の順
+        assert history.rank(USERNAME, candidates) == candidates
+
+        history.record(USERNAME, {candidates[0]: (True, 0.2), candidates[1]: (True, 0.1), candidates[2]: (False, 0.5)})
+        assert history.rank(USERNAME, candidates)[0] == candidates[1]
+        assert history.drift(USERNAME, candidates) is not None
+
+        for _ in range(3):
+            history.record(USERNAME, {candidates[0]: (False, 0.2), candidates[1]: (False, 0.1), candidates[2]: (True, 0.5)})
+
+        assert history.rank(USERNAME, candidates)[0] == candidates[2]
+        drift = history.drift(USERNAME, candidates)
+        assert drift["primary"] == candidates[0]
+        assert drift["active"] == candidates[2]
+
+    def test_browser_reads_repeated_rows_as_candidates(self, tmp_path):
+        """selectors.csv の同じグループ・名前の行が候補として読み込まれること"""
+        selectors_path = tmp_path / "selectors.csv"
+        selectors_path.write_text(
+            "group,name,selector_type,selector_value,description\n"
+            "login,username,id,username,ユーザー名入力欄\n"
+            "login,username,css,#login input[name=user],ユーザー名入力欄（新デザイン）\n",
+            encoding="utf-8"
+        )
+        browser = Browser(selectors_path=str(selectors_path), project_root=str(tmp_path))
+        browser.add_selector_candidate("login", "username", "xpath", "//input", "フォールバック")
+        browser.add_selector_candidate("login", "username", "id", "username")
+
+        candidates = browser.get_selector_candidates("login", "username")
+
+        assert [c["selector_value"] for c in candidates] == ["username", "#login input[name=user]", "//input"]
+        assert browser.selectors["login"]["username"]["selector_value"] == "username"
+        assert browser._resolve_locator_candidates(("login", "username"))[1] == ("css selector", "#login input[name=user]")
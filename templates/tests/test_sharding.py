@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+シャーディングのテスト
+
+シャードの指定の解析、キーの決定的な振り分け、
+シャード数変更時の移動量、出力ファイルの結合を確認します。
+"""
+
+import json
+
+import pytest
+
+from src.utils.sharding import Shard, merge_shard_outputs, parse_shard, shard_for_key
+
+
+KEYS = [f"https://example.com/items/{i}" for i in range(1000)]
+
+
+class TestSharding:
+    """シャーディングのテスト"""
+
+    def test_parse_shard(self):
+        """'i/n' 形式の指定を解析し、不正な指定はエラーになること"""
+        shard = parse_shard("1/4")
+
+        assert (shard.index, shard.total) == (1, 4)
+        assert not parse_shard(None).is_sharded
+
+        for spec in ("4/4", "a/b", "1-4", "0/0"):
+            with pytest.raises(ValueError):
+                parse_shard(spec)
+
+    def test_every_key_belongs_to_exactly_one_shard(self):
+        """すべてのキーがちょうど1つのシャードに振り分けられ、偏りが小さいこと"""
+        shards = [Shard(i, 4) for i in range(4)]
+        assigned = [list(shard.filter(KEYS)) for shard in shards]
+
+        assert sorted(key for keys in assigned for key in keys) == sorted(KEYS)
+        assert all(150 < len(keys) < 350 for keys in assigned)
+
+    def test_assignment_is_deterministic(self):
+        """同じキーは常に同じシャードに振り分けられること"""
+        assert [shard_for_key(k, 8) for k in KEYS[:50]] == [shard_for_key(k, 8) for k in KEYS[:50]]
+        assert shard_for_key("https://example.com/items/0", 8) == 3
+
+    def test_adding_a_shard_moves_few_keys(self):
+        """シャード数を増やしても、移動するキーは新しいシャードへのものだけであること"""
+        moved = [k for k in KEYS if shard_for_key(k, 4) != shard_for_key(k, 5)]
+
+        assert all(shard_for_key(k, 5) == 4 for k in moved)
+        assert len(moved) < len(KEYS) * 0.3
+
+    def test_filter_with_key_function(self):
+        """キー関数でスプレッドシートの行などを振り分けられること"""
+        rows = [[f"ID-{i}", f"名前{i}"] for i in range(20)]
+        shard = Shard(0, 2)
+
+        assert list(shard.filter(rows, key=lambda row: row[0])) == [
+            row for row in rows if shard_for_key(row[0], 2) == 0
+        ]
+
+    def test_merge_jsonl_and_csv(self, tmp_path):
+        """シャードごとの出力が1つのファイルに結合されること"""
+        output = str(tmp_path / "results.jsonl")
+        for i in range(2):
+            with open(Shard(i, 2).output_path(output), "w", encoding="utf-8") as f:
+                f.write(json.dumps({"shard": i}) + "\n")
+
+        assert merge_shard_outputs(output) == 2
+        with open(output, encoding="utf-8") as f:
+            assert [json.loads(line)["shard"] for line in f] == [0, 1]
+
+        csv_output = str(tmp_path / "results.csv")
+        for i in range(2):
+            with open(Shard(i, 2).output_path(csv_output), "w", encoding="utf-8") as f:
+                f.write(f"url,title\nhttps://example.com/{i},タイトル{i}\n")
+
+        assert merge_shard_outputs(csv_output, remove=True) == 2
+        with open(csv_output, encoding="utf-8") as f:
+            assert f.read().splitlines() == ["url,title", "https://example.com/0,タイトル0", "https://example.com/1,タイトル1"]
+        assert not (tmp_path / "results.shard-0-of-2.csv").exists()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+起動時間の計測ユーティリティのテスト
+
+段階ごとの時間の記録と、表形式の出力を確認します。
+また、ブラウザモジュールのインポート時に読み込みの遅いライブラリを読み込まないことを確認します。
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from src.utils.startup_timer import StartupTimer
+
+
+# 使用する機能を呼び出すまでインポートしないライブラリ
+LAZY_MODULES = ("pyarrow", "psutil", "websocket", "watchdog", "PIL")
+
+
+class TestStartupTimer:
+    """StartupTimerのテスト"""
+
+    def test_checkpoint_and_measure_record_phases(self):
+        """checkpoint は前回からの経過時間を、measure はブロックの時間を記録すること"""
+        timer = StartupTimer()
+        time.sleep(0.02)
+        first = timer.checkpoint("import")
+        with timer.measure("config"):
+            time.sleep(0.01)
+        with timer.measure("config"):
+            time.sleep(0.01)
+
+        assert first >= 0.02
+        assert list(timer.phases) == ["import", "config"]
+        assert timer.phases["config"] >= 0.02
+        assert timer.to_dict()["total"] >= first + timer.phases["config"]
+
+    def test_report_lists_phases_in_order(self):
+        """記録した順に段階と割合を表示し、最後に合計を表示すること"""
+        timer = StartupTimer()
+        timer.started -= 1.0
+        timer.record("import", 0.5)
+        timer.record("browser.driver_resolution", 0.25)
+
+        lines = timer.report().splitlines()
+
+        assert [line.split()[0] for line in lines[1:-1]] == ["import", "browser.driver_resolution"]
+        assert lines[1].split()[1] == "0.500"
+        assert lines[-1].startswith("合計")
+
+
+class TestLazyImports:
+    """ブラウザモジュールのインポート時間のテスト"""
+
+    def test_browser_import_skips_heavy_modules(self):
+        """browser モジュールのインポートでは、読み込みの遅いライブラリがインポートされないこと"""
+        script = (
+            "import json, sys; import src.modules.selenium.browser; "
+            f"print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env)
+
+        assert json.loads(output.stdout) == []
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+タブプールのテスト
+
+DevTools への接続を模したセッションを使い、複数タブへの同時の移動指示、
+完了順での結果の返却、タブの作り直し、タイムアウトを確認します。
+"""
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from src.modules.selenium.tab_pool import TabPool
+
+
+class FakePages:
+    """
+    ダミーの DevTools 接続に応答を登録し、Page.navigate を受けると URL に応じた時間の後に load イベントを送る
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.ids = itertools.count(1)
+        self.created = []
+        self.closed = []
+        self.urls = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        session.handle("Target.createTarget", self._create_target)
+        session.handle("Target.closeTarget", self._close_target)
+        session.handle("Page.navigate", self._navigate)
+        session.handle("Runtime.evaluate",
+                       lambda params, session_id: {"result": {"value": {"url": self.urls[session_id]}}})
+
+    def _create_target(self, params, session_id):
+        target_id = f"T{next(self.ids)}"
+        self.created.append(target_id)
+        return {"targetId": target_id}
+
+    def _close_target(self, params, session_id):
+        self.closed.append(params["targetId"])
+        return {}
+
+    def _navigate(self, params, session_id):
+        if "error" in params["url"]:
+            # 次の移動が指示された後に、前の移動のエラーが返る
+            time.sleep(0.5)
+            raise RuntimeError("connection reset")
+        self.urls[session_id] = params["url"]
+        loader_id = f"L{next(self.ids)}"
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        threading.Thread(target=self._fire, args=(session_id, params["url"], loader_id), daemon=True).start()
+        return {"frameId": session_id[2:], "loaderId": loader_id}
+
+    def _fire(self, session_id, url, loader_id):
+        delay = 0.15 if "slow" in url else 0.02
+        if "hang" in url:
+            return
+        if "late" in url:
+            # タイムアウトした後に、前の移動の load イベントが届く
+            delay = 0.5
+        time.sleep(delay)
+        with self.lock:
+            self.active -= 1
+        self.session.emit("Page.lifecycleEvent", {"name": "load", "frameId": session_id[2:], "loaderId": loader_id},
+                          session_id=session_id)
+
+
+@pytest.fixture
+def pages(devtools_session):
+    return FakePages(devtools_session)
+
+
+class TestTabPool:
+    """TabPoolのテスト"""
+
+    def test_urls_are_loaded_concurrently_in_tabs(self, pages):
+        """複数のタブで同時に読み込み、完了した順に結果が返されること"""
+        session = pages.session
+        urls = ["https://example.com/slow"] + [f"https://example.com/{i}" for i in range(7)]
+
+        with TabPool(session, size=4, timeout=5) as pool:
+            results = list(pool.map(urls))
+
+        assert sorted(r.url for r in results) == sorted(urls)
+        assert all(r.ok and r.data["url"] == r.url for r in results)
+        assert results[-1].url == "https://example.com/slow"
+        assert pages.max_active == 4
+        assert len(pages.created) == 4
+        assert sorted(pages.closed) == sorted(pages.created)
+
+    def test_tabs_are_recycled_after_max_uses(self, pages):
+        """使用回数の上限に達したタブが作り直されること"""
+        session = pages.session
+
+        with TabPool(session, size=1, timeout=5, max_uses=2) as pool:
+            results = list(pool.map([f"https://example.com/{i}" for i in range(5)]))
+
+        assert len(results) == 5
+        assert len(pages.created) == 3
+
+    def test_timeout_marks_failure_and_continues(self, pages):
+        """読み込みが終わらないページは失敗とし、残りのURLを処理すること"""
+        session = pages.session
+
+        with TabPool(session, size=1, timeout=0.3) as pool:
+            results = list(pool.map(["https://example.com/hang", "https://example.com/ok"]))
+
+        assert [(r.url, r.ok) for r in results] == [
+            ("https://example.com/hang", False), ("https://example.com/ok", True)
+        ]
+        assert "タイムアウト" in results[0].error
+
+    def test_stale_completions_are_ignored(self, make_devtools_session):
+        """タイムアウトした前の移動の load イベントやエラーを、次のURLの結果として扱わないこと"""
+        # 前の移動の load イベントは次のページの読み込み中に届き、エラーは次の移動の Page.navigate の前に返る
+        cases = [("https://example.com/late", "https://example.com/slow-next"),
+                 ("https://example.com/error", "https://example.com/next")]
+        for stale_url, next_url in cases:
+            session = FakePages(make_devtools_session()).session
+
+            with TabPool(session, size=1, timeout=0.3) as pool:
+                results = list(pool.map([stale_url, next_url]))
+
+            assert [(r.url, r.ok) for r in results] == [(stale_url, False), (next_url, True)]
+            assert "タイムアウト" in results[0].error
+
+    def test_recycled_tabs_stop_listening(self, pages):
+        """作り直したタブと閉じたタブの読み込み完了イベントの購読を終了すること"""
+        session = pages.session
+
+        with TabPool(session, size=2, timeout=5, max_uses=1) as pool:
+            list(pool.map([f"https://example.com/{i}" for i in range(4)]))
+            assert len(session.listeners["Page.lifecycleEvent"]) == 2
+        assert session.listeners["Page.lifecycleEvent"] == []
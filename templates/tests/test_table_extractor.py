@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+テーブル抽出のテスト
+
+見出し行からの列名の作成と、行数ごとの取得・CSV/Parquet への書き出しを確認します。
+"""
+
+import csv
+
+import pytest
+
+from src.modules.selenium.table_extractor import (
+    TABLE_INFO_JS, TableExtractor, column_names, detect_format, extract_table, write_arrow
+)
+
+
+class FakeDriver:
+    """rowspan・colspan を展開済みの表を返すダミーのドライバー"""
+
+    def __init__(self, grid, header_rows=1):
+        self.grid = grid
+        self.header_rows = header_rows
+        self.calls = []
+
+    def execute_script(self, script, table, *args):
+        if script == TABLE_INFO_JS:
+            return {'rows': len(self.grid), 'header_rows': self.header_rows}
+        start, limit, carry, fill = args
+        self.calls.append((start, limit))
+        rows = [list(row) for row in self.grid[start:start + limit]]
+        return {'rows': rows, 'next': start + len(rows), 'carry': carry}
+
+
+GRID = [["Region", "Sales", "Sales"], ["Region", "Q1", "Q2"]] + [["East", str(i), str(i * 2)] for i in range(5)]
+
+
+class TestTableExtractor:
+    """TableExtractorのテスト"""
+
+    def test_column_names_from_header_rows(self):
+        """複数の見出し行が列ごとにつながり、空・重複の列名に番号が付くこと"""
+        assert column_names(GRID[:2], 3) == ["Region", "Sales / Q1", "Sales / Q2"]
+        assert column_names([["id", "", "id"]], 4) == ["id", "column_2", "id_2", "column_4"]
+        assert detect_format("out/table.PARQUET") == "parquet"
+        with pytest.raises(ValueError):
+            detect_format("out/table.xlsx")
+
+    def test_rows_are_fetched_in_chunks_and_written_to_csv(self, tmp_path):
+        """見出し行の後の行が chunk_size 行ずつ取得され、CSV に書き出されること"""
+        driver = FakeDriver(GRID + [["West", "9"], ["North", "1", "2", "extra"]], header_rows=2)
+        path = tmp_path / "sales.csv"
+
+        result = extract_table(driver, object(), str(path), chunk_size=3)
+
+        assert driver.calls == [(0, 2), (2, 3), (5, 3), (8, 3)]
+        assert result["rows"] == 7
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["Region", "Sales / Q1", "Sales / Q2"]
+        assert rows[-2] == ["West", "9", ""]
+        assert rows[-1] == ["North", "1", "2"]
+
+    def test_write_parquet(self, tmp_path):
+        """Parquet ファイルに文字列の列として書き出されること"""
+        pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+        extractor = TableExtractor(FakeDriver(GRID, header_rows=2), object(), chunk_size=2)
+        path = tmp_path / "sales.parquet"
+
+        assert write_arrow(extractor.columns, extractor.iter_chunks(), str(path), parquet=True) == 5
+
+        table = pyarrow_parquet.read_table(str(path))
+        assert table.column_names == ["Region", "Sales / Q1", "Sales / Q2"]
+        assert table.column("Sales / Q2").to_pylist() == ["0", "2", "4", "6", "8"]
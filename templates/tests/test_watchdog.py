@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+プロセス監視のテスト
+
+chromedriver と Chrome の代わりに子プロセスを持つ Python プロセスを起動し、
+プロセスツリーの計測、セッションの作り直しの判断、終了しないプロセスの強制終了を確認します。
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+psutil = pytest.importorskip("psutil")
+
+from src.modules.selenium.browser import Browser
+from src.modules.selenium.watchdog import ProcessWatchdog
+
+# 子プロセスを1つ起動して待ち続けるプロセス（ドライバーと Chrome の親子関係の代わり）
+TREE_SCRIPT = (
+    "import subprocess, sys, time; "
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+    "time.sleep(60)"
+)
+
+
+class FakeService:
+    def __init__(self, process):
+        self.process = process
+
+
+class FakeDriver:
+    """service.process にプロセスを持ち、quit() が戻らないダミーのドライバー"""
+
+    def __init__(self, process, hang=False):
+        self.service = FakeService(process)
+        self.hang = hang
+        self.released = threading.Event()
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        if self.hang:
+            self.released.wait(30)
+
+
+@pytest.fixture
+def process_tree():
+    process = subprocess.Popen([sys.executable, "-c", TREE_SCRIPT])
+    root = psutil.Process(process.pid)
+    deadline = time.time() + 10
+    while not root.children() and time.time() < deadline:
+        time.sleep(0.05)
+    children = root.children()
+    yield process, [root] + children
+    for p in [root] + children:
+        try:
+            p.kill()
+        except psutil.Error:
+            pass
+    process.wait()
+
+
+class TestProcessWatchdog:
+    """ProcessWatchdogのテスト"""
+
+    def test_sample_covers_process_tree(self, process_tree):
+        """ドライバーとその子プロセスをまとめて計測すること"""
+        process, _ = process_tree
+        watchdog = ProcessWatchdog()
+        watchdog.attach(FakeDriver(process))
+
+        sample = watchdog.sample()
+
+        assert sample["processes"] == 2
+        assert sample["rss_mb"] > 0
+        assert sample["handles"] > 0
+        assert watchdog.metrics.peak_rss_mb == sample["rss_mb"]
+
+    def test_should_recycle_after_limits(self, process_tree):
+        """移動回数またはメモリ使用量が上限に達すると作り直しを求めること"""
+        process, _ = process_tree
+        watchdog = ProcessWatchdog(max_navigations=2)
+        watchdog.attach(FakeDriver(process))
+
+        watchdog.record_navigation()
+        assert watchdog.should_recycle() is None
+        watchdog.record_navigation()
+        assert "移動回数" in watchdog.should_recycle()
+
+        watchdog = ProcessWatchdog(memory_limit_mb=1)
+        watchdog.attach(FakeDriver(process))
+        watchdog.record_navigation()
+        assert "メモリ使用量" in watchdog.should_recycle()
+
+    def test_terminate_kills_orphaned_children(self, process_tree):
+        """親プロセスが先に終了しても、残った子プロセスを強制終了すること"""
+        process, processes = process_tree
+        watchdog = ProcessWatchdog(quit_timeout=0.2)
+        watchdog.attach(FakeDriver(process))
+
+        # ドライバーだけが異常終了し、Chrome に相当する子プロセスが残った状態
+        processes[0].kill()
+        process.wait()
+
+        assert watchdog.terminate() == 1
+        assert not any(p.is_running() for p in processes)
+
+    def test_terminate_skips_reused_pids(self, process_tree):
+        """確認したプロセスが終了し、そのプロセスIDが別のプロセスに再利用されていても終了させないこと"""
+        process, processes = process_tree
+        watchdog = ProcessWatchdog(quit_timeout=0.2)
+        watchdog.attach(FakeDriver(process))
+
+        # 子プロセスのIDを、開始時刻の異なる（＝以前に同じIDを使っていた）プロセスとして記録し直す
+        child = processes[1]
+        stale = psutil.Process(child.pid)
+        if not hasattr(stale, "_ident"):
+            pytest.skip("psutil のバージョンが古いため、プロセスIDの再利用を再現できません")
+        stale._ident = (child.pid, stale._ident[1] - 1000)
+        watchdog._seen[child.pid] = stale
+        watchdog._roots = []
+
+        assert watchdog.terminate() == 1
+        assert child.is_running()
+        assert not processes[0].is_running()
+
+
+class TestBrowserQuit:
+    """Browser.quit() のタイムアウトと計測結果の出力のテスト"""
+
+    def test_hung_quit_is_killed_and_metrics_exported(self, process_tree, tmp_path):
+        """quit() が戻らない場合はプロセスを強制終了し、計測結果を出力すること"""
+        process, processes = process_tree
+        metrics_path = tmp_path / "sessions.jsonl"
+        browser = Browser(
+            config={"BROWSER": {"quit_timeout": "0.3", "watchdog_metrics_path": str(metrics_path),
+                                "auto_screenshot": "false"}},
+            project_root=str(tmp_path)
+        )
+        driver = FakeDriver(process, hang=True)
+        browser.driver = driver
+        browser.watchdog.attach(driver)
+        browser.watchdog.record_navigation()
+
+        started = time.time()
+        browser.quit()
+        driver.released.set()
+
+        assert time.time() - started < 10
+        assert browser.driver is None
+        assert not any(p.is_running() for p in processes)
+
+        record = json.loads(metrics_path.read_text(encoding="utf-8").splitlines()[0])
+        assert record["navigations"] == 1
+        assert record["killed_processes"] == 2
+        assert record["peak_rss_mb"] > 0